@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark primary-key lookups with and without server-side prepared statements.
+
+Runs `session.query(Exercise).filter(Exercise.id == exercise_id).first()` against
+a PostgreSQL database twice, both through psycopg 3: once with prepared
+statements disabled (re-planned on every call) and once with
+`prepare_threshold` set, so the statement is planned once per connection and
+then executed from the prepared plan. Only the threshold differs between the
+two runs. Reports mean, p50 and p99 latency for each mode.
+
+Usage:
+    DATABASE_URL=postgresql://localhost/mnemosys_bench \\
+        python scripts/dev/benchmark_prepared_statements.py --lookups 20000
+
+The script creates the schema if needed and seeds exercises when the table is
+empty. Point it at a scratch database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import time
+from typing import TYPE_CHECKING
+
+from sqlalchemy import make_url
+
+from mnemosys_core.db import models  # noqa: F401 - imports needed for SQLAlchemy model registration
+from mnemosys_core.db.base import Base
+from mnemosys_core.db.engine import create_db_engine, with_prepared_statement_driver
+from mnemosys_core.db.models import DomainType, Exercise
+from mnemosys_core.db.session import create_session_factory
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+    from sqlalchemy.orm import Session as DBSession
+
+
+def seed_exercises(engine: Engine, exercise_count: int) -> list[int]:
+    """Create the schema, seed exercises if empty and return their IDs."""
+    Base.metadata.create_all(engine)
+    session_factory = create_session_factory(engine)
+    with session_factory() as db_session:
+        if db_session.query(Exercise).count() == 0:
+            db_session.add_all(
+                Exercise(name=f"Benchmark Exercise {index}", domains=[DomainType.TECHNIQUE])
+                for index in range(exercise_count)
+            )
+            db_session.commit()
+        return [exercise_id for (exercise_id,) in db_session.query(Exercise.id).all()]
+
+
+def time_lookups(engine: Engine, exercise_ids: list[int], lookup_count: int) -> list[float]:
+    """Run primary-key lookups on one session and return per-call latencies in microseconds."""
+    session_factory = create_session_factory(engine)
+    randomizer = random.Random(42)
+    latencies: list[float] = []
+    with session_factory() as db_session:
+        # Warm up the connection, SQLAlchemy's compiled cache and the prepare threshold
+        for exercise_id in exercise_ids[:10]:
+            lookup_exercise(db_session, exercise_id)
+        for _ in range(lookup_count):
+            exercise_id = randomizer.choice(exercise_ids)
+            started = time.perf_counter()
+            lookup_exercise(db_session, exercise_id)
+            latencies.append((time.perf_counter() - started) * 1_000_000)
+    return latencies
+
+
+def lookup_exercise(db_session: DBSession, exercise_id: int) -> Exercise | None:
+    """The hot query under test."""
+    db_session.expunge_all()
+    return db_session.query(Exercise).filter(Exercise.id == exercise_id).first()
+
+
+def summarize(label: str, latencies: list[float]) -> None:
+    """Print latency statistics for one mode."""
+    ordered = sorted(latencies)
+    p99_index = min(len(ordered) - 1, int(len(ordered) * 0.99))
+    print(
+        f"{label:<28} mean={statistics.fmean(ordered):8.1f}us "
+        f"p50={statistics.median(ordered):8.1f}us p99={ordered[p99_index]:8.1f}us"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--exercises", type=int, default=35)
+    parser.add_argument("--prepare-threshold", type=int, default=1)
+    arguments = parser.parse_args()
+
+    if not arguments.database_url or not arguments.database_url.startswith("postgresql"):
+        raise SystemExit("A PostgreSQL --database-url (or DATABASE_URL) is required.")
+
+    # Same driver for both runs so only the prepare threshold differs
+    database_url = with_prepared_statement_driver(make_url(arguments.database_url)).render_as_string(
+        hide_password=False
+    )
+    baseline_engine = create_db_engine(database_url, prepare_threshold=None)
+    prepared_engine = create_db_engine(database_url, prepare_threshold=arguments.prepare_threshold)
+    try:
+        exercise_ids = seed_exercises(baseline_engine, arguments.exercises)
+        summarize("psycopg prepared off", time_lookups(baseline_engine, exercise_ids, arguments.lookups))
+        summarize(
+            f"psycopg prepare_threshold={arguments.prepare_threshold}",
+            time_lookups(prepared_engine, exercise_ids, arguments.lookups),
+        )
+    finally:
+        baseline_engine.dispose()
+        prepared_engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,15 +5,33 @@ FastAPI application factory.
 from fastapi import FastAPI
 from sqlalchemy import Engine
 
+from ..db.query_budget import QueryMonitor
+from ..db.retry import RetryPolicy
+from ..db.slow_query import SlowQueryLog
 from .dependencies import configure_dependencies
+from .middleware import observe_queries
 
 
-def create_app(engine: Engine) -> FastAPI:
+def create_app(
+    engine: Engine,
+    read_engine: Engine | None = None,
+    retry_policy: RetryPolicy | None = None,
+    query_monitor: QueryMonitor | None = None,
+    slow_query_log: SlowQueryLog | None = None,
+) -> FastAPI:
     """
     Create and configure FastAPI application.
 
     Args:
         engine: SQLAlchemy engine for database operations
+        read_engine: Optional reader engine for read-only requests
+            (see `create_read_engine` for file-backed SQLite)
+        retry_policy: Retry policy for idempotent requests hitting transient
+            database errors (see `retry_policy_from_settings`)
+        query_monitor: Per-request query budget checks (see
+            `query_monitor_from_settings`)
+        slow_query_log: Optional slow query log, served at /debug/slow-queries
+            (see `slow_query_log_from_settings`)
 
     Returns:
         Configured FastAPI application
@@ -30,14 +48,19 @@ def create_app(engine: Engine) -> FastAPI:
     )
 
     # Configure dependency injection
-    configure_dependencies(app, engine)
+    configure_dependencies(app, engine, read_engine, retry_policy, query_monitor, slow_query_log)
+    app.middleware("http")(observe_queries)
 
     # Register routers
-    from .routers import exercises, health, instruments, practices
+    from .routers import debug, exercises, exports, health, instruments, mesocycles, practices, sessions
 
     app.include_router(health.router, prefix="/health", tags=["health"])
+    app.include_router(debug.router, prefix="/debug", tags=["debug"])
     app.include_router(instruments.router, prefix="/api/v1/instruments", tags=["instruments"])
     app.include_router(exercises.router, prefix="/api/v1/exercises", tags=["exercises"])
     app.include_router(practices.router, prefix="/api/v1/practices", tags=["practices"])
+    app.include_router(sessions.router, prefix="/api/v1/sessions", tags=["sessions"])
+    app.include_router(mesocycles.router, prefix="/api/v1/mesocycles", tags=["mesocycles"])
+    app.include_router(exports.router, prefix="/api/v1/exports", tags=["exports"])
 
     return app
@@ -8,24 +8,69 @@ from fastapi import FastAPI, Request
 from sqlalchemy import Engine
 from sqlalchemy.orm import Session as DBSession
 
+from ..db.query_budget import QueryMonitor, track_queries
+from ..db.reference_cache import ReferenceDataCache
+from ..db.retry import RetryMetrics, RetryPolicy
 from ..db.session import create_session_factory, get_session_dependency
+from ..db.slow_query import SlowQueryLog
+from ..generator import CandidateIndexCache, SessionPlanCache
 
+# HTTP methods whose handlers only read; they run in read-only transactions
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
-def configure_dependencies(app: FastAPI, engine: Engine) -> None:
+
+def configure_dependencies(
+    app: FastAPI,
+    engine: Engine,
+    read_engine: Engine | None = None,
+    retry_policy: RetryPolicy | None = None,
+    query_monitor: QueryMonitor | None = None,
+    slow_query_log: SlowQueryLog | None = None,
+) -> None:
     """
     Configure application dependencies.
 
     Args:
         app: FastAPI application
         engine: SQLAlchemy engine
+        read_engine: Optional reader engine for read-only requests
+        retry_policy: Retry policy for idempotent requests hitting transient
+            database errors (defaults to RetryPolicy())
+        query_monitor: Per-request query budget checks (defaults to a
+            non-strict QueryMonitor that logs violations)
+        slow_query_log: Optional slow query log to attach to the engines
     """
-    app.state.session_factory = create_session_factory(engine)
+    session_factory = create_session_factory(engine, read_engine)
+    reference_cache = ReferenceDataCache(session_factory)
+    reference_cache.track_writes(session_factory)
+    plan_cache = SessionPlanCache()
+    plan_cache.track_writes(session_factory)
+    track_queries(engine)
+    if read_engine is not None:
+        track_queries(read_engine)
+    if slow_query_log is not None:
+        slow_query_log.attach(engine)
+        if read_engine is not None:
+            slow_query_log.attach(read_engine)
+
+    app.state.engine = engine
+    app.state.session_factory = session_factory
+    app.state.reference_cache = reference_cache
+    app.state.candidate_index_cache = CandidateIndexCache(reference_cache)
+    app.state.plan_cache = plan_cache
+    app.state.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+    app.state.retry_metrics = RetryMetrics()
+    app.state.query_monitor = query_monitor if query_monitor is not None else QueryMonitor()
+    app.state.slow_query_log = slow_query_log
 
 
 def get_db(request: Request) -> Generator[DBSession]:
     """
     FastAPI dependency for database sessions.
 
+    Sessions for GET, HEAD and OPTIONS requests run in read-only transactions
+    and are never committed.
+
     Yields:
         Database session
 
@@ -39,4 +84,43 @@ def get_db(request: Request) -> Generator[DBSession]:
         raise RuntimeError("Dependencies not configured. Call configure_dependencies first.")
 
     get_session = get_session_dependency(session_factory)
-    yield from get_session()
+    yield from get_session(read_only=request.method in READ_ONLY_METHODS)
+
+
+def get_reference_cache(request: Request) -> ReferenceDataCache:
+    """
+    FastAPI dependency for the reference data cache.
+
+    Returns:
+        Application reference data cache
+    """
+    reference_cache = getattr(request.app.state, "reference_cache", None)
+    if reference_cache is None:
+        raise RuntimeError("Dependencies not configured. Call configure_dependencies first.")
+    return reference_cache  # type: ignore[no-any-return]
+
+
+def get_candidate_index_cache(request: Request) -> CandidateIndexCache:
+    """
+    FastAPI dependency for the session generator's candidate index cache.
+
+    Returns:
+        Application candidate index cache
+    """
+    candidate_index_cache = getattr(request.app.state, "candidate_index_cache", None)
+    if candidate_index_cache is None:
+        raise RuntimeError("Dependencies not configured. Call configure_dependencies first.")
+    return candidate_index_cache  # type: ignore[no-any-return]
+
+
+def get_plan_cache(request: Request) -> SessionPlanCache:
+    """
+    FastAPI dependency for the generated session plan cache.
+
+    Returns:
+        Application session plan cache
+    """
+    plan_cache = getattr(request.app.state, "plan_cache", None)
+    if plan_cache is None:
+        raise RuntimeError("Dependencies not configured. Call configure_dependencies first.")
+    return plan_cache  # type: ignore[no-any-return]
@@ -0,0 +1,39 @@
+"""
+HTTP middleware.
+"""
+
+from collections.abc import Awaitable, Callable
+
+from fastapi import Request, Response
+
+from ..db.query_budget import QueryMonitor, capture_queries
+from ..db.slow_query import query_origin
+
+
+def route_label(request: Request) -> str:
+    """
+    Label a request by method and route template (e.g. "GET /api/v1/practices/{practice_id}").
+
+    Falls back to the URL path before routing or for unmatched requests.
+    """
+    route = request.scope.get("route")
+    return f"{request.method} {getattr(route, 'path', request.url.path)}"
+
+
+async def observe_queries(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """
+    Attribute each request's statements to its route and check its query budget.
+
+    Endpoints declare a budget with `dependencies=[Depends(QueryBudget(...))]`;
+    others get the monitor's default budget. Requests that fail are not
+    checked, so the original error is never masked.
+    """
+    with query_origin(lambda: route_label(request)):
+        query_monitor: QueryMonitor | None = getattr(request.app.state, "query_monitor", None)
+        if query_monitor is None:
+            return await call_next(request)
+
+        with capture_queries() as query_log:
+            response = await call_next(request)
+    query_monitor.check(query_log, route_label(request))
+    return response
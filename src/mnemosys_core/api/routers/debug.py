@@ -0,0 +1,41 @@
+"""
+Debugging endpoints.
+"""
+
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any, Literal
+
+from fastapi import APIRouter, HTTPException, Request
+
+from ..routing import RetryingRoute
+
+if TYPE_CHECKING:
+    from ...db.slow_query import SlowQueryLog
+
+router = APIRouter(route_class=RetryingRoute)
+
+
+@router.get("/slow-queries")
+def list_slow_queries(
+    request: Request,
+    order: Literal["recent", "slowest"] = "recent",
+    origin: str | None = None,
+    limit: int = 50,
+) -> dict[str, Any]:
+    """Recent slow statements with their plans, newest or slowest first."""
+    slow_query_log: SlowQueryLog | None = request.app.state.slow_query_log
+    if slow_query_log is None:
+        raise HTTPException(status_code=404, detail="Slow query log not enabled")
+
+    samples = slow_query_log.samples()
+    if origin is not None:
+        samples = [sample for sample in samples if sample.origin == origin]
+    if order == "slowest":
+        samples.sort(key=lambda sample: sample.duration_ms, reverse=True)
+    else:
+        samples.reverse()
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "explain_threshold_ms": slow_query_log.explain_threshold_ms,
+        "samples": [asdict(sample) for sample in samples[:limit]],
+    }
@@ -1,13 +1,26 @@
 """
 Exercise API endpoints.
-"""
 
+Exercise states are partly derived: their rolling minute windows and
+mastery estimates follow the practice history (see
+`mnemosys_core.db.rolling_minutes` and `mnemosys_core.db.mastery`) and
+cannot be written through the API.
+
+The exercise list can be filtered with repeated `domain`,
+`instrument_feature` and `technique_id` query arguments; each filter matches
+any of its values and filters combine with AND. Filters are evaluated on the
+catalog's compatibility bitmasks (see `mnemosys_core.generator.compatibility`).
+"""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session as DBSession
 
-from ...db.models import Exercise, ExerciseState
-from ..dependencies import get_db
+from ...db.models import DomainType, Exercise, ExerciseState
+from ...db.reference_cache import ExerciseSnapshot, ReferenceDataCache
+from ...db.rolling_minutes import refresh_rolling_minutes
+from ...generator import CandidateIndexCache
+from ..dependencies import get_candidate_index_cache, get_db, get_reference_cache
+from ..routing import RetryingRoute
 from ..schemas.exercises import (
     ExerciseCreate,
     ExerciseResponse,
@@ -17,7 +30,7 @@ from ..schemas.exercises import (
     ExerciseUpdate,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=RetryingRoute)
 
 
 # Exercise endpoints
@@ -31,15 +44,42 @@ def create_exercise(exercise: ExerciseCreate, db_session: DBSession = Depends(ge
 
 
 @router.get("/", response_model=list[ExerciseResponse])
-def list_exercises(db_session: DBSession = Depends(get_db), skip: int = 0, limit: int = 100) -> list[Exercise]:
-    """List all exercises."""
-    return db_session.query(Exercise).offset(skip).limit(limit).all()
+def list_exercises(
+    reference_cache: ReferenceDataCache = Depends(get_reference_cache),
+    candidate_index_cache: CandidateIndexCache = Depends(get_candidate_index_cache),
+    skip: int = 0,
+    limit: int = 100,
+    domain: list[DomainType] = Query(default=[], description="Domain the exercise belongs to"),
+    instrument_feature: list[str] = Query(
+        default=[], description="Instrument feature such as 7-string; matches exercises the instrument can play"
+    ),
+    technique_id: list[int] = Query(default=[], description="Technique the exercise is tagged with"),
+) -> list[ExerciseSnapshot]:
+    """List exercises, optionally filtered (served from the reference data cache)."""
+    snapshot = reference_cache.get()
+    if not (domain or instrument_feature or technique_id):
+        return list(snapshot.exercises[skip : skip + limit])
+
+    compatibility = candidate_index_cache.get().compatibility
+    mask = compatibility.all_mask
+    if domain:
+        mask &= compatibility.in_domains(domain)
+    if instrument_feature:
+        mask &= compatibility.compatible(feature.lower() for feature in instrument_feature)
+    if technique_id:
+        mask &= compatibility.with_techniques(technique_id)
+    if skip >= compatibility.count(mask):
+        return []
+    exercises = (snapshot.exercise_by_id.get(exercise_id) for exercise_id in compatibility.exercise_ids(mask))
+    return [exercise for exercise in exercises if exercise is not None][skip : skip + limit]
 
 
 @router.get("/{exercise_id}", response_model=ExerciseResponse)
-def get_exercise(exercise_id: int, db_session: DBSession = Depends(get_db)) -> Exercise:
-    """Get exercise by ID."""
-    exercise = db_session.query(Exercise).filter(Exercise.id == exercise_id).first()
+def get_exercise(
+    exercise_id: int, reference_cache: ReferenceDataCache = Depends(get_reference_cache)
+) -> ExerciseSnapshot:
+    """Get exercise by ID (served from the reference data cache)."""
+    exercise = reference_cache.get().exercise_by_id.get(exercise_id)
     if exercise is None:
         raise HTTPException(status_code=404, detail="Exercise not found")
     return exercise
@@ -76,10 +116,14 @@ def delete_exercise(exercise_id: int, db_session: DBSession = Depends(get_db)) -
 # Exercise state endpoints
 @router.post("/states/", response_model=ExerciseStateResponse, status_code=status.HTTP_201_CREATED)
 def create_exercise_state(state: ExerciseStateCreate, db_session: DBSession = Depends(get_db)) -> ExerciseState:
-    """Create a new exercise state."""
+    """Create a new exercise state, with rolling windows from the history logged so far."""
+    existing = db_session.query(ExerciseState.id).filter(ExerciseState.exercise_id == state.exercise_id).first()
+    if existing is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Exercise state already exists")
     db_state = ExerciseState(**state.model_dump())
     db_session.add(db_state)
     db_session.flush()
+    refresh_rolling_minutes(db_session, [db_state.exercise_id])
     return db_state
 
 
@@ -0,0 +1,67 @@
+"""
+Columnar export endpoints.
+
+`GET /{source}.parquet` streams an export source (see `EXPORT_SOURCES`) into
+a Parquet file. The `X-Export-Rows` and `X-Export-Last-Id` headers report
+what was written; pass the last ID back as `after_id` for the next
+incremental export.
+"""
+
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session as DBSession
+from starlette.background import BackgroundTask
+
+from ...db.export import EXPORT_SOURCES, export_file_name, export_parquet
+from ..dependencies import get_db
+from ..routing import RetryingRoute
+
+router = APIRouter(route_class=RetryingRoute)
+
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+
+@router.get("/")
+def list_export_sources() -> list[str]:
+    """List the sources that can be exported."""
+    return sorted(EXPORT_SOURCES)
+
+
+@router.get("/{source_name}.parquet", response_class=FileResponse)
+def export_source(
+    source_name: str,
+    after_id: int | None = None,
+    since: date | None = None,
+    db_session: DBSession = Depends(get_db),
+) -> FileResponse:
+    """Export a source as Parquet, optionally only rows after an ID or since a session date."""
+    if source_name not in EXPORT_SOURCES:
+        raise HTTPException(status_code=404, detail="Export source not found")
+
+    with tempfile.NamedTemporaryFile(suffix=".parquet", delete=False) as export_file:
+        export_path = Path(export_file.name)
+        try:
+            export_result = export_parquet(
+                db_session.connection(), source_name, export_file, after_id=after_id, since=since
+            )
+        except RuntimeError as error:
+            export_path.unlink()
+            raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(error)) from error
+        except BaseException:
+            export_path.unlink()
+            raise
+
+    headers = {"X-Export-Rows": str(export_result.rows)}
+    if export_result.last_id is not None:
+        headers["X-Export-Last-Id"] = str(export_result.last_id)
+    return FileResponse(
+        export_path,
+        media_type=PARQUET_MEDIA_TYPE,
+        filename=export_file_name(source_name, after_id, since),
+        headers=headers,
+        background=BackgroundTask(export_path.unlink),
+    )
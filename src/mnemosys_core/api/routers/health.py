@@ -2,15 +2,21 @@
 Health check endpoints.
 """
 
-from typing import Any
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import Engine, text
 from sqlalchemy.orm import Session as DBSession
 
+from ...db.pool import get_pool_metrics
 from ..dependencies import get_db
+from ..routing import RetryingRoute
 
-router = APIRouter()
+if TYPE_CHECKING:
+    from ...db.retry import RetryMetrics
+
+router = APIRouter(route_class=RetryingRoute)
 
 
 @router.get("/")
@@ -27,3 +33,26 @@ def database_health(db_session: DBSession = Depends(get_db)) -> dict[str, Any]:
         return {"status": "ok", "database": "connected"}
     except Exception as exception:
         return {"status": "error", "database": str(exception)}
+
+
+@router.get("/pool")
+def pool_health(request: Request) -> dict[str, Any]:
+    """Connection pool status, counters and checkout-wait histogram."""
+    engine: Engine = request.app.state.engine
+    pool_metrics = get_pool_metrics(engine.pool)
+    if pool_metrics is None:
+        return {"status": engine.pool.status(), "metrics": None}
+    pool_statistics = pool_metrics.snapshot()
+    return {
+        "status": engine.pool.status(),
+        "metrics": asdict(pool_statistics),
+        "wait_p50_ms": pool_statistics.wait_quantile_ms(0.50),
+        "wait_p99_ms": pool_statistics.wait_quantile_ms(0.99),
+    }
+
+
+@router.get("/retries")
+def retry_health(request: Request) -> dict[str, Any]:
+    """Counters of requests retried after transient database errors."""
+    retry_metrics: RetryMetrics = request.app.state.retry_metrics
+    return asdict(retry_metrics.snapshot())
@@ -1,17 +1,26 @@
 """
 Instrument API endpoints.
-"""
 
+Reads load the subclass columns of the joined-table instrument hierarchy in
+the same query (`with_polymorphic`); loading them lazily costs one query
+per instrument.
+"""
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session as DBSession
+from sqlalchemy.orm import with_polymorphic
 
 from ...db.models import Instrument
 from ...db.models.instrument import StringedInstrument
+from ...db.query_budget import QueryBudget
 from ..dependencies import get_db
+from ..routing import RetryingRoute
 from ..schemas.instruments import InstrumentCreate, InstrumentResponse, InstrumentUpdate
 
-router = APIRouter()
+router = APIRouter(route_class=RetryingRoute)
+
+# Instrument with the columns of every subclass table
+any_instrument = with_polymorphic(Instrument, "*")
 
 
 @router.post("/", response_model=InstrumentResponse, status_code=status.HTTP_201_CREATED)
@@ -23,18 +32,18 @@ def create_instrument(instrument: InstrumentCreate, db_session: DBSession = Depe
     return db_instrument
 
 
-@router.get("/", response_model=list[InstrumentResponse])
+@router.get("/", response_model=list[InstrumentResponse], dependencies=[Depends(QueryBudget(max_queries=1))])
 def list_instruments(
     db_session: DBSession = Depends(get_db), skip: int = 0, limit: int = 100
 ) -> list[Instrument]:
     """List all instruments."""
-    return db_session.query(Instrument).offset(skip).limit(limit).all()
+    return db_session.query(any_instrument).order_by(any_instrument.id).offset(skip).limit(limit).all()
 
 
-@router.get("/{instrument_id}", response_model=InstrumentResponse)
+@router.get("/{instrument_id}", response_model=InstrumentResponse, dependencies=[Depends(QueryBudget(max_queries=1))])
 def get_instrument(instrument_id: int, db_session: DBSession = Depends(get_db)) -> Instrument:
     """Get instrument by ID."""
-    instrument = db_session.query(Instrument).filter(Instrument.id == instrument_id).first()
+    instrument = db_session.query(any_instrument).filter(any_instrument.id == instrument_id).first()
     if instrument is None:
         raise HTTPException(status_code=404, detail="Instrument not found")
     return instrument
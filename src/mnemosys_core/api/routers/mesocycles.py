@@ -0,0 +1,105 @@
+"""
+Mesocycle API endpoints.
+
+`POST /` plans a mesocycle for an instrument and saves it day by day (see
+`mnemosys_core.generator.mesocycle`); each day's session type and target
+minutes are the inputs of `/api/v1/sessions` on that day. `POST
+/{mesocycle_id}/replan` checks the instrument's recent failure rate and,
+if it is rising, steps down the next week's sessions only.
+"""
+
+from collections.abc import Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session as DBSession
+from sqlalchemy.orm import selectinload
+
+from ...db.models import Instrument, Mesocycle, MesocycleDay
+from ...db.query_budget import QueryBudget
+from ...generator import create_mesocycle, replan_mesocycle
+from ...util.time import today_utc
+from ..dependencies import get_db
+from ..routing import RetryingRoute
+from ..schemas.mesocycles import (
+    MesocycleCreate,
+    MesocycleDayResponse,
+    MesocycleReplanRequest,
+    MesocycleReplanResponse,
+    MesocycleResponse,
+)
+
+router = APIRouter(route_class=RetryingRoute)
+
+
+def _get_mesocycle(db_session: DBSession, mesocycle_id: int) -> Mesocycle:
+    mesocycle = db_session.scalars(
+        select(Mesocycle).where(Mesocycle.id == mesocycle_id).options(selectinload(Mesocycle.days))
+    ).first()
+    if mesocycle is None:
+        raise HTTPException(status_code=404, detail="Mesocycle not found")
+    return mesocycle
+
+
+@router.post("/", response_model=MesocycleResponse, status_code=status.HTTP_201_CREATED)
+def plan_mesocycle(request: MesocycleCreate, db_session: DBSession = Depends(get_db)) -> Mesocycle:
+    """Plan a mesocycle and save its days."""
+    if db_session.get(Instrument, request.instrument_id) is None:
+        raise HTTPException(status_code=404, detail="Instrument not found")
+    return create_mesocycle(
+        db_session,
+        instrument_id=request.instrument_id,
+        start_date=request.start_date if request.start_date is not None else today_utc(),
+        base_minutes=request.base_minutes,
+        accumulation_weeks=request.accumulation_weeks,
+        intensification_weeks=request.intensification_weeks,
+    )
+
+
+@router.get("/", response_model=list[MesocycleResponse], dependencies=[Depends(QueryBudget(max_queries=2))])
+def list_mesocycles(
+    db_session: DBSession = Depends(get_db), instrument_id: int | None = None, skip: int = 0, limit: int = 100
+) -> Sequence[Mesocycle]:
+    """List mesocycles with their days, optionally for one instrument."""
+    statement = select(Mesocycle).options(selectinload(Mesocycle.days)).order_by(Mesocycle.id)
+    if instrument_id is not None:
+        statement = statement.where(Mesocycle.instrument_id == instrument_id)
+    return db_session.scalars(statement.offset(skip).limit(limit)).all()
+
+
+@router.get(
+    "/{mesocycle_id}", response_model=MesocycleResponse, dependencies=[Depends(QueryBudget(max_queries=2))]
+)
+def get_mesocycle(mesocycle_id: int, db_session: DBSession = Depends(get_db)) -> Mesocycle:
+    """Get mesocycle by ID, with its days."""
+    return _get_mesocycle(db_session, mesocycle_id)
+
+
+@router.post("/{mesocycle_id}/replan", response_model=MesocycleReplanResponse)
+def replan(
+    mesocycle_id: int, request: MesocycleReplanRequest, db_session: DBSession = Depends(get_db)
+) -> MesocycleReplanResponse:
+    """Step down the next week's sessions if the instrument's failure rate is rising."""
+    mesocycle = _get_mesocycle(db_session, mesocycle_id)
+    as_of = request.as_of if request.as_of is not None else today_utc()
+    trend, replanned_days = replan_mesocycle(db_session, mesocycle, as_of)
+    return MesocycleReplanResponse(
+        recent_outcomes=trend.recent_outcomes,
+        recent_failure_rate=trend.recent_rate,
+        baseline_outcomes=trend.baseline_outcomes,
+        baseline_failure_rate=trend.baseline_rate,
+        rising=trend.rising,
+        replanned_days=[MesocycleDayResponse.model_validate(day) for day in replanned_days],
+    )
+
+
+@router.delete("/{mesocycle_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_mesocycle(mesocycle_id: int, db_session: DBSession = Depends(get_db)) -> None:
+    """Delete mesocycle by ID."""
+    mesocycle = db_session.get(Mesocycle, mesocycle_id)
+    if mesocycle is None:
+        raise HTTPException(status_code=404, detail="Mesocycle not found")
+    # One statement for the days instead of one per day through the cascade
+    db_session.execute(delete(MesocycleDay).where(MesocycleDay.mesocycle_id == mesocycle_id))
+    db_session.delete(mesocycle)
+    db_session.flush()
@@ -1,14 +1,38 @@
 """
 Practice API endpoints.
+
+List endpoints accept `date_from`/`date_to` filters on each table's own
+`session_date` partition key, so PostgreSQL prunes partitions outside the
+requested range.
+
+Exercise instances can also be filtered on their parameters with repeated
+`parameter` query arguments such as `parameter=tempo>=120&parameter=key=C`
+(see `ParameterFilter`); commonly filtered parameters are indexed.
+
+Practices past the archive horizon live in the archive tables (see
+`mnemosys_core.db.archive`). Practice endpoints read them only when asked
+with `include_archived=true`; monthly summaries of archived practices are
+served by `/summaries/`.
 """
 
+from collections.abc import Sequence
+from datetime import date
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Row
 from sqlalchemy.orm import Session as DBSession
 
-from ...db.models import Practice, PracticeBlock, PracticeBlockLog
+from ...db.archive import practice_rows, summary_rows
+from ...db.models import ExerciseInstance, Practice, PracticeArchive, PracticeBlock, PracticeBlockLog, PracticeSummary
+from ...db.parameters import ParameterFilter
+from ...db.query_budget import QueryBudget
 from ..dependencies import get_db
+from ..routing import RetryingRoute
 from ..schemas.practices import (
+    ExerciseInstanceCreate,
+    ExerciseInstanceResponse,
+    ExerciseInstanceUpdate,
     PracticeBlockCreate,
     PracticeBlockLogCreate,
     PracticeBlockLogResponse,
@@ -17,10 +41,11 @@ from ..schemas.practices import (
     PracticeBlockUpdate,
     PracticeCreate,
     PracticeResponse,
+    PracticeSummaryResponse,
     PracticeUpdate,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=RetryingRoute)
 
 
 # Practice endpoints
@@ -33,19 +58,58 @@ def create_practice(practice: PracticeCreate, db_session: DBSession = Depends(ge
     return db_practice
 
 
-@router.get("/", response_model=list[PracticeResponse])
-def list_practices(db_session: DBSession = Depends(get_db), skip: int = 0, limit: int = 100) -> list[Practice]:
-    """List all practices."""
-    return db_session.query(Practice).offset(skip).limit(limit).all()
+@router.get("/", response_model=list[PracticeResponse], dependencies=[Depends(QueryBudget(max_queries=1))])
+def list_practices(
+    db_session: DBSession = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    include_archived: bool = False,
+) -> list[Practice] | Sequence[Row[Any]]:
+    """
+    List practices, optionally within a session date range (inclusive).
+
+    With `include_archived`, archived practices are listed too, hot and
+    archived ones ordered together by session date.
+    """
+    if include_archived:
+        statement = practice_rows(date_from, date_to, include_archived=True).offset(skip).limit(limit)
+        return db_session.execute(statement).all()
+    query = db_session.query(Practice)
+    if date_from is not None:
+        query = query.filter(Practice.session_date >= date_from)
+    if date_to is not None:
+        query = query.filter(Practice.session_date <= date_to)
+    return query.offset(skip).limit(limit).all()
+
+
+@router.get(
+    "/summaries/", response_model=list[PracticeSummaryResponse], dependencies=[Depends(QueryBudget(max_queries=1))]
+)
+def list_practice_summaries(
+    db_session: DBSession = Depends(get_db),
+    instrument_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> Sequence[PracticeSummary]:
+    """List monthly summaries of archived practices, optionally for one instrument and month range."""
+    return db_session.scalars(summary_rows(instrument_id, date_from, date_to)).all()
 
 
 @router.get("/{practice_id}", response_model=PracticeResponse)
-def get_practice(practice_id: int, db_session: DBSession = Depends(get_db)) -> Practice:
-    """Get practice by ID."""
+def get_practice(
+    practice_id: int, db_session: DBSession = Depends(get_db), include_archived: bool = False
+) -> Practice | PracticeResponse:
+    """Get practice by ID, falling back to the archive with `include_archived`."""
     practice = db_session.query(Practice).filter(Practice.id == practice_id).first()
-    if practice is None:
-        raise HTTPException(status_code=404, detail="Practice not found")
-    return practice
+    if practice is not None:
+        return practice
+    if include_archived:
+        archived_practice = db_session.get(PracticeArchive, practice_id)
+        if archived_practice is not None:
+            return PracticeResponse.model_validate(archived_practice).model_copy(update={"archived": True})
+    raise HTTPException(status_code=404, detail="Practice not found")
 
 
 @router.put("/{practice_id}", response_model=PracticeResponse)
@@ -86,12 +150,21 @@ def create_practice_block(block: PracticeBlockCreate, db_session: DBSession = De
     return db_block
 
 
-@router.get("/blocks/", response_model=list[PracticeBlockResponse])
+@router.get("/blocks/", response_model=list[PracticeBlockResponse], dependencies=[Depends(QueryBudget(max_queries=1))])
 def list_practice_blocks(
-    db_session: DBSession = Depends(get_db), skip: int = 0, limit: int = 100
+    db_session: DBSession = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    date_from: date | None = None,
+    date_to: date | None = None,
 ) -> list[PracticeBlock]:
-    """List all practice blocks."""
-    return db_session.query(PracticeBlock).offset(skip).limit(limit).all()
+    """List practice blocks, optionally within a session date range (inclusive)."""
+    query = db_session.query(PracticeBlock)
+    if date_from is not None:
+        query = query.filter(PracticeBlock.session_date >= date_from)
+    if date_to is not None:
+        query = query.filter(PracticeBlock.session_date <= date_to)
+    return query.offset(skip).limit(limit).all()
 
 
 @router.get("/blocks/{block_id}", response_model=PracticeBlockResponse)
@@ -143,12 +216,21 @@ def create_practice_block_log(
     return db_log
 
 
-@router.get("/logs/", response_model=list[PracticeBlockLogResponse])
+@router.get("/logs/", response_model=list[PracticeBlockLogResponse], dependencies=[Depends(QueryBudget(max_queries=1))])
 def list_practice_block_logs(
-    db_session: DBSession = Depends(get_db), skip: int = 0, limit: int = 100
+    db_session: DBSession = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    date_from: date | None = None,
+    date_to: date | None = None,
 ) -> list[PracticeBlockLog]:
-    """List all practice block logs."""
-    return db_session.query(PracticeBlockLog).offset(skip).limit(limit).all()
+    """List practice block logs, optionally within a session date range (inclusive)."""
+    query = db_session.query(PracticeBlockLog)
+    if date_from is not None:
+        query = query.filter(PracticeBlockLog.session_date >= date_from)
+    if date_to is not None:
+        query = query.filter(PracticeBlockLog.session_date <= date_to)
+    return query.offset(skip).limit(limit).all()
 
 
 @router.get("/logs/{log_id}", response_model=PracticeBlockLogResponse)
@@ -186,3 +268,90 @@ def delete_practice_block_log(log_id: int, db_session: DBSession = Depends(get_d
 
     db_session.delete(db_log)
     db_session.flush()
+
+
+# Exercise instance endpoints
+def parameter_filters(
+    parameter: list[str] = Query(default=[], description="Parameter filter such as tempo>=120 or key=C"),
+) -> list[ParameterFilter]:
+    """Parse the `parameter` query arguments."""
+    try:
+        return [ParameterFilter.parse(expression) for expression in parameter]
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(error)) from error
+
+
+@router.post("/instances/", response_model=ExerciseInstanceResponse, status_code=status.HTTP_201_CREATED)
+def create_exercise_instance(
+    exercise_instance: ExerciseInstanceCreate, db_session: DBSession = Depends(get_db)
+) -> ExerciseInstance:
+    """Create a new exercise instance."""
+    db_exercise_instance = ExerciseInstance(**exercise_instance.model_dump())
+    db_session.add(db_exercise_instance)
+    db_session.flush()
+    return db_exercise_instance
+
+
+@router.get(
+    "/instances/", response_model=list[ExerciseInstanceResponse], dependencies=[Depends(QueryBudget(max_queries=1))]
+)
+def list_exercise_instances(
+    db_session: DBSession = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    exercise_id: int | None = None,
+    practice_id: int | None = None,
+    filters: list[ParameterFilter] = Depends(parameter_filters),
+) -> list[ExerciseInstance]:
+    """List exercise instances, optionally by exercise, practice, session date range and parameters."""
+    query = db_session.query(ExerciseInstance)
+    if exercise_id is not None:
+        query = query.filter(ExerciseInstance.exercise_id == exercise_id)
+    if practice_id is not None:
+        query = query.filter(ExerciseInstance.practice_id == practice_id)
+    if date_from is not None:
+        query = query.filter(ExerciseInstance.session_date >= date_from)
+    if date_to is not None:
+        query = query.filter(ExerciseInstance.session_date <= date_to)
+    for parameter_filter in filters:
+        query = query.filter(parameter_filter.clause(ExerciseInstance.parameters))
+    return query.order_by(ExerciseInstance.id).offset(skip).limit(limit).all()
+
+
+@router.get("/instances/{instance_id}", response_model=ExerciseInstanceResponse)
+def get_exercise_instance(instance_id: int, db_session: DBSession = Depends(get_db)) -> ExerciseInstance:
+    """Get exercise instance by ID."""
+    exercise_instance = db_session.query(ExerciseInstance).filter(ExerciseInstance.id == instance_id).first()
+    if exercise_instance is None:
+        raise HTTPException(status_code=404, detail="Exercise instance not found")
+    return exercise_instance
+
+
+@router.put("/instances/{instance_id}", response_model=ExerciseInstanceResponse)
+def update_exercise_instance(
+    instance_id: int, instance_update: ExerciseInstanceUpdate, db_session: DBSession = Depends(get_db)
+) -> ExerciseInstance:
+    """Update exercise instance by ID."""
+    db_exercise_instance = db_session.query(ExerciseInstance).filter(ExerciseInstance.id == instance_id).first()
+    if db_exercise_instance is None:
+        raise HTTPException(status_code=404, detail="Exercise instance not found")
+
+    update_data = instance_update.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_exercise_instance, field, value)
+
+    db_session.flush()
+    return db_exercise_instance
+
+
+@router.delete("/instances/{instance_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_exercise_instance(instance_id: int, db_session: DBSession = Depends(get_db)) -> None:
+    """Delete exercise instance by ID."""
+    db_exercise_instance = db_session.query(ExerciseInstance).filter(ExerciseInstance.id == instance_id).first()
+    if db_exercise_instance is None:
+        raise HTTPException(status_code=404, detail="Exercise instance not found")
+
+    db_session.delete(db_exercise_instance)
+    db_session.flush()
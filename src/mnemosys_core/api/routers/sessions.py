@@ -0,0 +1,100 @@
+"""
+Session generation API endpoints.
+
+`POST /plan` previews the session the generator would produce for an
+instrument, day and time budget; `POST /` generates the same session and
+saves it as a practice with one exercise instance per block. Generation is
+deterministic (see `mnemosys_core.generator`): the same request against the
+same catalog and exercise states gives the same session.
+
+Instruments with a mesocycle get the session type and overload emphasis
+planned for the day, and at most its volume target in minutes.
+
+The catalog is read from the candidate index, rebuilt only when the
+reference data changes; a plan itself costs three queries (the instrument,
+its planned day and the exercise states). Plans are memoized (see `SessionPlanCache`), so
+repeating a request before any practice, log or state changes is served
+without touching the database.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session as DBSession
+
+from ...generator import (
+    CandidateIndexCache,
+    SessionGenerationError,
+    SessionPlan,
+    SessionPlanCache,
+    SessionRequest,
+    generate_session,
+    save_plan,
+)
+from ...util.time import today_utc
+from ..dependencies import get_candidate_index_cache, get_db, get_plan_cache
+from ..routing import RetryingRoute
+from ..schemas.sessions import (
+    GeneratedSessionResponse,
+    PlannedBlockResponse,
+    SessionGenerateRequest,
+    SessionPlanResponse,
+)
+
+router = APIRouter(route_class=RetryingRoute)
+
+
+def _generate(
+    request: SessionGenerateRequest,
+    db_session: DBSession,
+    candidate_index_cache: CandidateIndexCache,
+    plan_cache: SessionPlanCache,
+) -> SessionPlan:
+    session_request = SessionRequest(
+        instrument_id=request.instrument_id,
+        available_minutes=request.available_minutes,
+        session_type=request.session_type,
+        session_date=request.session_date if request.session_date is not None else today_utc(),
+        goal_weights=request.goal_weights,
+    )
+    try:
+        plan = generate_session(db_session, candidate_index_cache.get(), session_request, plan_cache)
+    except SessionGenerationError as error:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(error)) from error
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Instrument not found")
+    return plan
+
+
+def _plan_response(plan: SessionPlan) -> SessionPlanResponse:
+    return SessionPlanResponse(
+        instrument_id=plan.request.instrument_id,
+        session_date=plan.request.session_date,
+        session_type=plan.request.session_type,
+        total_minutes=plan.total_minutes,
+        catalog_version=plan.catalog_version,
+        blocks=[PlannedBlockResponse.model_validate(block) for block in plan.blocks],
+        skipped_blocks=list(plan.skipped_blocks),
+    )
+
+
+@router.post("/plan", response_model=SessionPlanResponse)
+def plan_session(
+    request: SessionGenerateRequest,
+    db_session: DBSession = Depends(get_db),
+    candidate_index_cache: CandidateIndexCache = Depends(get_candidate_index_cache),
+    plan_cache: SessionPlanCache = Depends(get_plan_cache),
+) -> SessionPlanResponse:
+    """Preview a generated session without saving it."""
+    return _plan_response(_generate(request, db_session, candidate_index_cache, plan_cache))
+
+
+@router.post("/", response_model=GeneratedSessionResponse, status_code=status.HTTP_201_CREATED)
+def create_session(
+    request: SessionGenerateRequest,
+    db_session: DBSession = Depends(get_db),
+    candidate_index_cache: CandidateIndexCache = Depends(get_candidate_index_cache),
+    plan_cache: SessionPlanCache = Depends(get_plan_cache),
+) -> GeneratedSessionResponse:
+    """Generate a session and save it as a practice."""
+    plan = _generate(request, db_session, candidate_index_cache, plan_cache)
+    practice = save_plan(db_session, plan)
+    return GeneratedSessionResponse(**_plan_response(plan).model_dump(), practice_id=practice.id)
@@ -0,0 +1,59 @@
+"""
+Route class that retries idempotent requests on transient database errors.
+
+FastAPI runs dependency teardown (and so the session commit in `get_db`)
+inside the route handler, so rerunning the handler reruns the whole unit of
+work: fresh dependencies, a fresh session and a new transaction. The failed
+attempt has already been rolled back by the time the exception reaches the
+retry loop.
+"""
+
+import asyncio
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from ..db.retry import RetryAttempts, RetryMetrics, RetryPolicy
+
+# Methods whose handlers can be rerun without changing the outcome
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class RetryingRoute(APIRoute):
+    """
+    APIRoute that reruns idempotent requests after transient database errors.
+
+    Uses the `retry_policy` and `retry_metrics` configured on app.state;
+    without a policy, requests run once as usual.
+
+    Example:
+        >>> router = APIRouter(route_class=RetryingRoute)
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        route_handler = super().get_route_handler()
+
+        async def retrying_route_handler(request: Request) -> Response:
+            retry_policy: RetryPolicy | None = getattr(request.app.state, "retry_policy", None)
+            if retry_policy is None or request.method not in IDEMPOTENT_METHODS:
+                return await route_handler(request)
+
+            retry_metrics: RetryMetrics | None = getattr(request.app.state, "retry_metrics", None)
+            dialect_name = request.app.state.engine.dialect.name
+            attempts = RetryAttempts(retry_policy, retry_metrics)
+            while True:
+                try:
+                    response = await route_handler(request)
+                except Exception as error:
+                    delay_seconds = attempts.retry_delay(error, dialect_name)
+                    if delay_seconds is None:
+                        raise
+                else:
+                    attempts.record_success()
+                    return response
+
+                await asyncio.sleep(delay_seconds)
+
+        return retrying_route_handler
@@ -41,13 +41,15 @@ class ExerciseResponse(ExerciseBase):
 
 
 class ExerciseStateBase(BaseModel):
-    """Base exercise state fields."""
+    """
+    Base exercise state fields.
+
+    The rolling minute windows and the mastery estimate are maintained from
+    the practice history and are read-only (see ExerciseStateResponse).
+    """
 
     exercise_id: int
     last_practiced_date: date | None = None
-    rolling_minutes_7d: int = Field(default=0, ge=0)
-    rolling_minutes_28d: int = Field(default=0, ge=0)
-    mastery_estimate: float = Field(default=0.0, ge=0.0, le=1.0)
     last_fatigue_profile: FatigueProfile | None = None
 
 
@@ -61,9 +63,6 @@ class ExerciseStateUpdate(BaseModel):
     """Schema for updating exercise states."""
 
     last_practiced_date: date | None = None
-    rolling_minutes_7d: int | None = Field(None, ge=0)
-    rolling_minutes_28d: int | None = Field(None, ge=0)
-    mastery_estimate: float | None = Field(None, ge=0.0, le=1.0)
     last_fatigue_profile: FatigueProfile | None = None
 
 
@@ -71,5 +70,10 @@ class ExerciseStateResponse(ExerciseStateBase):
     """Schema for exercise state responses."""
 
     id: int
+    rolling_minutes_7d: int
+    rolling_minutes_28d: int
+    rolling_as_of: date | None = None
+    mastery_estimate: float
+    failure_streak: int
 
     model_config = {"from_attributes": True}
@@ -0,0 +1,66 @@
+"""
+Pydantic schemas for mesocycle API.
+"""
+
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+from ...db.models import MesocyclePhase, SessionType
+from ...generator.mesocycle import ACCUMULATION_WEEKS, INTENSIFICATION_WEEKS
+from ...generator.rules import MAX_SESSION_MINUTES, MIN_SESSION_MINUTES
+
+
+class MesocycleCreate(BaseModel):
+    """Schema for planning mesocycles."""
+
+    instrument_id: int
+    start_date: date | None = None
+    base_minutes: int = Field(45, ge=MIN_SESSION_MINUTES, le=MAX_SESSION_MINUTES)
+    accumulation_weeks: int = Field(4, ge=ACCUMULATION_WEEKS.start, le=ACCUMULATION_WEEKS.stop - 1)
+    intensification_weeks: int = Field(1, ge=INTENSIFICATION_WEEKS.start, le=INTENSIFICATION_WEEKS.stop - 1)
+
+
+class MesocycleDayResponse(BaseModel):
+    """Schema for one planned day of a mesocycle."""
+
+    day: date
+    phase: MesocyclePhase
+    session_type: SessionType
+    target_minutes: int
+    overload: str | None
+    replanned_on: date | None
+
+    model_config = {"from_attributes": True}
+
+
+class MesocycleResponse(BaseModel):
+    """Schema for mesocycle responses."""
+
+    id: int
+    instrument_id: int
+    start_date: date
+    accumulation_weeks: int
+    intensification_weeks: int
+    deload_weeks: int
+    base_minutes: int
+    days: list[MesocycleDayResponse]
+
+    model_config = {"from_attributes": True}
+
+
+class MesocycleReplanRequest(BaseModel):
+    """Schema for re-planning requests."""
+
+    as_of: date | None = None
+
+
+class MesocycleReplanResponse(BaseModel):
+    """Schema for re-planning outcomes."""
+
+    recent_outcomes: int
+    recent_failure_rate: float
+    baseline_outcomes: int
+    baseline_failure_rate: float
+    rising: bool
+    replanned_days: list[MesocycleDayResponse]
@@ -37,6 +37,20 @@ class PracticeResponse(PracticeBase):
     """Schema for practice responses."""
 
     id: int
+    archived: bool = False
+
+    model_config = {"from_attributes": True}
+
+
+class PracticeSummaryResponse(BaseModel):
+    """Schema for monthly summaries of archived practices."""
+
+    instrument_id: int
+    month: date
+    practices: int
+    total_minutes: int
+    exercises: int
+    exercises_completed: int
 
     model_config = {"from_attributes": True}
 
@@ -70,6 +84,7 @@ class PracticeBlockResponse(PracticeBlockBase):
     """Schema for practice block responses."""
 
     id: int
+    session_date: date | None = None
 
     model_config = {"from_attributes": True}
 
@@ -101,5 +116,38 @@ class PracticeBlockLogResponse(PracticeBlockLogBase):
     """Schema for practice block log responses."""
 
     id: int
+    session_date: date | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class ExerciseInstanceBase(BaseModel):
+    """Base exercise instance fields."""
+
+    practice_id: int
+    exercise_id: int
+    sequence_order: int = Field(..., ge=1)
+    parameters: dict[str, str | int | float] = Field(default_factory=dict)
+
+
+class ExerciseInstanceCreate(ExerciseInstanceBase):
+    """Schema for creating exercise instances."""
+
+    pass
+
+
+class ExerciseInstanceUpdate(BaseModel):
+    """Schema for updating exercise instances."""
+
+    exercise_id: int | None = None
+    sequence_order: int | None = Field(None, ge=1)
+    parameters: dict[str, str | int | float] | None = None
+
+
+class ExerciseInstanceResponse(ExerciseInstanceBase):
+    """Schema for exercise instance responses."""
+
+    id: int
+    session_date: date | None = None
 
     model_config = {"from_attributes": True}
@@ -0,0 +1,56 @@
+"""
+Pydantic schemas for session generation API.
+"""
+
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+from ...db.models import BlockType, DomainType, FatigueProfile, SessionType
+from ...generator.rules import MAX_SESSION_MINUTES, MIN_SESSION_MINUTES
+
+
+class SessionGenerateRequest(BaseModel):
+    """Schema for session generation requests."""
+
+    instrument_id: int
+    available_minutes: int = Field(..., ge=MIN_SESSION_MINUTES, le=MAX_SESSION_MINUTES)
+    session_type: SessionType = SessionType.NORMAL
+    session_date: date | None = None
+    goal_weights: dict[DomainType, float] = Field(default_factory=dict)
+
+
+class PlannedBlockResponse(BaseModel):
+    """Schema for one block of a generated session."""
+
+    block_type: BlockType
+    exercise_id: int
+    exercise_name: str
+    duration_minutes: int
+    fatigue_profile: FatigueProfile
+    primary_overload: str | None
+    parameters: dict[str, str | int | float]
+    instructions: str
+    focus_cues: list[str]
+    stop_conditions: list[str]
+    reasons: list[str]
+
+    model_config = {"from_attributes": True}
+
+
+class SessionPlanResponse(BaseModel):
+    """Schema for generated session plans."""
+
+    instrument_id: int
+    session_date: date
+    session_type: SessionType
+    total_minutes: int
+    catalog_version: int
+    blocks: list[PlannedBlockResponse]
+    skipped_blocks: list[BlockType]
+
+
+class GeneratedSessionResponse(SessionPlanResponse):
+    """Schema for generated sessions saved as practices."""
+
+    practice_id: int
@@ -0,0 +1,59 @@
+"""
+Command-line interface for operational tasks.
+
+Usage:
+    mnemosys archive --horizon-days 730
+    mnemosys exercise-states expire
+    mnemosys exercise-states recompute --dry-run
+    mnemosys export exercise_facts practice --output-dir exports --after-id 1200
+    mnemosys import-history practice_history.csv --batch-size 5000
+    mnemosys partitions ensure --months-ahead 3
+    mnemosys sessions generate --date 2025-06-11 --workers 8
+    python -m mnemosys_core.cli partitions convert
+
+Configuration comes from the same environment variables as the API (see
+`load_settings_from_env`).
+"""
+
+import argparse
+from collections.abc import Sequence
+
+from .archive import add_archive_commands
+from .exercise_states import add_exercise_state_commands
+from .export import add_export_commands
+from .import_history import add_import_commands
+from .partitions import add_partition_commands
+from .sessions import add_session_commands
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the top-level argument parser with all subcommands.
+
+    Returns:
+        Argument parser whose parsed namespace carries a `handler` callable
+    """
+    parser = argparse.ArgumentParser(prog="mnemosys", description="MNEMOSYS operational commands.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_archive_commands(subparsers)
+    add_exercise_state_commands(subparsers)
+    add_export_commands(subparsers)
+    add_import_commands(subparsers)
+    add_partition_commands(subparsers)
+    add_session_commands(subparsers)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Run a command.
+
+    Args:
+        argv: Arguments without the program name (defaults to sys.argv)
+
+    Returns:
+        Process exit code
+    """
+    arguments = build_parser().parse_args(argv)
+    exit_code: int = arguments.handler(arguments)
+    return exit_code
@@ -0,0 +1,7 @@
+"""
+Entry point for `python -m mnemosys_core.cli`.
+"""
+
+from . import main
+
+raise SystemExit(main())
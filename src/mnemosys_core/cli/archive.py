@@ -0,0 +1,61 @@
+"""
+Practice history archival command.
+
+Meant to run on a schedule (e.g. nightly from cron): moves practices older
+than DB_ARCHIVE_HORIZON_DAYS to the archive tables in small batches, so it
+can run while the API is serving traffic.
+"""
+
+import argparse
+from datetime import date
+from typing import Any
+
+from ..config.settings import load_settings_from_env
+from ..db.archive import archive_cutoff, archive_practices
+from ..db.engine import create_db_engine_from_settings
+from ..db.retry import retry_policy_from_settings
+
+
+def add_archive_commands(subparsers: Any) -> None:
+    """
+    Register the `archive` command.
+
+    Args:
+        subparsers: Subparser collection of the top-level parser
+    """
+    archive_parser = subparsers.add_parser("archive", help="Move old practice history to the archive tables")
+    archive_parser.add_argument(
+        "--before", type=date.fromisoformat, default=None, help="Archive practices dated before this day"
+    )
+    archive_parser.add_argument(
+        "--horizon-days", type=int, default=None, help="Days of history kept hot (defaults to DB_ARCHIVE_HORIZON_DAYS)"
+    )
+    archive_parser.add_argument(
+        "--batch-size", type=int, default=None, help="Practices per transaction (defaults to DB_ARCHIVE_BATCH_SIZE)"
+    )
+    archive_parser.add_argument("--pause", type=float, default=0.1, help="Seconds to pause between batches")
+    archive_parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches")
+    archive_parser.set_defaults(handler=run_archive)
+
+
+def run_archive(arguments: argparse.Namespace) -> int:
+    """Archive practices behind the horizon and report how many moved."""
+    settings = load_settings_from_env()
+    horizon_days = arguments.horizon_days if arguments.horizon_days is not None else settings.db_archive_horizon_days
+    before = arguments.before if arguments.before is not None else archive_cutoff(date.today(), horizon_days)
+    batch_size = arguments.batch_size if arguments.batch_size is not None else settings.db_archive_batch_size
+    engine = create_db_engine_from_settings(settings)
+    try:
+        archive_result = archive_practices(
+            engine,
+            before,
+            batch_size=batch_size,
+            pause_seconds=arguments.pause,
+            max_batches=arguments.max_batches,
+            retry_policy=retry_policy_from_settings(settings),
+        )
+    finally:
+        engine.dispose()
+    state = "done" if archive_result.finished else "more to archive"
+    print(f"archived {archive_result.practices} practice(s) dated before {before} ({state})")
+    return 0
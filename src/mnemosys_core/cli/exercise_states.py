@@ -0,0 +1,106 @@
+"""
+Exercise state maintenance commands.
+
+`expire` is meant to run daily (e.g. from cron) so rolling minute windows
+of exercises nobody practiced lately slide forward too; `rebuild` reseeds
+the windows from the history after bulk imports; `recompute` rederives
+every state (dates, windows and fatigue profiles) in a few set-based
+statements, and with `--dry-run` only prints what would change; `mastery`
+replays every logged outcome into the mastery estimates.
+"""
+
+import argparse
+from typing import Any
+
+from ..config.settings import load_settings_from_env
+from ..db.engine import create_db_engine_from_settings
+from ..db.mastery import rebuild_mastery_estimates
+from ..db.rolling_minutes import expire_rolling_minutes, rebuild_rolling_minutes
+from ..db.session import create_session_factory
+from ..db.state_recompute import recompute_exercise_states
+
+
+def add_exercise_state_commands(subparsers: Any) -> None:
+    """
+    Register the `exercise-states` command group.
+
+    Args:
+        subparsers: Subparser collection of the top-level parser
+    """
+    states_parser = subparsers.add_parser("exercise-states", help="Maintain derived exercise state")
+    state_subparsers = states_parser.add_subparsers(dest="exercise_state_command", required=True)
+
+    expire_parser = state_subparsers.add_parser("expire", help="Slide rolling minute windows forward to today")
+    expire_parser.set_defaults(handler=run_expire)
+
+    rebuild_parser = state_subparsers.add_parser("rebuild", help="Rebuild rolling minute windows from the history")
+    rebuild_parser.set_defaults(handler=run_rebuild)
+
+    recompute_parser = state_subparsers.add_parser(
+        "recompute", help="Rederive every exercise state from the history"
+    )
+    recompute_parser.add_argument(
+        "--dry-run", action="store_true", help="Print the changes without writing them"
+    )
+    recompute_parser.set_defaults(handler=run_recompute)
+
+    mastery_parser = state_subparsers.add_parser("mastery", help="Replay logged outcomes into mastery estimates")
+    mastery_parser.set_defaults(handler=run_mastery)
+
+
+def run_expire(arguments: argparse.Namespace) -> int:
+    """Refresh stale rolling windows and prune old buckets."""
+    engine = create_db_engine_from_settings(load_settings_from_env())
+    try:
+        with create_session_factory(engine)() as db_session:
+            refreshed = expire_rolling_minutes(db_session)
+            db_session.commit()
+    finally:
+        engine.dispose()
+    print(f"{refreshed} exercise state(s) refreshed")
+    return 0
+
+
+def run_rebuild(arguments: argparse.Namespace) -> int:
+    """Rebuild the daily buckets and rolling windows."""
+    engine = create_db_engine_from_settings(load_settings_from_env())
+    try:
+        with create_session_factory(engine)() as db_session:
+            buckets = rebuild_rolling_minutes(db_session)
+            db_session.commit()
+    finally:
+        engine.dispose()
+    print(f"{buckets} daily bucket(s) rebuilt")
+    return 0
+
+
+def run_recompute(arguments: argparse.Namespace) -> int:
+    """Recompute every exercise state, printing the diff and phase timings."""
+    engine = create_db_engine_from_settings(load_settings_from_env())
+    try:
+        with create_session_factory(engine)() as db_session:
+            result = recompute_exercise_states(db_session, dry_run=arguments.dry_run)
+            if not arguments.dry_run:
+                db_session.commit()
+    finally:
+        engine.dispose()
+    for change in result.changes:
+        print(f"exercise {change.exercise_id}: {change.field} {change.old!r} -> {change.new!r}")
+    timings = ", ".join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in result.timings.items())
+    verb = "would change" if result.dry_run else "changed"
+    print(f"{result.states} exercise state(s) recomputed, {len(result.changes)} field(s) {verb} ({timings})")
+    return 0
+
+
+def run_mastery(arguments: argparse.Namespace) -> int:
+    """Rebuild every mastery estimate from the logged outcomes."""
+    engine = create_db_engine_from_settings(load_settings_from_env())
+    try:
+        with create_session_factory(engine)() as db_session:
+            result = rebuild_mastery_estimates(db_session)
+            db_session.commit()
+    finally:
+        engine.dispose()
+    timings = ", ".join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in result.timings.items())
+    print(f"{result.logs} log(s) replayed into {result.exercises} exercise state(s) ({timings})")
+    return 0
@@ -0,0 +1,61 @@
+"""
+Parquet export command.
+
+Writes each requested source to `<output-dir>/<source>.parquet` and prints
+the last ID written, which is the `--after-id` watermark for the next
+incremental export.
+"""
+
+import argparse
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from ..config.settings import load_settings_from_env
+from ..db.engine import create_db_engine_from_settings
+from ..db.export import DEFAULT_EXPORT_BATCH_SIZE, EXPORT_SOURCES, export_file_name, export_parquet
+
+
+def add_export_commands(subparsers: Any) -> None:
+    """
+    Register the `export` command.
+
+    Args:
+        subparsers: Subparser collection of the top-level parser
+    """
+    export_parser = subparsers.add_parser("export", help="Export practice history as Parquet files")
+    export_parser.add_argument("sources", nargs="+", choices=sorted(EXPORT_SOURCES), help="Tables or fact table to export")
+    export_parser.add_argument("--output-dir", type=Path, default=Path(), help="Directory to write files into")
+    export_parser.add_argument("--after-id", type=int, default=None, help="Only export rows with a higher ID")
+    export_parser.add_argument(
+        "--since", type=date.fromisoformat, default=None, help="Only export rows on or after this session date"
+    )
+    export_parser.add_argument("--batch-size", type=int, default=DEFAULT_EXPORT_BATCH_SIZE, help="Rows per record batch")
+    export_parser.set_defaults(handler=run_export)
+
+
+def run_export(arguments: argparse.Namespace) -> int:
+    """Export the requested sources and report rows and watermarks."""
+    settings = load_settings_from_env()
+    arguments.output_dir.mkdir(parents=True, exist_ok=True)
+    engine = create_db_engine_from_settings(settings)
+    try:
+        with engine.connect() as connection:
+            for source_name in arguments.sources:
+                destination = arguments.output_dir / export_file_name(source_name, arguments.after_id, arguments.since)
+                try:
+                    export_result = export_parquet(
+                        connection,
+                        source_name,
+                        destination,
+                        after_id=arguments.after_id,
+                        since=arguments.since,
+                        batch_size=arguments.batch_size,
+                    )
+                except RuntimeError as error:
+                    print(error)
+                    return 1
+                print(f"{source_name}: {export_result.rows} rows -> {destination} (last id {export_result.last_id})")
+    finally:
+        engine.dispose()
+    return 0
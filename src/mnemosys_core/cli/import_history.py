@@ -0,0 +1,582 @@
+"""
+Bulk import of historical practice logs.
+
+Each source row describes one practice block and its log entry:
+
+    session_date, instrument, session_type, total_minutes,
+    exercise, block_order, block_type, duration_minutes,
+    completed, quality, notes
+
+Rows are read from CSV, JSON (an array of objects) or JSON Lines; all three
+are streamed, so sources larger than memory can be imported. They are
+processed in batches: `instrument` and `exercise` names are resolved to IDs
+from in-memory maps, fields are validated against the API schemas, and the
+batch is written with PostgreSQL `COPY` (or batched `executemany` on other
+databases) in one transaction together with its checkpoint. A crash rolls
+back the batch in flight along with its checkpoint, so resuming under the
+same `--source` rewrites exactly the rows after the last checkpoint. Rows
+sharing instrument, session date and session type belong to the same
+practice, and practices that already exist are reused; blocks and logs are
+not matched against stored ones, so importing rows again under another
+source name (or after deleting its checkpoint) duplicates them.
+"""
+
+import argparse
+import csv
+import io
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date
+from itertools import batched
+from pathlib import Path
+from typing import Any, TextIO, cast
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Connection, Engine, Table, insert, select, text, tuple_
+
+from ..api.schemas.practices import PracticeBlockCreate, PracticeBlockLogCreate, PracticeCreate
+from ..config.settings import load_settings_from_env
+from ..db.engine import create_db_engine_from_settings
+from ..db.models import Exercise, ImportCheckpoint, Instrument, Practice, PracticeBlock, PracticeBlockLog
+from ..util.time import utc_now
+
+SOURCE_FORMATS = ("csv", "json", "jsonl")
+
+# Characters read at a time when streaming a JSON array
+JSON_CHUNK_SIZE = 1 << 16
+
+# A practice is identified by instrument, session date and session type
+PracticeKey = tuple[int, date, str]
+
+
+@dataclass(frozen=True)
+class ImportProgress:
+    """
+    Counters for an import run.
+
+    Attributes:
+        rows_processed: Source rows consumed in this run (imported or rejected)
+        rows_imported: Rows written in this run
+        rows_rejected: Rows rejected in this run
+        rows_skipped: Rows skipped because an earlier run already processed them
+        elapsed_seconds: Wall-clock time of this run
+    """
+
+    rows_processed: int
+    rows_imported: int
+    rows_rejected: int
+    rows_skipped: int
+    elapsed_seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput of processed rows in this run."""
+        return self.rows_processed / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class RejectedRow:
+    """
+    A source row that was not imported.
+
+    Attributes:
+        row_number: 1-based position of the row in the source
+        reason: Why the row was rejected
+    """
+
+    row_number: int
+    reason: str
+
+
+def _iter_json_array(source_file: TextIO, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Decode the elements of a top-level JSON array one at a time.
+
+    The file is read in chunks and each element is decoded as soon as it is
+    complete, so only the current element and one chunk are held in memory.
+
+    Raises:
+        json.JSONDecodeError: If the source is not a well-formed JSON array
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    is_exhausted = False
+
+    def next_character() -> str:
+        """Skip whitespace, reading more as needed; returns "" at the end of the file."""
+        nonlocal buffer, position, is_exhausted
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer) or is_exhausted:
+                return buffer[position : position + 1]
+            chunk = source_file.read(chunk_size)
+            buffer, position, is_exhausted = buffer[position:] + chunk, 0, not chunk
+
+    if next_character() != "[":
+        raise json.JSONDecodeError("Expected a JSON array", buffer, position)
+    position += 1
+    if next_character() == "]":
+        position += 1
+    else:
+        while True:
+            next_character()
+            # A value ending exactly at the end of the buffer (e.g. a number) may continue in the next chunk
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+                is_complete = end < len(buffer) or is_exhausted
+            except json.JSONDecodeError:
+                if is_exhausted:
+                    raise
+                is_complete = False
+            if not is_complete:
+                chunk = source_file.read(chunk_size)
+                buffer, position, is_exhausted = buffer[position:] + chunk, 0, not chunk
+                continue
+            yield element
+            position = end
+            separator = next_character()
+            position += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise json.JSONDecodeError("Expected ',' or ']'", buffer, position - 1)
+    if next_character():
+        raise json.JSONDecodeError("Extra data", buffer, position)
+
+
+def read_source_rows(path: Path, source_format: str | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Stream rows from a CSV, JSON or JSON Lines file.
+
+    Args:
+        path: Source file
+        source_format: One of SOURCE_FORMATS (inferred from the suffix if omitted)
+
+    Returns:
+        Iterator of row dictionaries
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    resolved_format = source_format if source_format is not None else path.suffix.lstrip(".").lower()
+    if resolved_format not in SOURCE_FORMATS:
+        raise ValueError(f"Unsupported import format: {resolved_format}")
+
+    with path.open(newline="", encoding="utf-8") as source_file:
+        if resolved_format == "csv":
+            yield from csv.DictReader(source_file)
+        elif resolved_format == "json":
+            yield from _iter_json_array(source_file)
+        else:
+            for line in source_file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _validate_batch(
+    adapter: TypeAdapter[list[Any]], items: list[dict[str, Any]]
+) -> tuple[list[Any], dict[int, str]]:
+    """
+    Validate a batch in one call, isolating the rows that fail.
+
+    Returns:
+        Validated models aligned with `items` (None where invalid) and the
+        error message for each invalid position
+    """
+    errors_by_index: dict[int, str] = {}
+    positions = list(range(len(items)))
+    while True:
+        try:
+            validated = adapter.validate_python([items[position] for position in positions])
+        except ValidationError as validation_error:
+            for error in validation_error.errors():
+                position = positions[int(error["loc"][0])]
+                field_path = ".".join(str(part) for part in error["loc"][1:])
+                errors_by_index.setdefault(position, f"{field_path}: {error['msg']}")
+            positions = [position for position in positions if position not in errors_by_index]
+            continue
+        models: list[Any] = [None] * len(items)
+        for position, model in zip(positions, validated, strict=True):
+            models[position] = model
+        return models, errors_by_index
+
+
+def _copy_rows(connection: Connection, table: Table, column_names: list[str], rows: list[tuple[Any, ...]]) -> None:
+    """Stream rows into a PostgreSQL table with COPY (psycopg 3 or psycopg2)."""
+    processors = [table.c[column_name].type.bind_processor(connection.dialect) for column_name in column_names]
+    processed_rows = [
+        tuple(
+            processor(value) if processor is not None else value
+            for processor, value in zip(processors, row, strict=True)
+        )
+        for row in rows
+    ]
+    columns = ", ".join(column_names)
+    driver_connection = connection.connection.driver_connection
+    cursor = driver_connection.cursor()  # type: ignore[union-attr]
+    try:
+        if hasattr(cursor, "copy"):
+            with cursor.copy(f"COPY {table.name} ({columns}) FROM STDIN") as copy:
+                for row in processed_rows:
+                    copy.write_row(row)
+        else:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(processed_rows)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table.name} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _table(model: type[Any]) -> Table:
+    return cast("Table", model.__table__)
+
+
+def _allocate_ids(connection: Connection, table: Table, count: int) -> list[int]:
+    """Reserve primary keys from a PostgreSQL serial sequence."""
+    rows = connection.execute(
+        text("SELECT nextval(pg_get_serial_sequence(:table_name, 'id')) FROM generate_series(1, :count)"),
+        {"table_name": table.name, "count": count},
+    )
+    return [row[0] for row in rows]
+
+
+class PracticeHistoryImporter:
+    """
+    Batched, resumable importer for practice history.
+
+    Example:
+        >>> importer = PracticeHistoryImporter(engine, batch_size=5000)
+        >>> progress = importer.run(read_source_rows(path), source=str(path))
+    """
+
+    def __init__(self, engine: Engine, batch_size: int = 5000, use_copy: bool | None = None) -> None:
+        self._engine = engine
+        self._batch_size = batch_size
+        self._use_copy = use_copy if use_copy is not None else engine.dialect.name == "postgresql"
+        self._practice_adapter: TypeAdapter[list[PracticeCreate]] = TypeAdapter(list[PracticeCreate])
+        self._block_adapter: TypeAdapter[list[PracticeBlockCreate]] = TypeAdapter(list[PracticeBlockCreate])
+        self._log_adapter: TypeAdapter[list[PracticeBlockLogCreate]] = TypeAdapter(list[PracticeBlockLogCreate])
+        self._practice_id_by_key: dict[PracticeKey, int] = {}
+        self._instrument_id_by_name: dict[str, int] = {}
+        self._exercise_id_by_name: dict[str, int] = {}
+
+    def run(
+        self,
+        rows: Iterable[dict[str, Any]],
+        source: str,
+        on_reject: Callable[[RejectedRow], None] | None = None,
+        on_progress: Callable[[ImportProgress], None] | None = None,
+    ) -> ImportProgress:
+        """
+        Import rows, resuming after the last committed checkpoint for a source.
+
+        Args:
+            rows: Source rows in a stable order
+            source: Identifier of the source the checkpoint is stored under
+            on_reject: Called for every rejected row
+            on_progress: Called after every committed batch
+
+        Returns:
+            Counters for this run
+        """
+        started = time.perf_counter()
+        self._load_name_maps()
+        rows_skipped = self._read_checkpoint(source)
+        rows_processed = rows_imported = rows_rejected = 0
+        row_iterator = iter(rows)
+        for _ in range(rows_skipped):
+            next(row_iterator, None)
+
+        first_row_number = rows_skipped + 1
+        for batch in batched(row_iterator, self._batch_size, strict=False):
+            # Practices created by a batch that rolls back must not be reused later
+            known_practice_ids = dict(self._practice_id_by_key)
+            try:
+                with self._engine.begin() as connection:
+                    imported_count, rejected_rows = self._import_batch(connection, list(batch), first_row_number)
+                    self._write_checkpoint(connection, source, len(batch), imported_count, len(rejected_rows))
+            except Exception:
+                self._practice_id_by_key = known_practice_ids
+                raise
+            rows_processed += len(batch)
+            rows_imported += imported_count
+            rows_rejected += len(rejected_rows)
+            first_row_number += len(batch)
+            if on_reject is not None:
+                for rejected_row in rejected_rows:
+                    on_reject(rejected_row)
+            if on_progress is not None:
+                on_progress(
+                    ImportProgress(
+                        rows_processed, rows_imported, rows_rejected, rows_skipped, time.perf_counter() - started
+                    )
+                )
+
+        return ImportProgress(rows_processed, rows_imported, rows_rejected, rows_skipped, time.perf_counter() - started)
+
+    def _load_name_maps(self) -> None:
+        with self._engine.connect() as connection:
+            self._instrument_id_by_name = dict(connection.execute(select(Instrument.name, Instrument.id)).tuples().all())
+            self._exercise_id_by_name = dict(connection.execute(select(Exercise.name, Exercise.id)).tuples().all())
+
+    def _read_checkpoint(self, source: str) -> int:
+        with self._engine.connect() as connection:
+            rows_processed = connection.execute(
+                select(ImportCheckpoint.rows_processed).where(ImportCheckpoint.source == source)
+            ).scalar()
+        return int(rows_processed) if rows_processed is not None else 0
+
+    def _write_checkpoint(
+        self, connection: Connection, source: str, rows_processed: int, rows_imported: int, rows_rejected: int
+    ) -> None:
+        checkpoint_table = _table(ImportCheckpoint)
+        result = connection.execute(
+            checkpoint_table.update()
+            .where(checkpoint_table.c.source == source)
+            .values(
+                rows_processed=checkpoint_table.c.rows_processed + rows_processed,
+                rows_imported=checkpoint_table.c.rows_imported + rows_imported,
+                rows_rejected=checkpoint_table.c.rows_rejected + rows_rejected,
+                updated_at=utc_now(),
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(
+                insert(checkpoint_table).values(
+                    source=source,
+                    rows_processed=rows_processed,
+                    rows_imported=rows_imported,
+                    rows_rejected=rows_rejected,
+                    updated_at=utc_now(),
+                )
+            )
+
+    def _import_batch(
+        self, connection: Connection, batch: list[dict[str, Any]], first_row_number: int
+    ) -> tuple[int, list[RejectedRow]]:
+        reason_by_index: dict[int, str] = {}
+
+        # Resolve names from the in-memory maps
+        practice_items: list[dict[str, Any]] = []
+        block_items: list[dict[str, Any]] = []
+        log_items: list[dict[str, Any]] = []
+        for index, row in enumerate(batch):
+            instrument_id = self._instrument_id_by_name.get(str(row.get("instrument", "")))
+            exercise_id = self._exercise_id_by_name.get(str(row.get("exercise", "")))
+            if instrument_id is None:
+                reason_by_index[index] = f"unknown instrument: {row.get('instrument')}"
+            elif exercise_id is None:
+                reason_by_index[index] = f"unknown exercise: {row.get('exercise')}"
+            practice_items.append(
+                {
+                    "instrument_id": instrument_id,
+                    "session_date": row.get("session_date"),
+                    "session_type": row.get("session_type"),
+                    "total_minutes": row.get("total_minutes"),
+                }
+            )
+            # Parent IDs are assigned after validation
+            block_items.append(
+                {
+                    "practice_id": 0,
+                    "exercise_id": exercise_id,
+                    "block_order": row.get("block_order"),
+                    "block_type": row.get("block_type"),
+                    "duration_minutes": row.get("duration_minutes"),
+                }
+            )
+            log_items.append(
+                {
+                    "practice_block_id": 0,
+                    "completed": row.get("completed"),
+                    "quality": row.get("quality"),
+                    "notes": row.get("notes") or None,
+                }
+            )
+
+        # Validate each part of the batch against the API schemas
+        practices, practice_errors = _validate_batch(self._practice_adapter, practice_items)
+        blocks, block_errors = _validate_batch(self._block_adapter, block_items)
+        logs, log_errors = _validate_batch(self._log_adapter, log_items)
+        for errors_by_index in (practice_errors, block_errors, log_errors):
+            for index, message in errors_by_index.items():
+                reason_by_index.setdefault(index, message)
+        valid_indexes = [index for index in range(len(batch)) if index not in reason_by_index]
+        rejected_rows = [
+            RejectedRow(row_number=first_row_number + index, reason=reason)
+            for index, reason in sorted(reason_by_index.items())
+        ]
+        if not valid_indexes:
+            return 0, rejected_rows
+
+        # Practices: reuse known or stored ones, insert the rest
+        practice_key_by_index: dict[int, PracticeKey] = {}
+        new_practice_by_key: dict[PracticeKey, PracticeCreate] = {}
+        for index in valid_indexes:
+            practice: PracticeCreate = practices[index]
+            practice_key = (practice.instrument_id, practice.session_date, practice.session_type.value)
+            practice_key_by_index[index] = practice_key
+            if practice_key not in self._practice_id_by_key:
+                new_practice_by_key.setdefault(practice_key, practice)
+        self._load_stored_practices(connection, list(new_practice_by_key))
+        new_practices = [
+            (practice_key, practice)
+            for practice_key, practice in new_practice_by_key.items()
+            if practice_key not in self._practice_id_by_key
+        ]
+        practice_ids = self._write_rows(
+            connection,
+            _table(Practice),
+            ["instrument_id", "session_date", "session_type", "total_minutes"],
+            [
+                (practice.instrument_id, practice.session_date, practice.session_type, practice.total_minutes)
+                for _, practice in new_practices
+            ],
+            is_returning_ids=True,
+        )
+        for (practice_key, _), practice_id in zip(new_practices, practice_ids, strict=True):
+            self._practice_id_by_key[practice_key] = practice_id
+
+        # Blocks and logs carry their parent's session_date partition key
+        block_ids = self._write_rows(
+            connection,
+            _table(PracticeBlock),
+            ["practice_id", "exercise_id", "block_order", "block_type", "duration_minutes", "session_date"],
+            [
+                (
+                    self._practice_id_by_key[practice_key_by_index[index]],
+                    blocks[index].exercise_id,
+                    blocks[index].block_order,
+                    blocks[index].block_type,
+                    blocks[index].duration_minutes,
+                    practice_key_by_index[index][1],
+                )
+                for index in valid_indexes
+            ],
+            is_returning_ids=True,
+        )
+        self._write_rows(
+            connection,
+            _table(PracticeBlockLog),
+            ["practice_block_id", "completed", "quality", "notes", "session_date"],
+            [
+                (
+                    block_id,
+                    logs[index].completed,
+                    logs[index].quality,
+                    logs[index].notes,
+                    practice_key_by_index[index][1],
+                )
+                for index, block_id in zip(valid_indexes, block_ids, strict=True)
+            ],
+            is_returning_ids=False,
+        )
+        return len(valid_indexes), rejected_rows
+
+    def _load_stored_practices(self, connection: Connection, practice_keys: list[PracticeKey]) -> None:
+        if not practice_keys:
+            return
+        practice_table = _table(Practice)
+        stored = connection.execute(
+            select(
+                practice_table.c.instrument_id,
+                practice_table.c.session_date,
+                practice_table.c.session_type,
+                practice_table.c.id,
+            ).where(
+                tuple_(practice_table.c.instrument_id, practice_table.c.session_date).in_(
+                    {(instrument_id, session_date) for instrument_id, session_date, _ in practice_keys}
+                )
+            )
+        )
+        for instrument_id, session_date, session_type, practice_id in stored:
+            self._practice_id_by_key.setdefault((instrument_id, session_date, session_type.value), practice_id)
+
+    def _write_rows(
+        self,
+        connection: Connection,
+        table: Table,
+        column_names: list[str],
+        rows: list[tuple[Any, ...]],
+        is_returning_ids: bool,
+    ) -> list[int]:
+        if not rows:
+            return []
+        if self._use_copy:
+            ids = _allocate_ids(connection, table, len(rows)) if is_returning_ids else []
+            if is_returning_ids:
+                rows = [(row_id, *row) for row_id, row in zip(ids, rows, strict=True)]
+                column_names = ["id", *column_names]
+            _copy_rows(connection, table, column_names, rows)
+            return ids
+
+        parameters = [dict(zip(column_names, row, strict=True)) for row in rows]
+        if not is_returning_ids:
+            connection.execute(insert(table), parameters)
+            return []
+        result = connection.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), parameters)
+        return list(result.scalars())
+
+
+def add_import_commands(subparsers: Any) -> None:
+    """
+    Register the `import-history` command.
+
+    Args:
+        subparsers: Subparser collection of the top-level parser
+    """
+    import_parser = subparsers.add_parser("import-history", help="Bulk import historical practice logs")
+    import_parser.add_argument("path", type=Path, help="CSV, JSON or JSON Lines file")
+    import_parser.add_argument("--format", choices=SOURCE_FORMATS, default=None, help="Defaults to the file suffix")
+    import_parser.add_argument("--batch-size", type=int, default=5000)
+    import_parser.add_argument("--source", default=None, help="Checkpoint name (defaults to the resolved path)")
+    import_parser.add_argument("--rejects", type=Path, default=None, help="Write rejected rows to this CSV file")
+    import_parser.add_argument("--no-copy", action="store_true", help="Use executemany even on PostgreSQL")
+    import_parser.set_defaults(handler=run_import_history)
+
+
+def _print_progress(progress: ImportProgress) -> None:
+    print(
+        f"{progress.rows_skipped + progress.rows_processed} rows processed "
+        f"({progress.rows_imported} imported, {progress.rows_rejected} rejected) "
+        f"at {progress.rows_per_second:,.0f} rows/s"
+    )
+
+
+def run_import_history(arguments: argparse.Namespace) -> int:
+    """Import a practice history file and report throughput."""
+    engine = create_db_engine_from_settings(load_settings_from_env())
+    source = arguments.source if arguments.source is not None else str(arguments.path.resolve())
+    importer = PracticeHistoryImporter(
+        engine, batch_size=arguments.batch_size, use_copy=False if arguments.no_copy else None
+    )
+    rejects_file = arguments.rejects.open("a", newline="", encoding="utf-8") if arguments.rejects else None
+    rejects_writer = csv.writer(rejects_file) if rejects_file is not None else None
+    try:
+        progress = importer.run(
+            read_source_rows(arguments.path, arguments.format),
+            source=source,
+            on_reject=(
+                (lambda rejected_row: rejects_writer.writerow([rejected_row.row_number, rejected_row.reason]))
+                if rejects_writer is not None
+                else None
+            ),
+            on_progress=_print_progress,
+        )
+    finally:
+        if rejects_file is not None:
+            rejects_file.close()
+        engine.dispose()
+
+    if progress.rows_skipped:
+        print(f"resumed after {progress.rows_skipped} previously processed rows")
+    print(
+        f"done: {progress.rows_imported} imported, {progress.rows_rejected} rejected in "
+        f"{progress.elapsed_seconds:.1f}s ({progress.rows_per_second:,.0f} rows/s)"
+    )
+    return 0
@@ -0,0 +1,66 @@
+"""
+Partition maintenance commands.
+
+`ensure` is meant to run on a schedule (e.g. daily from cron) so upcoming
+months always have a partition; `convert` is the one-off conversion of an
+existing PostgreSQL database.
+"""
+
+import argparse
+from typing import Any
+
+from ..config.settings import load_settings_from_env
+from ..db.engine import create_db_engine_from_settings
+from ..db.partitioning import convert_to_partitioned, ensure_partitions
+
+
+def add_partition_commands(subparsers: Any) -> None:
+    """
+    Register the `partitions` command group.
+
+    Args:
+        subparsers: Subparser collection of the top-level parser
+    """
+    partitions_parser = subparsers.add_parser("partitions", help="Manage monthly table partitions (PostgreSQL)")
+    partition_subparsers = partitions_parser.add_subparsers(dest="partition_command", required=True)
+
+    ensure_parser = partition_subparsers.add_parser("ensure", help="Create missing partitions for upcoming months")
+    ensure_parser.add_argument("--months-ahead", type=int, default=None, help="Defaults to DB_PARTITION_MONTHS_AHEAD")
+    ensure_parser.set_defaults(handler=run_ensure)
+
+    convert_parser = partition_subparsers.add_parser("convert", help="Convert tables to monthly range partitions")
+    convert_parser.add_argument("--months-ahead", type=int, default=None, help="Defaults to DB_PARTITION_MONTHS_AHEAD")
+    convert_parser.set_defaults(handler=run_convert)
+
+
+def run_ensure(arguments: argparse.Namespace) -> int:
+    """Create missing monthly partitions and report them."""
+    settings = load_settings_from_env()
+    months_ahead = arguments.months_ahead if arguments.months_ahead is not None else settings.db_partition_months_ahead
+    engine = create_db_engine_from_settings(settings)
+    try:
+        with engine.begin() as connection:
+            created = ensure_partitions(connection, months_ahead=months_ahead)
+    finally:
+        engine.dispose()
+    for name in created:
+        print(f"created {name}")
+    print(f"{len(created)} partition(s) created")
+    return 0
+
+
+def run_convert(arguments: argparse.Namespace) -> int:
+    """Convert the practice and log tables to partitioned tables."""
+    settings = load_settings_from_env()
+    months_ahead = arguments.months_ahead if arguments.months_ahead is not None else settings.db_partition_months_ahead
+    engine = create_db_engine_from_settings(settings)
+    try:
+        if engine.dialect.name != "postgresql":
+            print(f"Partitioning requires PostgreSQL; {engine.dialect.name} keeps the unpartitioned layout")
+            return 1
+        with engine.begin() as connection:
+            is_converted = convert_to_partitioned(connection, months_ahead=months_ahead)
+    finally:
+        engine.dispose()
+    print("tables converted" if is_converted else "tables already partitioned")
+    return 0
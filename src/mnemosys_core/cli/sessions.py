@@ -0,0 +1,79 @@
+"""
+Session generation commands.
+
+`generate` precomputes one day's session for every instrument (by default
+tomorrow's), meant to run overnight. Instruments are planned in partitions
+on a process pool (see `mnemosys_core.generator.batch`); the command prints
+the throughput of each worker and the phase timings.
+"""
+
+import argparse
+from datetime import date, timedelta
+from typing import Any
+
+from ..config.settings import load_settings_from_env
+from ..db.engine import create_db_engine_from_settings
+from ..db.models import SessionType
+from ..db.session import create_session_factory
+from ..generator.batch import DEFAULT_BATCH_MINUTES, DEFAULT_PARTITION_SIZE, generate_sessions_batch
+from ..generator.rules import MAX_SESSION_MINUTES, MIN_SESSION_MINUTES
+from ..util.time import today_utc
+
+
+def add_session_commands(subparsers: Any) -> None:
+    """
+    Register the `sessions` command group.
+
+    Args:
+        subparsers: Subparser collection of the top-level parser
+    """
+    sessions_parser = subparsers.add_parser("sessions", help="Generate practice sessions")
+    session_subparsers = sessions_parser.add_subparsers(dest="session_command", required=True)
+
+    generate_parser = session_subparsers.add_parser("generate", help="Generate one session per instrument for a day")
+    generate_parser.add_argument(
+        "--date", type=date.fromisoformat, default=None, help="Session date (defaults to tomorrow, UTC)"
+    )
+    generate_parser.add_argument(
+        "--minutes",
+        type=int,
+        default=DEFAULT_BATCH_MINUTES,
+        choices=range(MIN_SESSION_MINUTES, MAX_SESSION_MINUTES + 1),
+        metavar=f"{{{MIN_SESSION_MINUTES}..{MAX_SESSION_MINUTES}}}",
+    )
+    generate_parser.add_argument(
+        "--session-type", type=SessionType, default=SessionType.NORMAL, choices=list(SessionType)
+    )
+    generate_parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to CPU count)")
+    generate_parser.add_argument("--partition-size", type=int, default=DEFAULT_PARTITION_SIZE)
+    generate_parser.set_defaults(handler=run_generate)
+
+
+def run_generate(arguments: argparse.Namespace) -> int:
+    """Generate and save the sessions of a day, printing per-worker throughput."""
+    session_date = arguments.date if arguments.date is not None else today_utc() + timedelta(days=1)
+    engine = create_db_engine_from_settings(load_settings_from_env())
+    try:
+        result = generate_sessions_batch(
+            create_session_factory(engine),
+            session_date,
+            available_minutes=arguments.minutes,
+            session_type=arguments.session_type,
+            workers=arguments.workers,
+            partition_size=arguments.partition_size,
+        )
+    finally:
+        engine.dispose()
+    for worker in result.workers:
+        print(
+            f"worker {worker.worker}: {worker.sessions} session(s) in {worker.partitions} partition(s), "
+            f"{worker.seconds * 1000:.1f} ms ({worker.sessions_per_second:,.0f} sessions/s)"
+        )
+    if result.unplannable:
+        print(f"no exercise fits instrument(s) {', '.join(map(str, result.unplannable))}")
+    timings = ", ".join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in result.timings.items())
+    print(
+        f"{result.sessions} session(s) generated for {result.session_date.isoformat()}, "
+        f"{result.skipped} instrument(s) already planned ({timings}; {result.sessions_per_second:,.0f} sessions/s)"
+    )
+    return 0
@@ -18,12 +18,73 @@ class Settings:
         database_url: Database connection string
         debug: Enable debug mode
         log_sql: Log SQL statements
+        db_pool_size: Persistent connections kept by the PostgreSQL pool
+        db_max_overflow: Extra connections allowed beyond db_pool_size
+        db_pool_timeout: Seconds to wait for a connection before failing
+        db_pool_recycle: Seconds after which connections are replaced (-1 disables)
+        db_pool_use_lifo: Reuse the most recently returned connection first
+        sqlite_reader_pool_size: Reader connections for file-backed SQLite
+        sqlite_mmap_size: Bytes of a file-backed SQLite database to memory-map
+        sqlite_cache_size: SQLite page cache size (negative values are KiB)
+        sqlite_busy_timeout_ms: Milliseconds SQLite waits on a locked database
+        db_query_cache_size: Entries in SQLAlchemy's compiled statement cache
+        db_prepare_threshold: Executions before PostgreSQL statements are prepared
+            server-side via psycopg 3 (None disables prepared statements)
+        db_partitioning: Range-partition practice and log tables by session month
+            (PostgreSQL only)
+        db_partition_months_ahead: Future monthly partitions kept ready ahead of today
+        db_retry_max_attempts: Attempts per unit of work on transient errors (1 disables retries)
+        db_retry_base_delay: Seconds of backoff ceiling before the first retry
+        db_retry_max_delay: Upper bound in seconds on a single backoff
+        db_retry_budget: Upper bound in seconds on total backoff per unit of work
+        db_query_budget_max_queries: Default statements allowed per request (None for no limit)
+        db_query_budget_max_repeats: Default executions allowed per identical statement
+            and request before it is flagged as a possible N+1
+        db_query_budget_strict: Fail requests exceeding their query budget instead of
+            logging (None: strict only in the test environment)
+        db_slow_query_ms: Record statements at least this slow (None disables the slow query log)
+        db_slow_query_explain_ms: Capture the plan of statements at least this slow
+            (None disables plan capture)
+        db_slow_query_explain_analyze: Capture PostgreSQL plans with EXPLAIN ANALYZE,
+            which runs the slow statement again
+        db_slow_query_capacity: Slow query samples kept in memory
+        db_migration_lock_timeout_ms: Milliseconds a migration statement waits for a
+            lock before failing instead of queueing behind traffic (PostgreSQL only)
+        db_archive_horizon_days: Age in days after which practices move to the archive
+        db_archive_batch_size: Practices archived per transaction
     """
 
     environment: Environment
     database_url: str
     debug: bool = False
     log_sql: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_use_lifo: bool = False
+    sqlite_reader_pool_size: int = 4
+    sqlite_mmap_size: int = 268_435_456
+    sqlite_cache_size: int = -64_000
+    sqlite_busy_timeout_ms: int = 5_000
+    db_query_cache_size: int = 500
+    db_prepare_threshold: int | None = None
+    db_partitioning: bool = False
+    db_partition_months_ahead: int = 3
+    db_retry_max_attempts: int = 3
+    db_retry_base_delay: float = 0.05
+    db_retry_max_delay: float = 1.0
+    db_retry_budget: float = 2.0
+    db_query_budget_max_queries: int | None = None
+    db_query_budget_max_repeats: int = 5
+    db_query_budget_strict: bool | None = None
+    db_slow_query_ms: float | None = None
+    db_slow_query_explain_ms: float | None = None
+    db_slow_query_explain_analyze: bool = False
+    db_slow_query_capacity: int = 100
+    db_migration_lock_timeout_ms: int = 5_000
+    db_archive_horizon_days: int = 730
+    db_archive_batch_size: int = 200
 
 
 def load_settings_from_env() -> Settings:
@@ -35,6 +96,38 @@ def load_settings_from_env() -> Settings:
         DATABASE_URL: Database connection string
         DEBUG: Enable debug mode (true/false)
         LOG_SQL: Log SQL statements (true/false)
+        DB_POOL_SIZE: Persistent pool connections (default 5)
+        DB_MAX_OVERFLOW: Overflow connections beyond the pool size (default 10)
+        DB_POOL_TIMEOUT: Seconds to wait for a pooled connection (default 30)
+        DB_POOL_RECYCLE: Connection recycle age in seconds (default -1, disabled)
+        DB_POOL_USE_LIFO: Reuse connections last-in first-out (true/false)
+        SQLITE_READER_POOL_SIZE: Reader connections for file-backed SQLite (default 4)
+        SQLITE_MMAP_SIZE: Memory-mapped bytes for file-backed SQLite (default 256 MiB)
+        SQLITE_CACHE_SIZE: SQLite page cache size, negative for KiB (default -64000)
+        SQLITE_BUSY_TIMEOUT_MS: SQLite lock wait in milliseconds (default 5000)
+        DB_QUERY_CACHE_SIZE: SQLAlchemy compiled statement cache size (default 500)
+        DB_PREPARE_THRESHOLD: Enable psycopg 3 server-side prepared statements after
+            this many executions (unset disables)
+        DB_PARTITIONING: Partition practice and log tables by month on PostgreSQL (true/false)
+        DB_PARTITION_MONTHS_AHEAD: Future monthly partitions to keep ready (default 3)
+        DB_RETRY_MAX_ATTEMPTS: Attempts per unit of work on transient errors (default 3)
+        DB_RETRY_BASE_DELAY: First backoff ceiling in seconds (default 0.05)
+        DB_RETRY_MAX_DELAY: Maximum single backoff in seconds (default 1.0)
+        DB_RETRY_BUDGET: Maximum total backoff in seconds (default 2.0)
+        DB_QUERY_BUDGET_MAX_QUERIES: Default statements allowed per request (unset for no limit)
+        DB_QUERY_BUDGET_MAX_REPEATS: Executions of one statement per request before it is
+            flagged as a possible N+1 (default 5)
+        DB_QUERY_BUDGET_STRICT: Fail requests over budget instead of logging (true/false;
+            unset means strict only in the test environment)
+        DB_SLOW_QUERY_MS: Record statements at least this slow (unset disables)
+        DB_SLOW_QUERY_EXPLAIN_MS: Capture plans of statements at least this slow (unset disables)
+        DB_SLOW_QUERY_EXPLAIN_ANALYZE: Capture plans with EXPLAIN ANALYZE, re-running the
+            statement (true/false)
+        DB_SLOW_QUERY_CAPACITY: Slow query samples kept in memory (default 100)
+        DB_MIGRATION_LOCK_TIMEOUT_MS: Lock wait allowed to migration statements in
+            milliseconds (default 5000)
+        DB_ARCHIVE_HORIZON_DAYS: Archive practices older than this many days (default 730)
+        DB_ARCHIVE_BATCH_SIZE: Practices archived per transaction (default 200)
 
     Returns:
         Configured Settings object
@@ -59,10 +152,69 @@ def load_settings_from_env() -> Settings:
     database_url = os.getenv("DATABASE_URL", default_db_urls[environment])
     debug = os.getenv("DEBUG", "false").lower() == "true"
     log_sql = os.getenv("LOG_SQL", "false").lower() == "true"
+    db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+    db_pool_use_lifo = os.getenv("DB_POOL_USE_LIFO", "false").lower() == "true"
+    sqlite_reader_pool_size = int(os.getenv("SQLITE_READER_POOL_SIZE", "4"))
+    sqlite_mmap_size = int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))
+    sqlite_cache_size = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))
+    sqlite_busy_timeout_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    db_query_cache_size = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))
+    prepare_threshold_value = os.getenv("DB_PREPARE_THRESHOLD")
+    db_prepare_threshold = int(prepare_threshold_value) if prepare_threshold_value else None
+    db_partitioning = os.getenv("DB_PARTITIONING", "false").lower() == "true"
+    db_partition_months_ahead = int(os.getenv("DB_PARTITION_MONTHS_AHEAD", "3"))
+    db_retry_max_attempts = int(os.getenv("DB_RETRY_MAX_ATTEMPTS", "3"))
+    db_retry_base_delay = float(os.getenv("DB_RETRY_BASE_DELAY", "0.05"))
+    db_retry_max_delay = float(os.getenv("DB_RETRY_MAX_DELAY", "1.0"))
+    db_retry_budget = float(os.getenv("DB_RETRY_BUDGET", "2.0"))
+    max_queries_value = os.getenv("DB_QUERY_BUDGET_MAX_QUERIES")
+    db_query_budget_max_queries = int(max_queries_value) if max_queries_value else None
+    db_query_budget_max_repeats = int(os.getenv("DB_QUERY_BUDGET_MAX_REPEATS", "5"))
+    strict_value = os.getenv("DB_QUERY_BUDGET_STRICT")
+    db_query_budget_strict = strict_value.lower() == "true" if strict_value else None
+    slow_query_value = os.getenv("DB_SLOW_QUERY_MS")
+    db_slow_query_ms = float(slow_query_value) if slow_query_value else None
+    slow_query_explain_value = os.getenv("DB_SLOW_QUERY_EXPLAIN_MS")
+    db_slow_query_explain_ms = float(slow_query_explain_value) if slow_query_explain_value else None
+    db_slow_query_explain_analyze = os.getenv("DB_SLOW_QUERY_EXPLAIN_ANALYZE", "false").lower() == "true"
+    db_slow_query_capacity = int(os.getenv("DB_SLOW_QUERY_CAPACITY", "100"))
+    db_migration_lock_timeout_ms = int(os.getenv("DB_MIGRATION_LOCK_TIMEOUT_MS", "5000"))
+    db_archive_horizon_days = int(os.getenv("DB_ARCHIVE_HORIZON_DAYS", "730"))
+    db_archive_batch_size = int(os.getenv("DB_ARCHIVE_BATCH_SIZE", "200"))
 
     return Settings(
         environment=environment,
         database_url=database_url,
         debug=debug,
         log_sql=log_sql,
+        db_pool_size=db_pool_size,
+        db_max_overflow=db_max_overflow,
+        db_pool_timeout=db_pool_timeout,
+        db_pool_recycle=db_pool_recycle,
+        db_pool_use_lifo=db_pool_use_lifo,
+        sqlite_reader_pool_size=sqlite_reader_pool_size,
+        sqlite_mmap_size=sqlite_mmap_size,
+        sqlite_cache_size=sqlite_cache_size,
+        sqlite_busy_timeout_ms=sqlite_busy_timeout_ms,
+        db_query_cache_size=db_query_cache_size,
+        db_prepare_threshold=db_prepare_threshold,
+        db_partitioning=db_partitioning,
+        db_partition_months_ahead=db_partition_months_ahead,
+        db_retry_max_attempts=db_retry_max_attempts,
+        db_retry_base_delay=db_retry_base_delay,
+        db_retry_max_delay=db_retry_max_delay,
+        db_retry_budget=db_retry_budget,
+        db_query_budget_max_queries=db_query_budget_max_queries,
+        db_query_budget_max_repeats=db_query_budget_max_repeats,
+        db_query_budget_strict=db_query_budget_strict,
+        db_slow_query_ms=db_slow_query_ms,
+        db_slow_query_explain_ms=db_slow_query_explain_ms,
+        db_slow_query_explain_analyze=db_slow_query_explain_analyze,
+        db_slow_query_capacity=db_slow_query_capacity,
+        db_migration_lock_timeout_ms=db_migration_lock_timeout_ms,
+        db_archive_horizon_days=db_archive_horizon_days,
+        db_archive_batch_size=db_archive_batch_size,
     )
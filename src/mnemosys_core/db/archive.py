@@ -0,0 +1,340 @@
+"""
+Hot/cold archival of old practice history.
+
+Practices older than the archive horizon (DB_ARCHIVE_HORIZON_DAYS) are moved
+out of the hot tables, whose indexes and working set then only cover recent
+history. Each practice becomes one `practice_archive` row carrying its
+blocks, block logs, exercise instances and exercise logs as one document,
+and its month's `practice_summary` row is updated, so monthly aggregates
+stay online.
+
+Archival runs in batches of practices, one short transaction per batch: a
+batch inserts the archive rows, adds to the summaries and deletes the hot
+rows together, so an interrupted run leaves every practice either hot or
+archived, and simply resumes with the next oldest practices. With
+partitioning on, the monthly partitions behind the horizon end up empty and
+can be dropped.
+
+Reads are hot-only unless a caller explicitly asks for archived history
+(`practice_rows(..., include_archived=True)`).
+"""
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import Engine, Select, delete, false, insert, select, true, union_all, update
+from sqlalchemy.orm import Session, selectinload
+
+from ..util.time import utc_now
+from .models import (
+    CompletionStatus,
+    ExerciseInstance,
+    ExerciseLog,
+    Practice,
+    PracticeArchive,
+    PracticeBlock,
+    PracticeBlockLog,
+    PracticeSummary,
+)
+from .retry import RetryPolicy, run_in_transaction
+from .session import create_session_factory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_HORIZON_DAYS = 730
+DEFAULT_ARCHIVE_BATCH_SIZE = 200
+
+
+@dataclass(frozen=True)
+class ArchiveResult:
+    """
+    Outcome of an archival run.
+
+    Attributes:
+        before: Practices dated before this day were eligible
+        practices: Practices archived in this run
+        batches: Batches committed in this run
+        finished: Whether no eligible practice is left in the hot tables
+    """
+
+    before: date
+    practices: int
+    batches: int
+    finished: bool
+
+
+def archive_cutoff(today: date, horizon_days: int) -> date:
+    """
+    Compute the first session date that stays in the hot tables.
+
+    Args:
+        today: Current date
+        horizon_days: Days of history kept hot
+
+    Returns:
+        Practices dated before this day are archived
+    """
+    return today - timedelta(days=horizon_days)
+
+
+def month_start(day: date) -> date:
+    """Return the first day of a date's month."""
+    return day.replace(day=1)
+
+
+def archive_document(practice: Practice) -> dict[str, Any]:
+    """
+    Serialize the children of a practice for its archive row.
+
+    Enum members are stored by value; IDs are kept so archived rows can be
+    traced back to exports and logs taken before archival.
+
+    Args:
+        practice: Practice with blocks, block logs, instances and logs loaded
+
+    Returns:
+        Document with "blocks" and "exercise_instances" lists
+    """
+    return {
+        "blocks": [
+            {
+                "id": block.id,
+                "exercise_id": block.exercise_id,
+                "block_order": block.block_order,
+                "block_type": block.block_type.value,
+                "duration_minutes": block.duration_minutes,
+                "logs": [
+                    {
+                        "id": log.id,
+                        "completed": log.completed.value,
+                        "quality": log.quality.value,
+                        "notes": log.notes,
+                    }
+                    for log in block.logs
+                ],
+            }
+            for block in practice.blocks
+        ],
+        "exercise_instances": [
+            {
+                "id": exercise_instance.id,
+                "exercise_id": exercise_instance.exercise_id,
+                "sequence_order": exercise_instance.sequence_order,
+                "parameters": exercise_instance.parameters,
+                "log": (
+                    {
+                        "id": exercise_instance.log.id,
+                        "completion_status": exercise_instance.log.completion_status.value,
+                        "quality_rating": exercise_instance.log.quality_rating.value,
+                        "notes": exercise_instance.log.notes,
+                    }
+                    if exercise_instance.log is not None
+                    else None
+                ),
+            }
+            for exercise_instance in practice.exercise_instances
+        ],
+    }
+
+
+def _add_to_summaries(db_session: Session, practices: Sequence[Practice]) -> None:
+    """Add archived practices to their monthly summaries (update, else insert)."""
+    totals: dict[tuple[int, date], Counter[str]] = {}
+    for practice in practices:
+        counts = totals.setdefault((practice.instrument_id, month_start(practice.session_date)), Counter())
+        counts["practices"] += 1
+        counts["total_minutes"] += practice.total_minutes
+        for exercise_instance in practice.exercise_instances:
+            counts["exercises"] += 1
+            if exercise_instance.log is not None and exercise_instance.log.completion_status is CompletionStatus.YES:
+                counts["exercises_completed"] += 1
+
+    columns = ("practices", "total_minutes", "exercises", "exercises_completed")
+    for (instrument_id, month), counts in sorted(totals.items()):
+        result = db_session.execute(
+            update(PracticeSummary)
+            .where(PracticeSummary.instrument_id == instrument_id, PracticeSummary.month == month)
+            .values({column: getattr(PracticeSummary, column) + counts[column] for column in columns})
+        )
+        if result.rowcount == 0:  # type: ignore[attr-defined]
+            db_session.execute(
+                insert(PracticeSummary).values(
+                    instrument_id=instrument_id, month=month, **{column: counts[column] for column in columns}
+                )
+            )
+
+
+def _archive_batch(db_session: Session, before: date, batch_size: int) -> int:
+    """Archive the oldest practices dated before a day; return how many were archived."""
+    practices = (
+        db_session.execute(
+            select(Practice)
+            .where(Practice.session_date < before)
+            .order_by(Practice.session_date, Practice.id)
+            .limit(batch_size)
+            .options(
+                selectinload(Practice.blocks).selectinload(PracticeBlock.logs),
+                selectinload(Practice.exercise_instances).selectinload(ExerciseInstance.log),
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if not practices:
+        return 0
+
+    archived_at = utc_now()
+    db_session.execute(
+        insert(PracticeArchive),
+        [
+            {
+                "id": practice.id,
+                "instrument_id": practice.instrument_id,
+                "session_date": practice.session_date,
+                "session_type": practice.session_type,
+                "total_minutes": practice.total_minutes,
+                "history": archive_document(practice),
+                "archived_at": archived_at,
+            }
+            for practice in practices
+        ],
+    )
+    _add_to_summaries(db_session, practices)
+
+    practice_ids = [practice.id for practice in practices]
+    instance_ids = select(ExerciseInstance.id).where(ExerciseInstance.practice_id.in_(practice_ids))
+    block_ids = select(PracticeBlock.id).where(PracticeBlock.practice_id.in_(practice_ids))
+    for statement in (
+        delete(ExerciseLog).where(ExerciseLog.exercise_instance_id.in_(instance_ids)),
+        delete(ExerciseInstance).where(ExerciseInstance.practice_id.in_(practice_ids)),
+        delete(PracticeBlockLog).where(PracticeBlockLog.practice_block_id.in_(block_ids)),
+        delete(PracticeBlock).where(PracticeBlock.practice_id.in_(practice_ids)),
+        delete(Practice).where(Practice.id.in_(practice_ids)),
+    ):
+        db_session.execute(statement, execution_options={"synchronize_session": False})
+    return len(practices)
+
+
+def archive_practices(
+    engine: Engine,
+    before: date,
+    batch_size: int = DEFAULT_ARCHIVE_BATCH_SIZE,
+    pause_seconds: float = 0.1,
+    max_batches: int | None = None,
+    retry_policy: RetryPolicy | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> ArchiveResult:
+    """
+    Move practices dated before a day from the hot tables to the archive.
+
+    Args:
+        engine: Database engine
+        before: Archive practices with an earlier session date
+        batch_size: Practices per transaction
+        pause_seconds: Sleep between batches, leaving room for other writers
+        max_batches: Stop after this many batches (None runs until done)
+        retry_policy: Retry bounds for failed batches (defaults to RetryPolicy())
+        sleep: Sleep function used between batches
+
+    Returns:
+        Practices and batches archived by this run
+
+    Example:
+        >>> archive_practices(engine, archive_cutoff(date.today(), settings.db_archive_horizon_days))
+    """
+    session_factory = create_session_factory(engine)
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        count = run_in_transaction(
+            session_factory, lambda db_session: _archive_batch(db_session, before, batch_size), retry_policy
+        )
+        if count == 0:
+            return ArchiveResult(before=before, practices=archived, batches=batches, finished=True)
+        archived += count
+        batches += 1
+        logger.info("Archived %d practices dated before %s (%d so far)", count, before, archived)
+        if count < batch_size:
+            return ArchiveResult(before=before, practices=archived, batches=batches, finished=True)
+        if pause_seconds > 0:
+            sleep(pause_seconds)
+    return ArchiveResult(before=before, practices=archived, batches=batches, finished=False)
+
+
+def practice_rows(
+    date_from: date | None = None, date_to: date | None = None, include_archived: bool = False
+) -> Select[Any]:
+    """
+    Select practice columns, from the hot table and optionally the archive.
+
+    Rows carry an `archived` flag and are ordered by session date and ID, so
+    paging through hot and archived practices is stable.
+
+    Args:
+        date_from: First session date to include
+        date_to: Last session date to include
+        include_archived: Also read archived practices
+
+    Returns:
+        Statement selecting id, instrument_id, session_date, session_type,
+        total_minutes and archived
+    """
+    hot = select(
+        Practice.id,
+        Practice.instrument_id,
+        Practice.session_date,
+        Practice.session_type,
+        Practice.total_minutes,
+        false().label("archived"),
+    )
+    if date_from is not None:
+        hot = hot.where(Practice.session_date >= date_from)
+    if date_to is not None:
+        hot = hot.where(Practice.session_date <= date_to)
+    if not include_archived:
+        return hot.order_by(Practice.session_date, Practice.id)
+
+    cold = select(
+        PracticeArchive.id,
+        PracticeArchive.instrument_id,
+        PracticeArchive.session_date,
+        PracticeArchive.session_type,
+        PracticeArchive.total_minutes,
+        true().label("archived"),
+    )
+    if date_from is not None:
+        cold = cold.where(PracticeArchive.session_date >= date_from)
+    if date_to is not None:
+        cold = cold.where(PracticeArchive.session_date <= date_to)
+    rows = union_all(hot, cold).subquery("practice_rows")
+    return select(rows).order_by(rows.c.session_date, rows.c.id)
+
+
+def summary_rows(
+    instrument_id: int | None = None, date_from: date | None = None, date_to: date | None = None
+) -> Select[tuple[PracticeSummary]]:
+    """
+    Select monthly summaries of archived practices.
+
+    Args:
+        instrument_id: Only this instrument's summaries
+        date_from: First day whose month is included
+        date_to: Last day whose month is included
+
+    Returns:
+        Statement selecting PracticeSummary rows by instrument and month
+    """
+    statement = select(PracticeSummary)
+    if instrument_id is not None:
+        statement = statement.where(PracticeSummary.instrument_id == instrument_id)
+    if date_from is not None:
+        statement = statement.where(PracticeSummary.month >= month_start(date_from))
+    if date_to is not None:
+        statement = statement.where(PracticeSummary.month <= date_to)
+    return statement.order_by(PracticeSummary.instrument_id, PracticeSummary.month)
+
@@ -0,0 +1,48 @@
+"""
+Row locks on ExerciseState for the incremental maintainers.
+
+The rolling minute windows and the mastery estimates are read, advanced in
+Python and written back on every flush. Two transactions doing that for the
+same exercise at once would each start from the committed values and the
+later commit would drop the other's minutes or outcomes. The maintainers
+therefore lock the state rows of the exercises they touch first: missing
+states are created (`ON CONFLICT DO NOTHING`, so concurrent creators do not
+collide) and all of them are selected `FOR UPDATE`, in exercise order to
+keep lock acquisition consistent. The lock also serializes writers of the
+exercise's `exercise_daily_minutes` buckets, which are only written while
+holding it.
+
+SQLite has no row locks; it serializes writers per database instead.
+"""
+
+from collections.abc import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .models import ExerciseState
+
+
+def lock_exercise_states(db_session: Session, exercise_ids: Iterable[int]) -> None:
+    """
+    Create any missing states of some exercises and lock all of them until the transaction ends.
+
+    Args:
+        db_session: Database session (inside the transaction to lock in)
+        exercise_ids: Exercises whose states are about to be read and rewritten
+    """
+    ordered_ids = sorted(set(exercise_ids))
+    if not ordered_ids:
+        return
+    dialect_insert = postgresql.insert if db_session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    db_session.execute(
+        dialect_insert(ExerciseState).on_conflict_do_nothing(index_elements=[ExerciseState.exercise_id]),
+        [{"exercise_id": exercise_id} for exercise_id in ordered_ids],
+    )
+    db_session.execute(
+        select(ExerciseState.id)
+        .where(ExerciseState.exercise_id.in_(ordered_ids))
+        .order_by(ExerciseState.exercise_id)
+        .with_for_update()
+    )
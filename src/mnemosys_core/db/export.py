@@ -0,0 +1,286 @@
+"""
+Columnar snapshot export of practice history.
+
+Practice history is written as Parquet, one file per table or as the
+denormalized `exercise_facts` table (one row per exercise log with its
+instance, practice, instrument and exercise). Rows are streamed from the
+database and written in record batches, so memory use is bounded by the
+batch size rather than by the table size. Enum columns are written
+dictionary-encoded.
+
+Exports can be incremental: `after_id` keeps rows whose ID is above a
+previous export's last ID, `since` keeps rows on or after a session date.
+Rows are written in ID order and the export reports the last ID written,
+which is the watermark for the next run.
+
+Parquet support needs pyarrow (the `analytics` extra); it is imported on
+first use so the rest of the package does not depend on it.
+"""
+
+import enum
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import IO, Any
+
+from sqlalchemy import Boolean, Connection, Date, DateTime, Float, Integer, Row, Select, String, select
+from sqlalchemy.orm import QueryableAttribute
+from sqlalchemy.types import TypeEngine
+
+from .models import Exercise, ExerciseInstance, ExerciseLog, Instrument, Practice, PracticeBlock, PracticeBlockLog
+from .types import DatabaseEnum, DatabaseEnumList, JSONEncodedDict, JSONEncodedList
+
+DEFAULT_EXPORT_BATCH_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class ExportSource:
+    """
+    A table or query that can be exported.
+
+    Attributes:
+        name: Source name used for file names and the export endpoint
+        statement: Query selecting the exported columns, unordered and unfiltered
+        id_column: Monotonic ID used for ordering and ID watermarks
+        id_key: Name of the ID column in the exported rows
+        date_column: Session date used for date watermarks
+    """
+
+    name: str
+    statement: Select[Any]
+    id_column: QueryableAttribute[int]
+    id_key: str
+    date_column: QueryableAttribute[Any]
+
+
+@dataclass(frozen=True)
+class ExportResult:
+    """
+    Outcome of one export.
+
+    Attributes:
+        source: Exported source name
+        rows: Rows written
+        last_id: Highest ID written, or the `after_id` watermark when no rows matched
+    """
+
+    source: str
+    rows: int
+    last_id: int | None
+
+
+def _table_source(model: Any) -> ExportSource:
+    """Export every column of a model's table."""
+    return ExportSource(
+        name=model.__tablename__,
+        statement=select(*model.__table__.columns),
+        id_column=model.id,
+        id_key="id",
+        date_column=model.session_date,
+    )
+
+
+def _exercise_facts_source() -> ExportSource:
+    """Exercise logs joined with their instance, practice, instrument and exercise."""
+    statement = (
+        select(
+            ExerciseLog.id.label("exercise_log_id"),
+            ExerciseInstance.id.label("exercise_instance_id"),
+            Practice.id.label("practice_id"),
+            Practice.session_date,
+            Practice.session_type,
+            Practice.total_minutes,
+            Instrument.id.label("instrument_id"),
+            Instrument.name.label("instrument_name"),
+            Exercise.id.label("exercise_id"),
+            Exercise.name.label("exercise_name"),
+            ExerciseInstance.sequence_order,
+            ExerciseInstance.parameters,
+            ExerciseLog.completion_status,
+            ExerciseLog.quality_rating,
+            ExerciseLog.notes,
+        )
+        .join(ExerciseInstance, ExerciseLog.exercise_instance_id == ExerciseInstance.id)
+        .join(Practice, ExerciseInstance.practice_id == Practice.id)
+        .join(Instrument, Practice.instrument_id == Instrument.id)
+        .join(Exercise, ExerciseInstance.exercise_id == Exercise.id)
+    )
+    return ExportSource(
+        name="exercise_facts",
+        statement=statement,
+        id_column=ExerciseLog.id,
+        id_key="exercise_log_id",
+        date_column=Practice.session_date,
+    )
+
+
+EXPORT_SOURCES: dict[str, ExportSource] = {
+    source.name: source
+    for source in (
+        _table_source(Practice),
+        _table_source(PracticeBlock),
+        _table_source(PracticeBlockLog),
+        _table_source(ExerciseInstance),
+        _table_source(ExerciseLog),
+        _exercise_facts_source(),
+    )
+}
+
+
+def _import_pyarrow() -> Any:
+    """Import pyarrow with its Parquet module, or explain how to install it."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise RuntimeError("Parquet export requires pyarrow; install the 'analytics' extra") from error
+    return pyarrow
+
+
+def _arrow_type(pyarrow: Any, column_type: TypeEngine[Any]) -> Any:
+    """Map a column type to its Arrow type."""
+    if isinstance(column_type, DatabaseEnum):
+        return pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    if isinstance(column_type, DatabaseEnumList | JSONEncodedList):
+        return pyarrow.list_(pyarrow.string())
+    if isinstance(column_type, JSONEncodedDict):
+        return pyarrow.string()
+    if isinstance(column_type, Boolean):
+        return pyarrow.bool_()
+    if isinstance(column_type, Integer):
+        return pyarrow.int64()
+    if isinstance(column_type, Float):
+        return pyarrow.float64()
+    if isinstance(column_type, DateTime):
+        return pyarrow.timestamp("us", tz="UTC" if column_type.timezone else None)
+    if isinstance(column_type, Date):
+        return pyarrow.date32()
+    if isinstance(column_type, String):
+        return pyarrow.string()
+    raise TypeError(f"No Arrow type for column type {column_type!r}")
+
+
+def _enum_value(value: enum.Enum | None) -> Any:
+    return value.value if value is not None else None
+
+
+def _enum_list_values(values: list[enum.Enum] | None) -> list[Any] | None:
+    return [item.value for item in values] if values is not None else None
+
+
+def _json_text(value: dict[str, Any] | None) -> str | None:
+    return json.dumps(value, sort_keys=True) if value is not None else None
+
+
+def _value_converter(column_type: TypeEngine[Any]) -> Callable[[Any], Any] | None:
+    """Return how to turn a loaded value into an Arrow value, or None to keep it."""
+    if isinstance(column_type, DatabaseEnum):
+        return _enum_value
+    if isinstance(column_type, DatabaseEnumList):
+        return _enum_list_values
+    if isinstance(column_type, JSONEncodedDict):
+        return _json_text
+    return None
+
+
+def arrow_schema(source: ExportSource) -> Any:
+    """
+    Build the Arrow schema of an export source.
+
+    Args:
+        source: Export source
+
+    Returns:
+        pyarrow.Schema with one field per selected column
+    """
+    pyarrow = _import_pyarrow()
+    return pyarrow.schema(
+        [pyarrow.field(column.key, _arrow_type(pyarrow, column.type)) for column in source.statement.selected_columns]
+    )
+
+
+def _record_batch(pyarrow: Any, schema: Any, source: ExportSource, rows: Sequence[Row[Any]]) -> Any:
+    """Convert loaded rows to a record batch column by column."""
+    arrays = []
+    for position, column in enumerate(source.statement.selected_columns):
+        values = [row[position] for row in rows]
+        converter = _value_converter(column.type)
+        if converter is not None:
+            values = [converter(value) for value in values]
+        arrays.append(pyarrow.array(values, type=schema.field(position).type))
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def export_parquet(
+    connection: Connection,
+    source_name: str,
+    destination: str | Path | IO[bytes],
+    after_id: int | None = None,
+    since: date | None = None,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+) -> ExportResult:
+    """
+    Stream an export source into a Parquet file.
+
+    Args:
+        connection: Database connection
+        source_name: Name of a source in EXPORT_SOURCES
+        destination: Path or binary file object to write to
+        after_id: Only export rows with an ID above this watermark
+        since: Only export rows with a session date on or after this date
+        batch_size: Rows per fetched chunk and per Parquet record batch
+
+    Returns:
+        Export counts and the ID watermark for the next incremental export
+
+    Raises:
+        ValueError: If the source name is unknown
+        RuntimeError: If pyarrow is not installed
+
+    Example:
+        >>> with engine.connect() as connection:
+        ...     result = export_parquet(connection, "exercise_facts", "facts.parquet", after_id=last_id)
+    """
+    source = EXPORT_SOURCES.get(source_name)
+    if source is None:
+        raise ValueError(f"Unknown export source: {source_name}")
+    pyarrow = _import_pyarrow()
+    schema = arrow_schema(source)
+
+    statement = source.statement.order_by(source.id_column)
+    if after_id is not None:
+        statement = statement.where(source.id_column > after_id)
+    if since is not None:
+        statement = statement.where(source.date_column >= since)
+
+    row_count = 0
+    last_id = after_id
+    result = connection.execution_options(stream_results=True).execute(statement)
+    with pyarrow.parquet.ParquetWriter(destination, schema) as writer:
+        for rows in result.partitions(batch_size):
+            writer.write_batch(_record_batch(pyarrow, schema, source, rows))
+            row_count += len(rows)
+            last_id = rows[-1]._mapping[source.id_key]
+    return ExportResult(source=source_name, rows=row_count, last_id=last_id)
+
+
+def export_file_name(source_name: str, after_id: int | None = None, since: date | None = None) -> str:
+    """
+    Name the file of an export so incremental exports do not overwrite snapshots.
+
+    Args:
+        source_name: Exported source name
+        after_id: ID watermark of the export, if any
+        since: Date watermark of the export, if any
+
+    Returns:
+        File name such as "practice.parquet" or "practice.after-120.parquet"
+    """
+    parts = [source_name]
+    if after_id is not None:
+        parts.append(f"after-{after_id}")
+    if since is not None:
+        parts.append(f"since-{since.isoformat()}")
+    return ".".join([*parts, "parquet"])
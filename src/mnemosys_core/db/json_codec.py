@@ -0,0 +1,73 @@
+"""
+JSON codec for JSON/JSONB columns.
+
+SQLAlchemy encodes and decodes every JSON cell (`parameters`, `domains`,
+`pitch_sequence`, `instrument_compatibility`, ...) with the engine's
+`json_serializer`/`json_deserializer`, which are stdlib `json` unless
+configured. `create_db_engine` defaults to `default_json_codec()`: orjson
+(the optional `fast-json` extra) when it is installed, stdlib `json`
+otherwise.
+
+The orjson codec falls back to stdlib `json` for the few documents orjson
+rejects (integers beyond 64 bits, NaN literals written by stdlib `json`),
+so both codecs read and write the same data.
+"""
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import cache
+from typing import Any
+
+
+@dataclass(frozen=True)
+class JSONCodec:
+    """
+    Serializer/deserializer pair handed to SQLAlchemy engines.
+
+    Attributes:
+        name: Codec name for logs and diagnostics
+        serializer: Encodes a Python value as JSON text
+        deserializer: Decodes JSON text (or bytes) into a Python value
+    """
+
+    name: str
+    serializer: Callable[[Any], str]
+    deserializer: Callable[[str | bytes], Any]
+
+
+STDLIB_JSON_CODEC = JSONCodec("json", json.dumps, json.loads)
+
+
+@cache
+def default_json_codec() -> JSONCodec:
+    """
+    Return the fastest available codec.
+
+    Returns:
+        orjson codec if orjson is installed, otherwise STDLIB_JSON_CODEC
+    """
+    try:
+        import orjson
+    except ImportError:
+        return STDLIB_JSON_CODEC
+
+    dumps = orjson.dumps
+    loads = orjson.loads
+    encode_error = orjson.JSONEncodeError
+    decode_error = orjson.JSONDecodeError
+    options = orjson.OPT_NON_STR_KEYS
+
+    def serialize(value: Any) -> str:
+        try:
+            return dumps(value, option=options).decode()
+        except encode_error:
+            return json.dumps(value)
+
+    def deserialize(document: str | bytes) -> Any:
+        try:
+            return loads(document)
+        except decode_error:
+            return json.loads(document)
+
+    return JSONCodec("orjson", serialize, deserialize)
@@ -0,0 +1,358 @@
+"""
+Server-side mastery estimates.
+
+`ExerciseState.mastery_estimate` follows the outcomes logged for an
+exercise (ExerciseLog and PracticeBlockLog rows): a clean completion raises
+it slowly toward 1.0, an acceptable or partial one holds it, and a failure
+(not completed, or sloppy) holds it the first time and lowers it slightly
+when it repeats. `ExerciseState.failure_streak` counts the failures logged
+since the last non-failure.
+
+Every outcome is an affine step `m -> p * m + q`, so estimates can be
+computed two equivalent ways:
+
+- Incrementally: `maintain_mastery_estimates` (an after_flush listener
+  registered by `create_session_factory`) applies the steps of new logs to
+  their exercise's state in the flush's transaction.
+- In batch: `rebuild_mastery_estimates` replays the whole history, hot and
+  archived, of every exercise as NumPy arrays. Composing the steps of an
+  exercise reduces to cumulative sums of log(p), so the replay has no
+  per-log Python loop.
+
+Logs are replayed in practice order (session date, practice, blocks before
+exercise instances, position, log ID). Edited, deleted and back-dated logs
+are only accounted for by a rebuild. Batch mode needs NumPy (the
+`analytics` extra); it is imported on first use.
+"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import Integer, Select, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session
+
+from ..util.timing import timed
+from .exercise_states import lock_exercise_states
+from .models import (
+    CompletionStatus,
+    ExerciseInstance,
+    ExerciseLog,
+    ExerciseState,
+    PracticeArchive,
+    PracticeBlock,
+    PracticeBlockLog,
+    QualityRating,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
+MASTERY_GAIN = 0.05
+MASTERY_PENALTY = 0.05
+
+OUTCOME_FAILURE = -1
+OUTCOME_HOLD = 0
+OUTCOME_CLEAN = 1
+
+COMPLETION_CODES = {status: code for code, status in enumerate(CompletionStatus)}
+QUALITY_CODES = {rating: code for code, rating in enumerate(QualityRating)}
+
+# Order of logs within a practice: block logs first, then exercise logs
+BLOCK_LOG, EXERCISE_LOG = 0, 1
+
+
+@dataclass(frozen=True)
+class MasteryRebuildResult:
+    """
+    Outcome of a mastery rebuild.
+
+    Attributes:
+        exercises: Exercise states written
+        logs: Logged outcomes replayed
+        timings: Seconds spent per phase ("load", "replay", "write")
+    """
+
+    exercises: int
+    logs: int
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def classify_outcome(completion: CompletionStatus, quality: QualityRating) -> int:
+    """
+    Classify a logged outcome.
+
+    Args:
+        completion: Completion status
+        quality: Quality rating
+
+    Returns:
+        OUTCOME_CLEAN, OUTCOME_HOLD or OUTCOME_FAILURE
+    """
+    if completion is CompletionStatus.NO or quality is QualityRating.SLOPPY:
+        return OUTCOME_FAILURE
+    if completion is CompletionStatus.YES and quality is QualityRating.CLEAN:
+        return OUTCOME_CLEAN
+    return OUTCOME_HOLD
+
+
+def apply_outcome(
+    mastery: float, failure_streak: int, completion: CompletionStatus, quality: QualityRating
+) -> tuple[float, int]:
+    """
+    Apply one logged outcome to a mastery estimate.
+
+    Args:
+        mastery: Current estimate
+        failure_streak: Failures logged since the last non-failure
+        completion: Completion status of the new log
+        quality: Quality rating of the new log
+
+    Returns:
+        New estimate and failure streak
+    """
+    outcome = classify_outcome(completion, quality)
+    if outcome == OUTCOME_CLEAN:
+        return min(mastery + MASTERY_GAIN * (1.0 - mastery), 1.0), 0
+    if outcome == OUTCOME_FAILURE:
+        if failure_streak > 0:
+            mastery = max(mastery * (1.0 - MASTERY_PENALTY), 0.0)
+        return mastery, failure_streak + 1
+    return mastery, 0
+
+
+def _import_numpy() -> Any:
+    """Import NumPy, or explain how to install it."""
+    try:
+        import numpy
+    except ImportError as error:
+        raise RuntimeError("Batch mastery replay requires numpy; install the 'analytics' extra") from error
+    return numpy
+
+
+def replay_mastery(
+    exercise_ids: "npt.NDArray[np.int64]", completion: "npt.NDArray[np.int64]", quality: "npt.NDArray[np.int64]"
+) -> tuple["npt.NDArray[np.int64]", "npt.NDArray[np.float64]", "npt.NDArray[np.int64]"]:
+    """
+    Replay the logged outcomes of many exercises from an estimate of 0.0.
+
+    Equivalent to folding `apply_outcome` over each exercise's logs.
+
+    Args:
+        exercise_ids: Exercise of each log, logs grouped by exercise and in replay order
+        completion: COMPLETION_CODES of each log
+        quality: QUALITY_CODES of each log
+
+    Returns:
+        Exercise IDs (one per group), their estimates and failure streaks
+    """
+    numpy = _import_numpy()
+    count = len(exercise_ids)
+    if count == 0:
+        return (numpy.empty(0, numpy.int64), numpy.empty(0, numpy.float64), numpy.empty(0, numpy.int64))
+
+    first = numpy.ones(count, dtype=bool)
+    first[1:] = exercise_ids[1:] != exercise_ids[:-1]
+    starts = numpy.flatnonzero(first)
+    ends = numpy.append(starts[1:], count) - 1
+    group = numpy.cumsum(first) - 1
+
+    failure = (completion == COMPLETION_CODES[CompletionStatus.NO]) | (quality == QUALITY_CODES[QualityRating.SLOPPY])
+    clean = (completion == COMPLETION_CODES[CompletionStatus.YES]) & (quality == QUALITY_CODES[QualityRating.CLEAN])
+    repeated = failure.copy()
+    repeated[1:] &= failure[:-1]
+    repeated[starts] = False
+
+    # m_end = sum_i q_i * prod_{j > i} p_j, with the products as exp of suffix sums of log(p)
+    log_p = numpy.where(clean, numpy.log1p(-MASTERY_GAIN), numpy.where(repeated, numpy.log1p(-MASTERY_PENALTY), 0.0))
+    cumulative = numpy.cumsum(log_p)
+    gains = numpy.where(clean, MASTERY_GAIN * numpy.exp(cumulative[ends][group] - cumulative), 0.0)
+    mastery = numpy.clip(numpy.add.reduceat(gains, starts), 0.0, 1.0)
+
+    # Failure streak: logs after the last non-failure of each group
+    index = numpy.arange(count)
+    last_success = numpy.maximum.accumulate(numpy.where(failure, starts[group] - 1, index))
+    streaks = ends - last_success[ends]
+    return exercise_ids[starts], mastery, streaks
+
+
+def _log_rows(block_log_ids: list[int] | None = None, exercise_log_ids: list[int] | None = None) -> Select[Any]:
+    """Select hot logs with their exercise and replay-order columns (optionally only some logs)."""
+    block_logs = select(
+        PracticeBlock.exercise_id,
+        PracticeBlock.session_date,
+        PracticeBlock.practice_id,
+        literal(BLOCK_LOG, Integer).label("kind"),
+        PracticeBlock.block_order.label("position"),
+        PracticeBlockLog.id.label("log_id"),
+        PracticeBlockLog.completed.label("completion_status"),
+        PracticeBlockLog.quality.label("quality_rating"),
+    ).select_from(PracticeBlockLog).join(PracticeBlock, PracticeBlock.id == PracticeBlockLog.practice_block_id)
+    exercise_logs = select(
+        ExerciseInstance.exercise_id,
+        ExerciseInstance.session_date,
+        ExerciseInstance.practice_id,
+        literal(EXERCISE_LOG, Integer).label("kind"),
+        ExerciseInstance.sequence_order.label("position"),
+        ExerciseLog.id.label("log_id"),
+        ExerciseLog.completion_status,
+        ExerciseLog.quality_rating,
+    ).select_from(ExerciseLog).join(ExerciseInstance, ExerciseInstance.id == ExerciseLog.exercise_instance_id)
+    if block_log_ids is not None:
+        block_logs = block_logs.where(PracticeBlockLog.id.in_(block_log_ids))
+    if exercise_log_ids is not None:
+        exercise_logs = exercise_logs.where(ExerciseLog.id.in_(exercise_log_ids))
+    rows = union_all(block_logs, exercise_logs).subquery("logs")
+    return select(rows)
+
+
+def _archived_log_rows(db_session: Session) -> Iterator[tuple[int, ...]]:
+    """Yield archived logs as (exercise, day ordinal, practice, kind, position, log, completion, quality) codes."""
+    for practice_id, session_date, history in db_session.execute(
+        select(PracticeArchive.id, PracticeArchive.session_date, PracticeArchive.history)
+    ):
+        day = session_date.toordinal()
+        for block in history.get("blocks", []):
+            for log in block.get("logs", []):
+                yield (
+                    block["exercise_id"],
+                    day,
+                    practice_id,
+                    BLOCK_LOG,
+                    block["block_order"],
+                    log["id"],
+                    COMPLETION_CODES[CompletionStatus(log["completed"])],
+                    QUALITY_CODES[QualityRating(log["quality"])],
+                )
+        for exercise_instance in history.get("exercise_instances", []):
+            log = exercise_instance.get("log")
+            if log is not None:
+                yield (
+                    exercise_instance["exercise_id"],
+                    day,
+                    practice_id,
+                    EXERCISE_LOG,
+                    exercise_instance["sequence_order"],
+                    log["id"],
+                    COMPLETION_CODES[CompletionStatus(log["completion_status"])],
+                    QUALITY_CODES[QualityRating(log["quality_rating"])],
+                )
+
+
+def _expire_loaded_states(db_session: Session, exercise_ids: set[int] | None = None) -> None:
+    """Reload mastery columns written behind the ORM's back on next access."""
+    for instance in list(db_session.identity_map.values()):
+        if isinstance(instance, ExerciseState) and (exercise_ids is None or instance.exercise_id in exercise_ids):
+            db_session.expire(instance, ["mastery_estimate", "failure_streak"])
+
+
+def _write_states(db_session: Session, values: dict[int, tuple[float, int]], reset_others: bool) -> int:
+    """Write estimates by exercise, creating missing states (and zeroing states not in `values`); return states written."""
+    existing = dict(db_session.execute(select(ExerciseState.exercise_id, ExerciseState.id)).tuples().all())
+    updates = [
+        {"id": state_id, "mastery_estimate": mastery, "failure_streak": streak}
+        for exercise_id, state_id in existing.items()
+        for mastery, streak in [values.get(exercise_id, (0.0, 0))]
+        if reset_others or exercise_id in values
+    ]
+    inserts = [
+        {"exercise_id": exercise_id, "mastery_estimate": mastery, "failure_streak": streak}
+        for exercise_id, (mastery, streak) in sorted(values.items())
+        if exercise_id not in existing
+    ]
+    if updates:
+        db_session.execute(update(ExerciseState), updates)
+    if inserts:
+        db_session.execute(insert(ExerciseState), inserts)
+    return len(updates) + len(inserts)
+
+
+def maintain_mastery_estimates(db_session: Session, flush_context: Any) -> None:
+    """
+    Apply the outcomes of newly flushed logs to mastery estimates (after_flush listener).
+
+    States are created for exercises logged without one, and locked until the
+    transaction ends.
+    """
+    block_log_ids = [instance.id for instance in db_session.new if isinstance(instance, PracticeBlockLog)]
+    exercise_log_ids = [instance.id for instance in db_session.new if isinstance(instance, ExerciseLog)]
+    if not (block_log_ids or exercise_log_ids):
+        return
+    with db_session.no_autoflush:
+        logs = _log_rows(block_log_ids, exercise_log_ids).subquery("new_logs")
+        rows = db_session.execute(
+            select(logs).order_by(
+                logs.c.exercise_id, logs.c.session_date, logs.c.practice_id, logs.c.kind, logs.c.position, logs.c.log_id
+            )
+        ).all()
+        exercise_ids = {row.exercise_id for row in rows}
+        # Concurrent loggers of an exercise queue here, so each steps from the other's committed estimate
+        lock_exercise_states(db_session, exercise_ids)
+        states = {
+            exercise_id: (mastery, streak)
+            for exercise_id, mastery, streak in db_session.execute(
+                select(ExerciseState.exercise_id, ExerciseState.mastery_estimate, ExerciseState.failure_streak).where(
+                    ExerciseState.exercise_id.in_(exercise_ids)
+                )
+            )
+        }
+        values: dict[int, tuple[float, int]] = {}
+        for exercise_id, exercise_rows in groupby(rows, key=lambda row: row.exercise_id):
+            mastery, streak = states[exercise_id]
+            for row in exercise_rows:
+                mastery, streak = apply_outcome(mastery, streak, row.completion_status, row.quality_rating)
+            values[exercise_id] = (mastery, streak)
+        _write_states(db_session, values, reset_others=False)
+        _expire_loaded_states(db_session, exercise_ids)
+
+
+def rebuild_mastery_estimates(db_session: Session) -> MasteryRebuildResult:
+    """
+    Replay every logged outcome, hot and archived, into the mastery estimates.
+
+    States of exercises without logs are reset to 0.0; exercises with logs
+    but no state get one.
+
+    Args:
+        db_session: Database session (the caller commits)
+
+    Returns:
+        States written, logs replayed and per-phase timings
+    """
+    numpy = _import_numpy()
+    timings: dict[str, float] = {}
+
+    with timed(timings, "load"):
+        rows: list[tuple[int, ...]] = [
+            (
+                row.exercise_id,
+                row.session_date.toordinal() if row.session_date is not None else 0,
+                row.practice_id,
+                row.kind,
+                row.position,
+                row.log_id,
+                COMPLETION_CODES[row.completion_status],
+                QUALITY_CODES[row.quality_rating],
+            )
+            for row in db_session.execute(_log_rows())
+        ]
+        rows.extend(_archived_log_rows(db_session))
+        logs = numpy.array(rows, dtype=numpy.int64).reshape(-1, 8)
+
+    with timed(timings, "replay"):
+        # lexsort sorts by the last key first
+        order = numpy.lexsort(logs[:, 5::-1].T)
+        logs = logs[order]
+        exercise_ids, mastery, streaks = replay_mastery(logs[:, 0], logs[:, 6], logs[:, 7])
+
+    with timed(timings, "write"):
+        values = {
+            int(exercise_id): (float(estimate), int(streak))
+            for exercise_id, estimate, streak in zip(exercise_ids, mastery, streaks, strict=True)
+        }
+        written = _write_states(db_session, values, reset_others=True)
+        _expire_loaded_states(db_session)
+
+    return MasteryRebuildResult(exercises=written, logs=len(logs), timings=timings)
@@ -5,6 +5,8 @@ This module exports all ORM models and enums.
 """
 
 import enum
+from collections.abc import Mapping
+from types import MappingProxyType
 
 
 # Domain enums
@@ -60,9 +62,33 @@ class QualityRating(enum.Enum):
     SLOPPY = "sloppy"
 
 
+class MesocyclePhase(enum.Enum):
+    """Training phases of a mesocycle."""
+
+    ACCUMULATION = "accumulation"
+    INTENSIFICATION = "intensification"
+    DELOAD = "deload"
+
+
+# Fatigue profile each session type works at: the highest one the generator
+# plans for it, and the one a practice of that type leaves its exercises in
+SESSION_FATIGUE: Mapping[SessionType, FatigueProfile] = MappingProxyType(
+    {
+        SessionType.LIGHT: FatigueProfile.F0,
+        SessionType.DELOAD: FatigueProfile.F0,
+        SessionType.NORMAL: FatigueProfile.F1,
+        SessionType.HEAVY: FatigueProfile.F2,
+    }
+)
+
+
 # Import models for convenience
+from .archive import PracticeArchive, PracticeSummary
+from .backfill_checkpoint import BackfillCheckpoint
 from .exercise import Exercise, ExerciseState
+from .exercise_daily_minutes import ExerciseDailyMinutes
 from .exercise_instance import ExerciseInstance, ExerciseLog
+from .import_checkpoint import ImportCheckpoint
 from .instrument import (
     Instrument,
     KeyboardInstrument,
@@ -70,6 +96,7 @@ from .instrument import (
     StringedInstrument,
     WindInstrument,
 )
+from .mesocycle import Mesocycle, MesocycleDay
 from .overload_dimension import OverloadDimension
 from .practice import Practice
 from .practice_block import PracticeBlock, PracticeBlockLog
@@ -88,8 +115,10 @@ __all__ = [
     "CompletionStatus",
     "DomainType",
     "FatigueProfile",
+    "MesocyclePhase",
     "QualityRating",
     "SessionType",
+    "SESSION_FATIGUE",
     # Instrument models
     "Instrument",
     "StringedInstrument",
@@ -111,7 +140,17 @@ __all__ = [
     "ExerciseInstance",
     "ExerciseLog",
     "ExerciseState",
+    "ExerciseDailyMinutes",
     "Practice",
     "PracticeBlock",
     "PracticeBlockLog",
+    # Planning models
+    "Mesocycle",
+    "MesocycleDay",
+    # Archive models
+    "PracticeArchive",
+    "PracticeSummary",
+    # Operational models
+    "BackfillCheckpoint",
+    "ImportCheckpoint",
 ]
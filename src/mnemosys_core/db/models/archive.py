@@ -0,0 +1,78 @@
+"""
+Archived practice history models.
+
+Practices older than the archive horizon move out of the hot tables (see
+`mnemosys_core.db.archive`). Each archived practice becomes one
+PracticeArchive row: the practice columns stay queryable, and its blocks,
+block logs, exercise instances and exercise logs are kept as a single
+document. PracticeSummary keeps monthly aggregates of archived practices
+online.
+"""
+
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..base import Base
+from ..types import DatabaseEnum, JSONEncodedDict
+from . import SessionType
+
+
+class PracticeArchive(Base):
+    """
+    Practice session moved out of the hot tables.
+
+    Attributes:
+        id: ID the practice had in the hot table
+        instrument_id: Foreign key to instruments
+        session_date: Date of session
+        session_type: Intensity level
+        total_minutes: Total session duration
+        history: Blocks (with their logs) and exercise instances (with their
+            logs) of the practice, as written by `archive_document`
+        archived_at: When the practice was archived (UTC)
+    """
+
+    __tablename__ = "practice_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    instrument_id: Mapped[int] = mapped_column(Integer, ForeignKey("instrument.id"), nullable=False)
+    session_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    session_type: Mapped[SessionType] = mapped_column(DatabaseEnum(SessionType), nullable=False)
+    total_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    history: Mapped[dict[str, Any]] = mapped_column(JSONEncodedDict, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PracticeArchive(id={self.id}, date={self.session_date})>"
+
+
+class PracticeSummary(Base):
+    """
+    Monthly aggregates of archived practices per instrument.
+
+    Attributes:
+        id: Primary key
+        instrument_id: Foreign key to instruments
+        month: First day of the summarized month
+        practices: Archived practices
+        total_minutes: Minutes practiced
+        exercises: Exercise instances practiced
+        exercises_completed: Exercise instances logged as completed
+    """
+
+    __tablename__ = "practice_summary"
+    __table_args__ = (UniqueConstraint("instrument_id", "month"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    instrument_id: Mapped[int] = mapped_column(Integer, ForeignKey("instrument.id"), nullable=False)
+    month: Mapped[date] = mapped_column(Date, nullable=False)
+    practices: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    exercises: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    exercises_completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<PracticeSummary(instrument_id={self.instrument_id}, month={self.month})>"
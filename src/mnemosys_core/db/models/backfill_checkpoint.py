@@ -0,0 +1,40 @@
+"""
+Batched backfill checkpoint model.
+
+Records the primary key up to which a batched data backfill has run. The
+checkpoint is updated in the same transaction as each batch, so an
+interrupted backfill resumes after the last committed batch.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..base import Base
+
+
+class BackfillCheckpoint(Base):
+    """
+    Progress of a resumable batched backfill.
+
+    Attributes:
+        id: Primary key
+        name: Backfill identifier (e.g., "exercise_instance.session_date")
+        last_key: Highest primary key of the target table already processed
+        rows_updated: Rows changed so far
+        batches: Batches committed so far
+        updated_at: Time of the last committed batch (UTC)
+    """
+
+    __tablename__ = "backfill_checkpoint"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(200), nullable=False, unique=True)
+    last_key: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rows_updated: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    batches: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<BackfillCheckpoint(name='{self.name}', last_key={self.last_key})>"
@@ -87,9 +87,11 @@ class ExerciseState(Base):
         id: Primary key
         exercise_id: Foreign key to exercises
         last_practiced_date: Most recent practice date
-        rolling_minutes_7d: Total minutes in last 7 days
-        rolling_minutes_28d: Total minutes in last 28 days
-        mastery_estimate: Skill level (0.0 = novice, 1.0 = mastery)
+        rolling_minutes_7d: Total minutes in last 7 days (maintained server-side)
+        rolling_minutes_28d: Total minutes in last 28 days (maintained server-side)
+        rolling_as_of: Last day covered by the rolling windows
+        mastery_estimate: Skill level (0.0 = novice, 1.0 = mastery; maintained server-side)
+        failure_streak: Consecutive failed outcomes logged most recently
         last_fatigue_profile: Most recent fatigue state
     """
 
@@ -100,7 +102,9 @@ class ExerciseState(Base):
     last_practiced_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     rolling_minutes_7d: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     rolling_minutes_28d: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rolling_as_of: Mapped[date | None] = mapped_column(Date, nullable=True)
     mastery_estimate: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    failure_streak: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     last_fatigue_profile: Mapped[FatigueProfile | None] = mapped_column(DatabaseEnum(FatigueProfile), nullable=True)
 
     # Relationships
@@ -0,0 +1,46 @@
+"""
+Per-exercise daily practice minutes.
+
+Buckets feed the rolling minute windows of ExerciseState (see
+`mnemosys_core.db.rolling_minutes`). Only days that can still fall inside a
+window are kept, so the table stays at most a few weeks of rows per
+exercise.
+"""
+
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..base import Base
+
+
+class ExerciseDailyMinutes(Base):
+    """
+    Minutes practiced on one exercise on one day.
+
+    Practice blocks and exercise instances are summed separately: sessions
+    logged both ways record the same work twice, so a day counts the larger
+    of the two totals (see `minutes`).
+
+    Attributes:
+        exercise_id: Foreign key to exercises
+        day: Session date
+        block_minutes: Sum of practice block durations
+        instance_minutes: Sum of exercise instance `duration` parameters
+    """
+
+    __tablename__ = "exercise_daily_minutes"
+
+    exercise_id: Mapped[int] = mapped_column(Integer, ForeignKey("exercise.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    block_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    instance_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    @property
+    def minutes(self) -> int:
+        """Minutes the day contributes to rolling windows."""
+        return max(self.block_minutes, self.instance_minutes, 0)
+
+    def __repr__(self) -> str:
+        return f"<ExerciseDailyMinutes(exercise_id={self.exercise_id}, day={self.day}, minutes={self.minutes})>"
@@ -3,14 +3,19 @@ Exercise instance and logging models.
 
 ExerciseInstance represents a parameterized exercise for a specific practice session.
 ExerciseLog records the performance outcome for an exercise instance (1:1 relationship).
+
+Commonly filtered parameters (see `INDEXED_PARAMETERS`) have expression
+indexes, so e.g. tempo range queries are index scans.
 """
 
+from datetime import date
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, Integer, Text
+from sqlalchemy import Date, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..base import Base
+from ..parameters import INDEXED_PARAMETERS, parameter_index_name, parameter_value
 from ..types import DatabaseEnum, JSONEncodedDict
 from . import CompletionStatus, QualityRating
 
@@ -31,6 +36,7 @@ class ExerciseInstance(Base):
         exercise_id: Foreign key to exercises
         sequence_order: Position within practice session (1-indexed)
         parameters: Exercise parameters (tempo, key, pattern, duration, etc.)
+        session_date: Partition key copied from the parent practice
     """
 
     __tablename__ = "exercise_instance"
@@ -40,6 +46,7 @@ class ExerciseInstance(Base):
     exercise_id: Mapped[int] = mapped_column(Integer, ForeignKey("exercise.id"), nullable=False)
     sequence_order: Mapped[int] = mapped_column(Integer, nullable=False)
     parameters: Mapped[dict[str, str | int | float]] = mapped_column(JSONEncodedDict, nullable=False, default=dict)
+    session_date: Mapped[date | None] = mapped_column(Date, nullable=True, index=True)
 
     # Relationships
     practice: Mapped["Practice"] = relationship("Practice", back_populates="exercise_instances")
@@ -52,6 +59,13 @@ class ExerciseInstance(Base):
         return f"<ExerciseInstance(id={self.id}, sequence={self.sequence_order})>"
 
 
+for _parameter_name, _numeric in INDEXED_PARAMETERS.items():
+    Index(
+        parameter_index_name(_parameter_name),
+        parameter_value(ExerciseInstance.__table__.c.parameters, _parameter_name, _numeric),
+    )
+
+
 class ExerciseLog(Base):
     """
     Performance record for an exercise instance (1:1 relationship).
@@ -64,6 +78,7 @@ class ExerciseLog(Base):
         completion_status: Whether exercise was completed (yes/partial/no)
         quality_rating: Subjective quality assessment (clean/acceptable/sloppy)
         notes: Optional free text notes
+        session_date: Partition key copied from the parent exercise instance
     """
 
     __tablename__ = "exercise_log"
@@ -75,6 +90,7 @@ class ExerciseLog(Base):
     completion_status: Mapped[CompletionStatus] = mapped_column(DatabaseEnum(CompletionStatus), nullable=False)
     quality_rating: Mapped[QualityRating] = mapped_column(DatabaseEnum(QualityRating), nullable=False)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    session_date: Mapped[date | None] = mapped_column(Date, nullable=True, index=True)
 
     # Relationships
     exercise_instance: Mapped["ExerciseInstance"] = relationship("ExerciseInstance", back_populates="log")
@@ -0,0 +1,40 @@
+"""
+Bulk import checkpoint model.
+
+Records how far a bulk import of one source has progressed. The checkpoint
+is updated in the same transaction as each imported batch, so a resumed
+import neither skips nor duplicates rows.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..base import Base
+
+
+class ImportCheckpoint(Base):
+    """
+    Progress of a resumable bulk import.
+
+    Attributes:
+        id: Primary key
+        source: Import source identifier (e.g., resolved file path)
+        rows_processed: Source rows consumed, imported or rejected
+        rows_imported: Rows written to the database
+        rows_rejected: Rows skipped because they failed validation
+        updated_at: Time of the last committed batch (UTC)
+    """
+
+    __tablename__ = "import_checkpoint"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    source: Mapped[str] = mapped_column(String(500), nullable=False, unique=True)
+    rows_processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rows_imported: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rows_rejected: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ImportCheckpoint(source='{self.source}', rows_processed={self.rows_processed})>"
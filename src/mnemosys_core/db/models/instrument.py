@@ -10,6 +10,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from ..base import Base
 
 if TYPE_CHECKING:
+    from .mesocycle import Mesocycle
     from .practice import Practice
     from .technique import Technique
     from .tuning import StringedInstrumentTuning
@@ -61,6 +62,9 @@ class Instrument(Base):
     practices: Mapped[list["Practice"]] = relationship(
         "Practice", back_populates="instrument", cascade="all, delete-orphan"
     )
+    mesocycles: Mapped[list["Mesocycle"]] = relationship(
+        "Mesocycle", back_populates="instrument", cascade="all, delete-orphan"
+    )
     techniques: Mapped[list["Technique"]] = relationship(
         "Technique",
         secondary=instrument_technique_association,
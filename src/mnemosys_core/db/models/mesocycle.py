@@ -0,0 +1,90 @@
+"""
+Mesocycle models.
+
+A Mesocycle is a multi-week training plan for one instrument: accumulation,
+intensification and deload phases laid out day by day (see
+docs/project/draft/Mesocycle_Deload_Strategy.md). Each MesocycleDay holds
+the session type and volume target of one day; re-planning rewrites only
+the affected future days.
+"""
+
+from datetime import date
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Date, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from ..base import Base
+from ..types import DatabaseEnum
+from . import MesocyclePhase, SessionType
+
+if TYPE_CHECKING:
+    from .instrument import Instrument
+
+
+class Mesocycle(Base):
+    """
+    Multi-week training plan of an instrument.
+
+    Attributes:
+        id: Primary key
+        instrument_id: Foreign key to instruments
+        start_date: First day of the cycle
+        accumulation_weeks: Weeks of the accumulation phase
+        intensification_weeks: Weeks of the intensification phase
+        deload_weeks: Weeks of the deload phase
+        base_minutes: Daily volume of the first accumulation week
+    """
+
+    __tablename__ = "mesocycle"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    instrument_id: Mapped[int] = mapped_column(Integer, ForeignKey("instrument.id"), nullable=False, index=True)
+    start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    accumulation_weeks: Mapped[int] = mapped_column(Integer, nullable=False)
+    intensification_weeks: Mapped[int] = mapped_column(Integer, nullable=False)
+    deload_weeks: Mapped[int] = mapped_column(Integer, nullable=False)
+    base_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Relationships
+    instrument: Mapped["Instrument"] = relationship("Instrument", back_populates="mesocycles")
+    days: Mapped[list["MesocycleDay"]] = relationship(
+        "MesocycleDay", back_populates="mesocycle", cascade="all, delete-orphan", order_by="MesocycleDay.day"
+    )
+
+    def __repr__(self) -> str:
+        return f"<Mesocycle(id={self.id}, instrument_id={self.instrument_id}, start={self.start_date})>"
+
+
+class MesocycleDay(Base):
+    """
+    Planned session of one day of a mesocycle.
+
+    Attributes:
+        id: Primary key
+        mesocycle_id: Foreign key to mesocycles
+        day: Date of the session
+        phase: Phase the day belongs to
+        session_type: Intensity of the session
+        target_minutes: Volume target of the session
+        overload: Overload dimension emphasized on the day, if any
+        replanned_on: When the day was last re-planned (None if as first planned)
+    """
+
+    __tablename__ = "mesocycle_day"
+    __table_args__ = (UniqueConstraint("mesocycle_id", "day"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    mesocycle_id: Mapped[int] = mapped_column(Integer, ForeignKey("mesocycle.id"), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    phase: Mapped[MesocyclePhase] = mapped_column(DatabaseEnum(MesocyclePhase), nullable=False)
+    session_type: Mapped[SessionType] = mapped_column(DatabaseEnum(SessionType), nullable=False)
+    target_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    overload: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    replanned_on: Mapped[date | None] = mapped_column(Date, nullable=True)
+
+    # Relationships
+    mesocycle: Mapped["Mesocycle"] = relationship("Mesocycle", back_populates="days")
+
+    def __repr__(self) -> str:
+        return f"<MesocycleDay(day={self.day}, phase={self.phase.value}, " f"type={self.session_type.value})>"
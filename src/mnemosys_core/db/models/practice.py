@@ -34,7 +34,7 @@ class Practice(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     instrument_id: Mapped[int] = mapped_column(Integer, ForeignKey("instrument.id"), nullable=False)
-    session_date: Mapped[date] = mapped_column(Date, nullable=False)
+    session_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
     session_type: Mapped[SessionType] = mapped_column(DatabaseEnum(SessionType), nullable=False)
     total_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
 
@@ -8,9 +8,10 @@ These models are being phased out in favor of ExerciseInstance/ExerciseLog,
 but remain for backward compatibility.
 """
 
+from datetime import date
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, Integer, Text
+from sqlalchemy import Date, ForeignKey, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..base import Base
@@ -33,6 +34,7 @@ class PracticeBlock(Base):
         block_order: Sequence within practice session
         block_type: Category of work
         duration_minutes: Block duration
+        session_date: Partition key copied from the parent practice
     """
 
     __tablename__ = "practice_block"
@@ -43,6 +45,7 @@ class PracticeBlock(Base):
     block_order: Mapped[int] = mapped_column(Integer, nullable=False)
     block_type: Mapped[BlockType] = mapped_column(DatabaseEnum(BlockType), nullable=False)
     duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    session_date: Mapped[date | None] = mapped_column(Date, nullable=True, index=True)
 
     # Relationships
     practice: Mapped["Practice"] = relationship("Practice", back_populates="blocks")
@@ -63,6 +66,7 @@ class PracticeBlockLog(Base):
         completed: Completion status
         quality: Quality assessment
         notes: Optional free text
+        session_date: Partition key copied from the parent practice block
     """
 
     __tablename__ = "practice_block_log"
@@ -72,6 +76,7 @@ class PracticeBlockLog(Base):
     completed: Mapped[CompletionStatus] = mapped_column(DatabaseEnum(CompletionStatus), nullable=False)
     quality: Mapped[QualityRating] = mapped_column(DatabaseEnum(QualityRating), nullable=False)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    session_date: Mapped[date | None] = mapped_column(Date, nullable=True, index=True)
 
     # Relationships
     practice_block: Mapped["PracticeBlock"] = relationship("PracticeBlock", back_populates="logs")
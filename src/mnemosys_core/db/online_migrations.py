@@ -0,0 +1,349 @@
+"""
+Schema and data changes that do not block writes.
+
+Adding an index or backfilling a column on a multi-million-row log table
+with plain DDL/DML holds locks for the whole operation, and a DDL statement
+queued behind a long transaction blocks every query queued behind it. The
+helpers here keep such changes online:
+
+- `lock_timeout`: statements give up after waiting for a lock, instead of
+  stalling traffic (retry the migration later)
+- `create_index_concurrently`: `CREATE INDEX CONCURRENTLY` on PostgreSQL,
+  per partition for partitioned tables, cleaning up invalid leftovers of
+  failed builds
+- `batched_backfill`: UPDATEs in primary key ranges, one short transaction
+  per batch with a pause in between, resumable from a BackfillCheckpoint
+
+On SQLite the same calls run the plain equivalents, so migrations stay
+portable. In Alembic migrations, run the concurrent index build and
+backfills outside the migration transaction:
+
+    with op.get_context().autocommit_block():
+        create_index_concurrently(op.get_bind(), index)
+        batched_backfill(op.get_bind().engine, "exercise_log.session_date", ...)
+"""
+
+import logging
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Connection, Engine, Index, insert, make_url, select, text, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.expression import TableClause
+
+from ..util.time import utc_now
+from .models import BackfillCheckpoint
+from .partitioning import existing_partitions, is_partitioned
+from .retry import RetryPolicy, run_in_transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCK_TIMEOUT_MS = 5_000
+DEFAULT_BACKFILL_BATCH_SIZE = 1_000
+
+
+@contextmanager
+def lock_timeout(connection: Connection, timeout_ms: int | None) -> Iterator[None]:
+    """
+    Bound how long statements on a connection wait for locks.
+
+    PostgreSQL only (SQLite waits according to its busy timeout). Lock
+    waits beyond the timeout fail with `lock_not_available`, which the
+    retry module treats as transient.
+
+    Args:
+        connection: Database connection
+        timeout_ms: Milliseconds to wait for a lock (None leaves the setting alone)
+    """
+    if timeout_ms is None or connection.dialect.name != "postgresql":
+        yield
+        return
+    previous = connection.execute(text("SELECT current_setting('lock_timeout')")).scalar_one()
+    connection.execute(text("SELECT set_config('lock_timeout', :value, false)"), {"value": f"{int(timeout_ms)}ms"})
+    try:
+        yield
+    finally:
+        try:
+            connection.execute(text("SELECT set_config('lock_timeout', :value, false)"), {"value": previous})
+        except Exception:
+            # An aborted transaction rolls the setting back by itself
+            logger.debug("Could not restore lock_timeout", exc_info=True)
+
+
+def lock_timeout_connect_args(database_url: str, timeout_ms: int | None) -> dict[str, Any]:
+    """
+    Build engine connect arguments applying a lock timeout to every connection.
+
+    Unlike `lock_timeout`, this needs no statement on an open connection, so
+    it suits engines whose transactions are managed elsewhere (e.g. Alembic).
+    Empty for databases other than PostgreSQL.
+
+    Args:
+        database_url: Database connection string
+        timeout_ms: Milliseconds to wait for a lock (None for no limit)
+
+    Returns:
+        `connect_args` for `create_engine`
+    """
+    if timeout_ms is None or make_url(database_url).get_backend_name() != "postgresql":
+        return {}
+    return {"options": f"-c lock_timeout={int(timeout_ms)}"}
+
+
+def _index_statement(index: Index, name: str, table_name: str, concurrently: bool, only: bool) -> str:
+    """Render PostgreSQL CREATE INDEX for an index under another name or table."""
+    table = index.table
+    if table is None:
+        raise ValueError(f"Index {index.name} is not bound to a table")
+    compiled = str(CreateIndex(index).compile(dialect=postgresql.dialect()))  # type: ignore[no-untyped-call]
+    # Everything after "ON <table> ": optional USING, the column list and WHERE
+    definition = compiled.split(f" ON {table.name} ", 1)[1]
+    unique = "UNIQUE " if index.unique else ""
+    concurrent = "CONCURRENTLY " if concurrently else ""
+    target = f"ONLY {table_name}" if only else table_name
+    return f"CREATE {unique}INDEX {concurrent}IF NOT EXISTS {name} ON {target} {definition}"
+
+
+def partition_index_name(index_name: str, table_name: str, partition_name: str) -> str:
+    """
+    Name the index of one partition after the index of its parent table.
+
+    Args:
+        index_name: Index on the partitioned table
+        table_name: Partitioned table
+        partition_name: Partition (e.g. "exercise_log_p2025_03")
+
+    Returns:
+        e.g. "ix_exercise_log_session_date_p2025_03"
+    """
+    return f"{index_name}{partition_name.removeprefix(table_name)}"
+
+
+def concurrent_index_statements(index: Index, partitions: Iterable[str] = ()) -> list[str]:
+    """
+    Build the PostgreSQL statements creating an index without blocking writes.
+
+    Partitioned tables do not support CONCURRENTLY, so the index is created
+    invalid on the parent only, built concurrently on each partition and
+    attached partition by partition; the parent index becomes valid once
+    every partition is attached.
+
+    Args:
+        index: Index to create (e.g. from the model metadata)
+        partitions: Partitions of the table, if it is partitioned
+
+    Returns:
+        Statements to run in order outside a transaction
+    """
+    table = index.table
+    if table is None or index.name is None:
+        raise ValueError("Only named indexes bound to a table can be created concurrently")
+    index_name = str(index.name)
+    partition_names = sorted(partitions)
+    if not partition_names:
+        return [_index_statement(index, index_name, table.name, concurrently=True, only=False)]
+
+    statements = [_index_statement(index, index_name, table.name, concurrently=False, only=True)]
+    for partition_name in partition_names:
+        child_name = partition_index_name(index_name, table.name, partition_name)
+        statements.append(_index_statement(index, child_name, partition_name, concurrently=True, only=False))
+        statements.append(f"ALTER INDEX {index_name} ATTACH PARTITION {child_name}")
+    return statements
+
+
+def _drop_invalid_index(connection: Connection, index_name: str) -> None:
+    """Drop an index left INVALID by an interrupted concurrent build."""
+    is_valid = connection.execute(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:index_name)"),
+        {"index_name": index_name},
+    ).scalar()
+    if is_valid is False:
+        logger.warning("Dropping invalid index %s left by an earlier build", index_name)
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+
+
+def create_index_concurrently(
+    connection: Connection, index: Index, lock_timeout_ms: int | None = DEFAULT_LOCK_TIMEOUT_MS
+) -> None:
+    """
+    Create an index while the table keeps accepting writes.
+
+    On PostgreSQL the connection must not be inside a transaction (in
+    Alembic, use `op.get_context().autocommit_block()`). Safe to rerun after
+    a failure: existing indexes are kept, invalid ones rebuilt. Other
+    dialects run a plain `CREATE INDEX IF NOT EXISTS`.
+
+    Args:
+        connection: Database connection
+        index: Index to create (e.g. from the model metadata)
+        lock_timeout_ms: Lock wait allowed per statement (None for no limit)
+    """
+    if connection.dialect.name != "postgresql":
+        connection.execute(CreateIndex(index, if_not_exists=True))
+        return
+
+    table = index.table
+    if table is None:
+        raise ValueError(f"Index {index.name} is not bound to a table")
+    partitions = existing_partitions(connection, table.name) if is_partitioned(connection, table.name) else set()
+    with lock_timeout(connection, lock_timeout_ms):
+        for statement in concurrent_index_statements(index, partitions):
+            if " CONCURRENTLY " in statement:
+                _drop_invalid_index(connection, statement.split(" IF NOT EXISTS ", 1)[1].split(" ", 1)[0])
+            connection.execute(text(statement))
+
+
+@dataclass(frozen=True)
+class BackfillProgress:
+    """
+    State of a batched backfill after a batch.
+
+    Attributes:
+        name: Backfill identifier
+        last_key: Highest primary key processed
+        rows_updated: Rows changed so far, across runs
+        batches: Batches committed so far, across runs
+        finished: Whether every row up to the end of the table was processed
+    """
+
+    name: str
+    last_key: int
+    rows_updated: int
+    batches: int
+    finished: bool = False
+
+
+def read_backfill_checkpoint(engine: Engine, name: str) -> BackfillProgress:
+    """
+    Load the progress of a backfill.
+
+    Args:
+        engine: Database engine
+        name: Backfill identifier
+
+    Returns:
+        Stored progress, or progress at key 0 for a new backfill
+    """
+    with engine.connect() as connection:
+        row = connection.execute(
+            select(BackfillCheckpoint.last_key, BackfillCheckpoint.rows_updated, BackfillCheckpoint.batches).where(
+                BackfillCheckpoint.name == name
+            )
+        ).first()
+    if row is None:
+        return BackfillProgress(name, last_key=0, rows_updated=0, batches=0)
+    return BackfillProgress(name, last_key=row.last_key, rows_updated=row.rows_updated, batches=row.batches)
+
+
+def _write_backfill_checkpoint(connection: Connection, progress: BackfillProgress) -> None:
+    values = {
+        "last_key": progress.last_key,
+        "rows_updated": progress.rows_updated,
+        "batches": progress.batches,
+        "updated_at": utc_now(),
+    }
+    result = connection.execute(
+        update(BackfillCheckpoint).where(BackfillCheckpoint.name == progress.name).values(**values)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(BackfillCheckpoint).values(name=progress.name, **values))
+
+
+def batched_backfill(
+    engine: Engine,
+    name: str,
+    table: TableClause,
+    values: Mapping[str, Any],
+    where: ColumnElement[bool] | None = None,
+    key_column: str = "id",
+    batch_size: int = DEFAULT_BACKFILL_BATCH_SIZE,
+    pause_seconds: float = 0.1,
+    lock_timeout_ms: int | None = DEFAULT_LOCK_TIMEOUT_MS,
+    max_batches: int | None = None,
+    retry_policy: RetryPolicy | None = None,
+    on_batch: Callable[[BackfillProgress], None] | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> BackfillProgress:
+    """
+    Update a large table in primary key ranges, one short transaction per batch.
+
+    Each batch updates the rows with keys in (last key, last key + batch]
+    that match `where`, and records the new last key in a BackfillCheckpoint
+    in the same transaction, so an interrupted run resumes where it stopped.
+    Batches hitting transient errors (including lock timeouts) are retried
+    per the retry policy. Keep `where` selective (e.g. `column IS NULL`) so
+    reruns skip rows that are already done.
+
+    Args:
+        engine: Database engine (batches use their own connections)
+        name: Backfill identifier the checkpoint is stored under
+        table: Table to update (a model table or `sqlalchemy.table(...)`)
+        values: New values by column name (literals or SQL expressions)
+        where: Additional filter on the rows to update
+        key_column: Integer primary key column batches are ranged on
+        batch_size: Primary keys per batch
+        pause_seconds: Sleep between batches, leaving room for other writers
+        lock_timeout_ms: Lock wait allowed per batch on PostgreSQL (None for no limit)
+        max_batches: Stop after this many batches in this run (None runs to the end)
+        retry_policy: Retry bounds for failed batches (defaults to RetryPolicy())
+        on_batch: Called with the progress after each committed batch
+        sleep: Sleep function used between batches
+
+    Returns:
+        Progress after the last batch of this run
+
+    Example:
+        >>> exercise_log = sa.table("exercise_log", sa.column("id"), sa.column("session_date"))
+        >>> batched_backfill(engine, "exercise_log.session_date", exercise_log,
+        ...                  {"session_date": session_date_from_parent},
+        ...                  where=exercise_log.c.session_date.is_(None))
+    """
+    key = table.c[key_column]
+    session_factory = sessionmaker(bind=engine)
+    progress = read_backfill_checkpoint(engine, name)
+    batches_this_run = 0
+
+    def run_batch(db_session: Session) -> BackfillProgress | None:
+        connection = db_session.connection()
+        if lock_timeout_ms is not None and connection.dialect.name == "postgresql":
+            connection.execute(
+                text("SELECT set_config('lock_timeout', :value, true)"), {"value": f"{int(lock_timeout_ms)}ms"}
+            )
+        keys = connection.execute(
+            select(key).where(key > progress.last_key).order_by(key).limit(batch_size)
+        ).scalars().all()
+        if not keys:
+            return None
+        statement = update(table).where(key > progress.last_key, key <= keys[-1]).values(**values)
+        if where is not None:
+            statement = statement.where(where)
+        rows_updated = connection.execute(statement).rowcount
+        batch_progress = BackfillProgress(
+            name,
+            last_key=keys[-1],
+            rows_updated=progress.rows_updated + rows_updated,
+            batches=progress.batches + 1,
+        )
+        _write_backfill_checkpoint(connection, batch_progress)
+        return batch_progress
+
+    while max_batches is None or batches_this_run < max_batches:
+        batch_progress = run_in_transaction(session_factory, run_batch, retry_policy)
+        if batch_progress is None:
+            finished = BackfillProgress(name, progress.last_key, progress.rows_updated, progress.batches, True)
+            logger.info("Backfill %s finished: %d rows in %d batches", name, finished.rows_updated, finished.batches)
+            return finished
+        progress = batch_progress
+        batches_this_run += 1
+        if on_batch is not None:
+            on_batch(progress)
+        logger.info("Backfill %s: up to key %d, %d rows updated", name, progress.last_key, progress.rows_updated)
+        if pause_seconds > 0:
+            sleep(pause_seconds)
+    return progress
@@ -0,0 +1,203 @@
+"""
+Querying exercise instance parameters.
+
+`ExerciseInstance.parameters` is a JSON document (JSONB on PostgreSQL)
+holding tempo, key, pattern, duration and similar settings. `parameter_value`
+extracts one parameter as a SQL expression that compiles per dialect:
+
+- PostgreSQL: `(parameters ->> 'key')`, or for numeric parameters
+  `(CASE WHEN jsonb_typeof(parameters -> 'tempo') = 'number'
+  THEN (parameters ->> 'tempo')::numeric END)`
+- SQLite: `json_extract(parameters, '$.tempo')`
+
+The parameter name is rendered as a literal, so the expression indexes on
+INDEXED_PARAMETERS (declared next to ExerciseInstance) match the filters
+exactly and range queries on those parameters become index scans.
+
+ParameterFilter is the filter language of the API: `tempo>=120`, `key=C`,
+`duration<10`.
+"""
+
+import operator
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Numeric, String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import QueryableAttribute
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import FromClause
+from sqlalchemy.sql.visitors import InternalTraversal
+
+# Parameters with an expression index, and whether their values are numeric
+INDEXED_PARAMETERS: dict[str, bool] = {
+    "tempo": True,
+    "duration": True,
+    "key": False,
+}
+
+PARAMETER_INDEX_PREFIX = "ix_exercise_instance_parameter_"
+
+PARAMETER_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_FILTER_EXPRESSION = re.compile(r"\s*(?P<name>[^<>=!\s]+)\s*(?P<operator>>=|<=|!=|=|<|>)\s*(?P<value>.*?)\s*")
+
+FILTER_OPERATORS: dict[str, Callable[[Any, Any], ColumnElement[bool]]] = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class ParameterValue(ColumnElement[Any]):
+    """
+    One parameter extracted from a JSON parameters column.
+
+    Args:
+        column: JSON column holding the parameters
+        name: Parameter name (letters, digits and underscores)
+        numeric: Extract numbers (other JSON types become NULL on PostgreSQL)
+    """
+
+    inherit_cache = True
+    _traverse_internals = [  # noqa: RUF012 - SQLAlchemy declares this as a list
+        ("column", InternalTraversal.dp_clauseelement),
+        ("name", InternalTraversal.dp_string),
+        ("numeric", InternalTraversal.dp_boolean),
+    ]
+
+    def __init__(self, column: ColumnElement[Any] | QueryableAttribute[Any], name: str, numeric: bool) -> None:
+        if not PARAMETER_NAME.fullmatch(name):
+            raise ValueError(f"Invalid parameter name: {name!r}")
+        self.column = column.expression
+        self.name = name
+        self.numeric = numeric
+        self.type = Numeric(asdecimal=False) if numeric else String()
+
+    @property
+    def _from_objects(self) -> list[FromClause]:
+        return self.column._from_objects
+
+
+@compiles(ParameterValue)
+def _compile_parameter_value(element: ParameterValue, compiler: SQLCompiler, **kw: Any) -> str:
+    column = compiler.process(element.column, **kw)
+    return f"json_extract({column}, '$.{element.name}')"
+
+
+@compiles(ParameterValue, "postgresql")
+def _compile_parameter_value_postgresql(element: ParameterValue, compiler: SQLCompiler, **kw: Any) -> str:
+    column = compiler.process(element.column, **kw)
+    if element.numeric:
+        return (
+            f"(CASE WHEN jsonb_typeof({column} -> '{element.name}') = 'number' "
+            f"THEN ({column} ->> '{element.name}')::numeric END)"
+        )
+    return f"({column} ->> '{element.name}')"
+
+
+def parameter_value(column: ColumnElement[Any] | QueryableAttribute[Any], name: str, numeric: bool | None = None) -> ParameterValue:
+    """
+    Extract a parameter from a JSON parameters column.
+
+    Args:
+        column: JSON column holding the parameters
+        name: Parameter name
+        numeric: Whether values are numbers (defaults to the INDEXED_PARAMETERS
+            declaration, or False for other parameters)
+
+    Returns:
+        SQL expression usable in filters, ordering and indexes
+    """
+    if numeric is None:
+        numeric = INDEXED_PARAMETERS.get(name, False)
+    return ParameterValue(column, name, numeric)
+
+
+def parameter_index_name(name: str) -> str:
+    """Return the name of the expression index on a parameter."""
+    return f"{PARAMETER_INDEX_PREFIX}{name}"
+
+
+@dataclass(frozen=True)
+class ParameterFilter:
+    """
+    Comparison of one parameter with a value, e.g. `tempo>=120`.
+
+    Attributes:
+        name: Parameter name
+        operator: One of =, !=, <, <=, >, >=
+        value: Number, or string for text parameters
+    """
+
+    name: str
+    operator: str
+    value: str | int | float
+
+    @classmethod
+    def parse(cls, expression: str) -> "ParameterFilter":
+        """
+        Parse a filter expression.
+
+        Values of numeric parameters (see INDEXED_PARAMETERS) must be numbers;
+        values of other parameters are numbers when they look like one.
+
+        Args:
+            expression: `<name><operator><value>`, e.g. "tempo>=120" or "key=C"
+
+        Returns:
+            Parsed filter
+
+        Raises:
+            ValueError: If the expression, name or value is invalid
+        """
+        match = _FILTER_EXPRESSION.fullmatch(expression)
+        if match is None or not match["value"]:
+            raise ValueError(f"Invalid parameter filter {expression!r}, expected e.g. 'tempo>=120'")
+        name = match["name"]
+        if not PARAMETER_NAME.fullmatch(name):
+            raise ValueError(f"Invalid parameter name: {name!r}")
+
+        raw_value = match["value"]
+        numeric = INDEXED_PARAMETERS.get(name)
+        value: str | int | float = raw_value
+        if numeric is not False:
+            try:
+                value = _parse_number(raw_value)
+            except ValueError:
+                if numeric:
+                    raise ValueError(f"Parameter {name!r} takes numeric values, got {raw_value!r}") from None
+        return cls(name, match["operator"], value)
+
+    @property
+    def numeric(self) -> bool:
+        """Whether the parameter is compared as a number."""
+        return not isinstance(self.value, str)
+
+    def clause(self, column: ColumnElement[Any] | QueryableAttribute[Any]) -> ColumnElement[bool]:
+        """
+        Build the WHERE clause for a parameters column.
+
+        Args:
+            column: JSON column holding the parameters
+
+        Returns:
+            Boolean SQL expression
+        """
+        return FILTER_OPERATORS[self.operator](ParameterValue(column, self.name, self.numeric), self.value)
+
+
+def _parse_number(text: str) -> int | float:
+    """Parse an integer or float, rejecting NaN and infinities."""
+    try:
+        return int(text)
+    except ValueError:
+        number = float(text)
+    if number != number or number in (float("inf"), float("-inf")):
+        raise ValueError(f"Not a finite number: {text!r}")
+    return number
@@ -0,0 +1,511 @@
+"""
+Date-range partitioning of the practice and log tables.
+
+`practice`, `practice_block`, `practice_block_log`, `exercise_instance` and
+`exercise_log` only grow, while queries almost always target recent months.
+On PostgreSQL these tables can be converted to declarative range partitions
+by session month, so scans filtered on `session_date` touch only the
+partitions in range.
+
+Every partitioned table carries its own `session_date` partition key. Child
+rows copy it from their parent when flushed (`populate_partition_keys`), and
+a changed practice date is pushed down to its children
+(`propagate_partition_keys`). Queries keep partition pruning working by
+filtering on the table's own `session_date` column rather than joining to
+`practice` for the date.
+
+SQLite (and unconverted PostgreSQL databases) keep the plain, unpartitioned
+layout; the partition key columns are still maintained so a later
+conversion needs no backfill.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from sqlalchemy import Connection, Date, Integer, Table, UniqueConstraint, bindparam, func, inspect, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import instance_dict
+from sqlalchemy.schema import CreateIndex
+
+from ..util.time import today_utc
+from .base import Base
+from .models import ExerciseInstance, ExerciseLog, Practice, PracticeBlock, PracticeBlockLog
+
+PARTITION_KEY = "session_date"
+UNPARTITIONED_SUFFIX = "_unpartitioned"
+DEFAULT_PARTITION_SUFFIX = "_default"
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    """
+    A table partitioned by session month.
+
+    Attributes:
+        name: Table name
+        parent_name: Partitioned table the partition key is copied from
+        parent_key: Foreign key column referencing the parent table
+    """
+
+    name: str
+    parent_name: str | None = None
+    parent_key: str | None = None
+
+
+# Parents before children, so partition keys and foreign keys resolve in order
+PARTITIONED_TABLES: tuple[PartitionedTable, ...] = (
+    PartitionedTable("practice"),
+    PartitionedTable("practice_block", "practice", "practice_id"),
+    PartitionedTable("exercise_instance", "practice", "practice_id"),
+    PartitionedTable("practice_block_log", "practice_block", "practice_block_id"),
+    PartitionedTable("exercise_log", "exercise_instance", "exercise_instance_id"),
+)
+
+@dataclass(frozen=True)
+class TableLayout:
+    """
+    Keys and indexes of a table, as the partition conversion rebuilds them.
+
+    Migrations pass a frozen copy so their DDL does not follow later model
+    changes; `table_layouts` reads the current models.
+
+    Attributes:
+        name: Table name
+        primary_key: Primary key constraint name
+        unique_constraints: (constraint name, column names) pairs
+        indexes: (index name, PostgreSQL CREATE INDEX IF NOT EXISTS statement) pairs
+        foreign_keys: (constraint name, column names, referred table) triples
+    """
+
+    name: str
+    primary_key: str
+    unique_constraints: tuple[tuple[str, tuple[str, ...]], ...] = ()
+    indexes: tuple[tuple[str, str], ...] = ()
+    foreign_keys: tuple[tuple[str, tuple[str, ...], str], ...] = ()
+
+
+# (model, parent relationship, parent foreign key) in parent-before-child order
+PARTITION_KEY_SOURCES: tuple[tuple[type[Base], str, str], ...] = (
+    (PracticeBlock, "practice", "practice_id"),
+    (ExerciseInstance, "practice", "practice_id"),
+    (PracticeBlockLog, "practice_block", "practice_block_id"),
+    (ExerciseLog, "exercise_instance", "exercise_instance_id"),
+)
+
+
+def month_start(day: date) -> date:
+    """Return the first day of the month containing a date."""
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    """
+    Return the first day of the month a number of months after a date's month.
+
+    Args:
+        day: Any date in the starting month
+        months: Months to move forward (negative moves back)
+
+    Returns:
+        First day of the target month
+    """
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def month_range(first: date, last: date) -> list[date]:
+    """
+    List the first day of every month from one date's month to another's.
+
+    Args:
+        first: Any date in the first month
+        last: Any date in the last month (inclusive)
+
+    Returns:
+        Month starts in ascending order (empty if last precedes first)
+    """
+    months: list[date] = []
+    current = month_start(first)
+    while current <= last:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+def partition_name(table_name: str, month: date) -> str:
+    """
+    Name the monthly partition of a table.
+
+    Example:
+        >>> partition_name("practice", date(2025, 3, 1))
+        'practice_p2025_03'
+    """
+    return f"{table_name}_p{month.year:04d}_{month.month:02d}"
+
+
+def create_partition_statement(table_name: str, month: date) -> str:
+    """Return the DDL creating one monthly partition if it does not exist."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table_name, month)} PARTITION OF {table_name} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def create_default_partition_statement(table_name: str) -> str:
+    """Return the DDL creating the catch-all partition for out-of-range dates."""
+    return f"CREATE TABLE IF NOT EXISTS {table_name}{DEFAULT_PARTITION_SUFFIX} PARTITION OF {table_name} DEFAULT"
+
+
+def _table(table_name: str) -> Table:
+    return Base.metadata.tables[table_name]
+
+
+def table_layout(table: Table) -> TableLayout:
+    """
+    Describe a model table's keys and indexes for the partition conversion.
+
+    Args:
+        table: Table from the model metadata
+
+    Returns:
+        Layout with constraints and indexes sorted by name
+    """
+    unique_constraints = sorted(
+        (constraint for constraint in table.constraints if isinstance(constraint, UniqueConstraint)),
+        key=lambda constraint: str(constraint.name),
+    )
+    indexes = sorted(table.indexes, key=lambda index: str(index.name))
+    foreign_keys = sorted(table.foreign_key_constraints, key=lambda constraint: str(constraint.name))
+    return TableLayout(
+        name=table.name,
+        primary_key=str(table.primary_key.name),
+        unique_constraints=tuple(
+            (str(constraint.name), tuple(column.name for column in constraint.columns))
+            for constraint in unique_constraints
+        ),
+        # Compiled rather than joined from column names to keep expression indexes
+        indexes=tuple(
+            (str(index.name), str(CreateIndex(index, if_not_exists=True).compile(dialect=postgresql.dialect())))  # type: ignore[no-untyped-call]
+            for index in indexes
+        ),
+        foreign_keys=tuple(
+            (str(constraint.name), tuple(column.name for column in constraint.columns), constraint.referred_table.name)
+            for constraint in foreign_keys
+        ),
+    )
+
+
+def table_layouts() -> tuple[TableLayout, ...]:
+    """Return the current models' layouts of the partitioned tables, parents first."""
+    return tuple(table_layout(_table(partitioned_table.name)) for partitioned_table in PARTITIONED_TABLES)
+
+
+def conversion_statements(months: Iterable[date], layouts: Iterable[TableLayout] | None = None) -> list[str]:
+    """
+    Build the DDL converting the unpartitioned tables into partitioned ones.
+
+    Each table is renamed aside, recreated with `PARTITION BY RANGE
+    (session_date)`, given monthly partitions plus a default partition,
+    refilled and dropped. Primary and unique keys gain the partition key
+    (PostgreSQL requires it), and foreign keys between partitioned tables
+    become composite `(parent_id, session_date)` keys with ON UPDATE CASCADE
+    so a rescheduled practice moves its children along.
+
+    Args:
+        months: First day of every month that needs a partition
+        layouts: Tables to convert, parents first (defaults to `table_layouts()`)
+
+    Returns:
+        Statements to run in order inside one transaction
+    """
+    month_list = list(months)
+    layout_list = list(layouts) if layouts is not None else list(table_layouts())
+    partitioned_names = {layout.name for layout in layout_list}
+    statements: list[str] = []
+
+    # Foreign keys between the tables being rebuilt would pin the old tables
+    for layout in reversed(layout_list):
+        for constraint_name, _, referred_name in layout.foreign_keys:
+            if referred_name in partitioned_names:
+                statements.append(f"ALTER TABLE {layout.name} DROP CONSTRAINT {constraint_name}")
+
+    for layout in layout_list:
+        old_name = f"{layout.name}{UNPARTITIONED_SUFFIX}"
+
+        # Move the old table and its index-backed names out of the way
+        statements.append(f"ALTER TABLE {layout.name} RENAME TO {old_name}")
+        statements.append(
+            f"ALTER TABLE {old_name} RENAME CONSTRAINT {layout.primary_key} TO {layout.primary_key}{UNPARTITIONED_SUFFIX}"
+        )
+        for constraint_name, _ in layout.unique_constraints:
+            statements.append(
+                f"ALTER TABLE {old_name} RENAME CONSTRAINT {constraint_name} TO {constraint_name}{UNPARTITIONED_SUFFIX}"
+            )
+        for index_name, _ in layout.indexes:
+            # IF EXISTS: indexes added by later migrations may not exist yet
+            statements.append(f"ALTER INDEX IF EXISTS {index_name} RENAME TO {index_name}{UNPARTITIONED_SUFFIX}")
+
+        # Partitioned replacement with the partition key in every unique key
+        statements.append(
+            f"CREATE TABLE {layout.name} (LIKE {old_name} INCLUDING DEFAULTS) PARTITION BY RANGE ({PARTITION_KEY})"
+        )
+        statements.append(f"ALTER TABLE {layout.name} ALTER COLUMN {PARTITION_KEY} SET NOT NULL")
+        statements.append(
+            f"ALTER TABLE {layout.name} ADD CONSTRAINT {layout.primary_key} PRIMARY KEY (id, {PARTITION_KEY})"
+        )
+        for constraint_name, column_names in layout.unique_constraints:
+            statements.append(
+                f"ALTER TABLE {layout.name} ADD CONSTRAINT {constraint_name} "
+                f"UNIQUE ({', '.join(column_names)}, {PARTITION_KEY})"
+            )
+        statements.extend(create_index for _, create_index in layout.indexes)
+
+        statements.extend(create_partition_statement(layout.name, month) for month in month_list)
+        statements.append(create_default_partition_statement(layout.name))
+        statements.append(f"INSERT INTO {layout.name} SELECT * FROM {old_name}")
+        statements.append(f"ALTER SEQUENCE {layout.name}_id_seq OWNED BY {layout.name}.id")
+
+    for layout in reversed(layout_list):
+        statements.append(f"DROP TABLE {layout.name}{UNPARTITIONED_SUFFIX}")
+
+    # Foreign keys: composite within the partitioned set, plain to reference tables
+    for layout in layout_list:
+        for constraint_name, column_names, referred_name in layout.foreign_keys:
+            if referred_name in partitioned_names:
+                statements.append(
+                    f"ALTER TABLE {layout.name} ADD CONSTRAINT {constraint_name} "
+                    f"FOREIGN KEY ({', '.join(column_names)}, {PARTITION_KEY}) "
+                    f"REFERENCES {referred_name} (id, {PARTITION_KEY}) ON UPDATE CASCADE"
+                )
+            else:
+                statements.append(
+                    f"ALTER TABLE {layout.name} ADD CONSTRAINT {constraint_name} "
+                    f"FOREIGN KEY ({', '.join(column_names)}) REFERENCES {referred_name} (id)"
+                )
+    return statements
+
+
+def backfill_statements() -> list[str]:
+    """
+    Build the UPDATEs copying partition keys from parents to children.
+
+    Returns:
+        Statements in parent-before-child order; portable across dialects
+    """
+    statements: list[str] = []
+    for partitioned_table in PARTITIONED_TABLES:
+        if partitioned_table.parent_name is None:
+            continue
+        statements.append(
+            f"UPDATE {partitioned_table.name} SET {PARTITION_KEY} = ("
+            f"SELECT {partitioned_table.parent_name}.{PARTITION_KEY} FROM {partitioned_table.parent_name} "
+            f"WHERE {partitioned_table.parent_name}.id = {partitioned_table.name}.{partitioned_table.parent_key}) "
+            f"WHERE {PARTITION_KEY} IS NULL"
+        )
+    return statements
+
+
+def backfill_partition_keys(connection: Connection) -> None:
+    """
+    Fill missing partition keys on child tables from their parents.
+
+    Args:
+        connection: Database connection (any dialect)
+    """
+    for statement in backfill_statements():
+        connection.execute(text(statement))
+
+
+def is_partitioned(connection: Connection, table_name: str) -> bool:
+    """
+    Report whether a table is a declaratively partitioned PostgreSQL table.
+
+    Args:
+        connection: Database connection
+        table_name: Table to check
+
+    Returns:
+        True only on PostgreSQL for tables created with PARTITION BY
+    """
+    if connection.dialect.name != "postgresql":
+        return False
+    relation_kind = connection.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table_name)"), {"table_name": table_name}
+    ).scalar()
+    return relation_kind == "p"
+
+
+def existing_partitions(connection: Connection, table_name: str) -> set[str]:
+    """Return the names of a partitioned table's attached partitions."""
+    rows = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table_name)"
+        ),
+        {"table_name": table_name},
+    )
+    return {row[0] for row in rows}
+
+
+def ensure_partitions(connection: Connection, months_ahead: int = 3, today: date | None = None) -> list[str]:
+    """
+    Create any missing monthly partitions from the current month onwards.
+
+    Run it regularly (e.g. daily from cron via `mnemosys partitions ensure`)
+    so inserts for upcoming sessions always land in a dedicated partition
+    rather than the default one. Tables that are not partitioned, and
+    non-PostgreSQL databases, are left untouched.
+
+    Args:
+        connection: Database connection
+        months_ahead: Months after the current one to prepare
+        today: Reference date (defaults to today in UTC)
+
+    Returns:
+        Names of the partitions created
+    """
+    reference_day = today if today is not None else today_utc()
+    months = month_range(reference_day, add_months(reference_day, months_ahead))
+    created: list[str] = []
+    for partitioned_table in PARTITIONED_TABLES:
+        if not is_partitioned(connection, partitioned_table.name):
+            continue
+        partition_names = existing_partitions(connection, partitioned_table.name)
+        for month in months:
+            name = partition_name(partitioned_table.name, month)
+            if name not in partition_names:
+                connection.execute(text(create_partition_statement(partitioned_table.name, month)))
+                created.append(name)
+    return created
+
+
+def convert_to_partitioned(
+    connection: Connection,
+    months_ahead: int = 3,
+    today: date | None = None,
+    layouts: Iterable[TableLayout] | None = None,
+) -> bool:
+    """
+    Convert the practice and log tables to monthly range partitions.
+
+    Partitions cover every month from the earliest stored session through
+    `months_ahead` months after today. Partition keys are backfilled first.
+    The conversion rewrites the tables, so run it in a maintenance window.
+
+    Args:
+        connection: PostgreSQL connection (inside a transaction)
+        months_ahead: Future months to create partitions for
+        today: Reference date (defaults to today in UTC)
+        layouts: Tables to convert, parents first (defaults to the current models)
+
+    Returns:
+        True if the tables were converted, False if already partitioned
+
+    Raises:
+        ValueError: If the connection is not to PostgreSQL
+    """
+    if connection.dialect.name != "postgresql":
+        raise ValueError(f"Table partitioning requires PostgreSQL, not {connection.dialect.name}")
+    if is_partitioned(connection, "practice"):
+        return False
+
+    reference_day = today if today is not None else today_utc()
+    earliest = connection.execute(select(func.min(Practice.session_date))).scalar()
+    months = month_range(earliest if earliest is not None else reference_day, add_months(reference_day, months_ahead))
+
+    backfill_partition_keys(connection)
+    for statement in conversion_statements(months, layouts):
+        connection.execute(text(statement))
+    return True
+
+
+def populate_partition_keys(db_session: Session, flush_context: Any, instances: Any) -> None:
+    """
+    Copy the partition key onto new or re-parented child rows before a flush.
+
+    Uses the parent object when it is loaded (or pending in the same flush)
+    and otherwise looks the parent up by primary key.
+    """
+    if not (db_session.new or db_session.dirty):
+        return
+    for model, relationship_name, foreign_key in PARTITION_KEY_SOURCES:
+        parent_model = inspect(model).relationships[relationship_name].mapper.class_
+        for instance in (*db_session.new, *db_session.dirty):
+            if not isinstance(instance, model):
+                continue
+            instance_state = inspect(instance)
+            is_reparented = instance_state.attrs[foreign_key].history.has_changes()
+            if instance_state.persistent and not is_reparented and getattr(instance, PARTITION_KEY) is not None:
+                continue
+            parent = None if is_reparented else instance_dict(instance).get(relationship_name)
+            if parent is None:
+                parent_id = getattr(instance, foreign_key)
+                if parent_id is None:
+                    continue
+                with db_session.no_autoflush:
+                    parent = db_session.get(parent_model, parent_id)
+            if parent is not None:
+                setattr(instance, PARTITION_KEY, getattr(parent, PARTITION_KEY))
+
+
+def propagate_partition_keys(db_session: Session, flush_context: Any) -> None:
+    """
+    Push a rescheduled practice's session date down to its child rows.
+
+    PostgreSQL partitioned tables also cascade the change through their
+    composite foreign keys; the explicit UPDATEs keep unpartitioned
+    databases consistent and are no-ops there.
+    """
+    changed_dates: dict[int, date] = {}
+    for instance in db_session.dirty:
+        if isinstance(instance, Practice):
+            history = inspect(instance).attrs.session_date.history
+            if history.added and history.deleted:
+                changed_dates[instance.id] = instance.session_date
+    if not changed_dates:
+        return
+
+    connection = db_session.connection()
+    parameters = [
+        {"changed_practice_id": practice_id, "new_session_date": session_date}
+        for practice_id, session_date in changed_dates.items()
+    ]
+    for statement in _propagation_statements():
+        connection.execute(statement, parameters)
+
+    # Loaded children now hold stale partition keys; reload them on next access
+    child_models = tuple(model for model, _, _ in PARTITION_KEY_SOURCES)
+    for instance in list(db_session.identity_map.values()):
+        if isinstance(instance, child_models):
+            db_session.expire(instance, [PARTITION_KEY])
+
+
+def _propagation_statements() -> list[Any]:
+    practice_block = _table("practice_block")
+    exercise_instance = _table("exercise_instance")
+    practice_block_log = _table("practice_block_log")
+    exercise_log = _table("exercise_log")
+    new_date = bindparam("new_session_date", type_=Date)
+    practice_id = bindparam("changed_practice_id", type_=Integer)
+    return [
+        practice_block.update().where(practice_block.c.practice_id == practice_id).values(session_date=new_date),
+        exercise_instance.update().where(exercise_instance.c.practice_id == practice_id).values(session_date=new_date),
+        practice_block_log.update()
+        .where(
+            practice_block_log.c.practice_block_id.in_(
+                select(practice_block.c.id).where(practice_block.c.practice_id == practice_id)
+            )
+        )
+        .values(session_date=new_date),
+        exercise_log.update()
+        .where(
+            exercise_log.c.exercise_instance_id.in_(
+                select(exercise_instance.c.id).where(exercise_instance.c.practice_id == practice_id)
+            )
+        )
+        .values(session_date=new_date),
+    ]
@@ -0,0 +1,172 @@
+"""
+Observable connection pool.
+
+Provides a QueuePool subclass that records checkout waits, overflow
+checkouts, checkins and timeouts into an explicit PoolMetrics object.
+Metrics are created per engine; nothing is registered at import time.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import cast
+
+from sqlalchemy import exc
+from sqlalchemy.pool import PoolProxiedConnection, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (milliseconds) of the pool-wait histogram buckets; the final
+# implicit bucket collects everything slower than the last bound.
+DEFAULT_WAIT_BUCKETS_MS: tuple[float, ...] = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0)
+
+
+@dataclass(frozen=True)
+class PoolStatistics:
+    """
+    Point-in-time copy of pool metrics.
+
+    Attributes:
+        checkouts: Successful connection checkouts
+        checkins: Connections returned to the pool
+        overflow_checkouts: Checkouts served by overflow connections
+        timeouts: Checkouts that gave up after pool_timeout
+        wait_bucket_bounds_ms: Histogram bucket upper bounds in milliseconds
+        wait_bucket_counts: Checkout count per bucket (one extra overflow bucket)
+        wait_total_ms: Sum of all checkout waits in milliseconds
+    """
+
+    checkouts: int
+    checkins: int
+    overflow_checkouts: int
+    timeouts: int
+    wait_bucket_bounds_ms: tuple[float, ...]
+    wait_bucket_counts: tuple[int, ...]
+    wait_total_ms: float
+
+    def wait_quantile_ms(self, quantile: float) -> float | None:
+        """
+        Estimate a checkout wait quantile from the histogram.
+
+        Args:
+            quantile: Quantile between 0.0 and 1.0 (e.g., 0.99 for p99)
+
+        Returns:
+            Upper bound of the bucket containing the quantile, infinity when it
+            falls in the overflow bucket, or None when nothing was recorded
+        """
+        total = sum(self.wait_bucket_counts)
+        if total == 0:
+            return None
+        target = quantile * total
+        running_count = 0
+        for bucket_index, bucket_count in enumerate(self.wait_bucket_counts):
+            running_count += bucket_count
+            if running_count >= target and bucket_index < len(self.wait_bucket_bounds_ms):
+                return self.wait_bucket_bounds_ms[bucket_index]
+        return float("inf")
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters and wait histogram for one connection pool.
+    """
+
+    def __init__(self, wait_bucket_bounds_ms: Sequence[float] = DEFAULT_WAIT_BUCKETS_MS) -> None:
+        self._lock = threading.Lock()
+        self._wait_bucket_bounds_ms = tuple(sorted(wait_bucket_bounds_ms))
+        self._wait_bucket_counts = [0] * (len(self._wait_bucket_bounds_ms) + 1)
+        self._wait_total_ms = 0.0
+        self._checkouts = 0
+        self._checkins = 0
+        self._overflow_checkouts = 0
+        self._timeouts = 0
+
+    def record_checkout(self, wait_seconds: float, is_overflow: bool) -> None:
+        """Record a successful checkout and how long it waited."""
+        wait_ms = wait_seconds * 1000.0
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total_ms += wait_ms
+            self._wait_bucket_counts[bisect_left(self._wait_bucket_bounds_ms, wait_ms)] += 1
+            if is_overflow:
+                self._overflow_checkouts += 1
+        logger.debug("Pool checkout after %.2f ms (overflow=%s)", wait_ms, is_overflow)
+        if is_overflow:
+            logger.info("Pool checkout served by overflow connection")
+
+    def record_checkin(self) -> None:
+        """Record a connection returned to the pool."""
+        with self._lock:
+            self._checkins += 1
+        logger.debug("Pool checkin")
+
+    def record_timeout(self, wait_seconds: float) -> None:
+        """Record a checkout that timed out waiting for a connection."""
+        with self._lock:
+            self._timeouts += 1
+        logger.warning("Pool checkout timed out after %.2f ms", wait_seconds * 1000.0)
+
+    def snapshot(self) -> PoolStatistics:
+        """Return a consistent copy of the current metrics."""
+        with self._lock:
+            return PoolStatistics(
+                checkouts=self._checkouts,
+                checkins=self._checkins,
+                overflow_checkouts=self._overflow_checkouts,
+                timeouts=self._timeouts,
+                wait_bucket_bounds_ms=self._wait_bucket_bounds_ms,
+                wait_bucket_counts=tuple(self._wait_bucket_counts),
+                wait_total_ms=self._wait_total_ms,
+            )
+
+
+class ObservedQueuePool(QueuePool):
+    """
+    QueuePool that reports checkout activity to an attached PoolMetrics.
+
+    Checkout waits are measured around the whole checkout, so they include
+    queueing, connection creation and pre-ping time.
+    """
+
+    metrics: PoolMetrics | None = None
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        overflow_before = self.overflow()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        if self.metrics is not None:
+            # Only a checkout that opened a connection beyond pool_size is an overflow
+            # checkout; one that reused a pooled connection leaves the overflow unchanged
+            overflow_after = self.overflow()
+            is_overflow = overflow_after > overflow_before and overflow_after > 0
+            self.metrics.record_checkout(time.perf_counter() - started, is_overflow=is_overflow)
+        return connection
+
+    def recreate(self) -> "ObservedQueuePool":
+        pool = cast("ObservedQueuePool", super().recreate())
+        pool.metrics = self.metrics
+        return pool
+
+
+def get_pool_metrics(pool: object) -> PoolMetrics | None:
+    """
+    Return the metrics attached to a pool, if it is observable.
+
+    Args:
+        pool: Engine pool
+
+    Returns:
+        PoolMetrics or None for pools without instrumentation
+    """
+    if isinstance(pool, ObservedQueuePool):
+        return pool.metrics
+    return None
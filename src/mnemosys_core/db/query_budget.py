@@ -0,0 +1,258 @@
+"""
+Per-request statement counting, N+1 detection and query budgets.
+
+Lazy relationships make it easy for a new serializer field to issue one
+query per row. `track_queries` attaches a cursor listener to an engine that
+records every statement into the QueryLog of the current unit of work (set
+with `capture_queries`, e.g. per HTTP request). A statement whose SQL text
+runs many times with different parameters is the signature of an N+1
+pattern; QueryBudget bounds both the total number of statements and how
+often one statement may repeat.
+
+QueryMonitor checks logs against budgets. In strict mode (tests) a
+violation raises QueryBudgetExceededError; otherwise it is logged. Nothing
+is registered at import time.
+"""
+
+import logging
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from ..config.environments import Environment
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Executions of one identical statement tolerated per unit of work by default
+DEFAULT_MAX_STATEMENT_REPEATS = 5
+
+_current_query_log: ContextVar["QueryLog | None"] = ContextVar("mnemosys_query_log", default=None)
+
+
+class QueryBudgetExceededError(Exception):
+    """Raised in strict mode when a unit of work exceeds its query budget."""
+
+
+class QueryLog:
+    """
+    Statements executed during one unit of work.
+
+    Attributes:
+        statements: SQL text of each execution, in order
+        budget: Budget declared for this unit of work, if any
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.statements: list[str] = []
+        self.budget: QueryBudget | None = None
+
+    def record(self, statement: str) -> None:
+        """Record one statement execution."""
+        with self._lock:
+            self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        """Number of statements executed."""
+        return len(self.statements)
+
+    def repeated_statements(self, min_executions: int = 2) -> dict[str, int]:
+        """
+        Find statements executed several times with (possibly) different parameters.
+
+        Args:
+            min_executions: Executions from which a statement is reported
+
+        Returns:
+            Execution count by SQL text, most repeated first
+        """
+        with self._lock:
+            counts = Counter(self.statements)
+        return {statement: count for statement, count in counts.most_common() if count >= min_executions}
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """
+    Upper bounds on the statements of one unit of work.
+
+    Instances are also FastAPI dependencies that declare the budget of an
+    endpoint for the current request.
+
+    Attributes:
+        max_queries: Total statements allowed (None for no limit)
+        max_statement_repeats: Executions allowed for any one statement text
+
+    Example:
+        >>> @router.get("/", dependencies=[Depends(QueryBudget(max_queries=2))])
+        ... def list_instruments(db_session: DBSession = Depends(get_db)) -> list[Instrument]:
+        ...     ...
+    """
+
+    max_queries: int | None = None
+    max_statement_repeats: int = DEFAULT_MAX_STATEMENT_REPEATS
+
+    def violations(self, query_log: QueryLog) -> list[str]:
+        """
+        Describe how a query log exceeds this budget.
+
+        Args:
+            query_log: Statements of the unit of work
+
+        Returns:
+            One message per violation (empty when within budget)
+        """
+        messages = []
+        if self.max_queries is not None and query_log.count > self.max_queries:
+            messages.append(f"{query_log.count} queries exceed the budget of {self.max_queries}")
+        repeated = query_log.repeated_statements(self.max_statement_repeats + 1)
+        for statement, count in repeated.items():
+            messages.append(f"possible N+1: statement ran {count} times: {' '.join(statement.split())}")
+        return messages
+
+    def __call__(self) -> None:
+        """Apply this budget to the unit of work being captured."""
+        query_log = _current_query_log.get()
+        if query_log is not None:
+            query_log.budget = self
+
+
+def _record_statement(
+    connection: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    """Record a statement into the current query log, if one is being captured."""
+    query_log = _current_query_log.get()
+    if query_log is not None:
+        query_log.record(statement)
+
+
+def track_queries(engine: Engine) -> None:
+    """
+    Record the statements of an engine into the current query log.
+
+    Safe to call more than once per engine.
+
+    Args:
+        engine: Engine to instrument
+    """
+    if not event.contains(engine, "before_cursor_execute", _record_statement):
+        event.listen(engine, "before_cursor_execute", _record_statement)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryLog]:
+    """
+    Collect statements of tracked engines executed within the block.
+
+    The log follows the context (including threads started with a copied
+    context, like FastAPI's threadpool), not a particular engine.
+
+    Yields:
+        QueryLog filled as statements run
+    """
+    query_log = QueryLog()
+    token = _current_query_log.set(query_log)
+    try:
+        yield query_log
+    finally:
+        _current_query_log.reset(token)
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[QueryLog]:
+    """
+    Collect every statement an engine executes within the block, from any thread.
+
+    Meant for tests, where the code under test may run outside the caller's
+    context (e.g. the TestClient's event loop thread).
+
+    Args:
+        engine: Engine to listen to
+
+    Yields:
+        QueryLog filled as statements run
+
+    Example:
+        >>> with count_queries(engine) as query_log:
+        ...     client.get("/api/v1/practices/")
+        >>> assert query_log.count <= 2
+    """
+    query_log = QueryLog()
+
+    def record(
+        connection: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        query_log.record(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield query_log
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+class QueryMonitor:
+    """
+    Checks units of work against their query budgets.
+
+    Args:
+        default_budget: Budget for units of work that do not declare one
+        strict: Raise QueryBudgetExceededError instead of logging violations
+    """
+
+    def __init__(self, default_budget: QueryBudget | None = None, strict: bool = False) -> None:
+        self.default_budget = default_budget if default_budget is not None else QueryBudget()
+        self.strict = strict
+
+    def check(self, query_log: QueryLog, name: str) -> list[str]:
+        """
+        Compare a query log with its budget and report violations.
+
+        Args:
+            query_log: Statements of the unit of work
+            name: Label for messages (e.g. "GET /api/v1/practices/")
+
+        Returns:
+            Violation messages (empty when within budget)
+
+        Raises:
+            QueryBudgetExceededError: In strict mode, when the budget is exceeded
+        """
+        budget = query_log.budget if query_log.budget is not None else self.default_budget
+        violations = budget.violations(query_log)
+        if violations:
+            message = f"{name}: " + "; ".join(violations)
+            if self.strict:
+                raise QueryBudgetExceededError(message)
+            logger.warning("Query budget exceeded by %s", message)
+        return violations
+
+
+def query_monitor_from_settings(settings: Settings) -> QueryMonitor:
+    """
+    Build the query monitor from application settings.
+
+    Args:
+        settings: Application configuration
+
+    Returns:
+        Query monitor, strict in the test environment unless configured otherwise
+    """
+    strict = settings.db_query_budget_strict
+    if strict is None:
+        strict = settings.environment == Environment.TEST
+    return QueryMonitor(
+        QueryBudget(
+            max_queries=settings.db_query_budget_max_queries,
+            max_statement_repeats=settings.db_query_budget_max_repeats,
+        ),
+        strict=strict,
+    )
@@ -0,0 +1,271 @@
+"""
+Process-local cache of canonical reference data.
+
+Exercises, techniques, overload dimensions and tunings change rarely, yet are
+read on nearly every request. The cache holds an immutable, versioned
+snapshot of all of them (including exercise associations) and serves reads
+without a database round trip.
+
+Snapshots are invalidated when a tracked session commits a change to any
+reference entity or exercise association, whether flushed from the ORM or
+executed as a bulk or Core statement, and expire after a TTL as a guard against out-of-band
+edits. The cache is created explicitly (see `configure_dependencies`); there
+is no module-level instance.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Mapper, ORMExecuteState, Session, selectinload, sessionmaker, with_polymorphic
+
+from .models import DomainType, Exercise, OverloadDimension, Technique, Tuning
+from .models.exercise import exercise_overload_dimension_association, exercise_technique_association
+from .session import READ_ONLY_KEY
+
+REFERENCE_MODELS: tuple[type, ...] = (Exercise, Technique, OverloadDimension, Tuning)
+REFERENCE_CHANGED_KEY = "mnemosys_reference_changed"
+
+
+def mapped_tables(models: tuple[type, ...]) -> set[str]:
+    """Names of the tables mapped by models and their subclasses."""
+    names: set[str] = set()
+    for model in models:
+        mapper: Mapper[Any] = inspect(model)
+        names.update(table.name for descendant in mapper.self_and_descendants for table in descendant.tables)
+    return names
+
+
+# Tables whose writes change the snapshot, including exercise associations
+REFERENCE_TABLES = frozenset(
+    mapped_tables(REFERENCE_MODELS)
+    | {exercise_technique_association.name, exercise_overload_dimension_association.name}
+)
+
+
+@dataclass(frozen=True)
+class TechniqueSnapshot:
+    """Immutable copy of a Technique row."""
+
+    id: int
+    name: str
+    description: str | None
+
+
+@dataclass(frozen=True)
+class OverloadDimensionSnapshot:
+    """Immutable copy of an OverloadDimension row."""
+
+    id: int
+    name: str
+    description: str | None
+
+
+@dataclass(frozen=True)
+class TuningSnapshot:
+    """Immutable copy of a Tuning row (pitch_sequence only for stringed tunings)."""
+
+    id: int
+    name: str
+    tuning_type: str
+    pitch_sequence: tuple[str, ...] | None
+
+
+@dataclass(frozen=True)
+class ExerciseSnapshot:
+    """Immutable copy of an Exercise row and its associations."""
+
+    id: int
+    name: str
+    domains: tuple[DomainType, ...]
+    instrument_compatibility: tuple[str, ...] | None
+    technique_ids: tuple[int, ...]
+    overload_dimension_ids: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """
+    Consistent, immutable view of all reference data.
+
+    Attributes:
+        version: Cache version the snapshot was loaded under
+        loaded_at: Monotonic clock reading when the snapshot was loaded
+        exercises: Exercises ordered by ID
+        exercise_by_id: Exercises keyed by ID
+        technique_by_id: Techniques keyed by ID
+        overload_dimension_by_id: Overload dimensions keyed by ID
+        tuning_by_id: Tunings keyed by ID
+    """
+
+    version: int
+    loaded_at: float
+    exercises: tuple[ExerciseSnapshot, ...]
+    exercise_by_id: Mapping[int, ExerciseSnapshot]
+    technique_by_id: Mapping[int, TechniqueSnapshot]
+    overload_dimension_by_id: Mapping[int, OverloadDimensionSnapshot]
+    tuning_by_id: Mapping[int, TuningSnapshot]
+
+
+def load_reference_snapshot(db_session: Session, version: int, loaded_at: float) -> ReferenceSnapshot:
+    """
+    Read all reference data into an immutable snapshot.
+
+    Args:
+        db_session: Database session
+        version: Cache version to stamp on the snapshot
+        loaded_at: Monotonic clock reading to stamp on the snapshot
+
+    Returns:
+        Reference snapshot
+    """
+    exercises = tuple(
+        ExerciseSnapshot(
+            id=exercise.id,
+            name=exercise.name,
+            domains=tuple(exercise.domains),
+            instrument_compatibility=(
+                tuple(exercise.instrument_compatibility) if exercise.instrument_compatibility is not None else None
+            ),
+            technique_ids=tuple(sorted(technique.id for technique in exercise.techniques)),
+            overload_dimension_ids=tuple(
+                sorted(overload_dimension.id for overload_dimension in exercise.overload_dimensions)
+            ),
+        )
+        for exercise in db_session.scalars(
+            select(Exercise)
+            .options(selectinload(Exercise.techniques), selectinload(Exercise.overload_dimensions))
+            .order_by(Exercise.id)
+        )
+    )
+    technique_by_id = {
+        technique.id: TechniqueSnapshot(id=technique.id, name=technique.name, description=technique.description)
+        for technique in db_session.scalars(select(Technique).order_by(Technique.id))
+    }
+    overload_dimension_by_id = {
+        overload_dimension.id: OverloadDimensionSnapshot(
+            id=overload_dimension.id, name=overload_dimension.name, description=overload_dimension.description
+        )
+        for overload_dimension in db_session.scalars(select(OverloadDimension).order_by(OverloadDimension.id))
+    }
+    polymorphic_tuning = with_polymorphic(Tuning, "*")
+    tuning_by_id = {}
+    for tuning in db_session.scalars(select(polymorphic_tuning).order_by(polymorphic_tuning.id)):
+        pitch_sequence = getattr(tuning, "pitch_sequence", None)
+        tuning_by_id[tuning.id] = TuningSnapshot(
+            id=tuning.id,
+            name=tuning.name,
+            tuning_type=tuning.tuning_type,
+            pitch_sequence=tuple(pitch_sequence) if pitch_sequence is not None else None,
+        )
+
+    return ReferenceSnapshot(
+        version=version,
+        loaded_at=loaded_at,
+        exercises=exercises,
+        exercise_by_id=MappingProxyType({exercise.id: exercise for exercise in exercises}),
+        technique_by_id=MappingProxyType(technique_by_id),
+        overload_dimension_by_id=MappingProxyType(overload_dimension_by_id),
+        tuning_by_id=MappingProxyType(tuning_by_id),
+    )
+
+
+class ReferenceDataCache:
+    """
+    Versioned, TTL-bounded cache of the reference data snapshot.
+
+    Example:
+        >>> reference_cache = ReferenceDataCache(session_factory, ttl_seconds=300.0)
+        >>> reference_cache.track_writes(session_factory)
+        >>> exercise = reference_cache.get().exercise_by_id[exercise_id]
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._session_factory = session_factory
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot: ReferenceSnapshot | None = None
+
+    @property
+    def version(self) -> int:
+        """Current cache version; bumped on every invalidation."""
+        return self._version
+
+    def get(self) -> ReferenceSnapshot:
+        """
+        Return a fresh snapshot, loading it from the database if needed.
+
+        Returns:
+            Current reference snapshot
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version and not self._is_expired(snapshot):
+            return snapshot
+
+        version = self._version
+        with self._session_factory() as db_session:
+            db_session.info[READ_ONLY_KEY] = True
+            snapshot = load_reference_snapshot(db_session, version, self._clock())
+        with self._lock:
+            # A write committed while loading; keep serving but do not cache stale data
+            if self._version == version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Drop the current snapshot and bump the cache version."""
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    def track_writes(self, session_factory: sessionmaker[Session]) -> None:
+        """
+        Invalidate the cache whenever sessions from a factory commit reference changes.
+
+        Args:
+            session_factory: Session factory whose sessions write reference data
+        """
+        event.listen(session_factory, "after_flush", _mark_reference_changes)
+        event.listen(session_factory, "do_orm_execute", _mark_reference_statements)
+        event.listen(session_factory, "after_commit", self._invalidate_after_commit)
+        event.listen(session_factory, "after_rollback", _clear_reference_changes)
+
+    def _invalidate_after_commit(self, db_session: Session) -> None:
+        if db_session.info.pop(REFERENCE_CHANGED_KEY, False):
+            self.invalidate()
+
+    def _is_expired(self, snapshot: ReferenceSnapshot) -> bool:
+        return self._clock() - snapshot.loaded_at >= self._ttl_seconds
+
+
+def _mark_reference_changes(db_session: Session, flush_context: Any) -> None:
+    """Flag sessions whose flush touched reference entities."""
+    for instance in (*db_session.new, *db_session.dirty, *db_session.deleted):
+        if isinstance(instance, REFERENCE_MODELS):
+            db_session.info[REFERENCE_CHANGED_KEY] = True
+            return
+
+
+def _mark_reference_statements(orm_execute_state: ORMExecuteState) -> None:
+    """Flag sessions executing statements that write reference or association tables."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is not None and table.name in REFERENCE_TABLES:
+        orm_execute_state.session.info[REFERENCE_CHANGED_KEY] = True
+
+
+def _clear_reference_changes(db_session: Session) -> None:
+    """Forget reference changes that were rolled back."""
+    db_session.info.pop(REFERENCE_CHANGED_KEY, None)
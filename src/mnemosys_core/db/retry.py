@@ -0,0 +1,311 @@
+"""
+Retry handling for transient database errors.
+
+Failovers, dropped connections, serialization conflicts and deadlocks
+abort a transaction without the unit of work itself being wrong; rerunning
+it a moment later usually succeeds. This module recognizes those errors per
+dialect and reruns idempotent units of work with jittered exponential
+backoff, bounded both by attempts and by total sleep time.
+
+Policies and metrics are plain objects created by the caller (see
+`configure_dependencies`); nothing is registered at import time.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL SQLSTATE codes (or class prefixes) worth retrying, by reason
+POSTGRESQL_TRANSIENT_SQLSTATES: dict[str, str] = {
+    "40001": "serialization_failure",
+    "40P01": "deadlock",
+    "55P03": "lock_timeout",
+    "08": "connection",
+    "57P01": "connection",
+    "57P02": "connection",
+    "57P03": "connection",
+}
+
+# SQLite reports lock contention only through the error message
+SQLITE_TRANSIENT_MESSAGES: dict[str, str] = {
+    "database is locked": "lock_contention",
+    "database table is locked": "lock_contention",
+}
+
+
+def _sqlstate(error: exc.DBAPIError) -> str | None:
+    """Return the SQLSTATE of a driver error (psycopg2 `pgcode` or psycopg 3 `sqlstate`)."""
+    original = error.orig
+    code = getattr(original, "sqlstate", None) or getattr(original, "pgcode", None)
+    return code if isinstance(code, str) else None
+
+
+def classify_transient_error(error: BaseException, dialect_name: str) -> str | None:
+    """
+    Name the transient failure behind an exception, if it is one.
+
+    Args:
+        error: Exception raised by a unit of work
+        dialect_name: Dialect of the database the work ran against
+
+    Returns:
+        Retry reason (e.g. "serialization_failure", "connection"), or None
+        when the error is not transient and must not be retried
+    """
+    if not isinstance(error, exc.DBAPIError):
+        return None
+    if error.connection_invalidated:
+        return "connection"
+
+    if dialect_name == "postgresql":
+        sqlstate = _sqlstate(error)
+        if sqlstate is None:
+            return None
+        reason = POSTGRESQL_TRANSIENT_SQLSTATES.get(sqlstate)
+        return reason if reason is not None else POSTGRESQL_TRANSIENT_SQLSTATES.get(sqlstate[:2])
+
+    if dialect_name == "sqlite" and isinstance(error, exc.OperationalError):
+        message = str(error.orig).lower()
+        for transient_message, reason in SQLITE_TRANSIENT_MESSAGES.items():
+            if transient_message in message:
+                return reason
+    return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Bounds and pacing for retrying a unit of work.
+
+    Attributes:
+        max_attempts: Total attempts including the first (1 disables retries)
+        base_delay_seconds: Backoff ceiling before the first retry
+        max_delay_seconds: Upper bound on any single backoff
+        budget_seconds: Upper bound on the total time spent backing off
+    """
+
+    max_attempts: int = 3
+    base_delay_seconds: float = 0.05
+    max_delay_seconds: float = 1.0
+    budget_seconds: float = 2.0
+
+    def backoff_seconds(self, attempt: int, randomizer: random.Random | None = None) -> float:
+        """
+        Pick the delay before the next attempt using full jitter.
+
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+            randomizer: Random source (defaults to the module-level generator)
+
+        Returns:
+            Seconds to wait, uniformly drawn below the exponential ceiling
+        """
+        ceiling = min(self.max_delay_seconds, self.base_delay_seconds * 2 ** (attempt - 1))
+        uniform = randomizer.uniform if randomizer is not None else random.uniform
+        return uniform(0.0, ceiling)
+
+    def allows_retry(self, attempt: int, total_delay_seconds: float) -> bool:
+        """
+        Report whether another attempt fits in the policy.
+
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+            total_delay_seconds: Backoff already spent plus the next delay
+
+        Returns:
+            True if both the attempt and time budgets allow another attempt
+        """
+        return attempt < self.max_attempts and total_delay_seconds <= self.budget_seconds
+
+
+@dataclass(frozen=True)
+class RetryStatistics:
+    """
+    Point-in-time copy of retry metrics.
+
+    Attributes:
+        retries: Attempts rerun after a transient error
+        recovered: Units of work that succeeded after at least one retry
+        exhausted: Units of work that failed after using up the policy
+        retries_by_reason: Retries keyed by transient error reason
+    """
+
+    retries: int
+    recovered: int
+    exhausted: int
+    retries_by_reason: dict[str, int]
+
+
+class RetryMetrics:
+    """
+    Thread-safe counters of retry activity.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._recovered = 0
+        self._exhausted = 0
+        self._retries_by_reason: dict[str, int] = {}
+
+    def record_retry(self, reason: str, attempt: int, delay_seconds: float) -> None:
+        """Record that a failed attempt is about to be rerun."""
+        with self._lock:
+            self._retries += 1
+            self._retries_by_reason[reason] = self._retries_by_reason.get(reason, 0) + 1
+        logger.warning("Retrying after %s on attempt %d (backoff %.1f ms)", reason, attempt, delay_seconds * 1000.0)
+
+    def record_recovered(self) -> None:
+        """Record a unit of work that succeeded after retrying."""
+        with self._lock:
+            self._recovered += 1
+
+    def record_exhausted(self, reason: str, attempt: int) -> None:
+        """Record a unit of work abandoned with a transient error."""
+        with self._lock:
+            self._exhausted += 1
+        logger.error("Giving up after %s on attempt %d", reason, attempt)
+
+    def snapshot(self) -> RetryStatistics:
+        """Return a consistent copy of the current counters."""
+        with self._lock:
+            return RetryStatistics(
+                retries=self._retries,
+                recovered=self._recovered,
+                exhausted=self._exhausted,
+                retries_by_reason=dict(self._retries_by_reason),
+            )
+
+
+class RetryAttempts:
+    """
+    Attempt and backoff bookkeeping for one unit of work.
+
+    Shared by every retry loop so they classify errors, pace backoff and
+    record metrics the same way; the loop itself only runs the work and
+    sleeps (synchronously or not).
+
+    Example:
+        >>> attempts = RetryAttempts(RetryPolicy())
+        >>> delay_seconds = attempts.retry_delay(error, "postgresql")  # None: re-raise
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy,
+        metrics: RetryMetrics | None = None,
+        randomizer: random.Random | None = None,
+    ) -> None:
+        self._policy = policy
+        self._metrics = metrics
+        self._randomizer = randomizer
+        self._attempt = 1
+        self._total_delay_seconds = 0.0
+
+    def retry_delay(self, error: BaseException, dialect_name: str) -> float | None:
+        """
+        Decide whether a failed attempt is rerun, and after how long.
+
+        Args:
+            error: Exception raised by the attempt
+            dialect_name: Dialect of the database the attempt ran against
+
+        Returns:
+            Seconds to wait before the next attempt, or None when the error
+            is not transient or the policy is used up and it must be raised
+        """
+        reason = classify_transient_error(error, dialect_name)
+        if reason is None:
+            return None
+        delay_seconds = self._policy.backoff_seconds(self._attempt, self._randomizer)
+        if not self._policy.allows_retry(self._attempt, self._total_delay_seconds + delay_seconds):
+            if self._metrics is not None:
+                self._metrics.record_exhausted(reason, self._attempt)
+            return None
+        if self._metrics is not None:
+            self._metrics.record_retry(reason, self._attempt, delay_seconds)
+        self._total_delay_seconds += delay_seconds
+        self._attempt += 1
+        return delay_seconds
+
+    def record_success(self) -> None:
+        """Record that the current attempt succeeded."""
+        if self._attempt > 1 and self._metrics is not None:
+            self._metrics.record_recovered()
+
+
+def run_in_transaction[ResultType](
+    session_factory: sessionmaker[Session],
+    work: Callable[[Session], ResultType],
+    retry_policy: RetryPolicy | None = None,
+    retry_metrics: RetryMetrics | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+    randomizer: random.Random | None = None,
+) -> ResultType:
+    """
+    Run a unit of work in its own transaction, retrying transient failures.
+
+    Each attempt gets a fresh session; the work is committed when it returns
+    and rolled back when it raises. Only pass idempotent work: a connection
+    lost while committing leaves it unknown whether the commit landed.
+
+    Args:
+        session_factory: Session factory for the target database
+        work: Callable receiving the session and returning the result
+        retry_policy: Retry bounds (defaults to RetryPolicy())
+        retry_metrics: Optional counters to record retries into
+        sleep: Sleep function used for backoff
+        randomizer: Random source for backoff jitter
+
+    Returns:
+        The work's return value
+
+    Example:
+        >>> run_in_transaction(session_factory, lambda db_session: db_session.get(Practice, practice_id))
+    """
+    attempts = RetryAttempts(retry_policy if retry_policy is not None else RetryPolicy(), retry_metrics, randomizer)
+    while True:
+        db_session = session_factory()
+        try:
+            result = work(db_session)
+            db_session.commit()
+        except Exception as error:
+            db_session.rollback()
+            delay_seconds = attempts.retry_delay(error, db_session.get_bind().dialect.name)
+            if delay_seconds is None:
+                raise
+        else:
+            attempts.record_success()
+            return result
+        finally:
+            db_session.close()
+
+        sleep(delay_seconds)
+
+
+def retry_policy_from_settings(settings: Settings) -> RetryPolicy:
+    """
+    Build the transient-error retry policy from application settings.
+
+    Args:
+        settings: Application configuration
+
+    Returns:
+        Retry policy
+    """
+    return RetryPolicy(
+        max_attempts=settings.db_retry_max_attempts,
+        base_delay_seconds=settings.db_retry_base_delay,
+        max_delay_seconds=settings.db_retry_max_delay,
+        budget_seconds=settings.db_retry_budget,
+    )
@@ -0,0 +1,454 @@
+"""
+Server-side rolling minute windows of ExerciseState.
+
+`rolling_minutes_7d` and `rolling_minutes_28d` are kept in step with the
+practice history on every write: a flush listener turns created, updated
+and deleted practice blocks and exercise instances (and rescheduled
+practices) into minute deltas per exercise and day, applies them to the
+`exercise_daily_minutes` buckets and the windows of the affected
+ExerciseState, all in the flush's transaction. Nothing scans the history. The affected
+states are locked first (`exercise_states.lock_exercise_states`), so
+concurrent writes to one exercise apply one after the other instead of
+overwriting each other's minutes.
+
+Only practiced minutes count: a block or instance contributes once it has
+a log (PracticeBlockLog, ExerciseLog), so saved plans do not, and adding or
+deleting a log adds or removes its row's minutes.
+
+Windows cover the days up to `ExerciseState.rolling_as_of`. When a write
+touches a state whose windows are from an earlier day, or when the daily
+`expire_rolling_minutes` job runs, the windows are recomputed from the at
+most 28 buckets of the exercise, which expires the days that slid out.
+Buckets older than the longest window are pruned.
+
+Bulk paths that bypass the ORM (the history import, archival) do not
+update buckets; rebuild the windows afterwards with
+`rebuild_rolling_minutes`, or rederive every state with
+`state_recompute.recompute_exercise_states`. Batch session generation
+rebuilds them itself.
+"""
+
+from collections.abc import Iterable
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import case, delete, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from ..util.time import today_utc
+from .exercise_states import lock_exercise_states
+from .models import (
+    ExerciseDailyMinutes,
+    ExerciseInstance,
+    ExerciseLog,
+    ExerciseState,
+    Practice,
+    PracticeBlock,
+    PracticeBlockLog,
+)
+
+ROLLING_WINDOWS = {"rolling_minutes_7d": 7, "rolling_minutes_28d": 28}
+RETAINED_DAYS = max(ROLLING_WINDOWS.values())
+DURATION_PARAMETER = "duration"
+SOURCE_ATTRIBUTES: dict[type, tuple[str, ...]] = {
+    PracticeBlock: ("exercise_id", "practice_id", "session_date", "duration_minutes"),
+    ExerciseInstance: ("exercise_id", "practice_id", "session_date", "parameters"),
+    PracticeBlockLog: ("practice_block_id",),
+    ExerciseLog: ("exercise_instance_id",),
+}
+# Practiced rows: model, log model, log foreign key, minutes attribute and delta position
+SOURCES: tuple[
+    tuple[type[PracticeBlock] | type[ExerciseInstance], type[PracticeBlockLog] | type[ExerciseLog], str, str, int], ...
+] = (
+    (PracticeBlock, PracticeBlockLog, "practice_block_id", "duration_minutes", 0),
+    (ExerciseInstance, ExerciseLog, "exercise_instance_id", "parameters", 1),
+)
+
+# Deltas of (block minutes, instance minutes) by (exercise ID, day)
+type MinuteChanges = dict[tuple[int, date], list[int]]
+
+
+def instance_minutes(parameters: dict[str, Any] | None) -> int:
+    """
+    Read the minutes of an exercise instance from its `duration` parameter.
+
+    Args:
+        parameters: Exercise instance parameters
+
+    Returns:
+        Whole minutes, or 0 when the parameter is missing or not a number
+    """
+    duration = (parameters or {}).get(DURATION_PARAMETER)
+    if isinstance(duration, bool) or not isinstance(duration, int | float):
+        return 0
+    return max(int(duration), 0)
+
+
+def _window_start(as_of: date, days: int) -> date:
+    """First day of a window of `days` days ending on `as_of`."""
+    return as_of - timedelta(days=days - 1)
+
+
+def _add(changes: MinuteChanges, exercise_id: int | None, day: date | None, position: int, minutes: int) -> None:
+    if exercise_id is None or day is None or minutes == 0:
+        return
+    changes.setdefault((exercise_id, day), [0, 0])[position] += minutes
+
+
+def _row_minutes(model: type, value: Any) -> int:
+    """Minutes of a block (`duration_minutes`) or an instance (`parameters`)."""
+    return int(value or 0) if model is PracticeBlock else instance_minutes(value)
+
+
+def _old_value(instance: Any, key: str) -> Any:
+    """Value of an attribute before the pending changes (a loaded None has no history)."""
+    history = inspect(instance).attrs[key].history
+    previous = history.deleted or history.unchanged
+    return previous[0] if previous else None
+
+
+def _is_changed(instance: Any, keys: Iterable[str]) -> bool:
+    attributes = inspect(instance).attrs
+    return any(attributes[key].history.has_changes() for key in keys)
+
+
+def _log_deltas(db_session: Session, log_model: type, log_key: str) -> dict[int, int]:
+    """Logs the flush added (positive) or removed (negative), by logged row ID."""
+    deltas: dict[int, int] = {}
+    for instance in (*db_session.new, *db_session.dirty, *db_session.deleted):
+        if not isinstance(instance, log_model):
+            continue
+        if instance not in db_session.new:
+            old_id = _old_value(instance, log_key)
+            deltas[old_id] = deltas.get(old_id, 0) - 1
+        if instance not in db_session.deleted:
+            new_id = getattr(instance, log_key)
+            deltas[new_id] = deltas.get(new_id, 0) + 1
+    return deltas
+
+
+def _collect_changes(db_session: Session) -> MinuteChanges:
+    """Turn the flushed blocks, instances, logs and practice reschedules into minute deltas."""
+    rescheduled: dict[int, tuple[date, date]] = {}
+    for instance in db_session.dirty:
+        if isinstance(instance, Practice):
+            history = inspect(instance).attrs.session_date.history
+            if history.added and history.deleted:
+                rescheduled[instance.id] = (history.deleted[0], instance.session_date)
+
+    changes: MinuteChanges = {}
+    for model, log_model, log_key, minutes_key, position in SOURCES:
+        log_deltas = _log_deltas(db_session, log_model, log_key)
+        # (exercise ID, day, minutes) of each affected row before and after the flush
+        rows: dict[int, tuple[tuple[int, date | None, int] | None, tuple[int, date | None, int] | None]] = {}
+        for instance in (*db_session.new, *db_session.dirty, *db_session.deleted):
+            if not isinstance(instance, model):
+                continue
+            is_new = instance in db_session.new
+            is_deleted = instance in db_session.deleted
+            if not (is_new or is_deleted or _is_changed(instance, SOURCE_ATTRIBUTES[model])):
+                continue
+            old = None
+            if not is_new:
+                old_minutes = _row_minutes(model, _old_value(instance, minutes_key))
+                old = (_old_value(instance, "exercise_id"), _old_value(instance, "session_date"), old_minutes)
+            new = None
+            if not is_deleted:
+                practice_id = instance.practice_id
+                day = rescheduled[practice_id][1] if practice_id in rescheduled else instance.session_date
+                new = (instance.exercise_id, day, _row_minutes(model, getattr(instance, minutes_key)))
+            rows[instance.id] = (old, new)
+
+        # Rows outside the flush: logged or unlogged by it, or moved with a rescheduled practice
+        other_ids = set(log_deltas) - set(rows)
+        if other_ids or rescheduled:
+            for row_id, practice_id, exercise_id, day, value in db_session.execute(
+                select(model.id, model.practice_id, model.exercise_id, model.session_date, getattr(model, minutes_key))
+                .where(model.id.in_(other_ids) | model.practice_id.in_(rescheduled))
+            ):
+                if row_id in rows:
+                    continue
+                old_day, new_day = rescheduled.get(practice_id, (day, day))
+                minutes = _row_minutes(model, value)
+                rows[row_id] = ((exercise_id, old_day, minutes), (exercise_id, new_day, minutes))
+
+        # New rows have only the flush's logs and deleted rows none; count the others
+        kept_ids = [row_id for row_id, (old, new) in rows.items() if old is not None and new is not None]
+        log_counts: dict[int, int] = {}
+        if kept_ids:
+            log_id = getattr(log_model, log_key)
+            log_counts = dict(
+                db_session.execute(select(log_id, func.count()).where(log_id.in_(kept_ids)).group_by(log_id)).tuples().all()
+            )
+        for row_id, (old, new) in rows.items():
+            delta = log_deltas.get(row_id, 0)
+            if new is None:
+                logged = 0
+            elif old is None:
+                logged = delta
+            else:
+                logged = log_counts.get(row_id, 0)
+            if old is not None and logged - delta > 0:
+                _add(changes, old[0], old[1], position, -old[2])
+            if new is not None and logged > 0:
+                _add(changes, new[0], new[1], position, new[2])
+    return changes
+
+
+def _window_sums(db_session: Session, exercise_ids: Iterable[int], as_of: date) -> dict[int, dict[str, int]]:
+    """Sum each exercise's buckets into its windows ending on `as_of`."""
+    block_minutes = ExerciseDailyMinutes.block_minutes
+    day_minutes = case(
+        (block_minutes >= ExerciseDailyMinutes.instance_minutes, block_minutes),
+        else_=ExerciseDailyMinutes.instance_minutes,
+    )
+    columns = [
+        func.coalesce(
+            func.sum(case((ExerciseDailyMinutes.day >= _window_start(as_of, days), day_minutes), else_=0)), 0
+        ).label(name)
+        for name, days in ROLLING_WINDOWS.items()
+    ]
+    rows = db_session.execute(
+        select(ExerciseDailyMinutes.exercise_id, *columns)
+        .where(
+            ExerciseDailyMinutes.exercise_id.in_(list(exercise_ids)),
+            ExerciseDailyMinutes.day >= _window_start(as_of, RETAINED_DAYS),
+            ExerciseDailyMinutes.day <= as_of,
+        )
+        .group_by(ExerciseDailyMinutes.exercise_id)
+    )
+    return {row.exercise_id: {name: max(int(row._mapping[name]), 0) for name in ROLLING_WINDOWS} for row in rows}
+
+
+def _expire_loaded_states(db_session: Session, exercise_ids: set[int]) -> None:
+    """Reload state columns written behind the ORM's back on next access."""
+    for instance in list(db_session.identity_map.values()):
+        if isinstance(instance, ExerciseState) and instance.exercise_id in exercise_ids:
+            db_session.expire(instance, [*ROLLING_WINDOWS, "rolling_as_of", "last_practiced_date"])
+
+
+def _apply_changes(db_session: Session, changes: MinuteChanges, today: date) -> None:
+    """Apply minute deltas to the buckets and the rolling windows of their exercises."""
+    oldest = _window_start(today, RETAINED_DAYS)
+    changes = {key: delta for key, delta in changes.items() if delta != [0, 0]}
+    if not changes:
+        return
+    exercise_ids = {exercise_id for exercise_id, _ in changes}
+    # Concurrent writers of an exercise queue here, so buckets and windows are read after their commits
+    lock_exercise_states(db_session, exercise_ids)
+
+    # Buckets: only days that can still be inside a window are kept
+    bucket_changes = {key: delta for key, delta in changes.items() if key[1] >= oldest}
+    day_deltas: dict[tuple[int, date], int] = {}
+    if bucket_changes:
+        existing = {
+            (row.exercise_id, row.day): (row.block_minutes, row.instance_minutes)
+            for row in db_session.execute(
+                select(
+                    ExerciseDailyMinutes.exercise_id,
+                    ExerciseDailyMinutes.day,
+                    ExerciseDailyMinutes.block_minutes,
+                    ExerciseDailyMinutes.instance_minutes,
+                ).where(
+                    ExerciseDailyMinutes.exercise_id.in_(exercise_ids),
+                    ExerciseDailyMinutes.day.in_({day for _, day in bucket_changes}),
+                )
+            )
+        }
+        for (exercise_id, day), (block_delta, instance_delta) in sorted(bucket_changes.items()):
+            old_block, old_instance = existing.get((exercise_id, day), (0, 0))
+            block_minutes = max(old_block + block_delta, 0)
+            new_instance = max(old_instance + instance_delta, 0)
+            day_deltas[(exercise_id, day)] = max(block_minutes, new_instance) - max(old_block, old_instance, 0)
+            key_clause = (ExerciseDailyMinutes.exercise_id == exercise_id, ExerciseDailyMinutes.day == day)
+            if block_minutes == 0 and new_instance == 0:
+                db_session.execute(delete(ExerciseDailyMinutes).where(*key_clause))
+            elif (exercise_id, day) in existing:
+                db_session.execute(
+                    update(ExerciseDailyMinutes)
+                    .where(*key_clause)
+                    .values(block_minutes=block_minutes, instance_minutes=new_instance)
+                )
+            else:
+                db_session.execute(
+                    insert(ExerciseDailyMinutes).values(
+                        exercise_id=exercise_id, day=day, block_minutes=block_minutes, instance_minutes=new_instance
+                    )
+                )
+
+    # Windows: apply deltas when current, recompute from buckets when stale
+    states = {
+        row.exercise_id: row
+        for row in db_session.execute(
+            select(
+                ExerciseState.exercise_id,
+                ExerciseState.last_practiced_date,
+                ExerciseState.rolling_as_of,
+                *(getattr(ExerciseState, name) for name in ROLLING_WINDOWS),
+            ).where(ExerciseState.exercise_id.in_(exercise_ids))
+        )
+    }
+    stale = {exercise_id for exercise_id in exercise_ids if states[exercise_id].rolling_as_of != today}
+    recomputed = _window_sums(db_session, stale, today) if stale else {}
+    for exercise_id in sorted(exercise_ids):
+        if exercise_id in stale:
+            windows = recomputed.get(exercise_id, dict.fromkeys(ROLLING_WINDOWS, 0))
+        else:
+            windows = {name: states[exercise_id]._mapping[name] for name in ROLLING_WINDOWS}
+            for (delta_exercise_id, day), minutes in day_deltas.items():
+                if delta_exercise_id != exercise_id:
+                    continue
+                for name, days in ROLLING_WINDOWS.items():
+                    if _window_start(today, days) <= day <= today:
+                        windows[name] = max(windows[name] + minutes, 0)
+
+        practiced_days = [
+            day
+            for (delta_exercise_id, day), delta in changes.items()
+            if delta_exercise_id == exercise_id and day <= today and max(delta) > 0
+        ]
+        last_practiced_date = states[exercise_id].last_practiced_date
+        if practiced_days:
+            last_practiced_date = max(filter(None, (last_practiced_date, *practiced_days)))
+
+        db_session.execute(
+            update(ExerciseState)
+            .where(ExerciseState.exercise_id == exercise_id)
+            .values(**windows, rolling_as_of=today, last_practiced_date=last_practiced_date)
+        )
+    _expire_loaded_states(db_session, exercise_ids)
+
+
+def load_rolling_minute_sources(db_session: Session, flush_context: Any, instances: Any) -> None:
+    """
+    Load the attributes minute deltas are computed from (before_flush listener).
+
+    Rows deleted by the flush cannot be reloaded afterwards, e.g. when an
+    earlier flush expired their partition keys.
+    """
+    with db_session.no_autoflush:
+        for instance in (*db_session.dirty, *db_session.deleted):
+            for key in SOURCE_ATTRIBUTES.get(type(instance), ()):
+                getattr(instance, key)
+
+
+def maintain_rolling_minutes(db_session: Session, flush_context: Any) -> None:
+    """
+    Keep buckets and rolling windows in step with a flush (after_flush listener).
+
+    Registered by `create_session_factory`, ahead of the partition key
+    propagation, whose UPDATEs would otherwise hide the children's old
+    session dates.
+    """
+    with db_session.no_autoflush:
+        changes = _collect_changes(db_session)
+        if changes:
+            _apply_changes(db_session, changes, today_utc())
+
+
+def refresh_rolling_minutes(db_session: Session, exercise_ids: Iterable[int], today: date | None = None) -> None:
+    """
+    Recompute the rolling windows of some exercises from their buckets.
+
+    Args:
+        db_session: Database session (the caller commits)
+        exercise_ids: Exercises whose states to refresh (states that do not exist are skipped)
+        today: Day the windows should end on (defaults to today, UTC)
+    """
+    as_of = today if today is not None else today_utc()
+    exercise_ids = set(exercise_ids)
+    if not exercise_ids:
+        return
+    sums = _window_sums(db_session, exercise_ids, as_of)
+    empty = dict.fromkeys(ROLLING_WINDOWS, 0)
+    rows = db_session.execute(
+        select(ExerciseState.id, ExerciseState.exercise_id).where(ExerciseState.exercise_id.in_(exercise_ids))
+    ).all()
+    if rows:
+        db_session.execute(
+            update(ExerciseState),
+            [{"id": state_id, **sums.get(exercise_id, empty), "rolling_as_of": as_of} for state_id, exercise_id in rows],
+        )
+    _expire_loaded_states(db_session, exercise_ids)
+
+
+def expire_rolling_minutes(db_session: Session, today: date | None = None) -> int:
+    """
+    Slide every stale rolling window forward to a day and prune old buckets.
+
+    Meant to run daily so that windows of exercises nobody practiced lately
+    also expire; windows of exercises written to are refreshed anyway.
+
+    Args:
+        db_session: Database session (the caller commits)
+        today: Day the windows should end on (defaults to today, UTC)
+
+    Returns:
+        Number of states refreshed
+    """
+    as_of = today if today is not None else today_utc()
+    stale_ids = set(
+        db_session.scalars(
+            select(ExerciseState.exercise_id).where(
+                (ExerciseState.rolling_as_of.is_(None)) | (ExerciseState.rolling_as_of != as_of)
+            )
+        )
+    )
+    refresh_rolling_minutes(db_session, stale_ids, as_of)
+    db_session.execute(
+        delete(ExerciseDailyMinutes).where(ExerciseDailyMinutes.day < _window_start(as_of, RETAINED_DAYS))
+    )
+    return len(stale_ids)
+
+
+def rebuild_rolling_minutes(db_session: Session, today: date | None = None) -> int:
+    """
+    Rebuild buckets and rolling windows from the practice history.
+
+    Reads only the last RETAINED_DAYS days of logged blocks and instances. Use it
+    once after enabling server-side windows and after bulk writes that
+    bypass the ORM.
+
+    Args:
+        db_session: Database session (the caller commits)
+        today: Day the windows should end on (defaults to today, UTC)
+
+    Returns:
+        Number of buckets written
+    """
+    as_of = today if today is not None else today_utc()
+    oldest = _window_start(as_of, RETAINED_DAYS)
+    buckets: dict[tuple[int, date], list[int]] = {}
+    for exercise_id, day, minutes in db_session.execute(
+        select(PracticeBlock.exercise_id, PracticeBlock.session_date, PracticeBlock.duration_minutes).where(
+            PracticeBlock.session_date >= oldest,
+            select(PracticeBlockLog.id).where(PracticeBlockLog.practice_block_id == PracticeBlock.id).exists(),
+        )
+    ):
+        _add(buckets, exercise_id, day, 0, minutes)
+    for exercise_id, day, parameters in db_session.execute(
+        select(ExerciseInstance.exercise_id, ExerciseInstance.session_date, ExerciseInstance.parameters)
+        .join(ExerciseLog, ExerciseLog.exercise_instance_id == ExerciseInstance.id)
+        .where(ExerciseInstance.session_date >= oldest)
+    ):
+        _add(buckets, exercise_id, day, 1, instance_minutes(parameters))
+
+    db_session.execute(delete(ExerciseDailyMinutes))
+    if buckets:
+        db_session.execute(
+            insert(ExerciseDailyMinutes),
+            [
+                {"exercise_id": exercise_id, "day": day, "block_minutes": block, "instance_minutes": instance}
+                for (exercise_id, day), (block, instance) in sorted(buckets.items())
+            ],
+        )
+    tracked_ids = set(db_session.scalars(select(ExerciseState.exercise_id)))
+    untracked_ids = sorted({exercise_id for exercise_id, _ in buckets} - tracked_ids)
+    if untracked_ids:
+        db_session.execute(
+            insert(ExerciseState),
+            [{"exercise_id": exercise_id, "mastery_estimate": 0.0} for exercise_id in untracked_ids],
+        )
+    db_session.execute(update(ExerciseState).values(rolling_as_of=None))
+    expire_rolling_minutes(db_session, as_of)
+    return len(buckets)
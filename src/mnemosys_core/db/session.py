@@ -2,20 +2,89 @@
 Database session management for dependency injection.
 
 Provides session factory and FastAPI dependency functions.
+
+Sessions are lazy: no connection is checked out of the pool until the first
+statement runs. Sessions flagged as read-only run inside a read-only
+transaction on PostgreSQL and raise ReadOnlySessionError on any write, and
+sessions that never wrote anything are closed without a COMMIT round trip.
+Writes are flushes and INSERT, UPDATE or DELETE statements run through
+`Session.execute` (bulk and Core DML); textual SQL is not inspected. When a
+separate reader engine is configured (file-backed SQLite), read-only sessions
+are routed to it.
 """
 
 from collections.abc import Callable, Generator
+from typing import Any
+
+from sqlalchemy import Connection, Engine, event, text
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction, sessionmaker
+
+from .mastery import maintain_mastery_estimates
+from .partitioning import populate_partition_keys, propagate_partition_keys
+from .rolling_minutes import load_rolling_minute_sources, maintain_rolling_minutes
+
+READ_ONLY_KEY = "mnemosys_read_only"
+HAS_WRITES_KEY = "mnemosys_has_writes"
+READ_ENGINE_KEY = "mnemosys_read_engine"
+
+
+class RoutingSession(Session):
+    """
+    Session that sends read-only units of work to a reader engine.
+
+    Read-write sessions keep using the primary (writer) bind for every
+    statement, so they always read their own writes.
+    """
+
+    def get_bind(self, mapper: Any = None, **kwargs: Any) -> Engine | Connection:
+        read_engine = self.info.get(READ_ENGINE_KEY)
+        if read_engine is not None and self.info.get(READ_ONLY_KEY):
+            return read_engine  # type: ignore[no-any-return]
+        return super().get_bind(mapper, **kwargs)
+
+
+class ReadOnlySessionError(RuntimeError):
+    """Raised when a read-only session writes."""
+
+
+def _record_write(session: Session) -> None:
+    if session.info.get(READ_ONLY_KEY):
+        raise ReadOnlySessionError("Read-only session cannot write")
+    session.info[HAS_WRITES_KEY] = True
 
-from sqlalchemy import Engine
-from sqlalchemy.orm import Session, sessionmaker
 
+def _mark_has_writes(session: Session, flush_context: Any) -> None:
+    """Record that a flush emitted DML in this session."""
+    _record_write(session)
 
-def create_session_factory(engine: Engine) -> sessionmaker[Session]:
+
+def _mark_write_statements(orm_execute_state: ORMExecuteState) -> None:
+    """Record that a bulk or Core INSERT, UPDATE or DELETE ran in this session."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _record_write(orm_execute_state.session)
+
+
+def _begin_read_only(session: Session, transaction: SessionTransaction, connection: Connection) -> None:
+    """Switch the freshly begun transaction to read-only when requested."""
+    if session.info.get(READ_ONLY_KEY) and connection.dialect.name == "postgresql":
+        connection.execute(text("SET TRANSACTION READ ONLY"))
+
+
+def create_session_factory(engine: Engine, read_engine: Engine | None = None) -> sessionmaker[Session]:
     """
     Create a session factory bound to an engine.
 
+    The factory tracks flushes and DML statements so that
+    `get_session_dependency` can skip the commit for sessions without
+    writes, and begins read-only transactions (rejecting writes) for
+    sessions whose info carries the read-only flag. It
+    also keeps the `session_date` partition keys of child rows in step with
+    their parents, and the rolling minute windows and mastery estimates of
+    ExerciseState in step with the practice history.
+
     Args:
         engine: SQLAlchemy engine
+        read_engine: Optional reader engine used by read-only sessions
 
     Returns:
         Configured sessionmaker
@@ -26,15 +95,43 @@ def create_session_factory(engine: Engine) -> sessionmaker[Session]:
         >>> with SessionFactory() as session:
         ...     session.query(Exercise).all()
     """
-    return sessionmaker(
+    session_factory: sessionmaker[Session] = sessionmaker(
         bind=engine,
+        class_=RoutingSession,
         autocommit=False,
         autoflush=False,
         expire_on_commit=False,
+        info={READ_ENGINE_KEY: read_engine},
     )
+    event.listen(session_factory, "after_flush", _mark_has_writes)
+    event.listen(session_factory, "do_orm_execute", _mark_write_statements)
+    event.listen(session_factory, "after_begin", _begin_read_only)
+    event.listen(session_factory, "before_flush", populate_partition_keys)
+    event.listen(session_factory, "before_flush", load_rolling_minute_sources)
+    event.listen(session_factory, "after_flush", maintain_rolling_minutes)
+    event.listen(session_factory, "after_flush", maintain_mastery_estimates)
+    event.listen(session_factory, "after_flush", propagate_partition_keys)
+    return session_factory
+
+
+def has_pending_writes(session: Session) -> bool:
+    """
+    Report whether a session holds writes that still need a commit.
+
+    Args:
+        session: Database session
+
+    Returns:
+        True when the session has unflushed changes or has run DML
+    """
+    if session.new or session.dirty or session.deleted:
+        return True
+    return bool(session.info.get(HAS_WRITES_KEY, False))
 
 
-def get_session_dependency(session_factory: sessionmaker[Session]) -> Callable[[], Generator[Session]]:
+def get_session_dependency(
+    session_factory: sessionmaker[Session],
+) -> Callable[..., Generator[Session]]:
     """
     Create a FastAPI dependency that yields database sessions.
 
@@ -42,18 +139,24 @@ def get_session_dependency(session_factory: sessionmaker[Session]) -> Callable[[
         session_factory: Configured sessionmaker
 
     Returns:
-        Dependency function for FastAPI
+        Dependency function for FastAPI; pass `read_only=True` to run the
+        unit of work in a read-only transaction, where writes raise
+        ReadOnlySessionError
 
     Example:
         >>> app = create_app(engine)
         >>> # FastAPI will call this for each request
     """
 
-    def get_session() -> Generator[Session]:
+    def get_session(read_only: bool = False) -> Generator[Session]:
         session = session_factory()
+        session.info[READ_ONLY_KEY] = read_only
         try:
             yield session
-            session.commit()
+            if has_pending_writes(session):
+                if read_only:
+                    raise ReadOnlySessionError("Read-only session has unflushed changes")
+                session.commit()
         except Exception:
             session.rollback()
             raise
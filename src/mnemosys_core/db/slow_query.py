@@ -0,0 +1,286 @@
+"""
+Slow query log with automatic EXPLAIN capture.
+
+SlowQueryLog times every statement of the engines it is attached to and
+keeps statements slower than a threshold in a fixed-size ring buffer, with
+normalized SQL, redacted parameters, duration and the originating route
+(set per request with `query_origin`). Statements slower than a second,
+higher threshold also get their plan captured on the same connection:
+`EXPLAIN` on PostgreSQL, `EXPLAIN QUERY PLAN` on SQLite. Neither runs the
+statement, so capturing a plan costs the request only the planning time.
+
+`EXPLAIN (ANALYZE, BUFFERS)` adds actual row counts and timings but executes
+the statement a second time on the request path; it is opt-in
+(`explain_analyze`). Only SELECT statements are explained, so no write is
+ever repeated, and each normalized statement is explained at most once per
+interval. Logs are created by the caller (see `configure_dependencies`);
+nothing is registered at import time.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Connection, Engine, event
+from sqlalchemy.engine import ExceptionContext
+
+from ..config.settings import Settings
+from ..util.time import utc_now
+
+logger = logging.getLogger(__name__)
+
+QUERY_START_KEY = "mnemosys_query_start"
+EXPLAIN_SAVEPOINT = "mnemosys_explain"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMERIC_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+_current_origin: ContextVar[Callable[[], str] | None] = ContextVar("mnemosys_query_origin", default=None)
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Reduce a statement to its shape: literals become `?`, whitespace collapses.
+
+    Args:
+        statement: SQL text as sent to the driver
+
+    Returns:
+        Normalized SQL text
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMERIC_LITERAL.sub("?", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Replace parameter values with their type names.
+
+    Args:
+        parameters: Driver parameters (sequence or mapping)
+        executemany: Whether parameters hold one set per execution
+
+    Returns:
+        Parameters of the same shape with values such as "<int>"
+    """
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {name: f"<{type(value).__name__}>" for name, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return None
+
+
+@contextmanager
+def query_origin(origin: Callable[[], str]) -> Iterator[None]:
+    """
+    Attribute statements run within the block to an origin such as a route.
+
+    Args:
+        origin: Callable returning the origin label when a slow statement is
+            recorded (a callable so routes resolved later are reported)
+    """
+    token = _current_origin.set(origin)
+    try:
+        yield
+    finally:
+        _current_origin.reset(token)
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    """
+    One statement that exceeded the slow query threshold.
+
+    Attributes:
+        statement: Normalized SQL text
+        parameters: Redacted parameters
+        duration_ms: Execution time in milliseconds
+        origin: Route or other origin label, if known
+        recorded_at: When the statement finished (UTC)
+        plan: Captured query plan lines, if the statement was explained
+    """
+
+    statement: str
+    parameters: Any
+    duration_ms: float
+    origin: str | None
+    recorded_at: datetime
+    plan: list[str] | None = None
+
+
+class SlowQueryLog:
+    """
+    Thread-safe ring buffer of slow statements fed by engine events.
+
+    Args:
+        threshold_ms: Statements at least this slow are recorded
+        explain_threshold_ms: Statements at least this slow are explained
+            (None disables plan capture)
+        capacity: Samples kept, and statements remembered for the explain
+            interval; the oldest are dropped first
+        explain_interval_seconds: Minimum time between plans of the same
+            normalized statement
+        explain_analyze: Capture PostgreSQL plans with `EXPLAIN (ANALYZE,
+            BUFFERS)`, which re-runs the slow statement
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 100.0,
+        explain_threshold_ms: float | None = None,
+        capacity: int = 100,
+        explain_interval_seconds: float = 60.0,
+        explain_analyze: bool = False,
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain_threshold_ms = explain_threshold_ms
+        self.capacity = capacity
+        self.explain_interval_seconds = explain_interval_seconds
+        self.explain_analyze = explain_analyze
+        self._lock = threading.Lock()
+        self._samples: deque[SlowQuery] = deque(maxlen=capacity)
+        # Claim time per normalized statement, oldest first and at most `capacity` entries
+        self._explained_at: OrderedDict[str, float] = OrderedDict()
+
+    def attach(self, engine: Engine) -> None:
+        """
+        Time the statements of an engine.
+
+        Args:
+            engine: Engine to observe
+        """
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def samples(self) -> list[SlowQuery]:
+        """Return the recorded samples, oldest first."""
+        with self._lock:
+            return list(self._samples)
+
+    def clear(self) -> None:
+        """Drop all samples."""
+        with self._lock:
+            self._samples.clear()
+            self._explained_at.clear()
+
+    def _before_cursor_execute(
+        self, connection: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        connection.info.setdefault(QUERY_START_KEY, {})[id(cursor)] = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, connection: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        started = connection.info.get(QUERY_START_KEY, {}).pop(id(cursor), None)
+        if started is None:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000.0
+        if duration_ms < self.threshold_ms:
+            return
+
+        normalized = normalize_statement(statement)
+        plan = None
+        if self._should_explain(normalized, statement, duration_ms, executemany):
+            plan = _explain(connection, statement, parameters, self.explain_analyze)
+        origin = _current_origin.get()
+        slow_query = SlowQuery(
+            statement=normalized,
+            parameters=redact_parameters(parameters, executemany),
+            duration_ms=duration_ms,
+            origin=origin() if origin is not None else None,
+            recorded_at=utc_now(),
+            plan=plan,
+        )
+        with self._lock:
+            self._samples.append(slow_query)
+        logger.warning("Slow query (%.1f ms) from %s: %s", duration_ms, slow_query.origin, normalized)
+
+    def _handle_error(self, exception_context: ExceptionContext) -> None:
+        """Forget the start time of a statement that raised, so pooled connections do not accumulate them."""
+        connection = exception_context.connection
+        execution_context = exception_context.execution_context
+        if connection is not None and execution_context is not None:
+            connection.info.get(QUERY_START_KEY, {}).pop(id(execution_context.cursor), None)
+
+    def _should_explain(self, normalized: str, statement: str, duration_ms: float, executemany: bool) -> bool:
+        """Decide whether to capture a plan, claiming the statement's explain slot if so."""
+        if self.explain_threshold_ms is None or duration_ms < self.explain_threshold_ms or executemany:
+            return False
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return False
+        now = time.monotonic()
+        with self._lock:
+            # Claims are kept oldest first, so expired ones are at the front
+            while self._explained_at and now - next(iter(self._explained_at.values())) >= self.explain_interval_seconds:
+                self._explained_at.popitem(last=False)
+            if normalized in self._explained_at:
+                return False
+            self._explained_at[normalized] = now
+            while len(self._explained_at) > self.capacity:
+                self._explained_at.popitem(last=False)
+        return True
+
+
+def _explain(connection: Connection, statement: str, parameters: Any, analyze: bool = False) -> list[str] | None:
+    """Capture the plan of a statement on the connection that just ran it."""
+    dialect_name = connection.dialect.name
+    if dialect_name == "postgresql":
+        explain_statement = f"EXPLAIN (ANALYZE, BUFFERS) {statement}" if analyze else f"EXPLAIN {statement}"
+    elif dialect_name == "sqlite":
+        explain_statement = f"EXPLAIN QUERY PLAN {statement}"
+    else:
+        return None
+
+    cursor = connection.connection.cursor()
+    is_savepoint_set = False
+    try:
+        if dialect_name == "postgresql":
+            # A failed EXPLAIN must not abort the request's transaction
+            cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            is_savepoint_set = True
+        cursor.execute(explain_statement, parameters)
+        rows = cursor.fetchall()
+        if is_savepoint_set:
+            cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+    except Exception:
+        logger.debug("Could not explain slow query", exc_info=True)
+        if is_savepoint_set:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        return None
+    finally:
+        cursor.close()
+    # PostgreSQL returns one text column; SQLite returns (id, parent, notused, detail)
+    return [str(row[0]) if dialect_name == "postgresql" else str(row[-1]) for row in rows]
+
+
+def slow_query_log_from_settings(settings: Settings) -> SlowQueryLog | None:
+    """
+    Build the slow query log from application settings.
+
+    Args:
+        settings: Application configuration
+
+    Returns:
+        Slow query log, or None when DB_SLOW_QUERY_MS is not set
+    """
+    if settings.db_slow_query_ms is None:
+        return None
+    return SlowQueryLog(
+        threshold_ms=settings.db_slow_query_ms,
+        explain_threshold_ms=settings.db_slow_query_explain_ms,
+        capacity=settings.db_slow_query_capacity,
+        explain_analyze=settings.db_slow_query_explain_analyze,
+    )
@@ -0,0 +1,292 @@
+"""
+Set-based recompute of every ExerciseState row.
+
+After imports or fixes to the history, `recompute_exercise_states` derives
+`last_practiced_date`, the rolling minute windows and `last_fatigue_profile`
+of all exercises from `practice` and the logged `practice_block` and
+`exercise_instance` rows (unlogged ones are plans) in one aggregate
+statement: block and instance minutes are unioned, summed per exercise and
+day (a day counts the larger of the two totals, as in the daily buckets),
+summed again into the windows, and the latest practice of each exercise is
+picked with `row_number()`. The daily buckets are rebuilt
+with one INSERT ... SELECT, and the states are then written in one
+executemany UPDATE and one INSERT for exercises without a state.
+
+The fatigue profile is not logged; it is derived from the session type of
+the exercise's latest practice (SESSION_FATIGUE). Exercises without a hot
+practice up to the day (all archived, or only later ones) keep their last
+practiced date and fatigue profile, since archived practices are older than
+any hot one.
+
+A dry run computes the same diff and writes nothing.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import Integer, Subquery, case, cast, delete, func, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..util.time import today_utc
+from ..util.timing import timed
+from .models import (
+    SESSION_FATIGUE,
+    ExerciseDailyMinutes,
+    ExerciseInstance,
+    ExerciseLog,
+    ExerciseState,
+    Practice,
+    PracticeBlock,
+    PracticeBlockLog,
+)
+from .parameters import parameter_value
+from .rolling_minutes import DURATION_PARAMETER, RETAINED_DAYS, ROLLING_WINDOWS
+
+logger = logging.getLogger(__name__)
+
+RECOMPUTED_FIELDS = ("last_practiced_date", *ROLLING_WINDOWS, "last_fatigue_profile")
+
+
+@dataclass(frozen=True)
+class StateChange:
+    """
+    One field of an ExerciseState that a recompute changes.
+
+    Attributes:
+        exercise_id: Exercise whose state changes
+        field: Changed column
+        old: Stored value (None for states that do not exist yet)
+        new: Recomputed value
+    """
+
+    exercise_id: int
+    field: str
+    old: Any
+    new: Any
+
+
+@dataclass(frozen=True)
+class RecomputeResult:
+    """
+    Outcome of a recompute.
+
+    Attributes:
+        as_of: Day the rolling windows end on
+        states: States recomputed (existing and new)
+        created: States created for exercises practiced without one
+        changes: Fields whose stored value differs from the recomputed one
+        dry_run: Whether nothing was written
+        timings: Seconds spent per phase ("derive", "diff", "write")
+    """
+
+    as_of: date
+    states: int
+    created: int
+    changes: tuple[StateChange, ...]
+    dry_run: bool
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def _instance_minutes(dialect_name: str) -> ColumnElement[Any]:
+    """SQL counterpart of `rolling_minutes.instance_minutes` (whole, non-negative numeric durations)."""
+    if dialect_name == "sqlite":
+        path = f"$.{DURATION_PARAMETER}"
+        minutes: ColumnElement[Any] = case(
+            (
+                func.json_type(ExerciseInstance.parameters, path).in_(("integer", "real")),
+                cast(func.json_extract(ExerciseInstance.parameters, path), Integer),
+            ),
+            else_=0,
+        )
+    else:
+        duration = parameter_value(ExerciseInstance.parameters, DURATION_PARAMETER, numeric=True)
+        minutes = func.coalesce(cast(func.floor(duration), Integer), 0)
+    return case((minutes > 0, minutes), else_=0)
+
+
+def _sources(dialect_name: str) -> Subquery:
+    """Logged blocks and instances as (exercise, practice, day, block minutes, instance minutes) rows."""
+    return union_all(
+        select(
+            PracticeBlock.exercise_id,
+            PracticeBlock.practice_id,
+            PracticeBlock.session_date,
+            PracticeBlock.duration_minutes.label("block_minutes"),
+            literal(0, Integer).label("instance_minutes"),
+        ).where(select(PracticeBlockLog.id).where(PracticeBlockLog.practice_block_id == PracticeBlock.id).exists()),
+        select(
+            ExerciseInstance.exercise_id,
+            ExerciseInstance.practice_id,
+            ExerciseInstance.session_date,
+            literal(0, Integer).label("block_minutes"),
+            _instance_minutes(dialect_name).label("instance_minutes"),
+        ).join(ExerciseLog, ExerciseLog.exercise_instance_id == ExerciseInstance.id),
+    ).subquery("sources")
+
+
+def _daily(sources: Subquery) -> Subquery:
+    """Block and instance minutes per exercise and day."""
+    return (
+        select(
+            sources.c.exercise_id,
+            sources.c.session_date.label("day"),
+            func.sum(sources.c.block_minutes).label("block_minutes"),
+            func.sum(sources.c.instance_minutes).label("instance_minutes"),
+        )
+        .group_by(sources.c.exercise_id, sources.c.session_date)
+        .subquery("daily")
+    )
+
+
+def _derived_states(db_session: Session, as_of: date) -> dict[int, dict[str, Any]]:
+    """Derive the recomputed fields of every exercise with hot history."""
+    sources = _sources(db_session.get_bind().dialect.name)
+    daily = _daily(sources)
+    day_minutes = case(
+        (daily.c.block_minutes >= daily.c.instance_minutes, daily.c.block_minutes),
+        else_=daily.c.instance_minutes,
+    )
+    aggregates = (
+        select(
+            daily.c.exercise_id,
+            func.max(case((daily.c.day <= as_of, daily.c.day))).label("last_practiced_date"),
+            *(
+                func.coalesce(
+                    func.sum(
+                        case(
+                            (daily.c.day.between(as_of - timedelta(days=days - 1), as_of), day_minutes),
+                            else_=0,
+                        )
+                    ),
+                    0,
+                ).label(name)
+                for name, days in ROLLING_WINDOWS.items()
+            ),
+        )
+        .group_by(daily.c.exercise_id)
+        .subquery("aggregates")
+    )
+    ranked = (
+        select(
+            sources.c.exercise_id,
+            Practice.session_type,
+            func.row_number()
+            .over(
+                partition_by=sources.c.exercise_id,
+                order_by=(sources.c.session_date.desc(), sources.c.practice_id.desc()),
+            )
+            .label("position"),
+        )
+        .join(Practice, Practice.id == sources.c.practice_id)
+        .where(sources.c.session_date <= as_of)
+        .subquery("ranked")
+    )
+    latest = select(ranked.c.exercise_id, ranked.c.session_type).where(ranked.c.position == 1).subquery("latest")
+    rows = db_session.execute(
+        select(aggregates, latest.c.session_type).outerjoin(latest, latest.c.exercise_id == aggregates.c.exercise_id)
+    )
+    return {
+        row.exercise_id: {
+            "last_practiced_date": row.last_practiced_date,
+            **{name: max(int(row._mapping[name]), 0) for name in ROLLING_WINDOWS},
+            "last_fatigue_profile": SESSION_FATIGUE.get(row.session_type) if row.session_type is not None else None,
+        }
+        for row in rows
+    }
+
+
+def _rebuild_buckets(db_session: Session, as_of: date) -> None:
+    """Replace the daily buckets with the retained days of the history."""
+    daily = _daily(_sources(db_session.get_bind().dialect.name))
+    db_session.execute(delete(ExerciseDailyMinutes))
+    db_session.execute(
+        insert(ExerciseDailyMinutes).from_select(
+            ["exercise_id", "day", "block_minutes", "instance_minutes"],
+            select(daily.c.exercise_id, daily.c.day, daily.c.block_minutes, daily.c.instance_minutes).where(
+                daily.c.day >= as_of - timedelta(days=RETAINED_DAYS - 1),
+                (daily.c.block_minutes > 0) | (daily.c.instance_minutes > 0),
+            ),
+        )
+    )
+
+
+def recompute_exercise_states(db_session: Session, today: date | None = None, dry_run: bool = False) -> RecomputeResult:
+    """
+    Recompute every ExerciseState from the practice history.
+
+    Args:
+        db_session: Database session (the caller commits)
+        today: Day the rolling windows should end on (defaults to today, UTC)
+        dry_run: Only compute the diff, write nothing
+
+    Returns:
+        Diff against the stored states and per-phase timings
+
+    Example:
+        >>> result = recompute_exercise_states(db_session, dry_run=True)
+        >>> for change in result.changes:
+        ...     print(change.exercise_id, change.field, change.old, change.new)
+    """
+    as_of = today if today is not None else today_utc()
+    timings: dict[str, float] = {}
+
+    with timed(timings, "derive"):
+        derived = _derived_states(db_session, as_of)
+
+    with timed(timings, "diff"):
+        stored = {
+            row.exercise_id: row
+            for row in db_session.execute(
+                select(ExerciseState.id, ExerciseState.exercise_id, *(getattr(ExerciseState, name) for name in RECOMPUTED_FIELDS))
+            )
+        }
+        updates: list[dict[str, Any]] = []
+        inserts: list[dict[str, Any]] = []
+        changes: list[StateChange] = []
+        for exercise_id in sorted(stored.keys() | derived.keys()):
+            current = stored.get(exercise_id)
+            values = derived.get(exercise_id, dict.fromkeys(ROLLING_WINDOWS, 0))
+            if current is not None and values.get("last_practiced_date") is None:
+                # No hot practice up to as_of (only archived or later ones): keep what the history cannot tell
+                values = {
+                    **values,
+                    "last_practiced_date": current.last_practiced_date,
+                    "last_fatigue_profile": current.last_fatigue_profile,
+                }
+            for name in RECOMPUTED_FIELDS:
+                old = current._mapping[name] if current is not None else None
+                if current is None or old != values[name]:
+                    changes.append(StateChange(exercise_id, name, old, values[name]))
+            if current is None:
+                inserts.append({"exercise_id": exercise_id, "mastery_estimate": 0.0, **values, "rolling_as_of": as_of})
+            else:
+                updates.append({"id": current.id, **values, "rolling_as_of": as_of})
+
+    if not dry_run:
+        with timed(timings, "write"):
+            _rebuild_buckets(db_session, as_of)
+            if updates:
+                db_session.execute(update(ExerciseState), updates)
+            if inserts:
+                db_session.execute(insert(ExerciseState), inserts)
+            db_session.expire_all()
+
+    logger.info(
+        "Recomputed %d exercise states as of %s (%d changed fields, %d created%s)",
+        len(updates) + len(inserts),
+        as_of,
+        len(changes),
+        len(inserts),
+        ", dry run" if dry_run else "",
+    )
+    return RecomputeResult(
+        as_of=as_of,
+        states=len(updates) + len(inserts),
+        created=len(inserts),
+        changes=tuple(changes),
+        dry_run=dry_run,
+        timings=timings,
+    )
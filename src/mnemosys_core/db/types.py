@@ -6,7 +6,8 @@ for testing.
 """
 
 import enum
-from typing import Any, cast
+from collections.abc import Callable
+from typing import Any
 
 from sqlalchemy import JSON, String, TypeDecorator
 from sqlalchemy import Enum as SQLEnum
@@ -18,6 +19,10 @@ class JSONEncodedList(TypeDecorator[list[str]]):
     """
     Array type that stores as PostgreSQL ARRAY in production
     and JSON in SQLite for testing.
+
+    Values pass through unchanged: no processors are defined, so
+    SQLAlchemy uses the impl's processors directly instead of wrapping them
+    in a per-cell call.
     """
 
     impl = JSON
@@ -28,19 +33,14 @@ class JSONEncodedList(TypeDecorator[list[str]]):
             return dialect.type_descriptor(postgresql.ARRAY(String))
         return dialect.type_descriptor(JSON())
 
-    def process_bind_param(self, value: list[str] | None, dialect: Dialect) -> list[str] | None:
-        return value
-
-    def process_result_value(self, value: Any, dialect: Dialect) -> list[str] | None:
-        if value is None:
-            return None
-        return cast("list[str]", value)
-
 
 class JSONEncodedDict(TypeDecorator[dict[str, Any]]):
     """
     Dictionary type that stores as PostgreSQL JSONB in production
     and JSON in SQLite for testing.
+
+    Like JSONEncodedList, it defines no per-value hooks, so the engine's
+    JSON codec is the only work done per cell.
     """
 
     impl = JSON
@@ -51,19 +51,17 @@ class JSONEncodedDict(TypeDecorator[dict[str, Any]]):
             return dialect.type_descriptor(postgresql.JSONB())
         return dialect.type_descriptor(JSON())
 
-    def process_bind_param(self, value: dict[str, Any] | None, dialect: Dialect) -> dict[str, Any] | None:
-        return value
-
-    def process_result_value(self, value: Any, dialect: Dialect) -> dict[str, Any] | None:
-        if value is None:
-            return None
-        return cast("dict[str, Any]", value)
-
 
 class DatabaseEnum(TypeDecorator[enum.Enum]):
     """
     Enum type that uses native PostgreSQL ENUM in production
     and VARCHAR in SQLite for testing.
+
+    A lookup table from values (and members) to members is built once per
+    type, and `bind_processor`/`result_processor` return closures that
+    SQLAlchemy caches per dialect: loading a cell is a dict lookup instead
+    of an Enum constructor call, binding one reads the member's `_value_`
+    directly instead of going through `isinstance` and the `value` property.
     """
 
     impl = String
@@ -71,6 +69,7 @@ class DatabaseEnum(TypeDecorator[enum.Enum]):
 
     def __init__(self, enum_class: type[enum.Enum], **kwargs: Any) -> None:
         self.enum_class = enum_class
+        self._member_by_value = _member_lookup(enum_class)
         super().__init__(**kwargs)
 
     def load_dialect_impl(self, dialect: Dialect) -> Any:
@@ -79,23 +78,35 @@ class DatabaseEnum(TypeDecorator[enum.Enum]):
         else:
             return dialect.type_descriptor(String(50))
 
-    def process_bind_param(self, value: enum.Enum | str | None, dialect: Dialect) -> str | None:
-        if value is None:
-            return None
-        if isinstance(value, self.enum_class):
-            return value.value  # type: ignore[no-any-return]
-        return value  # type: ignore[return-value]
+    def bind_processor(self, dialect: Dialect) -> Callable[[Any], Any] | None:
+        def process(value: Any) -> Any:
+            # Members bind their values; strings (and None) pass through unchanged
+            return getattr(value, "_value_", value)
 
-    def process_result_value(self, value: Any, dialect: Dialect) -> enum.Enum | None:
-        if value is None:
-            return None
-        return self.enum_class(value)
+        return _chain(process, self.impl_instance.bind_processor(dialect))
+
+    def result_processor(self, dialect: Dialect, coltype: object) -> Callable[[Any], Any] | None:
+        member_by_value = self._member_by_value
+        enum_class = self.enum_class
+
+        def process(value: Any) -> enum.Enum | None:
+            member = member_by_value.get(value)
+            if member is None and value is not None:
+                # Not a known value: let the Enum raise its usual ValueError
+                return enum_class(value)
+            return member
+
+        return _chain(self.impl_instance.result_processor(dialect, coltype), process)
 
 
 class DatabaseEnumList(TypeDecorator[list[enum.Enum]]):
     """
     Enum list type that uses native PostgreSQL ENUM arrays in production
     and JSON in SQLite for testing.
+
+    Like DatabaseEnum, list elements are converted in cached per-dialect
+    processors: loading uses the value-to-member table, binding reads each
+    member's `_value_` and validates strings against the set of values.
     """
 
     impl = JSON
@@ -103,6 +114,8 @@ class DatabaseEnumList(TypeDecorator[list[enum.Enum]]):
 
     def __init__(self, enum_class: type[enum.Enum], **kwargs: Any) -> None:
         self.enum_class = enum_class
+        self._member_by_value = _member_lookup(enum_class)
+        self._values = frozenset(member.value for member in enum_class)
         super().__init__(**kwargs)
 
     def load_dialect_impl(self, dialect: Dialect) -> Any:
@@ -112,20 +125,59 @@ class DatabaseEnumList(TypeDecorator[list[enum.Enum]]):
             )
         return dialect.type_descriptor(JSON())
 
-    def process_bind_param(
-        self, value: list[enum.Enum] | list[str] | None, dialect: Dialect
-    ) -> list[str] | None:
-        if value is None:
-            return None
-        enum_values = [self._coerce_enum(item).value for item in value]
-        return enum_values
+    def bind_processor(self, dialect: Dialect) -> Callable[[Any], Any] | None:
+        enum_values = self._values
+        coerce_enum = self._coerce_enum
+
+        def process(value: Any) -> list[Any] | None:
+            if value is None:
+                return None
+            item_values = [getattr(item, "_value_", item) for item in value]
+            if not enum_values.issuperset(item_values):
+                # Unknown item: let the Enum raise its usual ValueError
+                return [coerce_enum(item).value for item in value]
+            return item_values
+
+        return _chain(process, self.impl_instance.bind_processor(dialect))
 
-    def process_result_value(self, value: Any, dialect: Dialect) -> list[enum.Enum] | None:
-        if value is None:
-            return None
-        return [self._coerce_enum(item) for item in value]
+    def result_processor(self, dialect: Dialect, coltype: object) -> Callable[[Any], Any] | None:
+        member_by_value = self._member_by_value
+        coerce_enum = self._coerce_enum
+
+        def process(value: Any) -> list[enum.Enum] | None:
+            if value is None:
+                return None
+            try:
+                return [member_by_value[item] for item in value]
+            except KeyError:
+                return [coerce_enum(item) for item in value]
+
+        return _chain(self.impl_instance.result_processor(dialect, coltype), process)
 
     def _coerce_enum(self, value: enum.Enum | str) -> enum.Enum:
         if isinstance(value, self.enum_class):
             return value
         return self.enum_class(value)
+
+
+def _member_lookup(enum_class: type[enum.Enum]) -> dict[Any, enum.Enum]:
+    """Map each value, and each member itself (native ENUM results), to its member."""
+    return {
+        **{member.value: member for member in enum_class},
+        **{member: member for member in enum_class},
+    }
+
+
+def _chain(
+    first: Callable[[Any], Any] | None, second: Callable[[Any], Any] | None
+) -> Callable[[Any], Any] | None:
+    """Compose two optional value processors, applying `first` then `second`."""
+    if first is None:
+        return second
+    if second is None:
+        return first
+
+    def process(value: Any) -> Any:
+        return second(first(value))
+
+    return process
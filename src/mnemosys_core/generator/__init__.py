@@ -0,0 +1,81 @@
+"""
+Deterministic session generator.
+
+Turns the exercise catalog, exercise states and a session request into an
+executable practice session (see docs/project/draft/Session_Generator_Walkthrough.md).
+"""
+
+from .batch import BatchResult, WorkerReport, generate_sessions_batch
+from .candidates import (
+    Candidate,
+    CandidateIndex,
+    CandidateIndexCache,
+    build_candidate_index,
+    index_candidates,
+    instrument_features,
+)
+from .compatibility import CompatibilityIndex, build_compatibility_index
+from .engine import (
+    ExerciseProgress,
+    PlannedBlock,
+    SessionGenerationError,
+    SessionPlan,
+    SessionRequest,
+    need_score,
+    plan_session,
+)
+from .mesocycle import (
+    FailureTrend,
+    PlannedDay,
+    create_mesocycle,
+    load_failure_trend,
+    plan_mesocycle,
+    replan_mesocycle,
+)
+from .plan_cache import PlanKey, SessionPlanCache
+from .rules import BLOCK_RULES, BlockRule, allocate_minutes, session_skeleton
+from .service import (
+    generate_session,
+    load_features_by_instrument,
+    load_instrument_features,
+    load_progress,
+    save_plan,
+)
+
+__all__ = [
+    "BLOCK_RULES",
+    "BatchResult",
+    "BlockRule",
+    "Candidate",
+    "CandidateIndex",
+    "CandidateIndexCache",
+    "CompatibilityIndex",
+    "ExerciseProgress",
+    "FailureTrend",
+    "PlanKey",
+    "PlannedBlock",
+    "PlannedDay",
+    "SessionGenerationError",
+    "SessionPlan",
+    "SessionPlanCache",
+    "SessionRequest",
+    "WorkerReport",
+    "allocate_minutes",
+    "build_candidate_index",
+    "build_compatibility_index",
+    "create_mesocycle",
+    "generate_session",
+    "generate_sessions_batch",
+    "index_candidates",
+    "instrument_features",
+    "load_failure_trend",
+    "load_features_by_instrument",
+    "load_instrument_features",
+    "load_progress",
+    "need_score",
+    "plan_mesocycle",
+    "plan_session",
+    "replan_mesocycle",
+    "save_plan",
+    "session_skeleton",
+]
@@ -0,0 +1,388 @@
+"""
+Batch session generation.
+
+Precomputes one day's session (e.g. tomorrow's, overnight) for every
+instrument. Instruments are split into partitions of consecutive IDs and
+planned on a process pool:
+
+- The parent reads the catalog and every ExerciseState once. States are
+  per exercise, not per instrument, so one bulk read serves every
+  partition. Both are handed to each worker process once, at start-up,
+  and are only read there.
+- Per partition, the parent reads the features of its instruments in one
+  query; workers run `plan_session` without touching the database and
+  return compact rows. Instruments with a mesocycle follow its plan of the
+  day (see `PlannedDay.fit_request`), read for all instruments in one query.
+- The parent writes each partition's practices and exercise instances as
+  two bulk INSERT statements in a transaction of its own, retried on
+  transient errors (see `run_in_transaction`), so an interrupted run keeps
+  the partitions it finished. Instruments that already have a practice on
+  the day are skipped, both when the run starts and when a partition is
+  written, so retries and re-runs resume where the last attempt stopped.
+
+Bulk inserts bypass the rolling minute listeners; the daily buckets are
+rebuilt once at the end (see `rebuild_rolling_minutes`), also when the run
+is interrupted after writing some partitions.
+"""
+
+import multiprocessing
+import os
+import time
+from collections.abc import Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from functools import partial
+from itertools import batched
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..db.models import ExerciseInstance, Instrument, Practice, SessionType
+from ..db.reference_cache import load_reference_snapshot
+from ..db.retry import RetryPolicy, run_in_transaction
+from ..db.rolling_minutes import rebuild_rolling_minutes
+from .candidates import Candidate, CandidateIndex, build_candidate_index, index_candidates
+from .engine import ExerciseProgress, SessionGenerationError, SessionRequest, plan_session
+from .mesocycle import PlannedDay, load_planned_days
+from .service import load_features_by_instrument, load_progress
+
+DEFAULT_BATCH_MINUTES = 45
+DEFAULT_PARTITION_SIZE = 500
+
+# Exercise ID and parameters of one planned block
+type PlannedInstance = tuple[int, dict[str, str | int | float]]
+
+
+@dataclass(frozen=True)
+class PlannedPractice:
+    """
+    Compact plan of one instrument's session, as returned by workers.
+
+    Attributes:
+        instrument_id: Instrument practiced
+        session_type: Intensity of the session
+        total_minutes: Minutes of all blocks
+        instances: Exercise and parameters of each block, in session order
+    """
+
+    instrument_id: int
+    session_type: SessionType
+    total_minutes: int
+    instances: tuple[PlannedInstance, ...]
+
+
+@dataclass(frozen=True)
+class PartitionTask:
+    """
+    Instruments one worker plans in one go.
+
+    Attributes:
+        partition: Partition number
+        session_date: Day the sessions are for
+        session_type: Intensity of the sessions
+        available_minutes: Length of the sessions
+        features_by_instrument: Features of each instrument of the partition
+        planned_days: Mesocycle plan of the day of the instruments that have one
+    """
+
+    partition: int
+    session_date: date
+    session_type: SessionType
+    available_minutes: int
+    features_by_instrument: Mapping[int, frozenset[str]]
+    planned_days: Mapping[int, PlannedDay] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class PartitionPlans:
+    """
+    Plans of one partition.
+
+    Attributes:
+        partition: Partition number
+        worker: Process ID of the worker that planned it
+        practices: Planned sessions
+        unplannable: Instruments no exercise fits
+        seconds: Planning time in the worker
+    """
+
+    partition: int
+    worker: int
+    practices: tuple[PlannedPractice, ...]
+    unplannable: tuple[int, ...]
+    seconds: float
+
+
+@dataclass(frozen=True)
+class WorkerReport:
+    """
+    Throughput of one worker process.
+
+    Attributes:
+        worker: Process ID
+        partitions: Partitions planned
+        sessions: Sessions planned
+        seconds: Planning time
+    """
+
+    worker: int
+    partitions: int
+    sessions: int
+    seconds: float
+
+    @property
+    def sessions_per_second(self) -> float:
+        """Planning throughput of the worker."""
+        return self.sessions / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """
+    Outcome of a batch generation run.
+
+    Attributes:
+        session_date: Day the sessions are for
+        sessions: Practices written
+        instances: Exercise instances written
+        skipped: Instruments that already had a practice on the day
+        unplannable: Instruments no exercise fits
+        workers: Throughput per worker, by process ID
+        timings: Seconds per phase
+    """
+
+    session_date: date
+    sessions: int
+    instances: int
+    skipped: int
+    unplannable: tuple[int, ...]
+    workers: tuple[WorkerReport, ...]
+    timings: dict[str, float]
+
+    @property
+    def sessions_per_second(self) -> float:
+        """Overall throughput, from the first read to the last commit."""
+        seconds = sum(self.timings.values())
+        return self.sessions / seconds if seconds > 0 else 0.0
+
+
+# Read-only state of a worker process, set once by `_init_worker`
+_worker_index: CandidateIndex | None = None
+_worker_progress: Mapping[int, ExerciseProgress] = {}
+
+
+def _init_worker(version: int, catalog: Sequence[Candidate], progress: Mapping[int, ExerciseProgress]) -> None:
+    """Rebuild the candidate index in a worker (mapping proxies do not pickle)."""
+    global _worker_index, _worker_progress
+    _worker_index = index_candidates(version, catalog)
+    _worker_progress = progress
+
+
+def _plan_in_worker(task: PartitionTask) -> PartitionPlans:
+    if _worker_index is None:
+        raise RuntimeError("Worker not initialized")
+    return plan_partition(task, _worker_index, _worker_progress)
+
+
+def plan_partition(
+    task: PartitionTask, candidate_index: CandidateIndex, progress: Mapping[int, ExerciseProgress]
+) -> PartitionPlans:
+    """
+    Plan the sessions of one partition.
+
+    Args:
+        task: Partition to plan
+        candidate_index: Candidates of the catalog
+        progress: Exercise progress by exercise ID
+
+    Returns:
+        Compact plans of the partition
+    """
+    started = time.perf_counter()
+    practices = []
+    unplannable = []
+    for instrument_id, features in sorted(task.features_by_instrument.items()):
+        request = SessionRequest(instrument_id, task.available_minutes, task.session_type, task.session_date)
+        if instrument_id in task.planned_days:
+            request = task.planned_days[instrument_id].fit_request(request)
+        try:
+            plan = plan_session(request, candidate_index, features, progress)
+        except SessionGenerationError:
+            unplannable.append(instrument_id)
+            continue
+        practices.append(
+            PlannedPractice(
+                instrument_id=instrument_id,
+                session_type=request.session_type,
+                total_minutes=plan.total_minutes,
+                instances=tuple((block.exercise_id, block.parameters) for block in plan.blocks),
+            )
+        )
+    return PartitionPlans(
+        partition=task.partition,
+        worker=os.getpid(),
+        practices=tuple(practices),
+        unplannable=tuple(unplannable),
+        seconds=time.perf_counter() - started,
+    )
+
+
+def _plan_partitions(
+    tasks: Sequence[PartitionTask],
+    candidate_index: CandidateIndex,
+    progress: Mapping[int, ExerciseProgress],
+    workers: int | None,
+) -> Iterator[PartitionPlans]:
+    """Plan partitions in task order, on a process pool unless one worker suffices."""
+    worker_count = min(workers if workers is not None else os.cpu_count() or 1, len(tasks))
+    if worker_count <= 1:
+        for task in tasks:
+            yield plan_partition(task, candidate_index, progress)
+        return
+    # Spawned, not forked: forking a multi-threaded parent (e.g. a server) can deadlock
+    with ProcessPoolExecutor(
+        max_workers=worker_count,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(candidate_index.version, candidate_index.catalog, dict(progress)),
+    ) as pool:
+        yield from pool.map(_plan_in_worker, tasks)
+
+
+def _write_partition(db_session: Session, task: PartitionTask, plans: PartitionPlans) -> tuple[int, int]:
+    """Insert a partition's practices and exercise instances; return the practice and instance counts."""
+    if not plans.practices:
+        return 0, 0
+    # A retried or concurrent write may already have planned some instruments
+    planned_ids = set(
+        db_session.scalars(
+            select(Practice.instrument_id).where(
+                Practice.session_date == task.session_date,
+                Practice.instrument_id.in_([practice.instrument_id for practice in plans.practices]),
+            )
+        )
+    )
+    practices = [practice for practice in plans.practices if practice.instrument_id not in planned_ids]
+    if not practices:
+        return 0, 0
+    practice_ids = db_session.scalars(
+        insert(Practice).returning(Practice.id, sort_by_parameter_order=True),
+        [
+            {
+                "instrument_id": practice.instrument_id,
+                "session_date": task.session_date,
+                "session_type": practice.session_type,
+                "total_minutes": practice.total_minutes,
+            }
+            for practice in practices
+        ],
+    ).all()
+    instances = [
+        {
+            "practice_id": practice_id,
+            "exercise_id": exercise_id,
+            "sequence_order": order,
+            "parameters": parameters,
+            "session_date": task.session_date,
+        }
+        for practice_id, practice in zip(practice_ids, practices, strict=True)
+        for order, (exercise_id, parameters) in enumerate(practice.instances, start=1)
+    ]
+    db_session.execute(insert(ExerciseInstance), instances)
+    return len(practices), len(instances)
+
+
+def generate_sessions_batch(
+    session_factory: sessionmaker[Session],
+    session_date: date,
+    available_minutes: int = DEFAULT_BATCH_MINUTES,
+    session_type: SessionType = SessionType.NORMAL,
+    workers: int | None = None,
+    partition_size: int = DEFAULT_PARTITION_SIZE,
+    retry_policy: RetryPolicy | None = None,
+) -> BatchResult:
+    """
+    Generate and save one session per instrument for a day.
+
+    Args:
+        session_factory: Session factory
+        session_date: Day the sessions are for
+        available_minutes: Length of the sessions (at most the planned day's target for instruments with a mesocycle)
+        session_type: Intensity of the sessions (the planned day's for instruments with a mesocycle)
+        workers: Worker processes (defaults to the CPU count; 1 plans in this process)
+        partition_size: Instruments per partition
+        retry_policy: Retry bounds for failed partition writes (defaults to RetryPolicy())
+
+    Returns:
+        Counts, per-worker throughput and phase timings
+    """
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    with session_factory() as db_session:
+        candidate_index = build_candidate_index(load_reference_snapshot(db_session, 0, time.monotonic()))
+        progress = load_progress(db_session)
+        planned_ids = set(db_session.scalars(select(Practice.instrument_id).where(Practice.session_date == session_date)))
+        instrument_ids = [
+            instrument_id
+            for instrument_id in db_session.scalars(select(Instrument.id).order_by(Instrument.id))
+            if instrument_id not in planned_ids
+        ]
+        skipped = len(planned_ids)
+        planned_days = load_planned_days(db_session, session_date)
+        partition_tasks = [
+            PartitionTask(
+                partition=partition,
+                session_date=session_date,
+                session_type=session_type,
+                available_minutes=available_minutes,
+                features_by_instrument=load_features_by_instrument(db_session, partition_ids),
+                planned_days={
+                    instrument_id: planned_days[instrument_id]
+                    for instrument_id in partition_ids
+                    if instrument_id in planned_days
+                },
+            )
+            for partition, partition_ids in enumerate(batched(instrument_ids, partition_size, strict=False))
+        ]
+    timings["load"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    sessions = instances = 0
+    unplannable: list[int] = []
+    by_worker: dict[int, list[PartitionPlans]] = {}
+    try:
+        planned = _plan_partitions(partition_tasks, candidate_index, progress, workers)
+        for task, plans in zip(partition_tasks, planned, strict=True):
+            written_sessions, written_instances = run_in_transaction(
+                session_factory, partial(_write_partition, task=task, plans=plans), retry_policy
+            )
+            sessions += written_sessions
+            instances += written_instances
+            unplannable.extend(plans.unplannable)
+            by_worker.setdefault(plans.worker, []).append(plans)
+        timings["generate"] = time.perf_counter() - started
+    finally:
+        # Partitions already committed are kept, so their windows are rebuilt even if a later one failed
+        started = time.perf_counter()
+        if sessions:
+            run_in_transaction(session_factory, rebuild_rolling_minutes, retry_policy)
+        timings["windows"] = time.perf_counter() - started
+
+    return BatchResult(
+        session_date=session_date,
+        sessions=sessions,
+        instances=instances,
+        skipped=skipped,
+        unplannable=tuple(sorted(unplannable)),
+        workers=tuple(
+            WorkerReport(
+                worker=worker,
+                partitions=len(plans),
+                sessions=sum(len(partition.practices) for partition in plans),
+                seconds=sum(partition.seconds for partition in plans),
+            )
+            for worker, plans in sorted(by_worker.items())
+        ),
+        timings=timings,
+    )
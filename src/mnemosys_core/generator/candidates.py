@@ -0,0 +1,199 @@
+"""
+Candidate indexes of the session generator.
+
+Which exercises may fill a SessionBlock depends only on the exercise
+catalog: their domains, required instrument features and overload
+dimensions. A CandidateIndex precomputes, once per reference snapshot, the
+catalog's compatibility bitmasks (see `compatibility`) and the mask of
+every block type, so generating a session intersects a few integers instead
+of querying or scanning the catalog per block. CandidateIndexCache rebuilds
+the index whenever the reference data cache hands out a new snapshot (after
+catalog or association writes, or its TTL).
+"""
+
+import threading
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from ..db.models import BlockType, DomainType
+from ..db.reference_cache import ReferenceDataCache, ReferenceSnapshot
+from .compatibility import CompatibilityIndex, build_compatibility_index, positions
+from .rules import BLOCK_RULES
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """
+    Exercise as seen by the generator.
+
+    Attributes:
+        exercise_id: Exercise ID
+        name: Exercise name
+        domains: Domains of the exercise
+        required_features: Instrument features of which the instrument needs
+            at least one (empty for any instrument)
+        overload_dimensions: Names of the supported overload dimensions, sorted
+        technique_ids: Techniques the exercise is tagged with
+    """
+
+    exercise_id: int
+    name: str
+    domains: frozenset[DomainType]
+    required_features: frozenset[str]
+    overload_dimensions: tuple[str, ...]
+    technique_ids: frozenset[int] = frozenset()
+
+
+@dataclass(frozen=True)
+class CandidateIndex:
+    """
+    Candidates of every block type for one catalog version.
+
+    Attributes:
+        version: Reference snapshot version the index was built from
+        catalog: All exercises ordered by exercise ID; bit i of a mask is catalog[i]
+        compatibility: Bitmasks of the catalog
+        block_masks: Mask of the candidates of each block type
+    """
+
+    version: int
+    catalog: tuple[Candidate, ...]
+    compatibility: CompatibilityIndex
+    block_masks: Mapping[BlockType, int]
+
+    def block_mask(self, block_type: BlockType, instrument_features: frozenset[str]) -> int:
+        """
+        Mask of the candidates of a block that an instrument can play.
+
+        Args:
+            block_type: Block to fill
+            instrument_features: Features of the instrument (see `instrument_features`)
+
+        Returns:
+            Candidate mask
+        """
+        return self.block_masks[block_type] & self.compatibility.compatible(instrument_features)
+
+    def candidates(self, block_type: BlockType, instrument_features: frozenset[str]) -> tuple[Candidate, ...]:
+        """
+        Candidates of a block that an instrument can play.
+
+        Args:
+            block_type: Block to fill
+            instrument_features: Features of the instrument (see `instrument_features`)
+
+        Returns:
+            Candidates ordered by exercise ID
+        """
+        return self.select(self.block_mask(block_type, instrument_features))
+
+    def select(self, mask: int) -> tuple[Candidate, ...]:
+        """Candidates of a mask, ordered by exercise ID."""
+        return tuple(self.catalog[position] for position in positions(mask))
+
+
+def instrument_features(
+    instrument_type: str, technique_names: Iterable[str], string_count: int | None = None
+) -> frozenset[str]:
+    """
+    Features an instrument offers to `Exercise.instrument_compatibility`.
+
+    Features are lower case: the instrument type (e.g. "stringed"), the
+    names of its techniques and, for stringed instruments, e.g. "6-string".
+
+    Args:
+        instrument_type: Polymorphic instrument type
+        technique_names: Names of the instrument's techniques
+        string_count: String count of stringed instruments
+
+    Returns:
+        Feature names
+    """
+    features = {instrument_type.lower(), *(name.lower() for name in technique_names)}
+    if string_count is not None:
+        features.add(f"{string_count}-string")
+    return frozenset(features)
+
+
+def build_candidate_index(snapshot: ReferenceSnapshot) -> CandidateIndex:
+    """
+    Precompute the candidates of every block type from a reference snapshot.
+
+    Args:
+        snapshot: Reference data snapshot
+
+    Returns:
+        Candidate index stamped with the snapshot version
+    """
+    candidates = [
+        Candidate(
+            exercise_id=exercise.id,
+            name=exercise.name,
+            domains=frozenset(exercise.domains),
+            required_features=frozenset(feature.lower() for feature in exercise.instrument_compatibility or ()),
+            overload_dimensions=tuple(
+                sorted(
+                    snapshot.overload_dimension_by_id[dimension_id].name
+                    for dimension_id in exercise.overload_dimension_ids
+                    if dimension_id in snapshot.overload_dimension_by_id
+                )
+            ),
+            technique_ids=frozenset(exercise.technique_ids),
+        )
+        for exercise in snapshot.exercises
+    ]
+    return index_candidates(snapshot.version, candidates)
+
+
+def index_candidates(version: int, candidates: Sequence[Candidate]) -> CandidateIndex:
+    """
+    Precompute the masks of every block type.
+
+    Args:
+        version: Catalog version to stamp on the index
+        candidates: All exercises (ordered by exercise ID in the result)
+
+    Returns:
+        Candidate index
+    """
+    catalog = tuple(sorted(candidates, key=lambda candidate: candidate.exercise_id))
+    compatibility = build_compatibility_index(catalog)
+    return CandidateIndex(
+        version=version,
+        catalog=catalog,
+        compatibility=compatibility,
+        block_masks=MappingProxyType(
+            {block_type: compatibility.in_domains(rule.domains) for block_type, rule in BLOCK_RULES.items()}
+        ),
+    )
+
+
+class CandidateIndexCache:
+    """
+    Candidate index kept in step with the reference data cache.
+
+    Example:
+        >>> candidate_cache = CandidateIndexCache(reference_cache)
+        >>> candidates = candidate_cache.get().candidates(BlockType.TECHNIQUE, features)
+    """
+
+    def __init__(self, reference_cache: ReferenceDataCache) -> None:
+        self._reference_cache = reference_cache
+        self._lock = threading.Lock()
+        self._snapshot: ReferenceSnapshot | None = None
+        self._index: CandidateIndex | None = None
+
+    def get(self) -> CandidateIndex:
+        """
+        Return the index of the current reference snapshot, building it if needed.
+
+        Returns:
+            Candidate index
+        """
+        snapshot = self._reference_cache.get()
+        with self._lock:
+            if self._index is None or self._snapshot is not snapshot:
+                self._index = build_candidate_index(snapshot)
+                self._snapshot = snapshot
+            return self._index
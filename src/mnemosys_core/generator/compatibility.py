@@ -0,0 +1,133 @@
+"""
+Bitset compatibility index of the exercise catalog.
+
+Every exercise gets one bit, by position in exercise ID order. For each
+domain, instrument feature and technique the index holds the mask of the
+exercises carrying it, so filtering the whole catalog is a handful of
+bitwise operations on Python integers (arbitrary width) instead of a loop
+over exercises. Counting a mask is a popcount (`int.bit_count`), so
+callers that only need how many exercises match do not decode it:
+
+    mask = index.in_domains({DomainType.TECHNIQUE}) & index.compatible(features) & ~excluded
+    matches = index.count(mask)
+    exercise_ids = index.exercise_ids(mask)
+
+Masks of per-request exercise sets, such as exercises still recovering
+from F2 work, are made with `mask_of` and combined the same way.
+"""
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+from ..db.models import DomainType
+
+if TYPE_CHECKING:
+    from .candidates import Candidate
+
+
+@dataclass(frozen=True)
+class CompatibilityIndex:
+    """
+    Catalog attributes as exercise bitmasks.
+
+    Attributes:
+        ids: Exercise ID of each bit position, ascending
+        position_by_id: Bit position of each exercise ID
+        all_mask: Mask of every exercise
+        unrestricted_mask: Exercises playable on any instrument
+        domain_masks: Exercises per domain
+        feature_masks: Exercises per required instrument feature
+        technique_masks: Exercises per technique ID
+    """
+
+    ids: tuple[int, ...]
+    position_by_id: Mapping[int, int]
+    all_mask: int
+    unrestricted_mask: int
+    domain_masks: Mapping[DomainType, int]
+    feature_masks: Mapping[str, int]
+    technique_masks: Mapping[int, int]
+
+    def compatible(self, instrument_features: Iterable[str]) -> int:
+        """Mask of the exercises an instrument with these features can play."""
+        mask = self.unrestricted_mask
+        for feature in instrument_features:
+            mask |= self.feature_masks.get(feature, 0)
+        return mask
+
+    def in_domains(self, domains: Iterable[DomainType]) -> int:
+        """Mask of the exercises in any of the domains."""
+        mask = 0
+        for domain in domains:
+            mask |= self.domain_masks.get(domain, 0)
+        return mask
+
+    def with_techniques(self, technique_ids: Iterable[int]) -> int:
+        """Mask of the exercises tagged with any of the techniques."""
+        mask = 0
+        for technique_id in technique_ids:
+            mask |= self.technique_masks.get(technique_id, 0)
+        return mask
+
+    def mask_of(self, exercise_ids: Iterable[int]) -> int:
+        """Mask of exercises by ID; IDs outside the catalog are ignored."""
+        mask = 0
+        for exercise_id in exercise_ids:
+            position = self.position_by_id.get(exercise_id)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def count(self, mask: int) -> int:
+        """Number of exercises in a mask."""
+        return mask.bit_count()
+
+    def exercise_ids(self, mask: int) -> tuple[int, ...]:
+        """Exercise IDs of a mask, ascending."""
+        return tuple(self.ids[position] for position in positions(mask))
+
+
+def positions(mask: int) -> Iterator[int]:
+    """Yield the set bit positions of a mask, lowest first."""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def build_compatibility_index(candidates: Sequence["Candidate"]) -> CompatibilityIndex:
+    """
+    Encode the catalog as bitmasks.
+
+    Args:
+        candidates: Exercises ordered by exercise ID; bit i is candidates[i]
+
+    Returns:
+        Compatibility index
+    """
+    unrestricted_mask = 0
+    domain_masks: dict[DomainType, int] = {}
+    feature_masks: dict[str, int] = {}
+    technique_masks: dict[int, int] = {}
+    for position, candidate in enumerate(candidates):
+        bit = 1 << position
+        if not candidate.required_features:
+            unrestricted_mask |= bit
+        for domain in candidate.domains:
+            domain_masks[domain] = domain_masks.get(domain, 0) | bit
+        for feature in candidate.required_features:
+            feature_masks[feature] = feature_masks.get(feature, 0) | bit
+        for technique_id in candidate.technique_ids:
+            technique_masks[technique_id] = technique_masks.get(technique_id, 0) | bit
+    ids = tuple(candidate.exercise_id for candidate in candidates)
+    return CompatibilityIndex(
+        ids=ids,
+        position_by_id=MappingProxyType({exercise_id: position for position, exercise_id in enumerate(ids)}),
+        all_mask=(1 << len(candidates)) - 1,
+        unrestricted_mask=unrestricted_mask,
+        domain_masks=MappingProxyType(domain_masks),
+        feature_masks=MappingProxyType(feature_masks),
+        technique_masks=MappingProxyType(technique_masks),
+    )
@@ -0,0 +1,357 @@
+"""
+Deterministic session generation.
+
+`plan_session` turns a SessionRequest, the candidate index and the progress
+of each exercise into an executable SessionPlan, following the Session
+Generator Walkthrough:
+
+1. Build the block skeleton from the time available.
+2. For each block, take the candidates the instrument can play, drop
+   exercises already in the session, and drop exercises still recovering
+   from F2 work when the block would be F2 (if none is left, the block is
+   downgraded to F1 instead).
+3. Select the highest-need candidate: need grows with days since the last
+   practice, missing recent volume and missing mastery, scaled by the goal
+   weight of the exercise's domains. Ties go to the lower exercise ID.
+4. Assign overload: one primary dimension is progressed, held or regressed
+   depending on recent failures and the session type; it is the request's
+   overload emphasis (e.g. from the mesocycle phase) when the exercise has
+   it, and otherwise rotates daily. Every setting is clamped to the block's
+   bounds.
+
+Candidate sets are bitmasks of the catalog (see `compatibility`), so each
+filter is one bitwise operation. Blocks nothing can fill are skipped and
+their minutes go to the other blocks. Plans depend on nothing but the inputs, so the same inputs always
+give the same plan; no database access happens here.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import date
+
+from ..db.models import SESSION_FATIGUE, BlockType, DomainType, FatigueProfile, SessionType
+from .candidates import Candidate, CandidateIndex
+from .rules import (
+    BLOCK_RULES,
+    BlockRule,
+    allocate_minutes,
+    lower_fatigue,
+    session_skeleton,
+)
+
+# Need model
+RECENCY_HORIZON_DAYS = 28
+TARGET_MINUTES_28D = 120
+RECENCY_WEIGHT = 0.5
+VOLUME_WEIGHT = 0.3
+MASTERY_WEIGHT = 0.2
+
+# Exercises with F2 work this recently are kept out of F2 blocks
+RECOVERY_DAYS = 2
+
+TEMPO_DIMENSION = "tempo"
+COMPLEXITY_DIMENSION = "complexity"
+DURATION_DIMENSION = "duration"
+TEMPO_STEP = 4
+
+type ParameterValue = str | int | float
+
+
+class SessionGenerationError(Exception):
+    """Raised when no block of a session can be filled."""
+
+
+@dataclass(frozen=True)
+class SessionRequest:
+    """
+    Inputs of one generated session.
+
+    Attributes:
+        instrument_id: Instrument practiced
+        available_minutes: Session length
+        session_type: Intensity of the session
+        session_date: Day the session is for
+        goal_weights: Emphasis per domain (1.0 when missing)
+        overload: Overload dimension to progress where an exercise has it (rotates daily when None)
+    """
+
+    instrument_id: int
+    available_minutes: int
+    session_type: SessionType
+    session_date: date
+    goal_weights: Mapping[DomainType, float] = field(default_factory=dict)
+    overload: str | None = None
+
+
+@dataclass(frozen=True)
+class ExerciseProgress:
+    """
+    State of an exercise the generator reads (see ExerciseState).
+
+    Attributes:
+        last_practiced_date: Most recent practice date
+        rolling_minutes_28d: Minutes in the last 28 days
+        mastery_estimate: Skill level from 0.0 to 1.0
+        failure_streak: Consecutive failed outcomes logged most recently
+        last_fatigue_profile: Fatigue profile of the latest practice
+    """
+
+    last_practiced_date: date | None = None
+    rolling_minutes_28d: int = 0
+    mastery_estimate: float = 0.0
+    failure_streak: int = 0
+    last_fatigue_profile: FatigueProfile | None = None
+
+
+# Cold start: never practiced, no mastery
+NO_PROGRESS = ExerciseProgress()
+
+
+@dataclass(frozen=True)
+class PlannedBlock:
+    """
+    One executable block of a session plan.
+
+    Attributes:
+        block_type: SessionBlock
+        exercise_id: Selected exercise
+        exercise_name: Name of the selected exercise
+        duration_minutes: Minutes of the block
+        fatigue_profile: Fatigue profile of the variant
+        primary_overload: Overload dimension progressed, held or regressed
+        parameters: Concrete variant (duration, tempo, levels, ...)
+        instructions: Human-readable instructions
+        focus_cues: What to pay attention to
+        stop_conditions: When to stop or regress
+        reasons: Why this exercise was selected
+    """
+
+    block_type: BlockType
+    exercise_id: int
+    exercise_name: str
+    duration_minutes: int
+    fatigue_profile: FatigueProfile
+    primary_overload: str | None
+    parameters: dict[str, ParameterValue]
+    instructions: str
+    focus_cues: tuple[str, ...]
+    stop_conditions: tuple[str, ...]
+    reasons: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class SessionPlan:
+    """
+    Generated session.
+
+    Attributes:
+        request: Inputs the plan was generated from
+        blocks: Blocks in session order
+        skipped_blocks: Blocks of the skeleton no exercise could fill
+        catalog_version: Candidate index version used
+    """
+
+    request: SessionRequest
+    blocks: tuple[PlannedBlock, ...]
+    skipped_blocks: tuple[BlockType, ...]
+    catalog_version: int
+
+    @property
+    def total_minutes(self) -> int:
+        """Minutes of all blocks."""
+        return sum(block.duration_minutes for block in self.blocks)
+
+
+def need_score(candidate: Candidate, progress: ExerciseProgress, request: SessionRequest) -> float:
+    """
+    Score how much an exercise needs practice on the requested day.
+
+    Args:
+        candidate: Exercise
+        progress: Its state
+        request: Session inputs (day and goal weights)
+
+    Returns:
+        Non-negative score; higher is needier
+    """
+    if progress.last_practiced_date is None:
+        recency = 1.0
+    else:
+        days = (request.session_date - progress.last_practiced_date).days
+        recency = min(max(days, 0), RECENCY_HORIZON_DAYS) / RECENCY_HORIZON_DAYS
+    volume = 1.0 - min(progress.rolling_minutes_28d / TARGET_MINUTES_28D, 1.0)
+    mastery_gap = 1.0 - min(max(progress.mastery_estimate, 0.0), 1.0)
+    weight = max(max(request.goal_weights.get(domain, 1.0), 0.0) for domain in candidate.domains)
+    return weight * (RECENCY_WEIGHT * recency + VOLUME_WEIGHT * volume + MASTERY_WEIGHT * mastery_gap)
+
+
+def _reasons(candidate: Candidate, progress: ExerciseProgress, request: SessionRequest) -> tuple[str, ...]:
+    if progress.last_practiced_date is None:
+        recency = "never practiced"
+    else:
+        recency = f"last practiced {(request.session_date - progress.last_practiced_date).days} day(s) ago"
+    reasons = [
+        recency,
+        f"{progress.rolling_minutes_28d} min in the last 28 days",
+        f"mastery {progress.mastery_estimate:.2f}",
+    ]
+    weights = {request.goal_weights[domain] for domain in candidate.domains if domain in request.goal_weights}
+    if weights:
+        reasons.append(f"goal weight {max(weights):g}")
+    if progress.failure_streak:
+        reasons.append(f"{progress.failure_streak} failed attempt(s) in a row")
+    return tuple(reasons)
+
+
+def _is_recovering(progress: ExerciseProgress, session_date: date) -> bool:
+    return (
+        progress.last_fatigue_profile is FatigueProfile.F2
+        and progress.last_practiced_date is not None
+        and (session_date - progress.last_practiced_date).days < RECOVERY_DAYS
+    )
+
+
+def _overload_direction(progress: ExerciseProgress, session_type: SessionType) -> int:
+    """+1 to progress, 0 to hold, -1 to regress the primary dimension."""
+    if progress.failure_streak >= 2 or session_type is SessionType.DELOAD:
+        return -1
+    if progress.failure_streak == 1 or session_type is SessionType.LIGHT:
+        return 0
+    return 1
+
+
+def _variant(
+    candidate: Candidate,
+    progress: ExerciseProgress,
+    rule: BlockRule,
+    minutes: int,
+    fatigue: FatigueProfile,
+    request: SessionRequest,
+) -> tuple[str | None, dict[str, ParameterValue], str]:
+    """Concrete parameters of a block, its primary overload dimension and a description."""
+    mastery = min(max(progress.mastery_estimate, 0.0), 1.0)
+    dimensions = [dimension for dimension in candidate.overload_dimensions if dimension != DURATION_DIMENSION]
+    if request.overload in dimensions:
+        primary = request.overload
+    elif dimensions:
+        primary = dimensions[request.session_date.toordinal() % len(dimensions)]
+    else:
+        primary = None
+    direction = _overload_direction(progress, request.session_type)
+
+    parameters: dict[str, ParameterValue] = {
+        "block": rule.block_type.value,
+        "duration": minutes,
+        "fatigue": fatigue.value,
+    }
+    details = []
+    for dimension in dimensions:
+        step = direction if dimension == primary else 0
+        if dimension == TEMPO_DIMENSION:
+            low, high = rule.tempo_bounds
+            if request.session_type is SessionType.DELOAD:
+                high = low + (high - low) // 2
+            tempo = low + round(mastery * (high - low) / TEMPO_STEP) * TEMPO_STEP + step * TEMPO_STEP
+            parameters[dimension] = min(max(tempo, low), high)
+            details.append(f"at {parameters[dimension]} bpm")
+        else:
+            low, high = rule.level_bounds
+            if request.session_type is SessionType.DELOAD:
+                high = low + (high - low) // 2
+            level = low + round(mastery * (high - low)) + step
+            parameters[dimension] = min(max(level, low), high)
+            details.append(f"{dimension} level {parameters[dimension]}")
+    if primary is not None:
+        parameters["overload"] = primary
+
+    description = f"{rule.intent} Play {candidate.name} for {minutes} min"
+    if details:
+        description += " " + ", ".join(details)
+    if primary is not None:
+        change = {1: "progress", 0: "hold", -1: "step back"}[direction]
+        description += f"; {change} {primary} only"
+    return primary, parameters, description + "."
+
+
+def plan_session(
+    request: SessionRequest,
+    candidate_index: CandidateIndex,
+    instrument_features: frozenset[str],
+    progress: Mapping[int, ExerciseProgress],
+) -> SessionPlan:
+    """
+    Generate a session plan.
+
+    Args:
+        request: Session inputs
+        candidate_index: Candidates of the current catalog
+        instrument_features: Features of the instrument (see `instrument_features`)
+        progress: Exercise progress by exercise ID (missing exercises start cold)
+
+    Returns:
+        Executable session plan
+
+    Raises:
+        SessionGenerationError: No exercise fits any block of the session
+    """
+    selected: list[tuple[BlockType, Candidate, FatigueProfile]] = []
+    skipped: list[BlockType] = []
+    used = 0
+    compatible = candidate_index.compatibility.compatible(instrument_features)
+    recovering = candidate_index.compatibility.mask_of(
+        exercise_id
+        for exercise_id, exercise_progress in progress.items()
+        if _is_recovering(exercise_progress, request.session_date)
+    )
+    for block_type in session_skeleton(request.available_minutes):
+        rule = BLOCK_RULES[block_type]
+        fatigue = lower_fatigue(rule.max_fatigue, SESSION_FATIGUE[request.session_type])
+        mask = candidate_index.block_masks[block_type] & compatible & ~used
+        if fatigue is FatigueProfile.F2:
+            if mask & ~recovering:
+                mask &= ~recovering
+            else:
+                fatigue = FatigueProfile.F1
+        if not mask:
+            skipped.append(block_type)
+            continue
+        candidates = candidate_index.select(mask)
+        best = min(
+            candidates,
+            key=lambda candidate: (
+                -need_score(candidate, progress.get(candidate.exercise_id, NO_PROGRESS), request),
+                candidate.exercise_id,
+            ),
+        )
+        used |= candidate_index.compatibility.mask_of((best.exercise_id,))
+        selected.append((block_type, best, fatigue))
+
+    if not selected:
+        raise SessionGenerationError("No exercise in the catalog fits this instrument and session")
+
+    blocks = []
+    minutes = allocate_minutes([block_type for block_type, _, _ in selected], request.available_minutes)
+    for (block_type, candidate, fatigue), block_minutes in zip(selected, minutes, strict=True):
+        rule = BLOCK_RULES[block_type]
+        exercise_progress = progress.get(candidate.exercise_id, NO_PROGRESS)
+        primary, parameters, instructions = _variant(
+            candidate, exercise_progress, rule, block_minutes, fatigue, request
+        )
+        blocks.append(
+            PlannedBlock(
+                block_type=block_type,
+                exercise_id=candidate.exercise_id,
+                exercise_name=candidate.name,
+                duration_minutes=block_minutes,
+                fatigue_profile=fatigue,
+                primary_overload=primary,
+                parameters=parameters,
+                instructions=instructions,
+                focus_cues=rule.focus_cues,
+                stop_conditions=rule.stop_conditions,
+                reasons=_reasons(candidate, exercise_progress, request),
+            )
+        )
+    return SessionPlan(
+        request=request, blocks=tuple(blocks), skipped_blocks=tuple(skipped), catalog_version=candidate_index.version
+    )
@@ -0,0 +1,484 @@
+"""
+Mesocycle planning.
+
+A mesocycle lays out weeks of sessions in three phases (see
+docs/project/draft/Mesocycle_Deload_Strategy.md):
+
+- Accumulation (3-5 weeks): volume rises week over week through session
+  duration; F1 work dominates, with one F2 (heavy) day a week.
+- Intensification (1-2 weeks): volume holds slightly below the accumulation
+  peak while tempo and complexity carry the overload; F2 work is selective.
+- Deload (1 week): reduced volume and no F2 work; every day is a deload
+  session.
+
+`plan_mesocycle` assigns every day a SessionType, a volume target and an
+overload emphasis, which become the generator's SessionRequest on the day
+(see `PlannedDay.session_request`; session generation fits requests for
+instruments with a planned day to it, see `PlannedDay.fit_request`). Plans
+are pure functions of their inputs; `create_mesocycle` persists them as
+Mesocycle rows.
+
+Transitions are explicit. When logged outcomes show a rising failure rate
+(see `load_failure_trend`), `replan_mesocycle` steps down the sessions of
+the next week only, heavy to normal and normal to light with less volume,
+and leaves past days, deload days and days re-planned before as they are.
+"""
+
+from collections.abc import Collection, Mapping, Sequence
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from types import MappingProxyType
+
+from sqlalchemy import insert, select, union_all
+from sqlalchemy.orm import Session
+
+from ..db.mastery import OUTCOME_FAILURE, classify_outcome
+from ..db.models import (
+    ExerciseInstance,
+    ExerciseLog,
+    Mesocycle,
+    MesocycleDay,
+    MesocyclePhase,
+    Practice,
+    PracticeBlock,
+    PracticeBlockLog,
+    SessionType,
+)
+from .engine import COMPLEXITY_DIMENSION, DURATION_DIMENSION, TEMPO_DIMENSION, SessionRequest
+from .rules import MAX_SESSION_MINUTES, MIN_SESSION_MINUTES
+
+ACCUMULATION_WEEKS = range(3, 6)
+INTENSIFICATION_WEEKS = range(1, 3)
+DELOAD_WEEKS = 1
+DAYS_PER_WEEK = 7
+
+# Session types of each day of a week, by phase
+WEEK_PATTERNS: Mapping[MesocyclePhase, tuple[SessionType, ...]] = MappingProxyType(
+    {
+        MesocyclePhase.ACCUMULATION: (
+            SessionType.NORMAL,
+            SessionType.NORMAL,
+            SessionType.LIGHT,
+            SessionType.NORMAL,
+            SessionType.HEAVY,
+            SessionType.NORMAL,
+            SessionType.LIGHT,
+        ),
+        MesocyclePhase.INTENSIFICATION: (
+            SessionType.HEAVY,
+            SessionType.NORMAL,
+            SessionType.LIGHT,
+            SessionType.HEAVY,
+            SessionType.NORMAL,
+            SessionType.NORMAL,
+            SessionType.LIGHT,
+        ),
+        MesocyclePhase.DELOAD: (SessionType.DELOAD,) * DAYS_PER_WEEK,
+    }
+)
+
+# Overload emphasis of each phase, alternating day by day within the phase;
+# accumulation progresses through the volume targets themselves
+PHASE_OVERLOAD: Mapping[MesocyclePhase, tuple[str, ...]] = MappingProxyType(
+    {
+        MesocyclePhase.ACCUMULATION: (DURATION_DIMENSION,),
+        MesocyclePhase.INTENSIFICATION: (TEMPO_DIMENSION, COMPLEXITY_DIMENSION),
+        MesocyclePhase.DELOAD: (),
+    }
+)
+
+# Volume model, as fractions of the base minutes or of the week's target
+ACCUMULATION_STEP = 0.1
+INTENSIFICATION_VOLUME = 0.9
+DELOAD_VOLUME = 0.6
+LIGHT_DAY_VOLUME = 0.6
+
+# Re-planning
+FAILURE_WINDOW_DAYS = 7
+BASELINE_WINDOW_DAYS = 21
+MIN_OUTCOMES = 5
+FAILURE_RATE_THRESHOLD = 0.3
+FAILURE_RATE_RISE = 0.1
+REPLAN_HORIZON_DAYS = 7
+REPLAN_VOLUME = 0.8
+
+STEP_DOWN: Mapping[SessionType, SessionType] = MappingProxyType(
+    {
+        SessionType.HEAVY: SessionType.NORMAL,
+        SessionType.NORMAL: SessionType.LIGHT,
+        SessionType.LIGHT: SessionType.LIGHT,
+        SessionType.DELOAD: SessionType.DELOAD,
+    }
+)
+
+
+@dataclass(frozen=True)
+class PlannedDay:
+    """
+    Planned session of one day.
+
+    Attributes:
+        day: Date of the session
+        phase: Phase the day belongs to
+        session_type: Intensity of the session
+        target_minutes: Volume target of the session
+        overload: Overload dimension emphasized on the day, if any
+    """
+
+    day: date
+    phase: MesocyclePhase
+    session_type: SessionType
+    target_minutes: int
+    overload: str | None
+
+    def session_request(self, instrument_id: int) -> SessionRequest:
+        """Generator inputs of the day's session."""
+        return SessionRequest(
+            instrument_id=instrument_id,
+            available_minutes=self.target_minutes,
+            session_type=self.session_type,
+            session_date=self.day,
+            overload=self.overload,
+        )
+
+    def fit_request(self, request: SessionRequest) -> SessionRequest:
+        """Follow the day's session type and overload, within the day's volume target."""
+        return replace(
+            request,
+            available_minutes=min(request.available_minutes, self.target_minutes),
+            session_type=self.session_type,
+            overload=self.overload,
+        )
+
+
+@dataclass(frozen=True)
+class FailureTrend:
+    """
+    Failure rates of the logged outcomes of an instrument.
+
+    Attributes:
+        recent_outcomes: Outcomes logged in the last FAILURE_WINDOW_DAYS days
+        recent_failures: Failures among them
+        baseline_outcomes: Outcomes logged in the BASELINE_WINDOW_DAYS days before
+        baseline_failures: Failures among them
+    """
+
+    recent_outcomes: int
+    recent_failures: int
+    baseline_outcomes: int
+    baseline_failures: int
+
+    @property
+    def recent_rate(self) -> float:
+        """Share of recent outcomes that failed."""
+        return self.recent_failures / self.recent_outcomes if self.recent_outcomes else 0.0
+
+    @property
+    def baseline_rate(self) -> float:
+        """Share of baseline outcomes that failed."""
+        return self.baseline_failures / self.baseline_outcomes if self.baseline_outcomes else 0.0
+
+    @property
+    def rising(self) -> bool:
+        """Whether enough recent outcomes fail, and more often than before, to re-plan."""
+        return (
+            self.recent_outcomes >= MIN_OUTCOMES
+            and self.recent_rate >= FAILURE_RATE_THRESHOLD
+            and self.recent_rate - self.baseline_rate >= FAILURE_RATE_RISE
+        )
+
+
+def _clamp_minutes(minutes: float) -> int:
+    return min(max(round(minutes), MIN_SESSION_MINUTES), MAX_SESSION_MINUTES)
+
+
+def phase_weeks(accumulation_weeks: int, intensification_weeks: int) -> tuple[MesocyclePhase, ...]:
+    """
+    Phase of each week of a mesocycle.
+
+    Args:
+        accumulation_weeks: Weeks of accumulation (3-5)
+        intensification_weeks: Weeks of intensification (1-2)
+
+    Returns:
+        Phases in week order, ending with the deload
+
+    Raises:
+        ValueError: A phase length is out of range
+    """
+    if accumulation_weeks not in ACCUMULATION_WEEKS:
+        raise ValueError(f"Accumulation lasts 3 to 5 weeks, not {accumulation_weeks}")
+    if intensification_weeks not in INTENSIFICATION_WEEKS:
+        raise ValueError(f"Intensification lasts 1 to 2 weeks, not {intensification_weeks}")
+    return (
+        (MesocyclePhase.ACCUMULATION,) * accumulation_weeks
+        + (MesocyclePhase.INTENSIFICATION,) * intensification_weeks
+        + (MesocyclePhase.DELOAD,) * DELOAD_WEEKS
+    )
+
+
+def plan_mesocycle(
+    start_date: date, base_minutes: int, accumulation_weeks: int = 4, intensification_weeks: int = 1
+) -> tuple[PlannedDay, ...]:
+    """
+    Lay out the sessions of a mesocycle.
+
+    Accumulation week w (from 0) targets base_minutes * (1 + ACCUMULATION_STEP * w);
+    intensification targets INTENSIFICATION_VOLUME of the accumulation peak and
+    the deload DELOAD_VOLUME of the base. Light days get LIGHT_DAY_VOLUME of
+    their week's target. Targets are clamped to the session length bounds.
+
+    Args:
+        start_date: First day of the cycle
+        base_minutes: Daily volume of the first accumulation week
+        accumulation_weeks: Weeks of accumulation (3-5)
+        intensification_weeks: Weeks of intensification (1-2)
+
+    Returns:
+        One planned day per day of the cycle, in date order
+
+    Raises:
+        ValueError: A phase length or the base volume is out of range
+
+    Example:
+        >>> days = plan_mesocycle(date(2026, 1, 5), base_minutes=45)
+        >>> len(days), days[-1].session_type
+        (42, <SessionType.DELOAD: 'deload'>)
+    """
+    if not MIN_SESSION_MINUTES <= base_minutes <= MAX_SESSION_MINUTES:
+        raise ValueError(f"Base minutes must be between {MIN_SESSION_MINUTES} and {MAX_SESSION_MINUTES}")
+    peak_minutes = base_minutes * (1 + ACCUMULATION_STEP * (accumulation_weeks - 1))
+    week_minutes = {
+        MesocyclePhase.INTENSIFICATION: peak_minutes * INTENSIFICATION_VOLUME,
+        MesocyclePhase.DELOAD: base_minutes * DELOAD_VOLUME,
+    }
+    days = []
+    phase_days = dict.fromkeys(MesocyclePhase, 0)
+    for week, phase in enumerate(phase_weeks(accumulation_weeks, intensification_weeks)):
+        if phase is MesocyclePhase.ACCUMULATION:
+            target = base_minutes * (1 + ACCUMULATION_STEP * week)
+        else:
+            target = week_minutes[phase]
+        overloads = PHASE_OVERLOAD[phase]
+        for weekday, session_type in enumerate(WEEK_PATTERNS[phase]):
+            minutes = target * LIGHT_DAY_VOLUME if session_type is SessionType.LIGHT else target
+            days.append(
+                PlannedDay(
+                    day=start_date + timedelta(days=week * DAYS_PER_WEEK + weekday),
+                    phase=phase,
+                    session_type=session_type,
+                    target_minutes=_clamp_minutes(minutes),
+                    overload=overloads[phase_days[phase] % len(overloads)] if overloads else None,
+                )
+            )
+            phase_days[phase] += 1
+    return tuple(days)
+
+
+def step_down(planned_day: PlannedDay) -> PlannedDay:
+    """
+    Lower the intensity and volume of a planned session.
+
+    Heavy sessions become normal and normal ones light, with REPLAN_VOLUME
+    of the volume; deload sessions are left as they are.
+
+    Args:
+        planned_day: Planned session
+
+    Returns:
+        Stepped-down session
+    """
+    if planned_day.session_type is SessionType.DELOAD:
+        return planned_day
+    return replace(
+        planned_day,
+        session_type=STEP_DOWN[planned_day.session_type],
+        target_minutes=_clamp_minutes(planned_day.target_minutes * REPLAN_VOLUME),
+    )
+
+
+def replan_days(days: Sequence[PlannedDay], as_of: date) -> tuple[PlannedDay, ...]:
+    """
+    Step down the sessions of the next REPLAN_HORIZON_DAYS days.
+
+    Args:
+        days: Planned days of a mesocycle
+        as_of: Day the failure trend was measured (its session is kept)
+
+    Returns:
+        Re-planned versions of the affected days only
+    """
+    horizon = as_of + timedelta(days=REPLAN_HORIZON_DAYS)
+    return tuple(
+        step_down(planned_day)
+        for planned_day in days
+        if as_of < planned_day.day <= horizon and planned_day.session_type is not SessionType.DELOAD
+    )
+
+
+def load_failure_trend(db_session: Session, instrument_id: int, as_of: date) -> FailureTrend:
+    """
+    Read the failure rates of an instrument's recent outcomes.
+
+    Block logs and exercise logs both count (see `classify_outcome`). The
+    recent window ends on `as_of`; the baseline window precedes it.
+
+    Args:
+        db_session: Database session
+        instrument_id: Instrument ID
+        as_of: Last day of the recent window
+
+    Returns:
+        Outcome and failure counts of both windows
+    """
+    recent_start = as_of - timedelta(days=FAILURE_WINDOW_DAYS - 1)
+    baseline_start = recent_start - timedelta(days=BASELINE_WINDOW_DAYS)
+    in_window = (
+        Practice.instrument_id == instrument_id,
+        Practice.session_date >= baseline_start,
+        Practice.session_date <= as_of,
+    )
+    block_logs = (
+        select(Practice.session_date, PracticeBlockLog.completed, PracticeBlockLog.quality)
+        .select_from(PracticeBlockLog)
+        .join(PracticeBlock, PracticeBlock.id == PracticeBlockLog.practice_block_id)
+        .join(Practice, Practice.id == PracticeBlock.practice_id)
+        .where(*in_window)
+    )
+    exercise_logs = (
+        select(Practice.session_date, ExerciseLog.completion_status, ExerciseLog.quality_rating)
+        .select_from(ExerciseLog)
+        .join(ExerciseInstance, ExerciseInstance.id == ExerciseLog.exercise_instance_id)
+        .join(Practice, Practice.id == ExerciseInstance.practice_id)
+        .where(*in_window)
+    )
+    counts = [0, 0, 0, 0]
+    for session_date, completion, quality in db_session.execute(union_all(block_logs, exercise_logs)):
+        offset = 0 if session_date >= recent_start else 2
+        counts[offset] += 1
+        if classify_outcome(completion, quality) == OUTCOME_FAILURE:
+            counts[offset + 1] += 1
+    return FailureTrend(*counts)
+
+
+def create_mesocycle(
+    db_session: Session,
+    instrument_id: int,
+    start_date: date,
+    base_minutes: int,
+    accumulation_weeks: int = 4,
+    intensification_weeks: int = 1,
+) -> Mesocycle:
+    """
+    Plan a mesocycle and write it with one row per day.
+
+    The days are written in one bulk INSERT and loaded on first access.
+
+    Args:
+        db_session: Database session (the caller commits)
+        instrument_id: Instrument ID
+        start_date: First day of the cycle
+        base_minutes: Daily volume of the first accumulation week
+        accumulation_weeks: Weeks of accumulation (3-5)
+        intensification_weeks: Weeks of intensification (1-2)
+
+    Returns:
+        Flushed mesocycle
+
+    Raises:
+        ValueError: A phase length or the base volume is out of range
+    """
+    days = plan_mesocycle(start_date, base_minutes, accumulation_weeks, intensification_weeks)
+    mesocycle = Mesocycle(
+        instrument_id=instrument_id,
+        start_date=start_date,
+        accumulation_weeks=accumulation_weeks,
+        intensification_weeks=intensification_weeks,
+        deload_weeks=DELOAD_WEEKS,
+        base_minutes=base_minutes,
+    )
+    db_session.add(mesocycle)
+    db_session.flush()
+    db_session.execute(
+        insert(MesocycleDay),
+        [
+            {
+                "mesocycle_id": mesocycle.id,
+                "day": planned_day.day,
+                "phase": planned_day.phase,
+                "session_type": planned_day.session_type,
+                "target_minutes": planned_day.target_minutes,
+                "overload": planned_day.overload,
+            }
+            for planned_day in days
+        ],
+    )
+    return mesocycle
+
+
+def _planned_day(row: MesocycleDay) -> PlannedDay:
+    return PlannedDay(
+        day=row.day,
+        phase=row.phase,
+        session_type=row.session_type,
+        target_minutes=row.target_minutes,
+        overload=row.overload,
+    )
+
+
+def load_planned_days(
+    db_session: Session, day: date, instrument_ids: Collection[int] | None = None
+) -> dict[int, PlannedDay]:
+    """
+    Read the planned sessions of a day, by instrument.
+
+    Args:
+        db_session: Database session
+        day: Day of the sessions
+        instrument_ids: Instruments to read (None reads every instrument)
+
+    Returns:
+        Planned day by instrument ID, from the latest mesocycle covering the day;
+        instruments without one are left out
+    """
+    query = (
+        select(Mesocycle.instrument_id, MesocycleDay)
+        .join(MesocycleDay.mesocycle)
+        .where(MesocycleDay.day == day)
+        .order_by(Mesocycle.id)
+    )
+    if instrument_ids is not None:
+        query = query.where(Mesocycle.instrument_id.in_(instrument_ids))
+    return {instrument_id: _planned_day(row) for instrument_id, row in db_session.execute(query).tuples()}
+
+
+def replan_mesocycle(
+    db_session: Session, mesocycle: Mesocycle, as_of: date
+) -> tuple[FailureTrend, list[MesocycleDay]]:
+    """
+    Re-plan the next days of a mesocycle if failure rates are rising.
+
+    Days re-planned before keep their plan, so repeating a re-plan for the
+    same trend changes nothing.
+
+    Args:
+        db_session: Database session (the caller commits)
+        mesocycle: Mesocycle to re-plan
+        as_of: Today; the trend is measured up to this day and later days are re-planned
+
+    Returns:
+        The failure trend and the rows that changed (none unless the trend is rising)
+    """
+    trend = load_failure_trend(db_session, mesocycle.instrument_id, as_of)
+    if not trend.rising:
+        return trend, []
+    rows = {row.day: row for row in mesocycle.days if row.replanned_on is None}
+    changed = []
+    for planned_day in replan_days([_planned_day(row) for row in rows.values()], as_of):
+        row = rows[planned_day.day]
+        row.session_type = planned_day.session_type
+        row.target_minutes = planned_day.target_minutes
+        row.replanned_on = as_of
+        changed.append(row)
+    db_session.flush()
+    return trend, changed
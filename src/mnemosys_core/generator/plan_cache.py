@@ -0,0 +1,231 @@
+"""
+Memoized session plans.
+
+Clients ask for "today's session" repeatedly (app open, refresh, screen
+rotation) with identical inputs. A plan depends only on the request, the
+catalog and the generator's view of the database (exercise states and the
+practice history they derive from, the instrument and its mesocycle plan),
+so SessionPlanCache keys plans by the request, the candidate index version
+and a state version.
+
+The state version is bumped when a tracked session commits a write to any of
+those rows, whether flushed from the ORM or executed as a bulk or Core
+statement; catalog writes bump the reference cache, and with it the
+candidate index version. Unrelated writes keep cached plans. Entries are
+evicted least recently used first and expire after a TTL as a guard against
+out-of-band writes. A hit touches no database.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+
+from ..db.models import (
+    DomainType,
+    ExerciseDailyMinutes,
+    ExerciseInstance,
+    ExerciseLog,
+    ExerciseState,
+    Instrument,
+    Mesocycle,
+    MesocycleDay,
+    Practice,
+    PracticeBlock,
+    PracticeBlockLog,
+    SessionType,
+)
+from ..db.models.instrument import instrument_technique_association
+from ..db.reference_cache import mapped_tables
+from .engine import SessionPlan, SessionRequest
+
+# Rows generation reads besides the catalog
+STATE_MODELS: tuple[type, ...] = (
+    ExerciseState,
+    ExerciseDailyMinutes,
+    ExerciseLog,
+    ExerciseInstance,
+    PracticeBlockLog,
+    PracticeBlock,
+    Practice,
+    Instrument,
+    Mesocycle,
+    MesocycleDay,
+)
+STATE_TABLES = frozenset(mapped_tables(STATE_MODELS) | {instrument_technique_association.name})
+STATE_CHANGED_KEY = "mnemosys_generator_state_changed"
+
+
+@dataclass(frozen=True)
+class PlanKey:
+    """
+    Inputs a cached plan was generated from.
+
+    Attributes:
+        instrument_id: Instrument practiced
+        available_minutes: Session length
+        session_type: Intensity of the session
+        session_date: Day the session is for
+        goal_weights: Goal weights sorted by domain
+        overload: Overload emphasis
+        catalog_version: Candidate index version
+        state_version: Plan cache state version
+    """
+
+    instrument_id: int
+    available_minutes: int
+    session_type: SessionType
+    session_date: date
+    goal_weights: tuple[tuple[DomainType, float], ...]
+    overload: str | None
+    catalog_version: int
+    state_version: int
+
+
+class SessionPlanCache:
+    """
+    LRU cache of generated session plans.
+
+    Example:
+        >>> plan_cache = SessionPlanCache(max_entries=1024)
+        >>> plan_cache.track_writes(session_factory)
+        >>> key = plan_cache.key(request, candidate_index.version)
+        >>> plan = plan_cache.get(key)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entries: OrderedDict[PlanKey, tuple[float, SessionPlan]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        """Current state version; bumped on every invalidation."""
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, request: SessionRequest, catalog_version: int) -> PlanKey:
+        """
+        Build the cache key of a request under the current state version.
+
+        Take the key before reading the database: if a write commits while
+        the plan is generated, the version no longer matches and `put`
+        discards the plan.
+
+        Args:
+            request: Session inputs
+            catalog_version: Candidate index version
+
+        Returns:
+            Cache key
+        """
+        return PlanKey(
+            instrument_id=request.instrument_id,
+            available_minutes=request.available_minutes,
+            session_type=request.session_type,
+            session_date=request.session_date,
+            goal_weights=tuple(sorted(request.goal_weights.items(), key=lambda item: item[0].value)),
+            overload=request.overload,
+            catalog_version=catalog_version,
+            state_version=self._version,
+        )
+
+    def get(self, key: PlanKey) -> SessionPlan | None:
+        """
+        Return the cached plan of a key, if any.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached plan, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or key.state_version != self._version or self._clock() - entry[0] >= self._ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: PlanKey, plan: SessionPlan) -> None:
+        """
+        Cache a plan, evicting the least recently used plans beyond the size limit.
+
+        Args:
+            key: Cache key the plan was generated under
+            plan: Generated plan
+        """
+        with self._lock:
+            # Generated under a version that has since been invalidated
+            if key.state_version != self._version:
+                return
+            self._entries[key] = (self._clock(), plan)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop every cached plan and bump the state version."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def track_writes(self, session_factory: sessionmaker[Session]) -> None:
+        """
+        Invalidate the cache whenever sessions from a factory commit state changes.
+
+        Args:
+            session_factory: Session factory whose sessions write practices, logs or states
+        """
+        event.listen(session_factory, "after_flush", _mark_state_changes)
+        event.listen(session_factory, "do_orm_execute", _mark_state_statements)
+        event.listen(session_factory, "after_commit", self._invalidate_after_commit)
+        event.listen(session_factory, "after_rollback", _clear_state_changes)
+
+    def _invalidate_after_commit(self, db_session: Session) -> None:
+        if db_session.info.pop(STATE_CHANGED_KEY, False):
+            self.invalidate()
+
+
+def _mark_state_changes(db_session: Session, flush_context: Any) -> None:
+    """Flag sessions whose flush touched rows session generation reads."""
+    for instance in (*db_session.new, *db_session.dirty, *db_session.deleted):
+        if isinstance(instance, STATE_MODELS):
+            db_session.info[STATE_CHANGED_KEY] = True
+            return
+
+
+def _mark_state_statements(orm_execute_state: ORMExecuteState) -> None:
+    """Flag sessions executing statements that write rows session generation reads."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is not None and table.name in STATE_TABLES:
+        orm_execute_state.session.info[STATE_CHANGED_KEY] = True
+
+
+def _clear_state_changes(db_session: Session) -> None:
+    """Forget state changes that were rolled back."""
+    db_session.info.pop(STATE_CHANGED_KEY, None)
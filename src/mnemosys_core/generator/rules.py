@@ -0,0 +1,168 @@
+"""
+Structural rules of generated sessions.
+
+A session is a skeleton of SessionBlocks chosen by the time available
+(Session Generator Walkthrough §4); each block is a constraint envelope
+(Design Overview §7) defining the domains it draws exercises from, the
+highest fatigue profile it allows, its overload bounds and the cues and
+stop conditions it emits. Block order is invariant: warmup first,
+application last.
+"""
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from ..db.models import BlockType, DomainType, FatigueProfile
+
+MIN_SESSION_MINUTES = 15
+MAX_SESSION_MINUTES = 180
+
+# Longest session of each skeleton; longer sessions use the last skeleton
+SKELETONS: tuple[tuple[int, tuple[BlockType, ...]], ...] = (
+    (25, (BlockType.WARMUP, BlockType.TECHNIQUE, BlockType.APPLICATION)),
+    (45, (BlockType.WARMUP, BlockType.TECHNIQUE, BlockType.HARMONY, BlockType.APPLICATION)),
+    (
+        MAX_SESSION_MINUTES,
+        (BlockType.WARMUP, BlockType.TECHNIQUE, BlockType.HARMONY, BlockType.RHYTHM, BlockType.APPLICATION),
+    ),
+)
+
+FATIGUE_ORDER = (FatigueProfile.F0, FatigueProfile.F1, FatigueProfile.F2)
+
+
+@dataclass(frozen=True)
+class BlockRule:
+    """
+    Constraint envelope of one SessionBlock.
+
+    Attributes:
+        block_type: Block the rule applies to
+        domains: Domains the block draws exercises from
+        max_fatigue: Highest fatigue profile allowed in the block
+        share: Relative share of the session's minutes
+        tempo_bounds: Lowest and highest tempo (bpm) assigned in the block
+        level_bounds: Lowest and highest level of other overload dimensions
+        intent: What the block is for, opening its instructions
+        focus_cues: What to pay attention to while playing
+        stop_conditions: When to stop or regress
+    """
+
+    block_type: BlockType
+    domains: frozenset[DomainType]
+    max_fatigue: FatigueProfile
+    share: int
+    tempo_bounds: tuple[int, int]
+    level_bounds: tuple[int, int]
+    intent: str
+    focus_cues: tuple[str, ...]
+    stop_conditions: tuple[str, ...]
+
+
+BLOCK_RULES: Mapping[BlockType, BlockRule] = MappingProxyType(
+    {
+        BlockType.WARMUP: BlockRule(
+            block_type=BlockType.WARMUP,
+            domains=frozenset({DomainType.TECHNIQUE, DomainType.RHYTHM}),
+            max_fatigue=FatigueProfile.F0,
+            share=2,
+            tempo_bounds=(50, 100),
+            level_bounds=(1, 2),
+            intent="Calibrate: play relaxed and accurate, well below your limit.",
+            focus_cues=("Loose hands and shoulders", "Even, quiet attack"),
+            stop_conditions=("Any tension or discomfort",),
+        ),
+        BlockType.TECHNIQUE: BlockRule(
+            block_type=BlockType.TECHNIQUE,
+            domains=frozenset({DomainType.TECHNIQUE}),
+            max_fatigue=FatigueProfile.F2,
+            share=3,
+            tempo_bounds=(60, 200),
+            level_bounds=(1, 5),
+            intent="Develop mechanics at the edge of clean control.",
+            focus_cues=("Minimal finger travel", "Consistent timing at the new setting"),
+            stop_conditions=("Two sloppy repetitions in a row: step back one setting", "Pain or strain: stop"),
+        ),
+        BlockType.HARMONY: BlockRule(
+            block_type=BlockType.HARMONY,
+            domains=frozenset({DomainType.HARMONY}),
+            max_fatigue=FatigueProfile.F1,
+            share=3,
+            tempo_bounds=(50, 160),
+            level_bounds=(1, 5),
+            intent="Build fretboard and harmonic fluency.",
+            focus_cues=("Name each note or chord tone as you play it", "Hear the sound before playing it"),
+            stop_conditions=("Guessing instead of knowing: slow down",),
+        ),
+        BlockType.RHYTHM: BlockRule(
+            block_type=BlockType.RHYTHM,
+            domains=frozenset({DomainType.RHYTHM}),
+            max_fatigue=FatigueProfile.F1,
+            share=3,
+            tempo_bounds=(50, 180),
+            level_bounds=(1, 5),
+            intent="Sharpen time feel against the click.",
+            focus_cues=("Feel the subdivision, not just the beat", "Land accents exactly"),
+            stop_conditions=("Losing the downbeat twice: lower the setting",),
+        ),
+        BlockType.APPLICATION: BlockRule(
+            block_type=BlockType.APPLICATION,
+            domains=frozenset({DomainType.MUSICIANSHIP}),
+            max_fatigue=FatigueProfile.F1,
+            share=2,
+            tempo_bounds=(50, 160),
+            level_bounds=(1, 4),
+            intent="Apply today's work musically.",
+            focus_cues=("Phrase with dynamics", "Keep going through mistakes"),
+            stop_conditions=("Mechanical playing: drop the tempo and play for sound",),
+        ),
+    }
+)
+
+
+def session_skeleton(available_minutes: int) -> tuple[BlockType, ...]:
+    """
+    Choose the SessionBlocks of a session by the time available.
+
+    Args:
+        available_minutes: Session length
+
+    Returns:
+        Block types in session order
+    """
+    for longest, blocks in SKELETONS:
+        if available_minutes <= longest:
+            return blocks
+    return SKELETONS[-1][1]
+
+
+def allocate_minutes(blocks: Sequence[BlockType], available_minutes: int) -> list[int]:
+    """
+    Split the session's minutes between blocks by their shares.
+
+    Uses the largest remainder method, so the blocks add up exactly to the
+    minutes available and ties go to earlier blocks.
+
+    Args:
+        blocks: Block types in session order
+        available_minutes: Session length
+
+    Returns:
+        Minutes per block, in block order
+    """
+    if not blocks:
+        return []
+    shares = [BLOCK_RULES[block].share for block in blocks]
+    total_share = sum(shares)
+    minutes = [available_minutes * share // total_share for share in shares]
+    remainders = sorted(
+        range(len(blocks)), key=lambda index: (-(available_minutes * shares[index] % total_share), index)
+    )
+    for index in remainders[: available_minutes - sum(minutes)]:
+        minutes[index] += 1
+    return minutes
+
+
+def lower_fatigue(first: FatigueProfile, second: FatigueProfile) -> FatigueProfile:
+    """Return the lower of two fatigue profiles."""
+    return min(first, second, key=FATIGUE_ORDER.index)
@@ -0,0 +1,166 @@
+"""
+Database side of session generation.
+
+Generating a session reads the instrument (with its techniques), its
+mesocycle plan of the day and the ExerciseState rows in one query each; the
+catalog comes from the candidate index. Instruments with a planned day get
+its session type and overload, within its volume target. With a SessionPlanCache, repeated requests are served from memory
+without touching the database. `save_plan` writes a plan as a Practice
+with one ExerciseInstance per block.
+"""
+
+from collections.abc import Collection
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, with_polymorphic
+
+from ..db.models import ExerciseInstance, ExerciseState, Instrument, Practice, StringedInstrument
+from .candidates import CandidateIndex, instrument_features
+from .engine import ExerciseProgress, SessionPlan, SessionRequest, plan_session
+from .mesocycle import load_planned_days
+from .plan_cache import SessionPlanCache
+
+
+def load_instrument_features(db_session: Session, instrument_id: int) -> frozenset[str] | None:
+    """
+    Read the features an instrument offers to exercises.
+
+    Args:
+        db_session: Database session
+        instrument_id: Instrument ID
+
+    Returns:
+        Features (see `instrument_features`), or None if the instrument does not exist
+    """
+    return load_features_by_instrument(db_session, [instrument_id]).get(instrument_id)
+
+
+def load_features_by_instrument(db_session: Session, instrument_ids: Collection[int]) -> dict[int, frozenset[str]]:
+    """
+    Read the features of many instruments in one query.
+
+    Args:
+        db_session: Database session
+        instrument_ids: Instrument IDs
+
+    Returns:
+        Features by instrument ID; missing instruments are left out
+    """
+    polymorphic_instrument = with_polymorphic(Instrument, [StringedInstrument])
+    instruments = db_session.scalars(
+        select(polymorphic_instrument)
+        .where(polymorphic_instrument.id.in_(instrument_ids))
+        .options(joinedload(polymorphic_instrument.techniques))
+    ).unique()
+    return {
+        instrument.id: instrument_features(
+            instrument.instrument_type,
+            (technique.name for technique in instrument.techniques),
+            instrument.string_count if isinstance(instrument, StringedInstrument) else None,
+        )
+        for instrument in instruments
+    }
+
+
+def load_progress(db_session: Session) -> dict[int, ExerciseProgress]:
+    """
+    Read the progress of every tracked exercise.
+
+    Args:
+        db_session: Database session
+
+    Returns:
+        Progress by exercise ID
+    """
+    rows = db_session.execute(
+        select(
+            ExerciseState.exercise_id,
+            ExerciseState.last_practiced_date,
+            ExerciseState.rolling_minutes_28d,
+            ExerciseState.mastery_estimate,
+            ExerciseState.failure_streak,
+            ExerciseState.last_fatigue_profile,
+        )
+    )
+    return {
+        row.exercise_id: ExerciseProgress(
+            last_practiced_date=row.last_practiced_date,
+            rolling_minutes_28d=row.rolling_minutes_28d,
+            mastery_estimate=row.mastery_estimate,
+            failure_streak=row.failure_streak,
+            last_fatigue_profile=row.last_fatigue_profile,
+        )
+        for row in rows
+    }
+
+
+def generate_session(
+    db_session: Session,
+    candidate_index: CandidateIndex,
+    request: SessionRequest,
+    plan_cache: SessionPlanCache | None = None,
+) -> SessionPlan | None:
+    """
+    Generate a session plan from the current exercise states and the instrument's mesocycle plan.
+
+    Args:
+        db_session: Database session
+        candidate_index: Candidates of the current catalog
+        request: Session inputs
+        plan_cache: Optional cache of generated plans
+
+    Returns:
+        Session plan, or None if the instrument does not exist
+
+    Raises:
+        SessionGenerationError: No exercise fits any block of the session
+    """
+    key = None
+    if plan_cache is not None:
+        key = plan_cache.key(request, candidate_index.version)
+        cached_plan = plan_cache.get(key)
+        if cached_plan is not None:
+            return cached_plan
+
+    features = load_instrument_features(db_session, request.instrument_id)
+    if features is None:
+        return None
+    planned_day = load_planned_days(db_session, request.session_date, [request.instrument_id]).get(request.instrument_id)
+    if planned_day is not None:
+        request = planned_day.fit_request(request)
+    plan = plan_session(request, candidate_index, features, load_progress(db_session))
+    if plan_cache is not None and key is not None:
+        plan_cache.put(key, plan)
+    return plan
+
+
+def plan_instances(plan: SessionPlan) -> list[dict[str, object]]:
+    """ExerciseInstance column values of a plan's blocks, in session order."""
+    return [
+        {"exercise_id": block.exercise_id, "sequence_order": order, "parameters": dict(block.parameters)}
+        for order, block in enumerate(plan.blocks, start=1)
+    ]
+
+
+def save_plan(db_session: Session, plan: SessionPlan) -> Practice:
+    """
+    Write a plan as a practice with one exercise instance per block.
+
+    Args:
+        db_session: Database session (the caller commits)
+        plan: Generated plan
+
+    Returns:
+        Flushed practice
+    """
+    request = plan.request
+    practice = Practice(
+        instrument_id=request.instrument_id,
+        session_date=request.session_date,
+        session_type=request.session_type,
+        total_minutes=plan.total_minutes,
+    )
+    practice.exercise_instances.extend(ExerciseInstance(**values) for values in plan_instances(plan))
+    db_session.add(practice)
+    db_session.flush()
+    return practice
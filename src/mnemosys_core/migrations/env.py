@@ -1,5 +1,11 @@
 """
 Alembic migration environment.
+
+Each migration runs in its own transaction, so a failed migration leaves the
+earlier ones applied. On PostgreSQL the migration connection waits at most
+DB_MIGRATION_LOCK_TIMEOUT_MS for locks: DDL queued behind a long-running
+transaction would otherwise block every query queued behind it. A migration
+that times out fails and can simply be rerun.
 """
 
 from logging.config import fileConfig
@@ -7,32 +13,12 @@ from logging.config import fileConfig
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 
-# Import metadata and models
 from mnemosys_core.config.settings import load_settings_from_env
-from mnemosys_core.db.base import Base
 
-# Ensure all models are imported for autogenerate
-from mnemosys_core.db.models import (  # noqa: F401
-    BlockLog,
-    Exercise,
-    ExerciseInstance,
-    ExerciseLog,
-    ExerciseState,
-    Instrument,
-    KeyboardInstrument,
-    KeyboardInstrumentTuning,
-    OverloadDimension,
-    PercussionInstrument,
-    PercussionInstrumentTuning,
-    Session,
-    SessionBlock,
-    StringedInstrument,
-    StringedInstrumentTuning,
-    Technique,
-    Tuning,
-    WindInstrument,
-    WindInstrumentTuning,
-)
+# Importing the models package registers every model for autogenerate
+from mnemosys_core.db import models  # noqa: F401
+from mnemosys_core.db.base import Base
+from mnemosys_core.db.online_migrations import lock_timeout_connect_args
 
 # Alembic Config object
 config = context.config
@@ -45,39 +31,40 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
-def get_url():
-    """Get database URL from settings."""
-    settings = load_settings_from_env()
-    return settings.database_url
-
-
-def run_migrations_offline():
+def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
-    url = get_url()
+    settings = load_settings_from_env()
     context.configure(
-        url=url,
+        url=settings.database_url,
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
         context.run_migrations()
 
 
-def run_migrations_online():
+def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
-    configuration = config.get_section(config.config_ini_section)
-    configuration["sqlalchemy.url"] = get_url()
+    settings = load_settings_from_env()
+    configuration = config.get_section(config.config_ini_section) or {}
+    configuration["sqlalchemy.url"] = settings.database_url
 
     connectable = engine_from_config(
         configuration,
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
+        connect_args=lock_timeout_connect_args(settings.database_url, settings.db_migration_lock_timeout_ms),
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
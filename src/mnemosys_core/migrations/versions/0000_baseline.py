@@ -0,0 +1,231 @@
+"""Create the initial instrument, exercise and practice schema
+
+On PostgreSQL the native enum types are created up front: DatabaseEnum only
+picks them at compile time, so table creation does not emit CREATE TYPE.
+
+Revision ID: 0000_baseline
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+from mnemosys_core.db.models import (
+    BlockType,
+    CompletionStatus,
+    DomainType,
+    FatigueProfile,
+    QualityRating,
+    SessionType,
+)
+from mnemosys_core.db.types import DatabaseEnum, DatabaseEnumList, JSONEncodedDict, JSONEncodedList
+
+# revision identifiers, used by Alembic.
+revision = "0000_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENUM_CLASSES = (BlockType, CompletionStatus, DomainType, FatigueProfile, QualityRating, SessionType)
+
+
+def _enum_types() -> list[sa.Enum]:
+    return [sa.Enum(enum_class, name=enum_class.__name__) for enum_class in ENUM_CLASSES]
+
+
+def _instrument_subtype(name: str, parent: str) -> None:
+    """Create a joined-table inheritance child whose primary key references its parent."""
+    op.create_table(
+        name,
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["id"], [f"{parent}.id"], name=f"fk_{name}_id_{parent}"),
+        sa.PrimaryKeyConstraint("id", name=f"pk_{name}"),
+    )
+
+
+def _association(name: str, left: str, right: str) -> None:
+    """Create a many-to-many association table keyed by both foreign keys."""
+    op.create_table(
+        name,
+        sa.Column(f"{left}_id", sa.Integer(), nullable=False),
+        sa.Column(f"{right}_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint([f"{left}_id"], [f"{left}.id"], name=f"fk_{name}_{left}_id_{left}"),
+        sa.ForeignKeyConstraint([f"{right}_id"], [f"{right}.id"], name=f"fk_{name}_{right}_id_{right}"),
+        sa.PrimaryKeyConstraint(f"{left}_id", f"{right}_id", name=f"pk_{name}"),
+    )
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    if connection.dialect.name == "postgresql":
+        for enum_type in _enum_types():
+            enum_type.create(connection, checkfirst=True)
+
+    op.create_table(
+        "instrument",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("instrument_type", sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint("id", name="pk_instrument"),
+        sa.UniqueConstraint("name", name="uq_instrument_name"),
+    )
+    op.create_table(
+        "stringed_instrument",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("string_count", sa.Integer(), nullable=False),
+        sa.Column("scale_length", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["id"], ["instrument.id"], name="fk_stringed_instrument_id_instrument"),
+        sa.PrimaryKeyConstraint("id", name="pk_stringed_instrument"),
+    )
+    for name in ("keyboard_instrument", "percussion_instrument", "wind_instrument"):
+        _instrument_subtype(name, "instrument")
+
+    op.create_table(
+        "tuning",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("tuning_type", sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint("id", name="pk_tuning"),
+    )
+    op.create_table(
+        "stringed_instrument_tuning",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("pitch_sequence", JSONEncodedList(), nullable=False),
+        sa.ForeignKeyConstraint(["id"], ["tuning.id"], name="fk_stringed_instrument_tuning_id_tuning"),
+        sa.PrimaryKeyConstraint("id", name="pk_stringed_instrument_tuning"),
+    )
+    for name in ("keyboard_instrument_tuning", "percussion_instrument_tuning", "wind_instrument_tuning"):
+        _instrument_subtype(name, "tuning")
+    _association("stringed_instrument_tuning_association", "stringed_instrument", "stringed_instrument_tuning")
+
+    for name in ("overload_dimension", "technique"):
+        op.create_table(
+            name,
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.PrimaryKeyConstraint("id", name=f"pk_{name}"),
+            sa.UniqueConstraint("name", name=f"uq_{name}_name"),
+        )
+    _association("instrument_technique_association", "instrument", "technique")
+
+    op.create_table(
+        "exercise",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=200), nullable=False),
+        sa.Column("domains", DatabaseEnumList(DomainType), nullable=False),
+        sa.Column("instrument_compatibility", JSONEncodedList(), nullable=True),
+        sa.PrimaryKeyConstraint("id", name="pk_exercise"),
+        sa.UniqueConstraint("name", name="uq_exercise_name"),
+    )
+    _association("exercise_overload_dimension_association", "exercise", "overload_dimension")
+    _association("exercise_technique_association", "exercise", "technique")
+    op.create_table(
+        "exercise_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("exercise_id", sa.Integer(), nullable=False),
+        sa.Column("last_practiced_date", sa.Date(), nullable=True),
+        sa.Column("rolling_minutes_7d", sa.Integer(), nullable=False),
+        sa.Column("rolling_minutes_28d", sa.Integer(), nullable=False),
+        sa.Column("mastery_estimate", sa.Float(), nullable=False),
+        sa.Column("last_fatigue_profile", DatabaseEnum(FatigueProfile), nullable=True),
+        sa.ForeignKeyConstraint(["exercise_id"], ["exercise.id"], name="fk_exercise_state_exercise_id_exercise"),
+        sa.PrimaryKeyConstraint("id", name="pk_exercise_state"),
+        sa.UniqueConstraint("exercise_id", name="uq_exercise_state_exercise_id"),
+    )
+
+    op.create_table(
+        "practice",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("instrument_id", sa.Integer(), nullable=False),
+        sa.Column("session_date", sa.Date(), nullable=False),
+        sa.Column("session_type", DatabaseEnum(SessionType), nullable=False),
+        sa.Column("total_minutes", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["instrument_id"], ["instrument.id"], name="fk_practice_instrument_id_instrument"),
+        sa.PrimaryKeyConstraint("id", name="pk_practice"),
+    )
+    op.create_table(
+        "practice_block",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("practice_id", sa.Integer(), nullable=False),
+        sa.Column("exercise_id", sa.Integer(), nullable=False),
+        sa.Column("block_order", sa.Integer(), nullable=False),
+        sa.Column("block_type", DatabaseEnum(BlockType), nullable=False),
+        sa.Column("duration_minutes", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["exercise_id"], ["exercise.id"], name="fk_practice_block_exercise_id_exercise"),
+        sa.ForeignKeyConstraint(["practice_id"], ["practice.id"], name="fk_practice_block_practice_id_practice"),
+        sa.PrimaryKeyConstraint("id", name="pk_practice_block"),
+    )
+    op.create_table(
+        "practice_block_log",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("practice_block_id", sa.Integer(), nullable=False),
+        sa.Column("completed", DatabaseEnum(CompletionStatus), nullable=False),
+        sa.Column("quality", DatabaseEnum(QualityRating), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["practice_block_id"], ["practice_block.id"], name="fk_practice_block_log_practice_block_id_practice_block"
+        ),
+        sa.PrimaryKeyConstraint("id", name="pk_practice_block_log"),
+    )
+    op.create_table(
+        "exercise_instance",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("practice_id", sa.Integer(), nullable=False),
+        sa.Column("exercise_id", sa.Integer(), nullable=False),
+        sa.Column("sequence_order", sa.Integer(), nullable=False),
+        sa.Column("parameters", JSONEncodedDict(), nullable=False),
+        sa.ForeignKeyConstraint(["exercise_id"], ["exercise.id"], name="fk_exercise_instance_exercise_id_exercise"),
+        sa.ForeignKeyConstraint(["practice_id"], ["practice.id"], name="fk_exercise_instance_practice_id_practice"),
+        sa.PrimaryKeyConstraint("id", name="pk_exercise_instance"),
+    )
+    op.create_table(
+        "exercise_log",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("exercise_instance_id", sa.Integer(), nullable=False),
+        sa.Column("completion_status", DatabaseEnum(CompletionStatus), nullable=False),
+        sa.Column("quality_rating", DatabaseEnum(QualityRating), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["exercise_instance_id"],
+            ["exercise_instance.id"],
+            name="fk_exercise_log_exercise_instance_id_exercise_instance",
+        ),
+        sa.PrimaryKeyConstraint("id", name="pk_exercise_log"),
+        sa.UniqueConstraint("exercise_instance_id", name="uq_exercise_log_exercise_instance_id"),
+    )
+
+
+def downgrade() -> None:
+    for name in (
+        "exercise_log",
+        "exercise_instance",
+        "practice_block_log",
+        "practice_block",
+        "practice",
+        "exercise_state",
+        "exercise_technique_association",
+        "exercise_overload_dimension_association",
+        "exercise",
+        "instrument_technique_association",
+        "technique",
+        "overload_dimension",
+        "stringed_instrument_tuning_association",
+        "wind_instrument_tuning",
+        "percussion_instrument_tuning",
+        "keyboard_instrument_tuning",
+        "stringed_instrument_tuning",
+        "tuning",
+        "wind_instrument",
+        "percussion_instrument",
+        "keyboard_instrument",
+        "stringed_instrument",
+        "instrument",
+    ):
+        op.drop_table(name)
+
+    connection = op.get_bind()
+    if connection.dialect.name == "postgresql":
+        for enum_type in _enum_types():
+            enum_type.drop(connection, checkfirst=True)
@@ -0,0 +1,37 @@
+"""Add session_date partition keys to practice child tables
+
+Revision ID: 0001_partition_keys
+Revises: 0000_baseline
+Create Date: 2026-10-18 00:00:00
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+from mnemosys_core.db.partitioning import PARTITIONED_TABLES, backfill_partition_keys
+
+# revision identifiers, used by Alembic.
+revision = "0001_partition_keys"
+down_revision = "0000_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for partitioned_table in PARTITIONED_TABLES:
+        column_names = {column["name"] for column in inspector.get_columns(partitioned_table.name)}
+        if "session_date" not in column_names:
+            op.add_column(partitioned_table.name, sa.Column("session_date", sa.Date(), nullable=True))
+        index_names = {index["name"] for index in inspector.get_indexes(partitioned_table.name)}
+        index_name = f"ix_{partitioned_table.name}_session_date"
+        if index_name not in index_names:
+            op.create_index(index_name, partitioned_table.name, ["session_date"])
+    backfill_partition_keys(op.get_bind())
+
+
+def downgrade() -> None:
+    for partitioned_table in reversed(PARTITIONED_TABLES):
+        op.drop_index(f"ix_{partitioned_table.name}_session_date", table_name=partitioned_table.name)
+        if partitioned_table.parent_name is not None:
+            op.drop_column(partitioned_table.name, "session_date")
@@ -0,0 +1,94 @@
+"""Range-partition practice and log tables by session month
+
+Only runs on PostgreSQL with DB_PARTITIONING=true; otherwise the tables keep
+the unpartitioned layout. The keys and indexes rebuilt here are the ones the
+tables have at this revision; later revisions add their own to the
+partitioned tables. Downgrading a partitioned database is not supported.
+
+Revision ID: 0002_partition_by_month
+Revises: 0001_partition_keys
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+from alembic.util import CommandError
+
+from mnemosys_core.config.settings import load_settings_from_env
+from mnemosys_core.db.partitioning import TableLayout, convert_to_partitioned, is_partitioned
+
+# revision identifiers, used by Alembic.
+revision = "0002_partition_by_month"
+down_revision = "0001_partition_keys"
+branch_labels = None
+depends_on = None
+
+
+def _session_date_index(table_name: str) -> tuple[str, str]:
+    index_name = f"ix_{table_name}_session_date"
+    return index_name, f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} (session_date)"
+
+
+# The partitioned tables as of 0001_partition_keys, parents first
+LAYOUTS = (
+    TableLayout(
+        "practice",
+        "pk_practice",
+        indexes=(_session_date_index("practice"),),
+        foreign_keys=(("fk_practice_instrument_id_instrument", ("instrument_id",), "instrument"),),
+    ),
+    TableLayout(
+        "practice_block",
+        "pk_practice_block",
+        indexes=(_session_date_index("practice_block"),),
+        foreign_keys=(
+            ("fk_practice_block_exercise_id_exercise", ("exercise_id",), "exercise"),
+            ("fk_practice_block_practice_id_practice", ("practice_id",), "practice"),
+        ),
+    ),
+    TableLayout(
+        "exercise_instance",
+        "pk_exercise_instance",
+        indexes=(_session_date_index("exercise_instance"),),
+        foreign_keys=(
+            ("fk_exercise_instance_exercise_id_exercise", ("exercise_id",), "exercise"),
+            ("fk_exercise_instance_practice_id_practice", ("practice_id",), "practice"),
+        ),
+    ),
+    TableLayout(
+        "practice_block_log",
+        "pk_practice_block_log",
+        indexes=(_session_date_index("practice_block_log"),),
+        foreign_keys=(
+            ("fk_practice_block_log_practice_block_id_practice_block", ("practice_block_id",), "practice_block"),
+        ),
+    ),
+    TableLayout(
+        "exercise_log",
+        "pk_exercise_log",
+        unique_constraints=(("uq_exercise_log_exercise_instance_id", ("exercise_instance_id",)),),
+        indexes=(_session_date_index("exercise_log"),),
+        foreign_keys=(
+            (
+                "fk_exercise_log_exercise_instance_id_exercise_instance",
+                ("exercise_instance_id",),
+                "exercise_instance",
+            ),
+        ),
+    ),
+)
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    settings = load_settings_from_env()
+    if connection.dialect.name != "postgresql" or not settings.db_partitioning:
+        return
+    convert_to_partitioned(connection, months_ahead=settings.db_partition_months_ahead, layouts=LAYOUTS)
+
+
+def downgrade() -> None:
+    if is_partitioned(op.get_bind(), "practice"):
+        raise CommandError(
+            "0002_partition_by_month is irreversible on a partitioned database: "
+            "partitioned tables cannot be converted back; restore from a backup taken before the upgrade"
+        )
@@ -0,0 +1,33 @@
+"""Add import_checkpoint table for resumable bulk imports
+
+Revision ID: 0003_import_checkpoint
+Revises: 0002_partition_by_month
+Create Date: 2026-10-18 00:00:00
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003_import_checkpoint"
+down_revision = "0002_partition_by_month"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_checkpoint",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(length=500), nullable=False),
+        sa.Column("rows_processed", sa.Integer(), nullable=False),
+        sa.Column("rows_imported", sa.Integer(), nullable=False),
+        sa.Column("rows_rejected", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", name="pk_import_checkpoint"),
+        sa.UniqueConstraint("source", name="uq_import_checkpoint_source"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("import_checkpoint")
@@ -0,0 +1,41 @@
+"""Add expression indexes on commonly filtered exercise instance parameters
+
+The expressions are spelled out as the parameter filters compiled them at
+this revision; a change to the filter expressions needs its own revision.
+
+Revision ID: 0004_parameter_indexes
+Revises: 0003_import_checkpoint
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004_parameter_indexes"
+down_revision = "0003_import_checkpoint"
+branch_labels = None
+depends_on = None
+
+
+def _numeric_parameter(name: str) -> str:
+    return f"(CASE WHEN jsonb_typeof(parameters -> '{name}') = 'number' THEN (parameters ->> '{name}')::numeric END)"
+
+
+# Index name -> (PostgreSQL expression, SQLite expression)
+PARAMETER_INDEXES: dict[str, tuple[str, str]] = {
+    "ix_exercise_instance_parameter_duration": (_numeric_parameter("duration"), "json_extract(parameters, '$.duration')"),
+    "ix_exercise_instance_parameter_key": ("(parameters ->> 'key')", "json_extract(parameters, '$.key')"),
+    "ix_exercise_instance_parameter_tempo": (_numeric_parameter("tempo"), "json_extract(parameters, '$.tempo')"),
+}
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+    for index_name, (postgresql_expression, sqlite_expression) in PARAMETER_INDEXES.items():
+        expression = postgresql_expression if is_postgresql else sqlite_expression
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON exercise_instance ({expression})")
+
+
+def downgrade() -> None:
+    for index_name in PARAMETER_INDEXES:
+        op.drop_index(index_name, table_name="exercise_instance", if_exists=True)
@@ -0,0 +1,33 @@
+"""Add backfill_checkpoint table for resumable batched backfills
+
+Revision ID: 0005_backfill_checkpoint
+Revises: 0004_parameter_indexes
+Create Date: 2026-10-18 00:00:00
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_backfill_checkpoint"
+down_revision = "0004_parameter_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "backfill_checkpoint",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=200), nullable=False),
+        sa.Column("last_key", sa.Integer(), nullable=False),
+        sa.Column("rows_updated", sa.Integer(), nullable=False),
+        sa.Column("batches", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", name="pk_backfill_checkpoint"),
+        sa.UniqueConstraint("name", name="uq_backfill_checkpoint_name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("backfill_checkpoint")
@@ -0,0 +1,57 @@
+"""Add practice_archive and practice_summary tables for archived history
+
+Revision ID: 0006_practice_archive
+Revises: 0005_backfill_checkpoint
+Create Date: 2026-10-18 00:00:00
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+from mnemosys_core.db.models import SessionType
+from mnemosys_core.db.types import DatabaseEnum, JSONEncodedDict
+
+# revision identifiers, used by Alembic.
+revision = "0006_practice_archive"
+down_revision = "0005_backfill_checkpoint"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "practice_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("instrument_id", sa.Integer(), nullable=False),
+        sa.Column("session_date", sa.Date(), nullable=False),
+        sa.Column("session_type", DatabaseEnum(SessionType), nullable=False),
+        sa.Column("total_minutes", sa.Integer(), nullable=False),
+        sa.Column("history", JSONEncodedDict(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["instrument_id"], ["instrument.id"], name="fk_practice_archive_instrument_id_instrument"
+        ),
+        sa.PrimaryKeyConstraint("id", name="pk_practice_archive"),
+    )
+    op.create_index("ix_practice_archive_session_date", "practice_archive", ["session_date"])
+    op.create_table(
+        "practice_summary",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("instrument_id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("practices", sa.Integer(), nullable=False),
+        sa.Column("total_minutes", sa.Integer(), nullable=False),
+        sa.Column("exercises", sa.Integer(), nullable=False),
+        sa.Column("exercises_completed", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["instrument_id"], ["instrument.id"], name="fk_practice_summary_instrument_id_instrument"
+        ),
+        sa.PrimaryKeyConstraint("id", name="pk_practice_summary"),
+        sa.UniqueConstraint("instrument_id", "month", name="uq_practice_summary_instrument_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("practice_summary")
+    op.drop_index("ix_practice_archive_session_date", table_name="practice_archive")
+    op.drop_table("practice_archive")
@@ -0,0 +1,38 @@
+"""Add exercise_daily_minutes buckets and ExerciseState.rolling_as_of
+
+Revision ID: 0007_exercise_daily_minutes
+Revises: 0006_practice_archive
+Create Date: 2026-10-18 00:00:00
+
+Rolling windows start empty; run `rebuild_rolling_minutes` once after
+upgrading to seed them from the last four weeks of history.
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_exercise_daily_minutes"
+down_revision = "0006_practice_archive"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "exercise_daily_minutes",
+        sa.Column("exercise_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("block_minutes", sa.Integer(), nullable=False),
+        sa.Column("instance_minutes", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["exercise_id"], ["exercise.id"], name="fk_exercise_daily_minutes_exercise_id_exercise"
+        ),
+        sa.PrimaryKeyConstraint("exercise_id", "day", name="pk_exercise_daily_minutes"),
+    )
+    op.add_column("exercise_state", sa.Column("rolling_as_of", sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("exercise_state", "rolling_as_of")
+    op.drop_table("exercise_daily_minutes")
@@ -0,0 +1,29 @@
+"""Add ExerciseState.failure_streak for server-side mastery estimates
+
+Revision ID: 0008_mastery_failure_streak
+Revises: 0007_exercise_daily_minutes
+Create Date: 2026-10-19 00:00:00
+
+Mastery estimates are not replayed on upgrade; run
+`mnemosys exercise-states mastery` once to derive them from the logged
+history.
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0008_mastery_failure_streak"
+down_revision = "0007_exercise_daily_minutes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "exercise_state", sa.Column("failure_streak", sa.Integer(), nullable=False, server_default="0")
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("exercise_state", "failure_streak")
@@ -0,0 +1,69 @@
+"""Add mesocycle and mesocycle_day tables for multi-week plans
+
+On PostgreSQL the MesocyclePhase enum type is created first, as
+0000_baseline does for the enums of its tables.
+
+Revision ID: 0009_mesocycles
+Revises: 0008_mastery_failure_streak
+Create Date: 2026-10-19 00:00:00
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+from mnemosys_core.db.models import MesocyclePhase, SessionType
+from mnemosys_core.db.types import DatabaseEnum
+
+# revision identifiers, used by Alembic.
+revision = "0009_mesocycles"
+down_revision = "0008_mastery_failure_streak"
+branch_labels = None
+depends_on = None
+
+
+def _phase_type() -> sa.Enum:
+    return sa.Enum(MesocyclePhase, name=MesocyclePhase.__name__)
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    if connection.dialect.name == "postgresql":
+        _phase_type().create(connection, checkfirst=True)
+
+    op.create_table(
+        "mesocycle",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("instrument_id", sa.Integer(), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("accumulation_weeks", sa.Integer(), nullable=False),
+        sa.Column("intensification_weeks", sa.Integer(), nullable=False),
+        sa.Column("deload_weeks", sa.Integer(), nullable=False),
+        sa.Column("base_minutes", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["instrument_id"], ["instrument.id"], name="fk_mesocycle_instrument_id_instrument"),
+        sa.PrimaryKeyConstraint("id", name="pk_mesocycle"),
+    )
+    op.create_index("ix_mesocycle_instrument_id", "mesocycle", ["instrument_id"])
+    op.create_table(
+        "mesocycle_day",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("mesocycle_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("phase", DatabaseEnum(MesocyclePhase), nullable=False),
+        sa.Column("session_type", DatabaseEnum(SessionType), nullable=False),
+        sa.Column("target_minutes", sa.Integer(), nullable=False),
+        sa.Column("overload", sa.String(length=50), nullable=True),
+        sa.Column("replanned_on", sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(["mesocycle_id"], ["mesocycle.id"], name="fk_mesocycle_day_mesocycle_id_mesocycle"),
+        sa.PrimaryKeyConstraint("id", name="pk_mesocycle_day"),
+        sa.UniqueConstraint("mesocycle_id", "day", name="uq_mesocycle_day_mesocycle_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("mesocycle_day")
+    op.drop_index("ix_mesocycle_instrument_id", table_name="mesocycle")
+    op.drop_table("mesocycle")
+
+    connection = op.get_bind()
+    if connection.dialect.name == "postgresql":
+        _phase_type().drop(connection, checkfirst=True)
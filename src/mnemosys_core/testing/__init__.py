@@ -0,0 +1,15 @@
+"""
+Test-database toolkit for mnemosys-core and the suites built on it.
+
+- TemplateDatabase: schema created once, copied per test (SQLite)
+- transactional_session: per-test isolation by rollback (any database)
+- DataFactory: realistic, reproducible seed data
+
+pytest users can enable ready-made fixtures with
+`pytest_plugins = ["mnemosys_core.testing.pytest_plugin"]`.
+"""
+
+from .database import TemplateDatabase, enable_sqlite_savepoints, transactional_session
+from .factories import DataFactory
+
+__all__ = ["DataFactory", "TemplateDatabase", "enable_sqlite_savepoints", "transactional_session"]
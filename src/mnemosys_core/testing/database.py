@@ -0,0 +1,125 @@
+"""
+Fast, isolated test databases.
+
+Creating the schema is the expensive part of a database test. Two ways to
+pay for it once per test session instead of once per test:
+
+- TemplateDatabase (SQLite): the schema is created, and optionally seeded,
+  once in an in-memory template; every test gets its own copy made with
+  SQLite's online backup API, a page copy that takes well under a
+  millisecond. Copies are independent engines, so code under test may
+  commit freely, including through the API.
+- transactional_session (any database, typically PostgreSQL): the schema
+  is created once, and each test runs in an outer transaction that is
+  rolled back afterwards. The session commits into SAVEPOINTs.
+
+Engines returned by `TemplateDatabase.snapshot` support SAVEPOINTs, so the
+two can be combined.
+"""
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from sqlalchemy import Connection, Engine, MetaData, event
+from sqlalchemy.orm import Session
+
+from ..db import models  # noqa: F401 - registers every model on Base.metadata
+from ..db.base import Base
+from ..db.engine import create_db_engine
+from ..db.session import create_session_factory
+
+IN_MEMORY_SQLITE_URL = "sqlite:///:memory:"
+
+
+def enable_sqlite_savepoints(engine: Engine) -> None:
+    """
+    Let SQLAlchemy, not the sqlite3 driver, begin transactions on an engine.
+
+    The driver begins transactions lazily before DML, so releasing the
+    first SAVEPOINT of a transaction would commit it. With driver-level
+    transaction handling off, BEGIN is emitted when SQLAlchemy begins.
+    BEGIN goes straight to the driver connection, so statement listeners
+    (query counting, slow query log) do not see it.
+
+    Must be called before the engine opens its first connection.
+
+    Args:
+        engine: SQLite engine
+    """
+
+    def disable_driver_transactions(dbapi_connection: Any, connection_record: Any) -> None:
+        dbapi_connection.isolation_level = None
+
+    def begin(connection: Connection) -> None:
+        connection.connection.driver_connection.execute("BEGIN")  # type: ignore[union-attr]
+
+    event.listen(engine, "connect", disable_driver_transactions)
+    event.listen(engine, "begin", begin)
+
+
+class TemplateDatabase:
+    """
+    In-memory SQLite schema created once and copied for every test.
+
+    Args:
+        seed: Optional callable filling the template (e.g. reference data)
+            before the first snapshot
+        metadata: Tables to create (defaults to every model)
+
+    Example:
+        >>> template = TemplateDatabase(seed=load_reference_data)
+        >>> engine = template.snapshot()  # per test
+        >>> engine.dispose()
+        >>> template.dispose()  # per test session
+    """
+
+    def __init__(self, seed: Callable[[Engine], None] | None = None, metadata: MetaData = Base.metadata) -> None:
+        self.engine = create_db_engine(IN_MEMORY_SQLITE_URL)
+        metadata.create_all(self.engine)
+        if seed is not None:
+            seed(self.engine)
+
+    def snapshot(self) -> Engine:
+        """
+        Copy the template into a new in-memory database.
+
+        Returns:
+            Engine over the copy, with SAVEPOINT support; dispose it after use
+        """
+        engine = create_db_engine(IN_MEMORY_SQLITE_URL)
+        enable_sqlite_savepoints(engine)
+        # Both engines use a StaticPool, so these are the databases' only connections
+        with self.engine.connect() as source, engine.connect() as target:
+            source.connection.driver_connection.backup(target.connection.driver_connection)  # type: ignore[union-attr]
+        return engine
+
+    def dispose(self) -> None:
+        """Close the template database."""
+        self.engine.dispose()
+
+
+@contextmanager
+def transactional_session(engine: Engine) -> Iterator[Session]:
+    """
+    Run a session inside a transaction that is rolled back on exit.
+
+    The session behaves like one from `create_session_factory` (partition
+    keys included); its commits release SAVEPOINTs and never reach the
+    database. On SQLite, use an engine with `enable_sqlite_savepoints`
+    (such as a `TemplateDatabase` snapshot).
+
+    Args:
+        engine: Engine over a database whose schema already exists
+
+    Yields:
+        Session whose changes are discarded afterwards
+    """
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        session = create_session_factory(engine)(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            session.close()
+            transaction.rollback()
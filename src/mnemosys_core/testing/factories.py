@@ -0,0 +1,219 @@
+"""
+Factories seeding realistic practice data.
+
+DataFactory builds instruments, exercises and practice histories with
+plausible values (tempos, keys, ratings) from a seeded random generator, so
+the same seed always produces the same data. Objects are added to the
+session and flushed, so their IDs are available; committing is left to the
+caller.
+"""
+
+import random
+from collections.abc import Sequence
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from ..db.models import (
+    BlockType,
+    CompletionStatus,
+    DomainType,
+    Exercise,
+    ExerciseInstance,
+    ExerciseLog,
+    Practice,
+    PracticeBlock,
+    PracticeBlockLog,
+    QualityRating,
+    SessionType,
+    StringedInstrument,
+)
+
+EXERCISE_NAMES = (
+    "Chromatic Scale",
+    "Spider Walk",
+    "Major Scale Sequences",
+    "Arpeggio Sweeps",
+    "Legato Triplets",
+    "ii-V-I Voicings",
+    "Syncopated Strumming",
+    "Interval Ear Training",
+)
+
+BLOCK_TYPE_BY_DOMAIN = {
+    DomainType.TECHNIQUE: BlockType.TECHNIQUE,
+    DomainType.HARMONY: BlockType.HARMONY,
+    DomainType.RHYTHM: BlockType.RHYTHM,
+    DomainType.MUSICIANSHIP: BlockType.APPLICATION,
+}
+
+KEYS = ("C", "G", "D", "A", "E", "F", "Bb", "Eb")
+
+
+class DataFactory:
+    """
+    Seeds instruments, exercises and practice histories into a session.
+
+    Args:
+        db_session: Session to add objects to (use one from
+            `create_session_factory` so partition keys are filled in)
+        seed: Random seed; equal seeds produce equal data
+
+    Example:
+        >>> factory = DataFactory(db_session)
+        >>> practices = factory.practice_history(days=30)
+        >>> db_session.commit()
+    """
+
+    def __init__(self, db_session: Session, seed: int = 0) -> None:
+        self.db_session = db_session
+        self.random = random.Random(seed)
+        self._counts: dict[str, int] = {}
+
+    def _next(self, kind: str) -> int:
+        """Return the next sequence number for unique names of a kind."""
+        self._counts[kind] = self._counts.get(kind, 0) + 1
+        return self._counts[kind]
+
+    def instrument(self, **overrides: Any) -> StringedInstrument:
+        """
+        Create a stringed instrument.
+
+        Args:
+            **overrides: Column values replacing the generated ones
+
+        Returns:
+            Flushed instrument
+        """
+        values: dict[str, Any] = {
+            "name": f"Guitar {self._next('instrument')}",
+            "string_count": self.random.choice((6, 6, 7, 8)),
+            "scale_length": self.random.choice((24.75, 25.5, 26.5)),
+        }
+        values.update(overrides)
+        instrument = StringedInstrument(**values)
+        self.db_session.add(instrument)
+        self.db_session.flush()
+        return instrument
+
+    def exercise(self, **overrides: Any) -> Exercise:
+        """
+        Create an exercise.
+
+        Args:
+            **overrides: Column values replacing the generated ones
+
+        Returns:
+            Flushed exercise
+        """
+        number = self._next("exercise")
+        name = EXERCISE_NAMES[(number - 1) % len(EXERCISE_NAMES)]
+        if number > len(EXERCISE_NAMES):
+            name = f"{name} {number}"
+        values: dict[str, Any] = {
+            "name": name,
+            "domains": [self.random.choice(list(DomainType))],
+            "instrument_compatibility": None,
+        }
+        values.update(overrides)
+        exercise = Exercise(**values)
+        self.db_session.add(exercise)
+        self.db_session.flush()
+        return exercise
+
+    def practice(
+        self,
+        instrument: StringedInstrument | None = None,
+        exercises: Sequence[Exercise] | None = None,
+        session_date: date | None = None,
+        session_type: SessionType = SessionType.NORMAL,
+    ) -> Practice:
+        """
+        Create a logged practice: one block and one exercise instance per exercise.
+
+        Args:
+            instrument: Instrument practiced (a new one if omitted)
+            exercises: Exercises practiced, in order (three new ones if omitted)
+            session_date: Practice date (defaults to 2025-01-01)
+            session_type: Session intensity
+
+        Returns:
+            Flushed practice with blocks, block logs, exercise instances and logs
+        """
+        if instrument is None:
+            instrument = self.instrument()
+        if exercises is None:
+            exercises = [self.exercise() for _ in range(3)]
+        practice = Practice(
+            instrument=instrument,
+            session_date=session_date if session_date is not None else date(2025, 1, 1),
+            session_type=session_type,
+            total_minutes=0,
+        )
+        for order, exercise in enumerate(exercises, start=1):
+            duration_minutes = self.random.choice((5, 10, 15, 20))
+            completion_status = self.random.choices(list(CompletionStatus), weights=(7, 2, 1))[0]
+            quality_rating = self.random.choices(list(QualityRating), weights=(3, 5, 2))[0]
+            block = PracticeBlock(
+                exercise=exercise,
+                block_order=order,
+                block_type=BLOCK_TYPE_BY_DOMAIN[exercise.domains[0]],
+                duration_minutes=duration_minutes,
+            )
+            block.logs.append(PracticeBlockLog(completed=completion_status, quality=quality_rating))
+            practice.blocks.append(block)
+
+            exercise_instance = ExerciseInstance(
+                exercise=exercise,
+                sequence_order=order,
+                parameters={
+                    "tempo": self.random.randrange(60, 181, 4),
+                    "key": self.random.choice(KEYS),
+                    "duration": duration_minutes,
+                },
+            )
+            exercise_instance.log = ExerciseLog(completion_status=completion_status, quality_rating=quality_rating)
+            practice.exercise_instances.append(exercise_instance)
+            practice.total_minutes += duration_minutes
+
+        self.db_session.add(practice)
+        self.db_session.flush()
+        return practice
+
+    def practice_history(
+        self,
+        days: int,
+        start: date | None = None,
+        instrument: StringedInstrument | None = None,
+        exercises: Sequence[Exercise] | None = None,
+        exercises_per_practice: int = 3,
+    ) -> list[Practice]:
+        """
+        Create one practice per day, each drawing from a shared pool of exercises.
+
+        Args:
+            days: Number of consecutive days
+            start: First practice date (defaults to 2025-01-01)
+            instrument: Instrument practiced (a new one if omitted)
+            exercises: Exercise pool (a new pool of EXERCISE_NAMES if omitted)
+            exercises_per_practice: Exercises practiced per day
+
+        Returns:
+            Flushed practices in date order
+        """
+        if instrument is None:
+            instrument = self.instrument()
+        if exercises is None:
+            exercises = [self.exercise() for _ in EXERCISE_NAMES]
+        first_day = start if start is not None else date(2025, 1, 1)
+        session_types = list(SessionType)
+        return [
+            self.practice(
+                instrument=instrument,
+                exercises=self.random.sample(list(exercises), min(exercises_per_practice, len(exercises))),
+                session_date=first_day + timedelta(days=day),
+                session_type=self.random.choices(session_types, weights=(6, 2, 1, 1))[0],
+            )
+            for day in range(days)
+        ]
@@ -0,0 +1,51 @@
+"""
+pytest fixtures over the test-database toolkit.
+
+Enable with `pytest_plugins = ["mnemosys_core.testing.pytest_plugin"]` in a
+conftest.py. Override `mnemosys_template_seed` to pre-seed the template
+every test starts from.
+"""
+
+from collections.abc import Callable, Generator
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from .database import TemplateDatabase, transactional_session
+from .factories import DataFactory
+
+
+@pytest.fixture(scope="session")
+def mnemosys_template_seed() -> Callable[[Engine], None] | None:
+    """Seed applied once to the template database (none by default)."""
+    return None
+
+
+@pytest.fixture(scope="session")
+def mnemosys_template(mnemosys_template_seed: Callable[[Engine], None] | None) -> Generator[TemplateDatabase]:
+    """Schema (and seed data) created once per test session."""
+    template = TemplateDatabase(seed=mnemosys_template_seed)
+    yield template
+    template.dispose()
+
+
+@pytest.fixture
+def mnemosys_engine(mnemosys_template: TemplateDatabase) -> Generator[Engine]:
+    """Private copy of the template database for one test."""
+    engine = mnemosys_template.snapshot()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def mnemosys_session(mnemosys_engine: Engine) -> Generator[Session]:
+    """Session whose changes are rolled back after the test."""
+    with transactional_session(mnemosys_engine) as db_session:
+        yield db_session
+
+
+@pytest.fixture
+def mnemosys_factory(mnemosys_session: Session) -> DataFactory:
+    """Data factory adding to `mnemosys_session`."""
+    return DataFactory(mnemosys_session)
@@ -0,0 +1,23 @@
+"""
+Wall-clock timing helpers.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+@contextmanager
+def timed(timings: dict[str, float], phase: str) -> Iterator[None]:
+    """
+    Time a block and record its duration, even when it raises.
+
+    Args:
+        timings: Seconds by phase, updated in place
+        phase: Key to record the block's duration under
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = time.perf_counter() - started
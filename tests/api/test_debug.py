@@ -0,0 +1,40 @@
+"""
+Debug API tests.
+"""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+
+from mnemosys_core.api.app import create_app
+from mnemosys_core.db.slow_query import SlowQueryLog
+
+
+def test_slow_queries_not_enabled(client: TestClient) -> None:
+    """Test that the endpoint is unavailable without a slow query log."""
+    response = client.get("/debug/slow-queries")
+
+    assert response.status_code == 404
+
+
+def test_slow_queries_are_attributed_to_routes(engine: Engine) -> None:
+    """Test that samples carry the route template and a plan."""
+    app = create_app(engine, slow_query_log=SlowQueryLog(threshold_ms=0.0, explain_threshold_ms=0.0))
+    with TestClient(app) as test_client:
+        test_client.get("/api/v1/practices/1")
+        test_client.get("/api/v1/instruments/")
+
+        response = test_client.get("/debug/slow-queries")
+        filtered_response = test_client.get(
+            "/debug/slow-queries", params={"origin": "GET /api/v1/practices/{practice_id}", "order": "slowest"}
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["threshold_ms"] == 0.0
+    assert [sample["origin"] for sample in data["samples"]] == [
+        "GET /api/v1/instruments/",
+        "GET /api/v1/practices/{practice_id}",
+    ]
+    assert data["samples"][1]["parameters"] == ["<int>", "<int>", "<int>"]
+    assert data["samples"][1]["plan"]
+    assert len(filtered_response.json()["samples"]) == 1
@@ -2,10 +2,26 @@
 Dependency injection tests.
 """
 
+from collections.abc import Callable
+from typing import cast
+
 import pytest
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session as DBSession
 
-from mnemosys_core.api.dependencies import get_db
+from mnemosys_core.api.dependencies import (
+    configure_dependencies,
+    get_candidate_index_cache,
+    get_db,
+    get_plan_cache,
+    get_reference_cache,
+)
+from mnemosys_core.db.engine import create_db_engine
+from mnemosys_core.db.query_budget import capture_queries
+from mnemosys_core.db.session import READ_ONLY_KEY
+from mnemosys_core.db.slow_query import SlowQueryLog
 
 
 def test_get_db_without_configuration() -> None:
@@ -17,3 +33,55 @@ def test_get_db_without_configuration() -> None:
     with pytest.raises(RuntimeError, match="Dependencies not configured"):
         generator = get_db(request)
         next(generator)
+
+
+def test_get_reference_cache_without_configuration() -> None:
+    """Test that get_reference_cache raises error when not configured."""
+    app = FastAPI()
+    scope = {"type": "http", "app": app, "headers": []}
+    request = Request(scope)
+
+    with pytest.raises(RuntimeError, match="Dependencies not configured"):
+        get_reference_cache(request)
+
+
+@pytest.mark.parametrize("dependency", [get_candidate_index_cache, get_plan_cache])
+def test_generator_caches_without_configuration(dependency: Callable[[Request], object]) -> None:
+    """Test that the session generator caches require configuration."""
+    request = Request({"type": "http", "app": FastAPI(), "headers": []})
+
+    with pytest.raises(RuntimeError, match="Dependencies not configured"):
+        dependency(request)
+
+
+def test_configure_dependencies_observes_read_engine() -> None:
+    """Test that query tracking and the slow query log cover the reader engine too."""
+    engine = create_db_engine("sqlite:///:memory:")
+    read_engine = create_db_engine("sqlite:///:memory:")
+    slow_query_log = SlowQueryLog(threshold_ms=0.0)
+    configure_dependencies(FastAPI(), engine, read_engine=read_engine, slow_query_log=slow_query_log)
+
+    with capture_queries() as query_log, read_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert len(query_log.statements) == 1
+    assert [sample.statement for sample in slow_query_log.samples()] == ["SELECT ?"]
+    engine.dispose()
+    read_engine.dispose()
+
+
+def test_get_request_runs_read_only(client: TestClient) -> None:
+    """Test that GET handlers receive read-only sessions and write handlers do not."""
+    seen_flags: list[bool] = []
+
+    def record_flag(db_session: DBSession = Depends(get_db)) -> dict[str, str]:
+        seen_flags.append(db_session.info[READ_ONLY_KEY])
+        return {"status": "ok"}
+
+    app = cast("FastAPI", client.app)
+    app.add_api_route("/probe", record_flag, methods=["GET", "POST"])
+
+    client.get("/probe")
+    client.post("/probe")
+
+    assert seen_flags == [True, False]
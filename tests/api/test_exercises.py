@@ -2,8 +2,11 @@
 Exercise API tests.
 """
 
+import pytest
 from fastapi.testclient import TestClient
 
+from mnemosys_core.util.time import today_utc
+
 
 # Exercise endpoint tests
 def test_create_exercise(client: TestClient) -> None:
@@ -74,6 +77,33 @@ def test_list_exercises_with_pagination(client: TestClient) -> None:
     assert data[1]["name"] == "Exercise 3"
 
 
+def test_list_exercises_with_filters(client: TestClient) -> None:
+    """Test GET /api/v1/exercises/ with domain and instrument feature filters."""
+    for name, domains, compatibility in [
+        ("Sweeps", ["Technique"], ["7-string"]),
+        ("Scales", ["Technique", "Harmony"], None),
+        ("Grooves", ["Rhythm"], ["drums"]),
+    ]:
+        client.post(
+            "/api/v1/exercises/",
+            json={"name": name, "domains": domains, "instrument_compatibility": compatibility},
+        )
+
+    def names(query: str) -> list[str]:
+        response = client.get(f"/api/v1/exercises/?{query}")
+        assert response.status_code == 200
+        return [exercise["name"] for exercise in response.json()]
+
+    assert names("domain=Technique") == ["Sweeps", "Scales"]
+    assert names("domain=Harmony&domain=Rhythm") == ["Scales", "Grooves"]
+    assert names("instrument_feature=stringed&instrument_feature=6-string") == ["Scales"]
+    assert names("domain=Technique&instrument_feature=7-String") == ["Sweeps", "Scales"]
+    assert names("domain=Technique&instrument_feature=7-String&skip=1") == ["Scales"]
+    assert names("domain=Technique&skip=2") == []
+    assert names("technique_id=1") == []
+    assert client.get("/api/v1/exercises/?domain=Unknown").status_code == 422
+
+
 def test_get_exercise(client: TestClient) -> None:
     """Test GET /api/v1/exercises/{id}."""
     # Create exercise
@@ -129,6 +159,21 @@ def test_update_exercise(client: TestClient) -> None:
     assert data["domains"] == ["Technique"]  # Unchanged
 
 
+def test_update_exercise_refreshes_cached_reads(client: TestClient) -> None:
+    """Test that GET after PUT sees the update despite the reference data cache."""
+    create_response = client.post(
+        "/api/v1/exercises/",
+        json={"name": "Original Name", "domains": ["Technique"], "instrument_compatibility": None},
+    )
+    exercise_id = create_response.json()["id"]
+    assert client.get(f"/api/v1/exercises/{exercise_id}").json()["name"] == "Original Name"
+
+    client.put(f"/api/v1/exercises/{exercise_id}", json={"name": "Updated Name"})
+
+    assert client.get(f"/api/v1/exercises/{exercise_id}").json()["name"] == "Updated Name"
+    assert [exercise["name"] for exercise in client.get("/api/v1/exercises/").json()] == ["Updated Name"]
+
+
 def test_update_exercise_not_found(client: TestClient) -> None:
     """Test PUT /api/v1/exercises/{id} with invalid ID."""
     response = client.put(
@@ -198,8 +243,8 @@ def test_create_exercise_state(client: TestClient) -> None:
     assert response.status_code == 201
     data = response.json()
     assert data["exercise_id"] == exercise_id
-    assert data["rolling_minutes_7d"] == 120
-    assert data["mastery_estimate"] == 0.65
+    assert data["rolling_minutes_7d"] == 0  # Read-only, derived from the practice history
+    assert data["mastery_estimate"] == 0.0  # Read-only, derived from the logged outcomes
 
 
 def test_list_exercise_states(client: TestClient) -> None:
@@ -296,7 +341,7 @@ def test_get_exercise_state(client: TestClient) -> None:
     assert response.status_code == 200
     data = response.json()
     assert data["id"] == state_id
-    assert data["mastery_estimate"] == 0.8
+    assert data["last_fatigue_profile"] == "F2"
 
 
 def test_get_exercise_state_not_found(client: TestClient) -> None:
@@ -341,9 +386,9 @@ def test_update_exercise_state(client: TestClient) -> None:
     )
     assert response.status_code == 200
     data = response.json()
-    assert data["mastery_estimate"] == 0.9
+    assert data["mastery_estimate"] == 0.0  # Read-only, derived from the logged outcomes
     assert data["last_fatigue_profile"] == "F1"
-    assert data["rolling_minutes_7d"] == 50  # Unchanged
+    assert data["rolling_minutes_7d"] == 0  # Read-only, derived from the practice history
 
 
 def test_update_exercise_state_not_found(client: TestClient) -> None:
@@ -395,3 +440,73 @@ def test_delete_exercise_state_not_found(client: TestClient) -> None:
     response = client.delete("/api/v1/exercises/states/999")
     assert response.status_code == 404
     assert response.json()["detail"] == "Exercise state not found"
+
+
+def test_exercise_state_windows_follow_practice_blocks(client: TestClient) -> None:
+    """Test that logging blocks maintains the rolling windows of the exercise state."""
+    exercise_id = client.post(
+        "/api/v1/exercises/", json={"name": "Rolling Exercise", "domains": ["Technique"]}
+    ).json()["id"]
+    instrument_id = client.post(
+        "/api/v1/instruments/", json={"name": "Rolling Guitar", "string_count": 6, "scale_length": 25.5}
+    ).json()["id"]
+    practice_id = client.post(
+        "/api/v1/practices/",
+        json={
+            "instrument_id": instrument_id,
+            "session_date": today_utc().isoformat(),
+            "session_type": "normal",
+            "total_minutes": 20,
+        },
+    ).json()["id"]
+    block = {"practice_id": practice_id, "exercise_id": exercise_id, "block_type": "Technique", "duration_minutes": 20}
+    block_id = client.post("/api/v1/practices/blocks/", json={**block, "block_order": 0}).json()["id"]
+    # A block counts once it is logged
+    assert client.get("/api/v1/exercises/states/").json() == []
+    client.post("/api/v1/practices/logs/", json={"practice_block_id": block_id, "completed": "yes", "quality": "clean"})
+
+    states = client.get("/api/v1/exercises/states/").json()
+    assert [(state["exercise_id"], state["rolling_minutes_7d"], state["rolling_minutes_28d"]) for state in states] == [
+        (exercise_id, 20, 20)
+    ]
+
+    response = client.post("/api/v1/exercises/states/", json={"exercise_id": exercise_id, "mastery_estimate": 0.5})
+    assert response.status_code == 409
+
+
+def test_exercise_state_mastery_follows_logs(client: TestClient) -> None:
+    """Test that logging clean blocks raises the mastery estimate of the exercise."""
+    exercise_id = client.post(
+        "/api/v1/exercises/", json={"name": "Mastery Exercise", "domains": ["Technique"]}
+    ).json()["id"]
+    instrument_id = client.post(
+        "/api/v1/instruments/", json={"name": "Mastery Guitar", "string_count": 6, "scale_length": 25.5}
+    ).json()["id"]
+    practice_id = client.post(
+        "/api/v1/practices/",
+        json={
+            "instrument_id": instrument_id,
+            "session_date": today_utc().isoformat(),
+            "session_type": "normal",
+            "total_minutes": 10,
+        },
+    ).json()["id"]
+    block_id = client.post(
+        "/api/v1/practices/blocks/",
+        json={
+            "practice_id": practice_id,
+            "exercise_id": exercise_id,
+            "block_order": 0,
+            "block_type": "Technique",
+            "duration_minutes": 10,
+        },
+    ).json()["id"]
+    response = client.post(
+        "/api/v1/practices/logs/",
+        json={"practice_block_id": block_id, "completed": "yes", "quality": "clean"},
+    )
+    assert response.status_code == 201
+
+    (state,) = client.get("/api/v1/exercises/states/").json()
+    assert state["mastery_estimate"] == pytest.approx(0.05)
+    assert state["failure_streak"] == 0
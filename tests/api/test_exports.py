@@ -0,0 +1,110 @@
+"""
+Export API tests.
+"""
+
+import io
+import sys
+from pathlib import Path
+from typing import Any
+
+import pyarrow.parquet
+import pytest
+from fastapi.testclient import TestClient
+
+
+def create_logged_practice(client: TestClient) -> None:
+    """Create a practice with one block and one block log through the API."""
+    instrument_id = client.post(
+        "/api/v1/instruments/", json={"name": "Test Guitar", "string_count": 6, "scale_length": 25.5}
+    ).json()["id"]
+    exercise_id = client.post("/api/v1/exercises/", json={"name": "Test Exercise", "domains": ["Technique"]}).json()["id"]
+    practice_id = client.post(
+        "/api/v1/practices/",
+        json={"instrument_id": instrument_id, "session_date": "2025-01-15", "session_type": "normal", "total_minutes": 60},
+    ).json()["id"]
+    block_id = client.post(
+        "/api/v1/practices/blocks/",
+        json={
+            "practice_id": practice_id,
+            "exercise_id": exercise_id,
+            "block_order": 1,
+            "block_type": "Technique",
+            "duration_minutes": 20,
+        },
+    ).json()["id"]
+    client.post("/api/v1/practices/logs/", json={"practice_block_id": block_id, "completed": "yes", "quality": "clean"})
+
+
+def test_list_export_sources(client: TestClient) -> None:
+    """Test GET /api/v1/exports/."""
+    response = client.get("/api/v1/exports/")
+
+    assert response.status_code == 200
+    assert "exercise_facts" in response.json()
+    assert "practice_block_log" in response.json()
+
+
+def test_export_source_as_parquet(client: TestClient) -> None:
+    """Test downloading a table as Parquet with watermark headers."""
+    create_logged_practice(client)
+
+    response = client.get("/api/v1/exports/practice_block_log.parquet")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    assert response.headers["x-export-rows"] == "1"
+    assert response.headers["x-export-last-id"] == "1"
+    table = pyarrow.parquet.read_table(io.BytesIO(response.content))
+    assert table.column("quality").to_pylist() == ["clean"]
+
+
+def test_export_incremental_after_last_id(client: TestClient) -> None:
+    """Test that exporting after the last ID returns an empty file and keeps the watermark."""
+    create_logged_practice(client)
+
+    response = client.get("/api/v1/exports/practice.parquet", params={"after_id": 1})
+
+    assert response.status_code == 200
+    assert response.headers["x-export-rows"] == "0"
+    assert response.headers["x-export-last-id"] == "1"
+    assert pyarrow.parquet.read_table(io.BytesIO(response.content)).num_rows == 0
+
+
+def test_export_unknown_source(client: TestClient) -> None:
+    """Test that unknown sources return 404."""
+    response = client.get("/api/v1/exports/instrument.parquet")
+
+    assert response.status_code == 404
+
+
+def test_export_of_empty_source_has_no_watermark(client: TestClient) -> None:
+    """Test that an empty export without after_id carries no last ID."""
+    response = client.get("/api/v1/exports/practice.parquet")
+
+    assert response.headers["x-export-rows"] == "0"
+    assert "x-export-last-id" not in response.headers
+
+
+def test_export_without_pyarrow(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a missing pyarrow is reported as 501."""
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    response = client.get("/api/v1/exports/practice.parquet")
+
+    assert response.status_code == 501
+    assert "'analytics' extra" in response.json()["detail"]
+
+
+def test_failed_export_removes_its_file(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the temporary file is deleted when the export fails."""
+    export_paths: list[Path] = []
+
+    def failing_export(connection: Any, source_name: str, destination: Any, **options: Any) -> None:
+        export_paths.append(Path(destination.name))
+        raise ValueError("export failed")
+
+    monkeypatch.setattr("mnemosys_core.api.routers.exports.export_parquet", failing_export)
+
+    with pytest.raises(ValueError, match="export failed"):
+        client.get("/api/v1/exports/practice.parquet")
+    assert not export_paths[0].exists()
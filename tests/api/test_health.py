@@ -53,3 +53,33 @@ def test_database_health_failure(client: TestClient) -> None:
         data = response.json()
         assert data["status"] == "error"
         assert "Connection failed" in data["database"]
+
+
+def test_pool_health_without_metrics(client: TestClient) -> None:
+    """Test pool endpoint for the uninstrumented SQLite test pool."""
+    response = client.get("/health/pool")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["metrics"] is None
+    assert "status" in data
+
+
+def test_pool_health_with_metrics() -> None:
+    """Test pool endpoint reports counters and wait quantiles."""
+    from mnemosys_core.api.app import create_app
+    from mnemosys_core.db.engine import attach_pool_metrics, create_db_engine
+    from mnemosys_core.db.pool import ObservedQueuePool, PoolMetrics
+
+    engine = create_db_engine("sqlite://", poolclass=ObservedQueuePool)
+    attach_pool_metrics(engine, PoolMetrics())
+    with TestClient(create_app(engine)) as test_client:
+        test_client.get("/health/db")
+        response = test_client.get("/health/pool")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["metrics"]["checkouts"] == 1
+    assert data["metrics"]["checkins"] == 1
+    assert data["wait_p99_ms"] is not None
+    engine.dispose()
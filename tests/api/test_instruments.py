@@ -2,8 +2,13 @@
 Instrument API tests.
 """
 
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
 from fastapi.testclient import TestClient
 
+from mnemosys_core.db.query_budget import QueryLog
+
 
 def test_health_check(client: TestClient) -> None:
     """Test basic health check endpoint."""
@@ -131,3 +136,16 @@ def test_delete_instrument(client: TestClient) -> None:
     # Verify deleted
     get_response = client.get(f"/api/v1/instruments/{instrument_id}")
     assert get_response.status_code == 404
+
+
+def test_list_instruments_loads_subclass_columns_in_one_query(
+    client: TestClient, assert_max_queries: Callable[[int], AbstractContextManager[QueryLog]]
+) -> None:
+    """Test that listing instruments does not lazy-load each stringed instrument row."""
+    for index in range(8):
+        client.post("/api/v1/instruments/", json={"name": f"Guitar {index}", "string_count": 6, "scale_length": 25.5})
+
+    with assert_max_queries(1):
+        response = client.get("/api/v1/instruments/")
+
+    assert [instrument["string_count"] for instrument in response.json()] == [6] * 8
@@ -0,0 +1,130 @@
+"""
+Mesocycle API tests.
+"""
+
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+from mnemosys_core.db.query_budget import QueryLog
+
+
+def _instrument(client: TestClient) -> int:
+    response = client.post("/api/v1/instruments/", json={"name": "Test Guitar", "string_count": 6, "scale_length": 25.5})
+    return int(response.json()["id"])
+
+
+def _mesocycle(client: TestClient, instrument_id: int, **overrides: Any) -> dict[str, Any]:
+    response = client.post(
+        "/api/v1/mesocycles/", json={"instrument_id": instrument_id, "start_date": "2025-06-02", **overrides}
+    )
+    assert response.status_code == 201
+    return dict(response.json())
+
+
+def _log_practice(client: TestClient, instrument_id: int, exercise_id: int, session_date: str, outcome: str) -> None:
+    """Log one block practiced on a day, clean or failed."""
+    practice = client.post(
+        "/api/v1/practices/",
+        json={"instrument_id": instrument_id, "session_date": session_date, "session_type": "normal", "total_minutes": 30},
+    ).json()
+    block = client.post(
+        "/api/v1/practices/blocks/",
+        json={
+            "practice_id": practice["id"],
+            "exercise_id": exercise_id,
+            "block_order": 1,
+            "block_type": "Technique",
+            "duration_minutes": 30,
+        },
+    ).json()
+    completed, quality = ("yes", "clean") if outcome == "clean" else ("no", "sloppy")
+    client.post(
+        "/api/v1/practices/logs/", json={"practice_block_id": block["id"], "completed": completed, "quality": quality}
+    )
+
+
+def test_plan_mesocycle(client: TestClient) -> None:
+    """Test POST /api/v1/mesocycles/."""
+    instrument_id = _instrument(client)
+
+    data = _mesocycle(client, instrument_id, accumulation_weeks=3, intensification_weeks=2, base_minutes=40)
+
+    assert (data["accumulation_weeks"], data["intensification_weeks"], data["deload_weeks"]) == (3, 2, 1)
+    assert len(data["days"]) == 42
+    assert data["days"][0] == {
+        "day": "2025-06-02",
+        "phase": "accumulation",
+        "session_type": "normal",
+        "target_minutes": 40,
+        "overload": "duration",
+        "replanned_on": None,
+    }
+    assert {day["session_type"] for day in data["days"][-7:]} == {"deload"}
+
+
+def test_plan_mesocycle_validation(client: TestClient) -> None:
+    """Test that unknown instruments and out-of-range phases are rejected."""
+    assert client.post("/api/v1/mesocycles/", json={"instrument_id": 999}).status_code == 404
+    instrument_id = _instrument(client)
+    response = client.post("/api/v1/mesocycles/", json={"instrument_id": instrument_id, "accumulation_weeks": 6})
+    assert response.status_code == 422
+
+
+def test_get_and_list_mesocycles(
+    client: TestClient, assert_max_queries: Callable[[int], AbstractContextManager[QueryLog]]
+) -> None:
+    """Test GET /api/v1/mesocycles/ and /{mesocycle_id}."""
+    first = _instrument(client)
+    second = client.post("/api/v1/instruments/", json={"name": "Second Guitar", "string_count": 7}).json()["id"]
+    mesocycle = _mesocycle(client, first)
+    _mesocycle(client, second)
+
+    with assert_max_queries(2):
+        response = client.get(f"/api/v1/mesocycles/{mesocycle['id']}")
+    assert response.json() == mesocycle
+    with assert_max_queries(2):
+        listed = client.get("/api/v1/mesocycles/").json()
+    assert len(listed) == 2
+    assert client.get("/api/v1/mesocycles/", params={"instrument_id": first}).json() == [mesocycle]
+    assert client.get("/api/v1/mesocycles/999").status_code == 404
+
+
+def test_replan_mesocycle(client: TestClient) -> None:
+    """Test POST /api/v1/mesocycles/{mesocycle_id}/replan."""
+    instrument_id = _instrument(client)
+    exercise_id = client.post("/api/v1/exercises/", json={"name": "Chromatic picking", "domains": ["Technique"]}).json()[
+        "id"
+    ]
+    mesocycle = _mesocycle(client, instrument_id)
+    for day in range(2, 9):
+        _log_practice(client, instrument_id, exercise_id, f"2025-06-{day:02d}", "clean")
+    for day in range(9, 16):
+        _log_practice(client, instrument_id, exercise_id, f"2025-06-{day:02d}", "failed" if day % 2 else "clean")
+
+    response = client.post(f"/api/v1/mesocycles/{mesocycle['id']}/replan", json={"as_of": "2025-06-15"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["rising"] is True
+    assert (data["recent_outcomes"], data["baseline_outcomes"]) == (7, 7)
+    assert data["baseline_failure_rate"] == 0.0
+    assert [day["day"] for day in data["replanned_days"]] == [f"2025-06-{day}" for day in range(16, 23)]
+    assert {day["replanned_on"] for day in data["replanned_days"]} == {"2025-06-15"}
+    days = client.get(f"/api/v1/mesocycles/{mesocycle['id']}").json()["days"]
+    assert days[:14] == mesocycle["days"][:14]
+    assert days[21:] == mesocycle["days"][21:]
+
+    repeated = client.post(f"/api/v1/mesocycles/{mesocycle['id']}/replan", json={"as_of": "2025-06-15"}).json()
+    assert repeated["replanned_days"] == []
+
+
+def test_delete_mesocycle(client: TestClient) -> None:
+    """Test DELETE /api/v1/mesocycles/{mesocycle_id}."""
+    mesocycle = _mesocycle(client, _instrument(client))
+
+    assert client.delete(f"/api/v1/mesocycles/{mesocycle['id']}").status_code == 204
+    assert client.get(f"/api/v1/mesocycles/{mesocycle['id']}").status_code == 404
+    assert client.delete(f"/api/v1/mesocycles/{mesocycle['id']}").status_code == 404
@@ -0,0 +1,59 @@
+"""
+Query budget middleware tests.
+"""
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, text
+from sqlalchemy.orm import Session as DBSession
+
+from mnemosys_core.api.app import create_app
+from mnemosys_core.api.dependencies import get_db
+from mnemosys_core.api.middleware import observe_queries
+from mnemosys_core.db.query_budget import QueryBudget, QueryBudgetExceededError, QueryMonitor
+
+
+def create_probe_client(engine: Engine, query_monitor: QueryMonitor) -> TestClient:
+    """Create a client with a route running three identical statements under a budget of two."""
+    app = create_app(engine, query_monitor=query_monitor)
+    router = APIRouter()
+
+    @router.get("/probe", dependencies=[Depends(QueryBudget(max_queries=2))])
+    def probe(db_session: DBSession = Depends(get_db)) -> dict[str, int]:
+        for value in range(3):
+            db_session.execute(text("SELECT :value"), {"value": value})
+        return {"queries": 3}
+
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_requests_over_budget_fail_in_strict_mode(engine: Engine) -> None:
+    """Test that the endpoint's declared budget is enforced."""
+    test_client = create_probe_client(engine, QueryMonitor(strict=True))
+
+    with pytest.raises(QueryBudgetExceededError, match="GET /probe: 3 queries exceed the budget of 2"):
+        test_client.get("/probe")
+
+
+def test_requests_over_budget_are_logged_otherwise(engine: Engine, caplog: pytest.LogCaptureFixture) -> None:
+    """Test that non-strict monitors let the response through."""
+    test_client = create_probe_client(engine, QueryMonitor())
+
+    response = test_client.get("/probe")
+
+    assert response.json() == {"queries": 3}
+    assert "3 queries exceed the budget of 2" in caplog.text
+
+
+def test_apps_without_query_monitor_pass_requests_through() -> None:
+    """Test that the middleware only attributes statements when no monitor is configured."""
+    app = FastAPI()
+    app.middleware("http")(observe_queries)
+
+    @app.get("/probe")
+    def probe() -> dict[str, bool]:
+        return {"ok": True}
+
+    assert TestClient(app).get("/probe").json() == {"ok": True}
@@ -2,9 +2,15 @@
 Practice API tests.
 """
 
+from datetime import date
 from typing import Any
 
 from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+
+from mnemosys_core.db.archive import archive_practices
+from mnemosys_core.db.session import create_session_factory
+from mnemosys_core.testing import DataFactory
 
 
 # Helper function to create required dependencies
@@ -141,6 +147,60 @@ def test_get_practice_not_found(client: TestClient) -> None:
     assert response.json()["detail"] == "Practice not found"
 
 
+def archive_test_history(engine: Engine) -> list[int]:
+    """Seed practices from 2020-01-30 to 2020-02-02, archive January, and return their IDs."""
+    with create_session_factory(engine)() as db_session:
+        practice_ids = [
+            practice.id for practice in DataFactory(db_session).practice_history(days=4, start=date(2020, 1, 30))
+        ]
+        db_session.commit()
+    archive_practices(engine, date(2020, 2, 1))
+    return practice_ids
+
+
+def test_list_practices_reads_archive_when_asked(client: TestClient, engine: Engine) -> None:
+    """Test GET /api/v1/practices/ with include_archived."""
+    archive_test_history(engine)
+
+    hot = client.get("/api/v1/practices/").json()
+    assert [practice["session_date"] for practice in hot] == ["2020-02-01", "2020-02-02"]
+
+    response = client.get("/api/v1/practices/?include_archived=true&date_to=2020-02-01&skip=1")
+    assert response.status_code == 200
+    assert [(practice["session_date"], practice["archived"]) for practice in response.json()] == [
+        ("2020-01-31", True),
+        ("2020-02-01", False),
+    ]
+
+
+def test_get_archived_practice(client: TestClient, engine: Engine) -> None:
+    """Test GET /api/v1/practices/{id} for an archived practice."""
+    archived_id = archive_test_history(engine)[0]
+
+    assert client.get(f"/api/v1/practices/{archived_id}").status_code == 404
+
+    response = client.get(f"/api/v1/practices/{archived_id}?include_archived=true")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == archived_id
+    assert data["session_date"] == "2020-01-30"
+    assert data["archived"] is True
+    assert client.get("/api/v1/practices/999?include_archived=true").status_code == 404
+
+
+def test_list_practice_summaries(client: TestClient, engine: Engine) -> None:
+    """Test GET /api/v1/practices/summaries/."""
+    archive_test_history(engine)
+
+    response = client.get("/api/v1/practices/summaries/?date_from=2020-01-15")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["month"] == "2020-01-01"
+    assert data[0]["practices"] == 2
+    assert data[0]["exercises"] == 6
+
+
 def test_update_practice(client: TestClient) -> None:
     """Test PUT /api/v1/practices/{id}."""
     instrument_id = create_test_instrument(client)
@@ -760,3 +820,170 @@ def test_delete_practice_block_log_not_found(client: TestClient) -> None:
     response = client.delete("/api/v1/practices/logs/999")
     assert response.status_code == 404
     assert response.json()["detail"] == "Practice block log not found"
+
+
+def create_practice_with_block_log(client: TestClient, instrument_id: int, exercise_id: int, session_date: str) -> int:
+    """Create a practice with one block and one block log; return the practice ID."""
+    practice_response = client.post(
+        "/api/v1/practices/",
+        json={
+            "instrument_id": instrument_id,
+            "session_date": session_date,
+            "session_type": "normal",
+            "total_minutes": 60,
+        },
+    )
+    practice_id = int(practice_response.json()["id"])
+    block_response = client.post(
+        "/api/v1/practices/blocks/",
+        json={
+            "practice_id": practice_id,
+            "exercise_id": exercise_id,
+            "block_order": 1,
+            "block_type": "Technique",
+            "duration_minutes": 20,
+        },
+    )
+    client.post(
+        "/api/v1/practices/logs/",
+        json={"practice_block_id": block_response.json()["id"], "completed": "yes", "quality": "clean"},
+    )
+    return practice_id
+
+
+def test_list_filters_by_session_date_range(client: TestClient) -> None:
+    """Test that list endpoints filter practices, blocks and logs by session date."""
+    instrument_id = create_test_instrument(client)
+    exercise_id = create_test_exercise(client)
+    create_practice_with_block_log(client, instrument_id, exercise_id, "2025-01-15")
+    create_practice_with_block_log(client, instrument_id, exercise_id, "2025-02-10")
+    create_practice_with_block_log(client, instrument_id, exercise_id, "2025-03-05")
+
+    date_range = {"date_from": "2025-02-01", "date_to": "2025-02-28"}
+    practices = client.get("/api/v1/practices/", params=date_range).json()
+    blocks = client.get("/api/v1/practices/blocks/", params=date_range).json()
+    logs = client.get("/api/v1/practices/logs/", params=date_range).json()
+
+    assert [practice["session_date"] for practice in practices] == ["2025-02-10"]
+    assert [block["session_date"] for block in blocks] == ["2025-02-10"]
+    assert [log["session_date"] for log in logs] == ["2025-02-10"]
+    assert len(client.get("/api/v1/practices/logs/", params={"date_from": "2025-02-01"}).json()) == 2
+    assert len(client.get("/api/v1/practices/blocks/", params={"date_to": "2025-02-28"}).json()) == 2
+
+
+def test_rescheduling_practice_moves_block_session_date(client: TestClient) -> None:
+    """Test that updating a practice date updates its blocks' partition keys."""
+    instrument_id = create_test_instrument(client)
+    exercise_id = create_test_exercise(client)
+    practice_id = create_practice_with_block_log(client, instrument_id, exercise_id, "2025-01-15")
+
+    client.put(f"/api/v1/practices/{practice_id}", json={"session_date": "2025-04-01"})
+
+    blocks = client.get("/api/v1/practices/blocks/").json()
+    logs = client.get("/api/v1/practices/logs/").json()
+    assert blocks[0]["session_date"] == "2025-04-01"
+    assert logs[0]["session_date"] == "2025-04-01"
+
+
+# Exercise instance endpoint tests
+def create_practice_with_instances(
+    client: TestClient, instrument_id: int, exercise_id: int, parameter_sets: list[dict[str, Any]]
+) -> list[int]:
+    """Create a practice with one exercise instance per parameter set and return their IDs."""
+    practice_response = client.post(
+        "/api/v1/practices/",
+        json={
+            "instrument_id": instrument_id,
+            "session_date": "2025-01-15",
+            "session_type": "normal",
+            "total_minutes": 60,
+        },
+    )
+    instance_ids = []
+    for sequence_order, parameters in enumerate(parameter_sets, start=1):
+        response = client.post(
+            "/api/v1/practices/instances/",
+            json={
+                "practice_id": practice_response.json()["id"],
+                "exercise_id": exercise_id,
+                "sequence_order": sequence_order,
+                "parameters": parameters,
+            },
+        )
+        assert response.status_code == 201
+        instance_ids.append(int(response.json()["id"]))
+    return instance_ids
+
+
+def test_create_and_get_exercise_instance(client: TestClient) -> None:
+    """Test POST and GET /api/v1/practices/instances/."""
+    instrument_id = create_test_instrument(client)
+    exercise_id = create_test_exercise(client)
+    [instance_id] = create_practice_with_instances(client, instrument_id, exercise_id, [{"tempo": 96, "key": "A"}])
+
+    response = client.get(f"/api/v1/practices/instances/{instance_id}")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["parameters"] == {"tempo": 96, "key": "A"}
+    assert data["session_date"] == "2025-01-15"
+
+    client.put(f"/api/v1/practices/instances/{instance_id}", json={"parameters": {"tempo": 100}})
+    assert client.get(f"/api/v1/practices/instances/{instance_id}").json()["parameters"] == {"tempo": 100}
+    assert client.delete(f"/api/v1/practices/instances/{instance_id}").status_code == 204
+    assert client.get(f"/api/v1/practices/instances/{instance_id}").status_code == 404
+
+
+def test_list_exercise_instances_by_parameters(client: TestClient) -> None:
+    """Test parameter filters on GET /api/v1/practices/instances/."""
+    instrument_id = create_test_instrument(client)
+    exercise_id = create_test_exercise(client)
+    slow, medium, fast, untimed = create_practice_with_instances(
+        client,
+        instrument_id,
+        exercise_id,
+        [{"tempo": 90, "key": "C"}, {"tempo": 120, "key": "G"}, {"tempo": 144.5, "key": "C"}, {"pattern": "1-2-3-4"}],
+    )
+
+    def instance_ids(*parameter: str) -> list[int]:
+        response = client.get(
+            "/api/v1/practices/instances/", params={"exercise_id": exercise_id, "parameter": list(parameter)}
+        )
+        assert response.status_code == 200
+        return [instance["id"] for instance in response.json()]
+
+    assert instance_ids("tempo>=120") == [medium, fast]
+    assert instance_ids("tempo>100", "tempo<=130") == [medium]
+    assert instance_ids("key=C", "tempo>100") == [fast]
+    assert instance_ids("pattern=1-2-3-4") == [untimed]
+    assert instance_ids() == [slow, medium, fast, untimed]
+
+
+def test_invalid_parameter_filter_is_rejected(client: TestClient) -> None:
+    """Test that malformed filters and non-numeric tempos return 422."""
+    for parameter in ("tempo", "tempo>=fast", "tempo'; --=1"):
+        response = client.get("/api/v1/practices/instances/", params={"parameter": parameter})
+        assert response.status_code == 422, parameter
+
+
+def test_list_exercise_instances_by_practice_and_date(client: TestClient) -> None:
+    """Test practice and session date filters on GET /api/v1/practices/instances/."""
+    instrument_id = create_test_instrument(client)
+    exercise_id = create_test_exercise(client)
+    [first] = create_practice_with_instances(client, instrument_id, exercise_id, [{"tempo": 90}])
+    [second] = create_practice_with_instances(client, instrument_id, exercise_id, [{"tempo": 100}])
+    practice_id = client.get(f"/api/v1/practices/instances/{second}").json()["practice_id"]
+
+    def instance_ids(**params: Any) -> list[int]:
+        return [instance["id"] for instance in client.get("/api/v1/practices/instances/", params=params).json()]
+
+    assert instance_ids(practice_id=practice_id) == [second]
+    assert instance_ids(date_from="2025-01-15", date_to="2025-01-15") == [first, second]
+    assert instance_ids(date_from="2025-01-16") == []
+    assert instance_ids(date_to="2025-01-14") == []
+
+
+def test_missing_exercise_instance_returns_404(client: TestClient) -> None:
+    """Test PUT and DELETE /api/v1/practices/instances/{instance_id} for unknown IDs."""
+    assert client.put("/api/v1/practices/instances/999", json={"parameters": {}}).status_code == 404
+    assert client.delete("/api/v1/practices/instances/999").status_code == 404
@@ -0,0 +1,123 @@
+"""
+Retrying route tests.
+"""
+
+from typing import cast
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, exc
+from sqlalchemy.orm import Session as DBSession
+
+from mnemosys_core.api.app import create_app
+from mnemosys_core.api.dependencies import get_db
+from mnemosys_core.api.routing import RetryingRoute
+from mnemosys_core.db.models import DomainType, Exercise
+from mnemosys_core.db.retry import RetryPolicy
+
+
+def locked_error() -> exc.OperationalError:
+    """Build the error SQLite raises under lock contention."""
+    return exc.OperationalError("UPDATE exercise", {}, Exception("database is locked"))
+
+
+def create_flaky_client(engine: Engine, failures: int, retry_policy: RetryPolicy) -> tuple[TestClient, list[str]]:
+    """Create a client whose probe routes fail transiently a given number of times."""
+    app = create_app(engine, retry_policy=retry_policy)
+    router = APIRouter(route_class=RetryingRoute)
+    calls: list[str] = []
+
+    @router.api_route("/probe", methods=["PUT", "POST"])
+    def probe(db_session: DBSession = Depends(get_db)) -> dict[str, int]:
+        calls.append("call")
+        db_session.add(Exercise(name=f"Attempt {len(calls)}", domains=[DomainType.TECHNIQUE]))
+        db_session.flush()
+        if len(calls) <= failures:
+            raise locked_error()
+        return {"attempts": len(calls)}
+
+    app.include_router(router)
+    return TestClient(app, raise_server_exceptions=False), calls
+
+
+def test_idempotent_request_is_retried(engine: Engine) -> None:
+    """Test that a PUT hitting a transient error is rerun and only the last attempt commits."""
+    test_client, calls = create_flaky_client(engine, failures=2, retry_policy=RetryPolicy(base_delay_seconds=0.0))
+
+    response = test_client.put("/probe")
+
+    assert response.status_code == 200
+    assert response.json() == {"attempts": 3}
+    assert len(calls) == 3
+    retry_statistics = test_client.get("/health/retries").json()
+    assert retry_statistics == {
+        "retries": 2,
+        "recovered": 1,
+        "exhausted": 0,
+        "retries_by_reason": {"lock_contention": 2},
+    }
+    app = cast("FastAPI", test_client.app)
+    with app.state.session_factory() as db_session:
+        assert [exercise.name for exercise in db_session.query(Exercise)] == ["Attempt 3"]
+
+
+def test_retry_budget_is_bounded(engine: Engine) -> None:
+    """Test that retries stop at max_attempts and the error surfaces."""
+    test_client, calls = create_flaky_client(
+        engine, failures=5, retry_policy=RetryPolicy(max_attempts=2, base_delay_seconds=0.0)
+    )
+
+    response = test_client.put("/probe")
+
+    assert response.status_code == 500
+    assert len(calls) == 2
+    assert test_client.get("/health/retries").json()["exhausted"] == 1
+
+
+def test_non_idempotent_request_is_not_retried(engine: Engine) -> None:
+    """Test that POST requests run once."""
+    test_client, calls = create_flaky_client(engine, failures=1, retry_policy=RetryPolicy(base_delay_seconds=0.0))
+
+    response = test_client.post("/probe")
+
+    assert response.status_code == 500
+    assert calls == ["call"]
+
+
+def test_routes_without_policy_run_once() -> None:
+    """Test that apps without a retry policy leave requests alone."""
+    app = FastAPI()
+    router = APIRouter(route_class=RetryingRoute)
+    calls: list[str] = []
+
+    @router.get("/probe")
+    def probe() -> None:
+        calls.append("call")
+        raise locked_error()
+
+    app.include_router(router)
+
+    with pytest.raises(exc.OperationalError):
+        TestClient(app).get("/probe")
+    assert calls == ["call"]
+
+
+def test_retries_without_metrics(engine: Engine) -> None:
+    """Test that apps without retry metrics still retry up to the policy."""
+    app = FastAPI()
+    app.state.engine = engine
+    app.state.retry_policy = RetryPolicy(max_attempts=3, base_delay_seconds=0.0)
+    router = APIRouter(route_class=RetryingRoute)
+    calls: list[str] = []
+
+    @router.get("/probe")
+    def probe() -> None:
+        calls.append("call")
+        raise locked_error()
+
+    app.include_router(router)
+
+    with pytest.raises(exc.OperationalError):
+        TestClient(app).get("/probe")
+    assert len(calls) == 3
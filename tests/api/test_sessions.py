@@ -0,0 +1,135 @@
+"""
+Session generation API tests.
+"""
+
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+from mnemosys_core.db.query_budget import QueryLog
+
+
+def _catalog(client: TestClient) -> int:
+    """Create an instrument and a small catalog; return the instrument ID."""
+    response = client.post("/api/v1/instruments/", json={"name": "Test Guitar", "string_count": 6, "scale_length": 25.5})
+    for name, domain in [
+        ("Chromatic picking", "Technique"),
+        ("Legato runs", "Technique"),
+        ("Triad inversions", "Harmony"),
+        ("Sixteenth-note grid", "Rhythm"),
+        ("Melodic improvisation", "Musicianship"),
+    ]:
+        client.post("/api/v1/exercises/", json={"name": name, "domains": [domain]})
+    return int(response.json()["id"])
+
+
+def _request(instrument_id: int, **overrides: Any) -> dict[str, Any]:
+    return {"instrument_id": instrument_id, "available_minutes": 30, "session_date": "2025-06-10", **overrides}
+
+
+def test_plan_session(client: TestClient) -> None:
+    """Test POST /api/v1/sessions/plan."""
+    instrument_id = _catalog(client)
+
+    response = client.post("/api/v1/sessions/plan", json=_request(instrument_id))
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_minutes"] == 30
+    assert [block["block_type"] for block in data["blocks"]] == ["Warmup", "Technique", "Harmony", "Application"]
+    assert data["skipped_blocks"] == []
+    assert client.post("/api/v1/sessions/plan", json=_request(instrument_id)).json() == data
+    assert client.get("/api/v1/practices/").json() == []
+
+
+def test_plan_session_reads_states_once(
+    client: TestClient, assert_max_queries: Callable[[int], AbstractContextManager[QueryLog]]
+) -> None:
+    """Test that a plan reads the instrument, its planned day and the states, not the catalog."""
+    instrument_id = _catalog(client)
+    client.post("/api/v1/sessions/plan", json=_request(instrument_id))
+
+    with assert_max_queries(3):
+        client.post("/api/v1/sessions/plan", json=_request(instrument_id, available_minutes=90))
+
+
+def test_repeated_plans_are_cached(
+    client: TestClient, assert_max_queries: Callable[[int], AbstractContextManager[QueryLog]]
+) -> None:
+    """Test that repeating a request is served from the plan cache until a practice is logged."""
+    instrument_id = _catalog(client)
+    first = client.post("/api/v1/sessions/plan", json=_request(instrument_id)).json()
+
+    with assert_max_queries(0):
+        assert client.post("/api/v1/sessions/plan", json=_request(instrument_id)).json() == first
+
+    created = client.post("/api/v1/sessions/", json=_request(instrument_id)).json()
+    assert created["blocks"] == first["blocks"]
+    with assert_max_queries(3) as query_log:
+        client.post("/api/v1/sessions/plan", json=_request(instrument_id))
+    assert len(query_log.statements) == 3
+
+
+def test_create_session(client: TestClient) -> None:
+    """Test POST /api/v1/sessions/ saves the plan as a practice."""
+    instrument_id = _catalog(client)
+
+    response = client.post("/api/v1/sessions/", json=_request(instrument_id, session_type="light"))
+
+    assert response.status_code == 201
+    data = response.json()
+    practice = client.get(f"/api/v1/practices/{data['practice_id']}").json()
+    assert practice["total_minutes"] == 30
+    assert practice["session_type"] == "light"
+    instances = client.get("/api/v1/practices/instances/").json()
+    assert [instance["exercise_id"] for instance in instances] == [block["exercise_id"] for block in data["blocks"]]
+    assert instances[0]["parameters"] == data["blocks"][0]["parameters"]
+
+
+def test_saved_plans_do_not_count_as_practice(client: TestClient) -> None:
+    """Test that saving a plan leaves the exercise states, and so the next plan, unchanged."""
+    instrument_id = _catalog(client)
+    planned = client.post("/api/v1/sessions/plan", json=_request(instrument_id)).json()
+
+    client.post("/api/v1/sessions/", json=_request(instrument_id))
+
+    replanned = client.post("/api/v1/sessions/plan", json=_request(instrument_id)).json()
+    assert [block["exercise_id"] for block in replanned["blocks"]] == [
+        block["exercise_id"] for block in planned["blocks"]
+    ]
+    assert client.get("/api/v1/exercises/states/").json() == []
+
+
+def test_sessions_follow_the_mesocycle(client: TestClient) -> None:
+    """Test that a planned day sets the session type, caps the minutes and invalidates cached plans."""
+    instrument_id = _catalog(client)
+    request = _request(instrument_id, available_minutes=60, session_date="2025-06-11")
+    unplanned = client.post("/api/v1/sessions/plan", json=request).json()
+    assert unplanned["session_type"] == "normal"
+
+    mesocycle = client.post(
+        "/api/v1/mesocycles/",
+        json={"instrument_id": instrument_id, "start_date": "2025-06-02", "accumulation_weeks": 3, "base_minutes": 40},
+    ).json()
+    planned_day = next(day for day in mesocycle["days"] if day["day"] == "2025-06-11")
+    assert (planned_day["session_type"], planned_day["target_minutes"]) == ("light", 26)
+
+    response = client.post("/api/v1/sessions/", json=request)
+
+    data = response.json()
+    assert (data["session_type"], data["total_minutes"]) == ("light", 26)
+    practice = client.get(f"/api/v1/practices/{data['practice_id']}").json()
+    assert practice["session_type"] == "light"
+
+
+def test_generate_session_errors(client: TestClient) -> None:
+    """Test missing instruments, empty catalogs and invalid lengths."""
+    assert client.post("/api/v1/sessions/plan", json=_request(999)).status_code == 404
+
+    response = client.post("/api/v1/instruments/", json={"name": "Bare", "string_count": 6, "scale_length": 25.5})
+    assert client.post("/api/v1/sessions/plan", json=_request(response.json()["id"])).status_code == 422
+
+    instrument_id = _catalog(client)
+    assert client.post("/api/v1/sessions/plan", json=_request(instrument_id, available_minutes=5)).status_code == 422
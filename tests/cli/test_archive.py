@@ -0,0 +1,58 @@
+"""
+Archival command tests.
+"""
+
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+
+from mnemosys_core.cli import main
+from mnemosys_core.db.base import Base
+from mnemosys_core.db.engine import create_db_engine
+from mnemosys_core.db.models import Practice, PracticeArchive
+from mnemosys_core.db.session import create_session_factory
+from mnemosys_core.testing import DataFactory
+
+
+@pytest.fixture
+def sqlite_database_url(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Point the CLI at a file-backed SQLite database with practices from 2020-01-01 to 2020-01-10."""
+    database_url = f"sqlite:///{tmp_path / 'mnemosys.db'}"
+    monkeypatch.setenv("MNEMOSYS_ENV", "test")
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    engine = create_db_engine(database_url)
+    Base.metadata.create_all(engine)
+    with create_session_factory(engine)() as db_session:
+        DataFactory(db_session).practice_history(days=10, start=date(2020, 1, 1))
+        db_session.commit()
+    engine.dispose()
+    return database_url
+
+
+def _counts(database_url: str) -> tuple[int, int]:
+    engine = create_db_engine(database_url)
+    with engine.connect() as connection:
+        hot = connection.execute(select(func.count()).select_from(Practice)).scalar_one()
+        archived = connection.execute(select(func.count()).select_from(PracticeArchive)).scalar_one()
+    engine.dispose()
+    return hot, archived
+
+
+def test_archive_command_archives_before_date(sqlite_database_url: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that --before moves the older practices."""
+    assert main(["archive", "--before", "2020-01-05", "--batch-size", "3", "--pause", "0"]) == 0
+
+    assert "archived 4 practice(s) dated before 2020-01-05 (done)" in capsys.readouterr().out
+    assert _counts(sqlite_database_url) == (6, 4)
+
+
+def test_archive_command_uses_horizon(sqlite_database_url: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the horizon defaults to archiving everything old and stops after --max-batches."""
+    assert main(["archive", "--batch-size", "2", "--max-batches", "1", "--pause", "0"]) == 0
+
+    output = capsys.readouterr().out
+    assert "archived 2 practice(s)" in output
+    assert "(more to archive)" in output
+    assert _counts(sqlite_database_url) == (8, 2)
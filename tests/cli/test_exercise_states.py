@@ -0,0 +1,108 @@
+"""
+Exercise state maintenance command tests.
+"""
+
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert, select
+
+from mnemosys_core.cli import main
+from mnemosys_core.db.base import Base
+from mnemosys_core.db.engine import create_db_engine
+from mnemosys_core.db.models import ExerciseState, PracticeBlock, PracticeBlockLog
+from mnemosys_core.db.session import create_session_factory
+from mnemosys_core.testing import DataFactory
+from mnemosys_core.util.time import today_utc
+
+
+@pytest.fixture
+def sqlite_database_url(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Point the CLI at a file-backed SQLite database with a week of practices, one logged block inserted behind the ORM."""
+    database_url = f"sqlite:///{tmp_path / 'mnemosys.db'}"
+    monkeypatch.setenv("MNEMOSYS_ENV", "test")
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    engine = create_db_engine(database_url)
+    Base.metadata.create_all(engine)
+    with create_session_factory(engine)() as db_session:
+        factory = DataFactory(db_session)
+        exercise = factory.exercise()
+        practice = factory.practice(exercises=[exercise], session_date=today_utc() - timedelta(days=1))
+        db_session.commit()
+    with engine.begin() as connection:
+        block_id = connection.execute(
+            insert(PracticeBlock)
+            .values(
+                practice_id=practice.id,
+                exercise_id=exercise.id,
+                block_order=2,
+                block_type="Technique",
+                duration_minutes=1000,
+                session_date=practice.session_date,
+            )
+            .returning(PracticeBlock.id)
+        ).scalar_one()
+        connection.execute(
+            insert(PracticeBlockLog).values(practice_block_id=block_id, completed="yes", quality="clean")
+        )
+    engine.dispose()
+    return database_url
+
+
+def _windows(database_url: str) -> list[tuple[int, int]]:
+    engine = create_db_engine(database_url)
+    with engine.connect() as connection:
+        rows = connection.execute(select(ExerciseState.rolling_minutes_7d, ExerciseState.rolling_minutes_28d)).all()
+    engine.dispose()
+    return [tuple(row) for row in rows]
+
+
+def test_rebuild_picks_up_rows_written_behind_the_orm(
+    sqlite_database_url: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that rebuild reseeds windows from the history."""
+    before = _windows(sqlite_database_url)
+
+    assert main(["exercise-states", "rebuild"]) == 0
+
+    assert "1 daily bucket(s) rebuilt" in capsys.readouterr().out
+    assert _windows(sqlite_database_url) == [(before[0][0] + 1000, before[0][1] + 1000)]
+
+
+def test_expire_skips_current_windows(sqlite_database_url: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that expire only refreshes windows from an earlier day."""
+    assert main(["exercise-states", "expire"]) == 0
+
+    assert "0 exercise state(s) refreshed" in capsys.readouterr().out
+
+
+def test_recompute_dry_run_prints_diff(sqlite_database_url: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that a dry run prints changed fields and writes nothing."""
+    before = _windows(sqlite_database_url)
+
+    assert main(["exercise-states", "recompute", "--dry-run"]) == 0
+
+    output = capsys.readouterr().out
+    assert f"rolling_minutes_7d {before[0][0]!r} -> {before[0][0] + 1000!r}" in output
+    assert "1 exercise state(s) recomputed" in output
+    assert "would change" in output
+    assert "derive" in output
+    assert _windows(sqlite_database_url) == before
+
+
+def test_recompute_writes_states(sqlite_database_url: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that recompute picks up rows written behind the ORM."""
+    before = _windows(sqlite_database_url)
+
+    assert main(["exercise-states", "recompute"]) == 0
+
+    assert "field(s) changed" in capsys.readouterr().out
+    assert _windows(sqlite_database_url) == [(before[0][0] + 1000, before[0][1] + 1000)]
+
+
+def test_mastery_replays_logs(sqlite_database_url: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that mastery rebuilds estimates from the block and exercise logs."""
+    assert main(["exercise-states", "mastery"]) == 0
+
+    assert "3 log(s) replayed into 1 exercise state(s)" in capsys.readouterr().out
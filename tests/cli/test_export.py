@@ -0,0 +1,56 @@
+"""
+Parquet export command tests.
+"""
+
+import sys
+from pathlib import Path
+
+import pyarrow.parquet
+import pytest
+
+from mnemosys_core.cli import main
+from mnemosys_core.db.base import Base
+from mnemosys_core.db.engine import create_db_engine
+
+
+@pytest.fixture
+def sqlite_database_url(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Point the CLI at an empty file-backed SQLite database."""
+    database_url = f"sqlite:///{tmp_path / 'mnemosys.db'}"
+    monkeypatch.setenv("MNEMOSYS_ENV", "test")
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    engine = create_db_engine(database_url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return database_url
+
+
+def test_export_command_writes_one_file_per_source(
+    sqlite_database_url: str, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that each source is written to the output directory."""
+    output_dir = tmp_path / "exports"
+
+    assert main(["export", "practice", "exercise_facts", "--output-dir", str(output_dir), "--after-id", "5"]) == 0
+
+    output = capsys.readouterr().out
+    assert "practice: 0 rows" in output
+    assert "(last id 5)" in output
+    assert pyarrow.parquet.read_table(output_dir / "exercise_facts.after-5.parquet").num_rows == 0
+    assert (output_dir / "practice.after-5.parquet").exists()
+
+
+def test_export_command_rejects_unknown_sources(sqlite_database_url: str) -> None:
+    """Test that sources are validated by the parser."""
+    with pytest.raises(SystemExit):
+        main(["export", "instrument"])
+
+
+def test_export_command_without_pyarrow(
+    sqlite_database_url: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that a missing pyarrow is reported and fails the command."""
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    assert main(["export", "practice", "--output-dir", str(tmp_path / "exports")]) == 1
+    assert "'analytics' extra" in capsys.readouterr().out
@@ -0,0 +1,350 @@
+"""
+Bulk practice history import tests.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Generator
+from datetime import date
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import sessionmaker
+
+from mnemosys_core.cli import main
+from mnemosys_core.cli.import_history import (
+    ImportProgress,
+    PracticeHistoryImporter,
+    RejectedRow,
+    _allocate_ids,
+    _copy_rows,
+    _iter_json_array,
+    read_source_rows,
+)
+from mnemosys_core.db import models
+from mnemosys_core.db.base import Base
+from mnemosys_core.db.engine import create_db_engine
+from mnemosys_core.db.models import (
+    DomainType,
+    Exercise,
+    ImportCheckpoint,
+    Practice,
+    PracticeBlock,
+    PracticeBlockLog,
+    StringedInstrument,
+)
+
+FIELD_NAMES = [
+    "session_date",
+    "instrument",
+    "session_type",
+    "total_minutes",
+    "exercise",
+    "block_order",
+    "block_type",
+    "duration_minutes",
+    "completed",
+    "quality",
+    "notes",
+]
+
+
+def history_row(session_date: str, block_order: int, **overrides: Any) -> dict[str, Any]:
+    """Build one valid source row."""
+    row: dict[str, Any] = {
+        "session_date": session_date,
+        "instrument": "Strat",
+        "session_type": "normal",
+        "total_minutes": "60",
+        "exercise": "Chromatic Scale",
+        "block_order": str(block_order),
+        "block_type": "Technique",
+        "duration_minutes": "15",
+        "completed": "yes",
+        "quality": "clean",
+        "notes": "",
+    }
+    row.update(overrides)
+    return row
+
+
+def seed_reference_data(engine: Engine) -> None:
+    """Create the instrument and exercise the rows refer to by name."""
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db_session:
+        db_session.add(StringedInstrument(name="Strat", string_count=6, scale_length=25.5))
+        db_session.add(Exercise(name="Chromatic Scale", domains=[DomainType.TECHNIQUE]))
+        db_session.commit()
+
+
+@pytest.fixture
+def seeded_engine(engine: Engine) -> Engine:
+    """In-memory database with reference data."""
+    seed_reference_data(engine)
+    return engine
+
+
+def test_import_groups_rows_into_practices(seeded_engine: Engine) -> None:
+    """Test that rows become practices, blocks and logs with partition keys."""
+    rows = [history_row("2021-03-01", 1), history_row("2021-03-01", 2), history_row("2021-03-02", 1)]
+    progress_reports: list[ImportProgress] = []
+
+    progress = PracticeHistoryImporter(seeded_engine, batch_size=2).run(
+        rows, source="history.csv", on_progress=progress_reports.append
+    )
+
+    assert (progress.rows_processed, progress.rows_imported, progress.rows_rejected) == (3, 3, 0)
+    assert [report.rows_processed for report in progress_reports] == [2, 3]
+    with seeded_engine.connect() as connection:
+        assert connection.execute(select(Practice.session_date).order_by(Practice.id)).scalars().all() == [
+            date(2021, 3, 1),
+            date(2021, 3, 2),
+        ]
+        block_dates = connection.execute(select(PracticeBlock.session_date).order_by(PracticeBlock.id)).scalars()
+        assert list(block_dates) == [date(2021, 3, 1), date(2021, 3, 1), date(2021, 3, 2)]
+        log_dates = connection.execute(select(PracticeBlockLog.session_date).order_by(PracticeBlockLog.id)).scalars()
+        assert list(log_dates) == [date(2021, 3, 1), date(2021, 3, 1), date(2021, 3, 2)]
+
+
+def test_import_rejects_invalid_rows_and_keeps_the_rest(seeded_engine: Engine) -> None:
+    """Test that unknown names and schema violations reject only their rows."""
+    rows = [
+        history_row("2021-03-01", 1),
+        history_row("2021-03-01", 2, exercise="Unknown Drill"),
+        history_row("2021-03-01", 3, duration_minutes="0"),
+        history_row("not-a-date", 4),
+        history_row("2021-03-01", 5, instrument="Tuba"),
+        history_row("2021-03-01", 6, quality="perfect"),
+    ]
+    rejected_rows: list[RejectedRow] = []
+
+    progress = PracticeHistoryImporter(seeded_engine).run(rows, source="history.csv", on_reject=rejected_rows.append)
+
+    assert progress.rows_imported == 1
+    assert [rejected_row.row_number for rejected_row in rejected_rows] == [2, 3, 4, 5, 6]
+    assert rejected_rows[0].reason == "unknown exercise: Unknown Drill"
+    assert rejected_rows[1].reason.startswith("duration_minutes:")
+    assert rejected_rows[3].reason == "unknown instrument: Tuba"
+
+
+def test_import_resumes_from_checkpoint(seeded_engine: Engine) -> None:
+    """Test that a second run skips processed rows and reuses stored practices."""
+    rows = [history_row("2021-03-01", order) for order in range(1, 5)]
+    PracticeHistoryImporter(seeded_engine, batch_size=2).run(rows[:2], source="history.csv")
+
+    progress = PracticeHistoryImporter(seeded_engine, batch_size=2).run(rows, source="history.csv")
+
+    assert progress.rows_skipped == 2
+    assert progress.rows_imported == 2
+    with seeded_engine.connect() as connection:
+        assert len(connection.execute(select(Practice.id)).all()) == 1
+        assert len(connection.execute(select(PracticeBlockLog.id)).all()) == 4
+        checkpoint = connection.execute(select(ImportCheckpoint)).one()
+        assert (checkpoint.source, checkpoint.rows_processed, checkpoint.rows_imported) == ("history.csv", 4, 4)
+    with sessionmaker(bind=seeded_engine)() as db_session:
+        checkpoint_model = db_session.scalars(select(ImportCheckpoint)).one()
+        assert repr(checkpoint_model) == "<ImportCheckpoint(source='history.csv', rows_processed=4)>"
+
+
+def test_failed_checkpoint_rolls_back_its_batch(seeded_engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a batch is only kept together with its checkpoint, so resuming writes it once."""
+    rows = [history_row("2021-03-01", 1), history_row("2021-03-02", 1)]
+    importer = PracticeHistoryImporter(seeded_engine, batch_size=1)
+    write_checkpoint = importer._write_checkpoint
+    calls = 0
+
+    def fail_second_checkpoint(*arguments: Any) -> None:
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("connection lost")
+        write_checkpoint(*arguments)
+
+    monkeypatch.setattr(importer, "_write_checkpoint", fail_second_checkpoint)
+    with pytest.raises(RuntimeError, match="connection lost"):
+        importer.run(rows, source="history.csv")
+
+    progress = importer.run(rows, source="history.csv")
+
+    assert (progress.rows_skipped, progress.rows_imported) == (1, 1)
+    with seeded_engine.connect() as connection:
+        assert connection.execute(select(Practice.session_date).order_by(Practice.id)).scalars().all() == [
+            date(2021, 3, 1),
+            date(2021, 3, 2),
+        ]
+        assert len(connection.execute(select(PracticeBlockLog.id)).all()) == 2
+
+
+def test_import_reuses_practices_from_earlier_batches(seeded_engine: Engine) -> None:
+    """Test that later batches of a run attach to practices created by earlier ones."""
+    rows = [history_row("2021-03-01", order) for order in range(1, 4)]
+
+    progress = PracticeHistoryImporter(seeded_engine, batch_size=1).run(rows, source="history.csv")
+
+    assert progress.rows_imported == 3
+    with seeded_engine.connect() as connection:
+        assert len(connection.execute(select(Practice.id)).all()) == 1
+        assert len(connection.execute(select(PracticeBlock.id)).all()) == 3
+
+
+def test_read_source_rows_formats(tmp_path: Path) -> None:
+    """Test reading CSV, JSON and JSON Lines sources."""
+    rows = [history_row("2021-03-01", 1), history_row("2021-03-02", 1)]
+    csv_path = tmp_path / "history.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=FIELD_NAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+    json_path = tmp_path / "history.json"
+    json_path.write_text(json.dumps(rows), encoding="utf-8")
+    jsonl_path = tmp_path / "history.jsonl"
+    jsonl_path.write_text("\n".join(json.dumps(row) for row in rows) + "\n\n", encoding="utf-8")
+
+    assert list(read_source_rows(csv_path)) == rows
+    assert list(read_source_rows(json_path)) == rows
+    assert list(read_source_rows(jsonl_path)) == rows
+    with pytest.raises(ValueError, match="Unsupported import format"):
+        list(read_source_rows(tmp_path / "history.xlsx"))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_iter_json_array_streams_elements(chunk_size: int) -> None:
+    """Test that array elements decode the same whatever the chunk boundaries."""
+    elements = [{"name": "a [b], c", "count": 12345}, 67890, [1.5, None], "tail", True]
+    source = ' \n[ ' + " ,\n ".join(json.dumps(element) for element in elements) + " ]\n"
+
+    assert list(_iter_json_array(io.StringIO(source), chunk_size=chunk_size)) == elements
+    assert list(_iter_json_array(io.StringIO("[ ]"), chunk_size=chunk_size)) == []
+
+
+@pytest.mark.parametrize(
+    ("source", "message"),
+    [
+        ('{"rows": []}', "Expected a JSON array"),
+        ("", "Expected a JSON array"),
+        ("[1, 2", "Expected ',' or ']'"),
+        ("[1 2]", "Expected ',' or ']'"),
+        ('[{"open": ', "Expecting value"),
+        ("[1] [2]", "Extra data"),
+    ],
+)
+def test_iter_json_array_rejects_malformed_sources(source: str, message: str) -> None:
+    """Test that malformed sources fail like json.load does."""
+    with pytest.raises(json.JSONDecodeError, match=message):
+        list(_iter_json_array(io.StringIO(source), chunk_size=4))
+
+
+def test_read_source_rows_reads_json_lazily(tmp_path: Path) -> None:
+    """Test that JSON rows are produced before the whole array is read."""
+    json_path = tmp_path / "history.json"
+    json_path.write_text("[" + json.dumps(history_row("2021-03-01", 1)) + ", not json", encoding="utf-8")
+
+    rows = read_source_rows(json_path)
+
+    assert next(rows)["session_date"] == "2021-03-01"
+    with pytest.raises(json.JSONDecodeError):
+        next(rows)
+
+
+def test_allocate_ids_reserves_serial_values() -> None:
+    """Test that primary keys are drawn from the table's serial sequence."""
+    connection = MagicMock()
+    connection.execute.return_value = [(41,), (42,)]
+
+    assert _allocate_ids(connection, Base.metadata.tables["practice"], 2) == [41, 42]
+    statement, parameters = connection.execute.call_args.args
+    assert "pg_get_serial_sequence(:table_name, 'id')" in str(statement)
+    assert parameters == {"table_name": "practice", "count": 2}
+
+
+def test_import_with_copy_writes_allocated_ids(seeded_engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the COPY path prefixes allocated IDs and links children to them."""
+    next_ids = iter(range(100, 200))
+    copied: dict[str, tuple[list[str], list[tuple[Any, ...]]]] = {}
+    monkeypatch.setattr(
+        "mnemosys_core.cli.import_history._allocate_ids",
+        lambda connection, table, count: [next(next_ids) for _ in range(count)],
+    )
+    monkeypatch.setattr(
+        "mnemosys_core.cli.import_history._copy_rows",
+        lambda connection, table, column_names, rows: copied.setdefault(table.name, (column_names, rows)),
+    )
+
+    progress = PracticeHistoryImporter(seeded_engine, use_copy=True).run(
+        [history_row("2021-03-01", 1)], source="history.csv"
+    )
+
+    assert progress.rows_imported == 1
+    assert copied["practice"][0][0] == "id"
+    assert copied["practice"][1][0][0] == 100
+    assert copied["practice_block"][1][0][:2] == (101, 100)
+    assert copied["practice_block_log"][0][0] == "practice_block_id"
+    assert copied["practice_block_log"][1][0][0] == 101
+
+
+def test_copy_rows_uses_psycopg_copy() -> None:
+    """Test that COPY streams processed rows through psycopg 3."""
+    copy_context = MagicMock()
+    cursor = MagicMock(spec=["copy", "close"])
+    cursor.copy.return_value.__enter__.return_value = copy_context
+    connection = MagicMock()
+    connection.dialect = create_db_engine("sqlite:///:memory:").dialect
+    connection.connection.driver_connection.cursor.return_value = cursor
+    table = Base.metadata.tables["practice_block_log"]
+
+    _copy_rows(connection, table, ["practice_block_id", "completed"], [(7, models.CompletionStatus.YES)])
+
+    cursor.copy.assert_called_once_with("COPY practice_block_log (practice_block_id, completed) FROM STDIN")
+    copy_context.write_row.assert_called_once_with((7, "yes"))
+    cursor.close.assert_called_once()
+
+
+def test_copy_rows_falls_back_to_psycopg2_copy_expert() -> None:
+    """Test that psycopg2 connections receive CSV through copy_expert."""
+    cursor = MagicMock(spec=["copy_expert", "close"])
+    connection = MagicMock()
+    connection.dialect = create_db_engine("sqlite:///:memory:").dialect
+    connection.connection.driver_connection.cursor.return_value = cursor
+    table = Base.metadata.tables["practice_block_log"]
+
+    _copy_rows(connection, table, ["practice_block_id", "notes"], [(7, "steady"), (8, None)])
+
+    statement, buffer = cursor.copy_expert.call_args.args
+    assert statement == "COPY practice_block_log (practice_block_id, notes) FROM STDIN WITH (FORMAT csv)"
+    assert buffer.getvalue() == "7,steady\r\n8,\r\n"
+
+
+@pytest.fixture
+def sqlite_file_database(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Generator[Engine]:
+    """File-backed database the CLI can open through DATABASE_URL."""
+    database_url = f"sqlite:///{tmp_path / 'mnemosys.db'}"
+    monkeypatch.setenv("MNEMOSYS_ENV", "test")
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    engine = create_db_engine(database_url)
+    Base.metadata.create_all(engine)
+    seed_reference_data(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_import_history_command(
+    sqlite_file_database: Engine, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test the CLI command end to end, including the rejects file and resume."""
+    source_path = tmp_path / "history.jsonl"
+    rows = [history_row("2021-03-01", 1), history_row("2021-03-01", 2, exercise="Unknown Drill")]
+    source_path.write_text("\n".join(json.dumps(row) for row in rows), encoding="utf-8")
+    rejects_path = tmp_path / "rejects.csv"
+
+    assert main(["import-history", str(source_path), "--rejects", str(rejects_path), "--batch-size", "1"]) == 0
+    output = capsys.readouterr().out
+    assert "done: 1 imported, 1 rejected" in output
+    assert "rows/s" in output
+    assert rejects_path.read_text(encoding="utf-8").splitlines() == ["2,unknown exercise: Unknown Drill"]
+
+    assert main(["import-history", str(source_path), "--no-copy"]) == 0
+    assert "resumed after 2 previously processed rows" in capsys.readouterr().out
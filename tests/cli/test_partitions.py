@@ -0,0 +1,81 @@
+"""
+Partition maintenance command tests.
+"""
+
+import runpy
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from mnemosys_core.cli import build_parser, main
+
+
+@pytest.fixture
+def sqlite_database_url(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Point the CLI at a file-backed SQLite database."""
+    database_url = f"sqlite:///{tmp_path / 'mnemosys.db'}"
+    monkeypatch.setenv("MNEMOSYS_ENV", "test")
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    return database_url
+
+
+def test_partitions_ensure_on_sqlite_creates_nothing(
+    sqlite_database_url: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that ensure leaves the unpartitioned SQLite layout alone."""
+    assert main(["partitions", "ensure", "--months-ahead", "2"]) == 0
+    assert "0 partition(s) created" in capsys.readouterr().out
+
+
+def test_partitions_convert_requires_postgresql(sqlite_database_url: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that convert refuses non-PostgreSQL databases."""
+    assert main(["partitions", "convert"]) == 1
+    assert "requires PostgreSQL" in capsys.readouterr().out
+
+
+def test_partitions_ensure_reports_created_partitions(
+    sqlite_database_url: str, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that every created partition is listed."""
+    monkeypatch.setattr(
+        "mnemosys_core.cli.partitions.ensure_partitions", MagicMock(return_value=["practice_p2025_06"])
+    )
+
+    assert main(["partitions", "ensure"]) == 0
+    assert capsys.readouterr().out.splitlines() == ["created practice_p2025_06", "1 partition(s) created"]
+
+
+@pytest.mark.parametrize(("is_converted", "message"), [(True, "tables converted"), (False, "tables already partitioned")])
+def test_partitions_convert_on_postgresql(
+    sqlite_database_url: str,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    is_converted: bool,
+    message: str,
+) -> None:
+    """Test that convert runs in one transaction and disposes of the engine."""
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    convert_to_partitioned = MagicMock(return_value=is_converted)
+    monkeypatch.setattr("mnemosys_core.cli.partitions.create_db_engine_from_settings", MagicMock(return_value=engine))
+    monkeypatch.setattr("mnemosys_core.cli.partitions.convert_to_partitioned", convert_to_partitioned)
+
+    assert main(["partitions", "convert", "--months-ahead", "2"]) == 0
+    assert capsys.readouterr().out.strip() == message
+    convert_to_partitioned.assert_called_once_with(engine.begin.return_value.__enter__.return_value, months_ahead=2)
+    engine.dispose.assert_called_once_with()
+
+
+def test_parser_requires_a_command() -> None:
+    """Test that running without a command is a usage error."""
+    with pytest.raises(SystemExit):
+        build_parser().parse_args([])
+
+
+def test_module_entry_point(sqlite_database_url: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that `python -m mnemosys_core.cli` exits with the command's status."""
+    monkeypatch.setattr("sys.argv", ["mnemosys", "partitions", "ensure"])
+    with pytest.raises(SystemExit) as exit_info:
+        runpy.run_module("mnemosys_core.cli", run_name="__main__")
+    assert exit_info.value.code == 0
@@ -0,0 +1,73 @@
+"""
+Session generation command tests.
+"""
+
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+
+from mnemosys_core.cli import main
+from mnemosys_core.db.base import Base
+from mnemosys_core.db.engine import create_db_engine
+from mnemosys_core.db.models import Practice
+from mnemosys_core.db.session import create_session_factory
+from mnemosys_core.testing import DataFactory
+
+
+@pytest.fixture
+def sqlite_database_url(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Point the CLI at a file-backed SQLite database with a catalog and two instruments."""
+    database_url = f"sqlite:///{tmp_path / 'mnemosys.db'}"
+    monkeypatch.setenv("MNEMOSYS_ENV", "test")
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    engine = create_db_engine(database_url)
+    Base.metadata.create_all(engine)
+    with create_session_factory(engine)() as db_session:
+        factory = DataFactory(db_session)
+        factory.practice_history(3)
+        factory.instrument()
+        db_session.commit()
+    engine.dispose()
+    return database_url
+
+
+def test_generate_reports_workers(sqlite_database_url: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that generate writes a session per instrument and reports throughput."""
+    assert main(["sessions", "generate", "--date", "2025-02-01", "--minutes", "20", "--workers", "1"]) == 0
+
+    output = capsys.readouterr().out
+    assert "2 session(s) generated for 2025-02-01, 0 instrument(s) already planned" in output
+    assert "worker " in output and "sessions/s" in output
+    engine = create_db_engine(sqlite_database_url)
+    with engine.connect() as connection:
+        planned = select(func.count()).select_from(Practice).where(Practice.session_date == date(2025, 2, 1))
+        assert connection.scalar(planned) == 2
+    engine.dispose()
+
+
+def test_generate_rejects_invalid_lengths(sqlite_database_url: str) -> None:
+    with pytest.raises(SystemExit):
+        main(["sessions", "generate", "--minutes", "5"])
+
+
+def test_generate_reports_unplannable_instruments(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that instruments no exercise fits are listed."""
+    database_url = f"sqlite:///{tmp_path / 'empty.db'}"
+    monkeypatch.setenv("MNEMOSYS_ENV", "test")
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    engine = create_db_engine(database_url)
+    Base.metadata.create_all(engine)
+    with create_session_factory(engine)() as db_session:
+        instrument_id = DataFactory(db_session).instrument().id
+        db_session.commit()
+    engine.dispose()
+
+    assert main(["sessions", "generate", "--workers", "1"]) == 0
+
+    output = capsys.readouterr().out
+    assert f"no exercise fits instrument(s) {instrument_id}" in output
+    assert "0 session(s) generated" in output
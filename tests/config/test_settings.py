@@ -132,3 +132,176 @@ def test_load_settings_from_env_all_custom(monkeypatch: pytest.MonkeyPatch) -> N
     assert settings.database_url == "sqlite:///test.db"
     assert settings.debug is True
     assert settings.log_sql is True
+
+
+def test_load_settings_from_env_pool_defaults(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test connection pool defaults when no pool variables are set."""
+    for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_TIMEOUT", "DB_POOL_RECYCLE", "DB_POOL_USE_LIFO"):
+        monkeypatch.delenv(name, raising=False)
+
+    settings = load_settings_from_env()
+
+    assert settings.db_pool_size == 5
+    assert settings.db_max_overflow == 10
+    assert settings.db_pool_timeout == 30.0
+    assert settings.db_pool_recycle == -1
+    assert settings.db_pool_use_lifo is False
+
+
+def test_load_settings_from_env_pool_custom(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test connection pool settings customized via environment."""
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "1800")
+    monkeypatch.setenv("DB_POOL_USE_LIFO", "true")
+
+    settings = load_settings_from_env()
+
+    assert settings.db_pool_size == 20
+    assert settings.db_max_overflow == 0
+    assert settings.db_pool_timeout == 2.5
+    assert settings.db_pool_recycle == 1800
+    assert settings.db_pool_use_lifo is True
+
+
+def test_load_settings_from_env_sqlite_custom(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test file-backed SQLite settings customized via environment."""
+    monkeypatch.setenv("SQLITE_READER_POOL_SIZE", "8")
+    monkeypatch.setenv("SQLITE_MMAP_SIZE", "0")
+    monkeypatch.setenv("SQLITE_CACHE_SIZE", "-2000")
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "250")
+
+    settings = load_settings_from_env()
+
+    assert settings.sqlite_reader_pool_size == 8
+    assert settings.sqlite_mmap_size == 0
+    assert settings.sqlite_cache_size == -2000
+    assert settings.sqlite_busy_timeout_ms == 250
+
+
+def test_load_settings_from_env_statement_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test statement cache and prepared statement settings via environment."""
+    monkeypatch.setenv("DB_QUERY_CACHE_SIZE", "2000")
+    monkeypatch.setenv("DB_PREPARE_THRESHOLD", "0")
+
+    settings = load_settings_from_env()
+
+    assert settings.db_query_cache_size == 2000
+    assert settings.db_prepare_threshold == 0
+
+
+def test_load_settings_from_env_prepared_statements_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that prepared statements are off unless configured."""
+    monkeypatch.delenv("DB_QUERY_CACHE_SIZE", raising=False)
+    monkeypatch.delenv("DB_PREPARE_THRESHOLD", raising=False)
+
+    settings = load_settings_from_env()
+
+    assert settings.db_query_cache_size == 500
+    assert settings.db_prepare_threshold is None
+
+
+def test_load_settings_from_env_partitioning(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test table partitioning settings via environment."""
+    monkeypatch.setenv("DB_PARTITIONING", "true")
+    monkeypatch.setenv("DB_PARTITION_MONTHS_AHEAD", "6")
+
+    settings = load_settings_from_env()
+
+    assert settings.db_partitioning is True
+    assert settings.db_partition_months_ahead == 6
+
+
+def test_load_settings_from_env_partitioning_defaults(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that partitioning is off by default."""
+    monkeypatch.delenv("DB_PARTITIONING", raising=False)
+    monkeypatch.delenv("DB_PARTITION_MONTHS_AHEAD", raising=False)
+
+    settings = load_settings_from_env()
+
+    assert settings.db_partitioning is False
+    assert settings.db_partition_months_ahead == 3
+
+
+def test_load_settings_from_env_retry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test transient-error retry settings via environment."""
+    monkeypatch.setenv("DB_RETRY_MAX_ATTEMPTS", "5")
+    monkeypatch.setenv("DB_RETRY_BASE_DELAY", "0.1")
+    monkeypatch.setenv("DB_RETRY_MAX_DELAY", "3")
+    monkeypatch.setenv("DB_RETRY_BUDGET", "10")
+
+    settings = load_settings_from_env()
+
+    assert settings.db_retry_max_attempts == 5
+    assert settings.db_retry_base_delay == 0.1
+    assert settings.db_retry_max_delay == 3.0
+    assert settings.db_retry_budget == 10.0
+
+
+def test_load_settings_from_env_query_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test query budget settings via environment."""
+    monkeypatch.setenv("DB_QUERY_BUDGET_MAX_QUERIES", "20")
+    monkeypatch.setenv("DB_QUERY_BUDGET_MAX_REPEATS", "3")
+    monkeypatch.setenv("DB_QUERY_BUDGET_STRICT", "false")
+
+    settings = load_settings_from_env()
+
+    assert settings.db_query_budget_max_queries == 20
+    assert settings.db_query_budget_max_repeats == 3
+    assert settings.db_query_budget_strict is False
+
+
+def test_load_settings_from_env_query_budget_defaults(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that budgets have no total limit and strictness follows the environment by default."""
+    monkeypatch.delenv("DB_QUERY_BUDGET_MAX_QUERIES", raising=False)
+    monkeypatch.delenv("DB_QUERY_BUDGET_MAX_REPEATS", raising=False)
+    monkeypatch.delenv("DB_QUERY_BUDGET_STRICT", raising=False)
+
+    settings = load_settings_from_env()
+
+    assert settings.db_query_budget_max_queries is None
+    assert settings.db_query_budget_max_repeats == 5
+    assert settings.db_query_budget_strict is None
+
+
+def test_load_settings_from_env_slow_query_log(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test slow query log settings via environment."""
+    monkeypatch.setenv("DB_SLOW_QUERY_MS", "200")
+    monkeypatch.setenv("DB_SLOW_QUERY_EXPLAIN_MS", "1000")
+    monkeypatch.setenv("DB_SLOW_QUERY_CAPACITY", "50")
+    monkeypatch.delenv("DB_SLOW_QUERY_EXPLAIN_ANALYZE", raising=False)
+
+    settings = load_settings_from_env()
+
+    assert settings.db_slow_query_ms == 200.0
+    assert settings.db_slow_query_explain_ms == 1000.0
+    assert settings.db_slow_query_capacity == 50
+    assert settings.db_slow_query_explain_analyze is False
+
+    monkeypatch.setenv("DB_SLOW_QUERY_EXPLAIN_ANALYZE", "true")
+    assert load_settings_from_env().db_slow_query_explain_analyze is True
+
+
+def test_load_settings_from_env_migration_lock_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the migration lock timeout setting and its default."""
+    monkeypatch.delenv("DB_MIGRATION_LOCK_TIMEOUT_MS", raising=False)
+    assert load_settings_from_env().db_migration_lock_timeout_ms == 5000
+
+    monkeypatch.setenv("DB_MIGRATION_LOCK_TIMEOUT_MS", "2000")
+    assert load_settings_from_env().db_migration_lock_timeout_ms == 2000
+
+
+def test_load_settings_from_env_archive(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the archive horizon and batch size settings and their defaults."""
+    monkeypatch.delenv("DB_ARCHIVE_HORIZON_DAYS", raising=False)
+    monkeypatch.delenv("DB_ARCHIVE_BATCH_SIZE", raising=False)
+    settings = load_settings_from_env()
+    assert settings.db_archive_horizon_days == 730
+    assert settings.db_archive_batch_size == 200
+
+    monkeypatch.setenv("DB_ARCHIVE_HORIZON_DAYS", "365")
+    monkeypatch.setenv("DB_ARCHIVE_BATCH_SIZE", "50")
+    settings = load_settings_from_env()
+    assert settings.db_archive_horizon_days == 365
+    assert settings.db_archive_batch_size == 50
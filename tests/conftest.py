@@ -2,8 +2,8 @@
 Shared test fixtures.
 """
 
-import gc
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Iterator
+from contextlib import AbstractContextManager, contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
@@ -12,31 +12,37 @@ from sqlalchemy.orm import Session as DBSession
 from sqlalchemy.orm import close_all_sessions, sessionmaker
 
 from mnemosys_core.api.app import create_app
+from mnemosys_core.db.query_budget import QueryBudget, QueryLog, QueryMonitor, count_queries
 
-# Import all models to register them with Base.metadata before create_all()
-from mnemosys_core.db import models  # noqa: F401
-from mnemosys_core.db.base import Base
-from mnemosys_core.db.engine import create_db_engine
+pytest_plugins = ["mnemosys_core.testing.pytest_plugin"]
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register --benchmarks, which opts into the timing tests."""
+    parser.addoption("--benchmarks", action="store_true", help="run tests marked benchmark")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Skip benchmark tests: wall-clock assertions are flaky on shared CI runners."""
+    if config.getoption("--benchmarks"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="benchmark: run with --benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
 
 
 @pytest.fixture(scope="function")
-def engine() -> Generator[Engine]:
+def engine(mnemosys_engine: Engine) -> Generator[Engine]:
     """
-    Create in-memory SQLite engine for tests.
+    In-memory SQLite engine for one test.
 
-    Uses StaticPool to ensure all operations share the same in-memory database.
-    Explicit cleanup prevents most connection warnings.
+    A private copy of the schema created once per test session (see
+    `mnemosys_core.testing.TemplateDatabase`), so tests may commit freely.
     """
-    engine = create_db_engine("sqlite:///:memory:", echo=False)
-    Base.metadata.create_all(engine)
-    yield engine
-    # Ensure all sessions are closed before disposal
+    yield mnemosys_engine
+    # Ensure all sessions are closed before the copy is disposed
     close_all_sessions()
-    gc.collect()
-    # Clean up
-    Base.metadata.drop_all(engine)
-    engine.dispose()
-    gc.collect()
 
 
 @pytest.fixture(scope="function")
@@ -56,7 +62,28 @@ def db_session(session_factory: sessionmaker[DBSession]) -> Generator[DBSession]
 
 @pytest.fixture(scope="function")
 def client(engine: Engine) -> Generator[TestClient]:
-    """Create FastAPI test client."""
-    app = create_app(engine)
+    """Create FastAPI test client that fails requests exceeding their query budget."""
+    app = create_app(engine, query_monitor=QueryMonitor(strict=True))
     with TestClient(app) as test_client:
         yield test_client
+
+
+@pytest.fixture(scope="function")
+def assert_max_queries(engine: Engine) -> Callable[[int], AbstractContextManager[QueryLog]]:
+    """
+    Assert how many statements a block (e.g. one API call) runs, without N+1 repeats.
+
+    Example:
+        def test_list_practices(client, assert_max_queries):
+            with assert_max_queries(1):
+                client.get("/api/v1/practices/")
+    """
+
+    @contextmanager
+    def assert_queries(max_queries: int) -> Iterator[QueryLog]:
+        with count_queries(engine) as query_log:
+            yield query_log
+        violations = QueryBudget(max_queries=max_queries).violations(query_log)
+        assert not violations, "\n".join([*violations, *query_log.statements])
+
+    return assert_queries
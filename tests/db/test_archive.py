@@ -0,0 +1,143 @@
+"""
+Practice history archival tests.
+"""
+
+from datetime import date
+
+from sqlalchemy import Engine, func, select
+
+from mnemosys_core.db.archive import archive_cutoff, archive_practices, practice_rows, summary_rows
+from mnemosys_core.db.models import (
+    CompletionStatus,
+    ExerciseInstance,
+    ExerciseLog,
+    Practice,
+    PracticeArchive,
+    PracticeBlock,
+    PracticeBlockLog,
+    PracticeSummary,
+)
+from mnemosys_core.db.session import create_session_factory
+from mnemosys_core.testing import DataFactory
+
+
+def _seed(engine: Engine, days: int, start: date) -> list[Practice]:
+    with create_session_factory(engine)() as db_session:
+        practices = DataFactory(db_session).practice_history(days=days, start=start)
+        db_session.commit()
+    return practices
+
+
+def _count(engine: Engine, model: type) -> int:
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def test_archive_cutoff() -> None:
+    assert archive_cutoff(date(2026, 10, 18), 730) == date(2024, 10, 18)
+
+
+def test_archive_practices_moves_old_practices_in_batches(engine: Engine) -> None:
+    practices = _seed(engine, days=20, start=date(2020, 1, 22))
+    old_practices = [practice for practice in practices if practice.session_date < date(2020, 2, 1)]
+    pauses: list[float] = []
+
+    result = archive_practices(engine, date(2020, 2, 1), batch_size=4, pause_seconds=0.5, sleep=pauses.append)
+
+    assert result.practices == len(old_practices) == 10
+    assert result.batches == 3
+    assert result.finished
+    assert pauses == [0.5, 0.5]
+    assert _count(engine, Practice) == 10
+    assert _count(engine, PracticeArchive) == 10
+    assert _count(engine, ExerciseInstance) == 30
+    assert _count(engine, ExerciseLog) == 30
+    assert _count(engine, PracticeBlock) == 30
+    assert _count(engine, PracticeBlockLog) == 30
+
+
+def test_archive_practices_with_full_last_batch(engine: Engine) -> None:
+    _seed(engine, days=8, start=date(2020, 1, 24))
+
+    result = archive_practices(engine, date(2020, 2, 1), batch_size=4, pause_seconds=0)
+
+    assert (result.practices, result.batches, result.finished) == (8, 2, True)
+    assert archive_practices(engine, date(2020, 2, 1)).practices == 0
+    assert _count(engine, Practice) == 0
+
+
+def test_archived_practice_keeps_its_history(engine: Engine) -> None:
+    practice = _seed(engine, days=1, start=date(2020, 1, 5))[0]
+
+    archive_practices(engine, date(2020, 2, 1))
+
+    with create_session_factory(engine)() as db_session:
+        archived = db_session.get(PracticeArchive, practice.id)
+    assert archived is not None
+    assert repr(archived) == f"<PracticeArchive(id={practice.id}, date=2020-01-05)>"
+    assert archived.session_date == practice.session_date
+    assert archived.session_type is practice.session_type
+    assert archived.total_minutes == practice.total_minutes
+    instances = archived.history["exercise_instances"]
+    assert [instance["id"] for instance in instances] == [instance.id for instance in practice.exercise_instances]
+    first_instance = practice.exercise_instances[0]
+    assert first_instance.log is not None
+    assert instances[0]["parameters"] == first_instance.parameters
+    assert instances[0]["log"]["completion_status"] == first_instance.log.completion_status.value
+    blocks = archived.history["blocks"]
+    assert blocks[0]["block_type"] == practice.blocks[0].block_type.value
+    assert blocks[0]["logs"][0]["quality"] == practice.blocks[0].logs[0].quality.value
+
+
+def test_summaries_accumulate_across_runs(engine: Engine) -> None:
+    practices = _seed(engine, days=40, start=date(2020, 1, 1))
+    january = [practice for practice in practices if practice.session_date.month == 1]
+    completed = sum(
+        1
+        for practice in january
+        for instance in practice.exercise_instances
+        if instance.log is not None and instance.log.completion_status is CompletionStatus.YES
+    )
+
+    first = archive_practices(engine, date(2020, 2, 1), batch_size=5, max_batches=2)
+    assert not first.finished
+    archive_practices(engine, date(2020, 2, 1), batch_size=5)
+
+    with create_session_factory(engine)() as db_session:
+        summaries = db_session.scalars(summary_rows()).all()
+    assert [(summary.month, summary.practices) for summary in summaries] == [(date(2020, 1, 1), 31)]
+    assert repr(summaries[0]) == f"<PracticeSummary(instrument_id={summaries[0].instrument_id}, month=2020-01-01)>"
+    assert summaries[0].total_minutes == sum(practice.total_minutes for practice in january)
+    assert summaries[0].exercises == 93
+    assert summaries[0].exercises_completed == completed
+
+
+def test_practice_rows_include_archive_only_when_asked(engine: Engine) -> None:
+    _seed(engine, days=6, start=date(2020, 1, 29))
+    archive_practices(engine, date(2020, 2, 1))
+
+    with engine.connect() as connection:
+        hot = connection.execute(practice_rows()).all()
+        both = connection.execute(practice_rows(date_from=date(2020, 1, 30), include_archived=True)).all()
+
+    assert [row.session_date for row in hot] == [date(2020, 2, day) for day in (1, 2, 3)]
+    assert [(row.session_date, row.archived) for row in both] == [
+        (date(2020, 1, 30), True),
+        (date(2020, 1, 31), True),
+        (date(2020, 2, 1), False),
+        (date(2020, 2, 2), False),
+        (date(2020, 2, 3), False),
+    ]
+
+
+def test_summary_rows_filter_by_instrument_and_month(engine: Engine) -> None:
+    _seed(engine, days=60, start=date(2020, 1, 1))
+    archive_practices(engine, date(2020, 3, 1))
+
+    with create_session_factory(engine)() as db_session:
+        instrument_id = db_session.scalars(select(PracticeSummary.instrument_id)).first()
+        february = db_session.scalars(summary_rows(instrument_id, date(2020, 2, 15), date(2020, 2, 20))).all()
+        other = db_session.scalars(summary_rows(instrument_id=-1)).all()
+
+    assert [summary.month for summary in february] == [date(2020, 2, 1)]
+    assert other == []
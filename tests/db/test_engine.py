@@ -3,11 +3,26 @@ Database engine tests.
 """
 
 from importlib.util import find_spec
+from pathlib import Path
 
 import pytest
-from sqlalchemy import Engine
+from sqlalchemy import Engine, event, make_url, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool, QueuePool
 
-from mnemosys_core.db.engine import create_db_engine
+from mnemosys_core.config.environments import Environment
+from mnemosys_core.config.settings import Settings
+from mnemosys_core.db.engine import (
+    SQLiteFileProfile,
+    attach_pool_metrics,
+    create_db_engine,
+    create_db_engine_from_settings,
+    create_read_engine,
+    create_read_engine_from_settings,
+    is_sqlite_file_url,
+    with_prepared_statement_driver,
+)
+from mnemosys_core.db.pool import ObservedQueuePool, PoolMetrics, get_pool_metrics
 
 
 def is_psycopg2_available() -> bool:
@@ -57,3 +72,258 @@ def test_create_db_engine_postgresql_settings() -> None:
     else:
         with pytest.raises(ModuleNotFoundError, match="psycopg2"):
             create_db_engine("postgresql://localhost/testdb", echo=False)
+
+
+def test_create_db_engine_postgresql_pool_options() -> None:
+    """Test PostgreSQL engine honours pool sizing options and is observable."""
+    pool_metrics = PoolMetrics()
+    pool_options = {
+        "pool_size": 7,
+        "max_overflow": 3,
+        "pool_timeout": 2.5,
+        "pool_recycle": 1800,
+        "pool_use_lifo": True,
+        "pool_metrics": pool_metrics,
+    }
+    if is_psycopg2_available():
+        engine = create_db_engine("postgresql://localhost/testdb", **pool_options)
+
+        assert isinstance(engine.pool, ObservedQueuePool)
+        assert engine.pool.size() == 7
+        assert engine.pool.timeout() == 2.5
+        assert engine.pool.metrics is pool_metrics
+    else:
+        with pytest.raises(ModuleNotFoundError, match="psycopg2"):
+            create_db_engine("postgresql://localhost/testdb", **pool_options)
+
+
+@pytest.mark.skipif(not is_psycopg2_available(), reason="psycopg2 not installed")
+def test_create_db_engine_postgresql_honours_poolclass() -> None:
+    """Test that a caller's pool class replaces the observed queue pool on PostgreSQL."""
+    engine = create_db_engine("postgresql://localhost/testdb", poolclass=NullPool, pool_size=7)
+
+    assert isinstance(engine.pool, NullPool)
+    assert get_pool_metrics(engine.pool) is None
+
+
+@pytest.mark.skipif(not is_psycopg2_available(), reason="psycopg2 not installed")
+def test_create_db_engine_postgresql_sizes_custom_queue_pool() -> None:
+    """Test that sizing options still reach a caller's queue pool class."""
+    engine = create_db_engine("postgresql://localhost/testdb", poolclass=QueuePool, pool_size=7)
+
+    assert type(engine.pool) is QueuePool
+    assert engine.pool.size() == 7
+
+
+def test_attach_pool_metrics_requires_observed_pool() -> None:
+    """Test that metrics cannot be attached to uninstrumented pools."""
+    engine = create_db_engine("sqlite:///:memory:")
+
+    with pytest.raises(TypeError, match="ObservedQueuePool"):
+        attach_pool_metrics(engine, PoolMetrics())
+
+
+def test_attach_pool_metrics_records_checkins() -> None:
+    """Test that engine checkins reach the attached metrics."""
+    engine = create_db_engine("sqlite://", poolclass=ObservedQueuePool)
+    pool_metrics = PoolMetrics()
+    attach_pool_metrics(engine, pool_metrics)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    pool_statistics = pool_metrics.snapshot()
+    assert pool_statistics.checkouts == 1
+    assert pool_statistics.checkins == 1
+    engine.dispose()
+
+
+def test_create_db_engine_from_settings() -> None:
+    """Test engine creation from Settings."""
+    settings = Settings(environment=Environment.TEST, database_url="sqlite:///:memory:", log_sql=True)
+
+    engine = create_db_engine_from_settings(settings)
+
+    assert engine.echo is True
+    assert str(engine.url).startswith("sqlite")
+
+
+def test_is_sqlite_file_url() -> None:
+    """Test detection of file-backed SQLite URLs."""
+    assert is_sqlite_file_url("sqlite:////var/lib/mnemosys/mnemosys.db") is True
+    assert is_sqlite_file_url("sqlite:///relative.db") is True
+    assert is_sqlite_file_url("sqlite://") is False
+    assert is_sqlite_file_url("sqlite:///:memory:") is False
+    assert is_sqlite_file_url("sqlite:///file:shared?mode=memory&uri=true") is False
+    assert is_sqlite_file_url("postgresql://localhost/testdb") is False
+
+
+def test_sqlite_file_profile_pragma_statements() -> None:
+    """Test the pragma statements generated by a profile."""
+    sqlite_profile = SQLiteFileProfile(mmap_size=0, cache_size=-2000, busy_timeout_ms=100, foreign_keys=False)
+
+    assert sqlite_profile.pragma_statements() == [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA mmap_size=0",
+        "PRAGMA cache_size=-2000",
+        "PRAGMA busy_timeout=100",
+        "PRAGMA foreign_keys=OFF",
+    ]
+
+
+def test_create_db_engine_sqlite_file_writer(tmp_path: Path) -> None:
+    """Test that file-backed SQLite gets a single tuned writer connection."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'mnemosys.db'}")
+
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == -64000
+        assert connection.execute(text("PRAGMA query_only")).scalar() == 0
+
+    assert isinstance(engine.pool, ObservedQueuePool)
+    assert engine.pool.size() == 1
+    assert engine.pool._max_overflow == 0
+    engine.dispose()
+
+
+def test_create_read_engine_sqlite_file_is_query_only(tmp_path: Path) -> None:
+    """Test that the reader pool rejects writes."""
+    database_url = f"sqlite:///{tmp_path / 'mnemosys.db'}"
+    engine = create_db_engine(database_url)
+    read_engine = create_read_engine(database_url, pool_size=3)
+    assert read_engine is not None
+
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE sample (id INTEGER PRIMARY KEY)"))
+    with read_engine.connect() as connection:
+        assert connection.execute(text("PRAGMA query_only")).scalar() == 1
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.execute(text("INSERT INTO sample (id) VALUES (1)"))
+
+    assert read_engine.pool.size() == 3  # type: ignore[attr-defined]
+    engine.dispose()
+    read_engine.dispose()
+
+
+def test_sqlite_file_readers_run_alongside_writer(tmp_path: Path) -> None:
+    """Test that readers are not blocked by an open write transaction."""
+    database_url = f"sqlite:///{tmp_path / 'mnemosys.db'}"
+    engine = create_db_engine(database_url)
+    read_engine = create_read_engine(database_url)
+    assert read_engine is not None
+
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE sample (id INTEGER PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO sample (id) VALUES (1)"))
+
+    with engine.connect() as write_connection:
+        write_transaction = write_connection.begin()
+        write_connection.execute(text("INSERT INTO sample (id) VALUES (2)"))
+        with read_engine.connect() as read_connection:
+            assert read_connection.execute(text("SELECT count(*) FROM sample")).scalar() == 1
+        write_transaction.commit()
+
+    with read_engine.connect() as read_connection:
+        assert read_connection.execute(text("SELECT count(*) FROM sample")).scalar() == 2
+    engine.dispose()
+    read_engine.dispose()
+
+
+def test_create_read_engine_not_split_for_other_databases() -> None:
+    """Test that only file-backed SQLite gets a separate reader engine."""
+    assert create_read_engine("sqlite:///:memory:") is None
+    assert create_read_engine("postgresql://localhost/testdb") is None
+
+
+def test_create_engines_from_settings_sqlite_file(tmp_path: Path) -> None:
+    """Test that SQLite pragma settings reach both engines."""
+    settings = Settings(
+        environment=Environment.PRODUCTION,
+        database_url=f"sqlite:///{tmp_path / 'mnemosys.db'}",
+        sqlite_reader_pool_size=2,
+        sqlite_busy_timeout_ms=1234,
+    )
+
+    engine = create_db_engine_from_settings(settings)
+    read_engine = create_read_engine_from_settings(settings)
+    assert read_engine is not None
+
+    with read_engine.connect() as connection:
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+    assert read_engine.pool.size() == 2  # type: ignore[attr-defined]
+    engine.dispose()
+    read_engine.dispose()
+
+
+def is_psycopg_available() -> bool:
+    """Return True when the psycopg 3 driver is installed."""
+    return find_spec("psycopg") is not None
+
+
+def test_create_db_engine_query_cache_size() -> None:
+    """Test that the compiled statement cache size is configurable."""
+    engine = create_db_engine("sqlite:///:memory:", query_cache_size=42)
+
+    assert engine._compiled_cache is not None
+    assert engine._compiled_cache.capacity == 42
+
+
+def test_with_prepared_statement_driver() -> None:
+    """Test that PostgreSQL URLs switch to the psycopg 3 driver."""
+    for database_url in ("postgresql://localhost/db", "postgresql+psycopg2://localhost/db"):
+        url = with_prepared_statement_driver(make_url(database_url))
+        assert url.drivername == "postgresql+psycopg"
+        assert url.database == "db"
+
+
+def test_with_prepared_statement_driver_rejects_other_drivers() -> None:
+    """Test that drivers without prepared statement support are rejected."""
+    with pytest.raises(ValueError, match="psycopg driver"):
+        with_prepared_statement_driver(make_url("postgresql+pg8000://localhost/db"))
+
+
+def test_create_db_engine_postgresql_prepared_statements() -> None:
+    """Test PostgreSQL engine configured for server-side prepared statements."""
+    if is_psycopg_available():
+        engine = create_db_engine("postgresql://localhost/testdb", prepare_threshold=0, query_cache_size=1000)
+
+        assert engine.dialect.driver == "psycopg"
+        assert engine._compiled_cache is not None
+        assert engine._compiled_cache.capacity == 1000
+    else:
+        with pytest.raises(ModuleNotFoundError, match="psycopg"):
+            create_db_engine("postgresql://localhost/testdb", prepare_threshold=0)
+
+
+class _ConnectAttemptedError(Exception):
+    """Raised instead of opening a connection so tests can inspect its parameters."""
+
+
+def _connect_parameters(engine: Engine) -> dict[str, object]:
+    """Return the keyword arguments the engine passes to the driver's connect()."""
+    captured: dict[str, object] = {}
+
+    @event.listens_for(engine, "do_connect")
+    def capture(dialect: object, connection_record: object, cargs: object, cparams: dict[str, object]) -> None:
+        captured.update(cparams)
+        raise _ConnectAttemptedError
+
+    with pytest.raises(_ConnectAttemptedError):
+        engine.connect()
+    engine.dispose()
+    return captured
+
+
+@pytest.mark.skipif(not is_psycopg_available(), reason="psycopg not installed")
+def test_create_db_engine_psycopg_url_disables_prepared_statements_by_default() -> None:
+    """Test that psycopg 3's own prepare threshold is turned off unless one is configured."""
+    database_url = "postgresql+psycopg://localhost/testdb"
+
+    assert _connect_parameters(create_db_engine(database_url, poolclass=NullPool))["prepare_threshold"] is None
+    prepared = create_db_engine(database_url, poolclass=NullPool, prepare_threshold=3)
+    assert _connect_parameters(prepared)["prepare_threshold"] == 3
+    assert "prepare_threshold" not in _connect_parameters(create_db_engine(database_url.replace("+psycopg", "")))
@@ -0,0 +1,49 @@
+"""
+Exercise state locking tests.
+"""
+
+from unittest.mock import MagicMock
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from mnemosys_core.db.exercise_states import lock_exercise_states
+from mnemosys_core.db.models import ExerciseState
+from mnemosys_core.testing import DataFactory
+
+
+def test_lock_creates_missing_states_and_keeps_existing_ones(db_session: Session) -> None:
+    factory = DataFactory(db_session)
+    tracked, untracked = factory.exercise(), factory.exercise()
+    db_session.add(ExerciseState(exercise=tracked, rolling_minutes_7d=30, mastery_estimate=0.5))
+    db_session.flush()
+
+    lock_exercise_states(db_session, [untracked.id, tracked.id, untracked.id])
+
+    states = {state.exercise_id: state for state in db_session.scalars(select(ExerciseState))}
+    assert set(states) == {tracked.id, untracked.id}
+    assert (states[tracked.id].rolling_minutes_7d, states[tracked.id].mastery_estimate) == (30, 0.5)
+    assert (states[untracked.id].rolling_minutes_7d, states[untracked.id].mastery_estimate) == (0, 0.0)
+
+
+def test_lock_without_exercises_runs_no_statements() -> None:
+    db_session = MagicMock()
+
+    lock_exercise_states(db_session, [])
+
+    db_session.execute.assert_not_called()
+
+
+def test_lock_selects_states_for_update_in_exercise_order_on_postgresql() -> None:
+    db_session = MagicMock()
+    db_session.get_bind.return_value.dialect.name = "postgresql"
+
+    lock_exercise_states(db_session, [3, 1, 2])
+
+    (insert_call, select_call) = db_session.execute.call_args_list
+    insert_sql = str(insert_call.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (exercise_id) DO NOTHING" in insert_sql
+    assert insert_call.args[1] == [{"exercise_id": 1}, {"exercise_id": 2}, {"exercise_id": 3}]
+    select_sql = str(select_call.args[0].compile(dialect=postgresql.dialect()))
+    assert select_sql.endswith("ORDER BY exercise_state.exercise_id FOR UPDATE")
@@ -0,0 +1,180 @@
+"""
+Parquet export tests.
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+import pyarrow
+import pyarrow.parquet
+import pytest
+from sqlalchemy import Boolean, DateTime, Engine, Float, LargeBinary
+from sqlalchemy.types import TypeEngine
+
+from mnemosys_core.db.export import (
+    EXPORT_SOURCES,
+    _arrow_type,
+    _value_converter,
+    arrow_schema,
+    export_file_name,
+    export_parquet,
+)
+from mnemosys_core.db.models import (
+    BlockType,
+    CompletionStatus,
+    DomainType,
+    Exercise,
+    ExerciseInstance,
+    ExerciseLog,
+    Practice,
+    PracticeBlock,
+    QualityRating,
+    SessionType,
+    StringedInstrument,
+)
+from mnemosys_core.db.session import create_session_factory
+from mnemosys_core.db.types import DatabaseEnumList, JSONEncodedList
+
+
+def seed_history(engine: Engine) -> None:
+    """Create two practices with blocks, exercise instances and logs."""
+    with create_session_factory(engine)() as db_session:
+        instrument = StringedInstrument(name="Strat", string_count=6, scale_length=25.5)
+        exercise = Exercise(name="Chromatic Scale", domains=[DomainType.TECHNIQUE])
+        for day, quality in ((1, QualityRating.CLEAN), (2, QualityRating.SLOPPY)):
+            practice = Practice(
+                instrument=instrument,
+                session_date=date(2024, 3, day),
+                session_type=SessionType.NORMAL,
+                total_minutes=45,
+            )
+            practice.blocks.append(
+                PracticeBlock(exercise=exercise, block_order=1, block_type=BlockType.TECHNIQUE, duration_minutes=15)
+            )
+            exercise_instance = ExerciseInstance(exercise=exercise, sequence_order=1, parameters={"tempo": 80 + day})
+            exercise_instance.log = ExerciseLog(completion_status=CompletionStatus.YES, quality_rating=quality)
+            practice.exercise_instances.append(exercise_instance)
+            db_session.add(practice)
+        db_session.commit()
+
+
+def test_enum_columns_are_dictionary_encoded() -> None:
+    """Test the Arrow schema of a table source."""
+    schema = arrow_schema(EXPORT_SOURCES["practice_block"])
+
+    assert schema.names == [
+        "id",
+        "practice_id",
+        "exercise_id",
+        "block_order",
+        "block_type",
+        "duration_minutes",
+        "session_date",
+    ]
+    assert schema.field("block_type").type == pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    assert schema.field("session_date").type == pyarrow.date32()
+
+
+@pytest.mark.parametrize(
+    ("column_type", "arrow_type"),
+    [
+        (Boolean(), pyarrow.bool_()),
+        (Float(), pyarrow.float64()),
+        (DateTime(timezone=True), pyarrow.timestamp("us", tz="UTC")),
+        (DateTime(), pyarrow.timestamp("us")),
+        (JSONEncodedList(), pyarrow.list_(pyarrow.string())),
+        (DatabaseEnumList(DomainType), pyarrow.list_(pyarrow.string())),
+    ],
+)
+def test_arrow_types(column_type: TypeEngine[object], arrow_type: pyarrow.DataType) -> None:
+    """Test the Arrow type of column types no source uses yet."""
+    assert _arrow_type(pyarrow, column_type) == arrow_type
+
+
+def test_arrow_type_rejects_unmapped_columns() -> None:
+    """Test that unmapped column types fail instead of exporting garbage."""
+    with pytest.raises(TypeError, match="No Arrow type"):
+        _arrow_type(pyarrow, LargeBinary())
+
+
+def test_enum_lists_export_their_values() -> None:
+    """Test that enum list members are converted to their values."""
+    converter = _value_converter(DatabaseEnumList(DomainType))
+
+    assert converter is not None
+    assert converter([DomainType.TECHNIQUE]) == ["Technique"]
+    assert converter(None) is None
+
+
+def test_export_without_pyarrow(engine: Engine, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a missing pyarrow explains which extra to install."""
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    with engine.connect() as connection, pytest.raises(RuntimeError, match="'analytics' extra"):
+        export_parquet(connection, "practice", tmp_path / "practice.parquet")
+
+
+def test_export_table_in_record_batches(engine: Engine, tmp_path: Path) -> None:
+    """Test that a table is written batch by batch and reads back with its values."""
+    seed_history(engine)
+    destination = tmp_path / "exercise_log.parquet"
+
+    with engine.connect() as connection:
+        export_result = export_parquet(connection, "exercise_log", destination, batch_size=1)
+
+    assert (export_result.rows, export_result.last_id) == (2, 2)
+    parquet_file = pyarrow.parquet.ParquetFile(destination)
+    assert parquet_file.metadata.num_row_groups == 2
+    table = parquet_file.read()
+    assert table.column("quality_rating").type == pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    assert table.column("quality_rating").to_pylist() == ["clean", "sloppy"]
+    assert table.column("session_date").to_pylist() == [date(2024, 3, 1), date(2024, 3, 2)]
+
+
+def test_export_facts_incrementally(engine: Engine, tmp_path: Path) -> None:
+    """Test the denormalized fact table with ID and date watermarks."""
+    seed_history(engine)
+
+    with engine.connect() as connection:
+        after_id_result = export_parquet(connection, "exercise_facts", tmp_path / "after.parquet", after_id=1)
+        since_result = export_parquet(connection, "exercise_facts", tmp_path / "since.parquet", since=date(2024, 3, 2))
+        empty_result = export_parquet(connection, "exercise_facts", tmp_path / "empty.parquet", after_id=2)
+
+    assert (after_id_result.rows, after_id_result.last_id) == (1, 2)
+    assert since_result.rows == 1
+    assert (empty_result.rows, empty_result.last_id) == (0, 2)
+    facts = pyarrow.parquet.read_table(tmp_path / "after.parquet").to_pylist()
+    assert facts == [
+        {
+            "exercise_log_id": 2,
+            "exercise_instance_id": 2,
+            "practice_id": 2,
+            "session_date": date(2024, 3, 2),
+            "session_type": "normal",
+            "total_minutes": 45,
+            "instrument_id": 1,
+            "instrument_name": "Strat",
+            "exercise_id": 1,
+            "exercise_name": "Chromatic Scale",
+            "sequence_order": 1,
+            "parameters": '{"tempo": 82}',
+            "completion_status": "yes",
+            "quality_rating": "sloppy",
+            "notes": None,
+        }
+    ]
+    assert pyarrow.parquet.read_table(tmp_path / "empty.parquet").num_rows == 0
+
+
+def test_export_unknown_source(engine: Engine, tmp_path: Path) -> None:
+    """Test that unknown sources are rejected."""
+    with engine.connect() as connection, pytest.raises(ValueError, match="Unknown export source"):
+        export_parquet(connection, "instrument", tmp_path / "instrument.parquet")
+
+
+def test_export_file_name() -> None:
+    """Test that incremental exports get distinct file names."""
+    assert export_file_name("practice") == "practice.parquet"
+    assert export_file_name("practice", after_id=120) == "practice.after-120.parquet"
+    assert export_file_name("practice", since=date(2024, 3, 1)) == "practice.since-2024-03-01.parquet"
@@ -0,0 +1,158 @@
+"""
+JSON codec tests and benchmark.
+"""
+
+import json
+import sys
+import timeit
+from collections.abc import Callable, Generator
+from datetime import date
+
+import pytest
+from sqlalchemy import Engine, insert, select
+
+from mnemosys_core.db.base import Base
+from mnemosys_core.db.engine import create_db_engine
+from mnemosys_core.db.json_codec import STDLIB_JSON_CODEC, default_json_codec
+from mnemosys_core.db.models import DomainType, Exercise, ExerciseInstance, Practice, SessionType, StringedInstrument
+from mnemosys_core.db.session import create_session_factory
+
+ROW_COUNT = 20_000
+ROUNDS = 3
+
+
+def test_default_codec_prefers_orjson() -> None:
+    """Test that orjson is picked when installed."""
+    pytest.importorskip("orjson")
+
+    assert default_json_codec().name == "orjson"
+
+
+def test_default_codec_without_orjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the stdlib codec is used when orjson is not installed."""
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    default_json_codec.cache_clear()
+    try:
+        assert default_json_codec() is STDLIB_JSON_CODEC
+    finally:
+        default_json_codec.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        {"tempo": 120, "key": "C", "pattern": "1-2-3-4", "duration": 7.5},
+        {"notes": "café ♯"},
+        {"big": 2**70},
+        ["Technique", "Harmony"],
+        None,
+    ],
+)
+def test_default_codec_round_trips_like_stdlib(document: object) -> None:
+    """Test that the default codec reads stdlib output and writes what stdlib reads."""
+    codec = default_json_codec()
+
+    assert codec.deserializer(json.dumps(document)) == document
+    assert json.loads(codec.serializer(document)) == document
+
+
+def test_default_codec_reads_stdlib_nan() -> None:
+    """Test the fallback for NaN literals, which stdlib json writes but orjson rejects."""
+    value = default_json_codec().deserializer(json.dumps({"tempo": float("nan")}))["tempo"]
+
+    assert value != value
+
+
+def test_engine_uses_default_codec(engine: Engine) -> None:
+    """Test that create_db_engine installs the default codec unless one is given."""
+    custom_engine = create_db_engine("sqlite:///:memory:", json_serializer=json.dumps, json_deserializer=json.loads)
+    try:
+        assert engine.dialect._json_serializer is default_json_codec().serializer  # type: ignore[attr-defined]
+        assert custom_engine.dialect._json_serializer is json.dumps  # type: ignore[attr-defined]
+    finally:
+        custom_engine.dispose()
+
+
+@pytest.fixture
+def engines() -> Generator[tuple[Engine, Engine]]:
+    """Default-codec and stdlib-codec engines over identical exercise instance tables."""
+    fast_engine = create_db_engine("sqlite:///:memory:")
+    stdlib_engine = create_db_engine(
+        "sqlite:///:memory:",
+        json_serializer=STDLIB_JSON_CODEC.serializer,
+        json_deserializer=STDLIB_JSON_CODEC.deserializer,
+    )
+    for engine in (fast_engine, stdlib_engine):
+        Base.metadata.create_all(engine)
+        with create_session_factory(engine)() as db_session:
+            db_session.add(
+                Practice(
+                    instrument=StringedInstrument(name="Strat", string_count=6, scale_length=25.5),
+                    session_date=date(2025, 1, 15),
+                    session_type=SessionType.NORMAL,
+                    total_minutes=60,
+                )
+            )
+            db_session.add(Exercise(name="Chromatic Scale", domains=[DomainType.TECHNIQUE]))
+            db_session.commit()
+    yield fast_engine, stdlib_engine
+    for engine in (fast_engine, stdlib_engine):
+        engine.dispose()
+
+
+def instance_rows(count: int) -> list[dict[str, object]]:
+    """Build exercise instance rows with realistic parameter documents."""
+    return [
+        {
+            "practice_id": 1,
+            "exercise_id": 1,
+            "sequence_order": index,
+            "session_date": date(2025, 1, 15),
+            "parameters": {
+                "tempo": 60 + index % 120,
+                "key": "CDEFGAB"[index % 7],
+                "pattern": "1-2-3-4",
+                "duration": 5.5,
+                "strings": [1, 2, 3, 4, 5, 6],
+            },
+        }
+        for index in range(count)
+    ]
+
+
+def best_time(function: Callable[[], object]) -> float:
+    """Best wall time of a callable over ROUNDS runs."""
+    return min(timeit.repeat(function, number=1, repeat=ROUNDS))
+
+
+@pytest.mark.benchmark
+def test_exercise_instance_table_benchmark(engines: tuple[Engine, Engine]) -> None:
+    """Benchmark writing and reading a large ExerciseInstance table with both codecs."""
+    rows = instance_rows(ROW_COUNT)
+    statement = select(ExerciseInstance.parameters)
+    timings = {}
+    for name, engine in zip(("default", "stdlib"), engines, strict=True):
+        with engine.begin() as connection:
+            connection.execute(insert(ExerciseInstance), rows)
+
+        def load(engine: Engine = engine) -> list[object]:
+            with engine.connect() as connection:
+                return list(connection.execute(statement).scalars())
+
+        def store(engine: Engine = engine) -> None:
+            with engine.connect() as connection:
+                connection.execute(insert(ExerciseInstance), rows)
+                connection.rollback()
+
+        assert load() == [row["parameters"] for row in rows]
+        timings[name] = (best_time(load), best_time(store))
+
+    for index, operation in enumerate(("read", "write")):
+        default_seconds, stdlib_seconds = timings["default"][index], timings["stdlib"][index]
+        print(
+            f"ExerciseInstance {operation} of {ROW_COUNT:,} rows: {default_seconds * 1000:.0f} ms with "
+            f"{default_json_codec().name}, {stdlib_seconds * 1000:.0f} ms with json "
+            f"({stdlib_seconds / default_seconds:.1f}x)"
+        )
+    if default_json_codec().name == "orjson":
+        assert timings["default"][0] < timings["stdlib"][0]
@@ -0,0 +1,237 @@
+"""
+Mastery estimate engine tests.
+"""
+
+import random
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from mnemosys_core.db import mastery
+from mnemosys_core.db.archive import archive_practices
+from mnemosys_core.db.mastery import (
+    COMPLETION_CODES,
+    QUALITY_CODES,
+    apply_outcome,
+    rebuild_mastery_estimates,
+    replay_mastery,
+)
+from mnemosys_core.db.models import (
+    BlockType,
+    CompletionStatus,
+    Exercise,
+    ExerciseInstance,
+    ExerciseState,
+    Practice,
+    PracticeBlock,
+    PracticeBlockLog,
+    QualityRating,
+    SessionType,
+)
+from mnemosys_core.db.session import create_session_factory
+from mnemosys_core.testing import DataFactory
+
+CLEAN = (CompletionStatus.YES, QualityRating.CLEAN)
+ACCEPTABLE = (CompletionStatus.YES, QualityRating.ACCEPTABLE)
+FAILED = (CompletionStatus.NO, QualityRating.ACCEPTABLE)
+
+
+def _fold(outcomes: list[tuple[CompletionStatus, QualityRating]]) -> tuple[float, int]:
+    mastery, streak = 0.0, 0
+    for completion, quality in outcomes:
+        mastery, streak = apply_outcome(mastery, streak, completion, quality)
+    return mastery, streak
+
+
+def _log_blocks(
+    factory: DataFactory,
+    exercise: Exercise,
+    session_date: date,
+    outcomes: list[tuple[CompletionStatus, QualityRating]],
+    duration_minutes: int = 5,
+) -> None:
+    practice = Practice(
+        instrument=factory.instrument(), session_date=session_date, session_type=SessionType.NORMAL, total_minutes=0
+    )
+    for order, (completion, quality) in enumerate(outcomes, start=1):
+        block = PracticeBlock(
+            exercise=exercise, block_order=order, block_type=BlockType.TECHNIQUE, duration_minutes=duration_minutes
+        )
+        block.logs.append(PracticeBlockLog(completed=completion, quality=quality))
+        practice.blocks.append(block)
+    factory.db_session.add(practice)
+    factory.db_session.flush()
+
+
+def _state(db_session: Session, exercise: Exercise) -> tuple[float, int]:
+    state = db_session.scalars(select(ExerciseState).where(ExerciseState.exercise_id == exercise.id)).one()
+    return state.mastery_estimate, state.failure_streak
+
+
+def test_apply_outcome_rules() -> None:
+    assert apply_outcome(0.5, 0, *CLEAN) == (pytest.approx(0.525), 0)
+    assert apply_outcome(0.5, 3, *ACCEPTABLE) == (0.5, 0)
+    assert apply_outcome(0.5, 0, CompletionStatus.PARTIAL, QualityRating.CLEAN) == (0.5, 0)
+    assert apply_outcome(0.5, 0, *FAILED) == (0.5, 1)
+    assert apply_outcome(0.5, 1, CompletionStatus.YES, QualityRating.SLOPPY) == (pytest.approx(0.475), 2)
+
+
+def test_replay_matches_incremental_updates() -> None:
+    """Test that the vectorized replay equals folding the outcomes one by one."""
+    generator = random.Random(7)
+    histories = {
+        exercise_id: [
+            (generator.choice(list(CompletionStatus)), generator.choice(list(QualityRating)))
+            for _ in range(generator.randrange(1, 300))
+        ]
+        for exercise_id in (3, 5, 8, 13)
+    }
+    histories[21] = [FAILED, FAILED, FAILED]
+    rows = [(exercise_id, *outcome) for exercise_id, outcomes in histories.items() for outcome in outcomes]
+
+    exercise_ids, mastery, streaks = replay_mastery(
+        np.array([row[0] for row in rows]),
+        np.array([COMPLETION_CODES[row[1]] for row in rows]),
+        np.array([QUALITY_CODES[row[2]] for row in rows]),
+    )
+
+    assert exercise_ids.tolist() == list(histories)
+    for exercise_id, estimate, streak in zip(exercise_ids, mastery, streaks, strict=True):
+        expected_mastery, expected_streak = _fold(histories[int(exercise_id)])
+        assert estimate == pytest.approx(expected_mastery, abs=1e-12)
+        assert streak == expected_streak
+
+
+def test_replay_of_nothing() -> None:
+    empty = np.array([], dtype=np.int64)
+    assert [len(array) for array in replay_mastery(empty, empty, empty)] == [0, 0, 0]
+
+
+def test_new_logs_update_estimates(mnemosys_factory: DataFactory, mnemosys_session: Session) -> None:
+    """Test that flushing logs moves the estimate and the failure streak."""
+    exercise = mnemosys_factory.exercise()
+
+    _log_blocks(mnemosys_factory, exercise, date(2025, 3, 1), [CLEAN, CLEAN])
+    assert _state(mnemosys_session, exercise) == (pytest.approx(_fold([CLEAN, CLEAN])[0]), 0)
+
+    _log_blocks(mnemosys_factory, exercise, date(2025, 3, 2), [FAILED, FAILED])
+    assert _state(mnemosys_session, exercise) == (pytest.approx(_fold([CLEAN, CLEAN, FAILED, FAILED])[0]), 2)
+
+
+def test_rebuild_matches_incremental_estimates(mnemosys_factory: DataFactory, mnemosys_session: Session) -> None:
+    """Test that replaying the history reproduces the estimates maintained on write."""
+    mnemosys_factory.practice_history(30)
+    columns = (ExerciseState.exercise_id, ExerciseState.mastery_estimate)
+    maintained = dict(mnemosys_session.execute(select(*columns)).tuples().all())
+    mnemosys_session.execute(update(ExerciseState).values(mastery_estimate=0.9, failure_streak=0))
+
+    result = rebuild_mastery_estimates(mnemosys_session)
+
+    rebuilt = dict(mnemosys_session.execute(select(*columns)).tuples().all())
+    assert rebuilt == pytest.approx(maintained)
+    assert result.exercises == len(maintained)
+    assert result.logs == 30 * 3 * 2
+    assert set(result.timings) == {"load", "replay", "write"}
+
+
+def test_rebuild_includes_archived_logs(engine: Engine) -> None:
+    """Test that archived practices still count towards the estimate."""
+    session_factory = create_session_factory(engine)
+    with session_factory() as db_session:
+        factory = DataFactory(db_session)
+        exercise = factory.exercise()
+        _log_blocks(factory, exercise, date(2020, 1, 1), [CLEAN, CLEAN, CLEAN])
+        _log_blocks(factory, exercise, date(2020, 1, 1) + timedelta(days=2000), [FAILED])
+        db_session.commit()
+        expected = _fold([CLEAN, CLEAN, CLEAN, FAILED])
+
+    archive_practices(engine, date(2021, 1, 1), pause_seconds=0)
+
+    with session_factory() as db_session:
+        rebuild_mastery_estimates(db_session)
+        db_session.commit()
+        assert _state(db_session, exercise) == (pytest.approx(expected[0]), expected[1])
+
+
+def test_new_logs_create_states_and_refresh_loaded_ones(
+    mnemosys_factory: DataFactory, mnemosys_session: Session
+) -> None:
+    """Test that a first log creates the state and later logs reach states already loaded."""
+    exercise = mnemosys_factory.exercise()
+
+    # No minutes, so the rolling windows create no state before the estimate does
+    _log_blocks(mnemosys_factory, exercise, date(2025, 3, 1), [CLEAN], duration_minutes=0)
+    state = mnemosys_session.scalars(select(ExerciseState)).one()
+    assert (state.mastery_estimate, state.failure_streak) == (pytest.approx(_fold([CLEAN])[0]), 0)
+
+    _log_blocks(mnemosys_factory, exercise, date(2025, 3, 2), [FAILED])
+    assert (state.mastery_estimate, state.failure_streak) == (pytest.approx(_fold([CLEAN, FAILED])[0]), 1)
+
+
+def test_new_logs_lock_their_states(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the estimates are stepped only after their states are locked."""
+    exercise = mnemosys_factory.exercise()
+    locked: list[set[int]] = []
+    lock = mastery.lock_exercise_states
+
+    def record_lock(db_session: Session, exercise_ids: set[int]) -> None:
+        locked.append(set(exercise_ids))
+        lock(db_session, exercise_ids)
+
+    monkeypatch.setattr(mastery, "lock_exercise_states", record_lock)
+
+    _log_blocks(mnemosys_factory, exercise, date(2025, 3, 1), [CLEAN], duration_minutes=0)
+
+    assert locked == [{exercise.id}]
+
+
+def test_rebuild_creates_missing_states(mnemosys_factory: DataFactory, mnemosys_session: Session) -> None:
+    """Test that a rebuild gives logged exercises without a state one."""
+    exercise = mnemosys_factory.exercise()
+    _log_blocks(mnemosys_factory, exercise, date(2025, 3, 1), [CLEAN, FAILED])
+    mnemosys_session.execute(delete(ExerciseState))
+
+    result = rebuild_mastery_estimates(mnemosys_session)
+
+    assert result.exercises == 1
+    assert _state(mnemosys_session, exercise) == (pytest.approx(_fold([CLEAN, FAILED])[0]), 1)
+
+
+def test_rebuild_includes_archived_exercise_logs(engine: Engine) -> None:
+    """Test that archived exercise instances replay their logs and unlogged ones are skipped."""
+    session_factory = create_session_factory(engine)
+    with session_factory() as db_session:
+        factory = DataFactory(db_session)
+        exercise = factory.exercise()
+        practice = factory.practice(exercises=[exercise], session_date=date(2020, 1, 1))
+        practice.exercise_instances.append(ExerciseInstance(exercise=exercise, sequence_order=2, parameters={}))
+        db_session.commit()
+        block_log, instance_log = practice.blocks[0].logs[0], practice.exercise_instances[0].log
+        assert instance_log is not None
+        expected = _fold(
+            [
+                (block_log.completed, block_log.quality),
+                (instance_log.completion_status, instance_log.quality_rating),
+            ]
+        )
+
+    archive_practices(engine, date(2021, 1, 1), pause_seconds=0)
+
+    with session_factory() as db_session:
+        result = rebuild_mastery_estimates(db_session)
+        assert result.logs == 2
+        assert _state(db_session, exercise) == (pytest.approx(expected[0]), expected[1])
+
+
+def test_rebuild_requires_numpy(mnemosys_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "numpy", None)
+
+    with pytest.raises(RuntimeError, match="analytics"):
+        rebuild_mastery_estimates(mnemosys_session)
@@ -0,0 +1,274 @@
+"""
+Online migration helper tests.
+"""
+
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import Engine, Index, column, select, table, text
+from sqlalchemy.orm import Session
+
+from mnemosys_core.db import online_migrations
+from mnemosys_core.db.models import BackfillCheckpoint, ExerciseInstance
+from mnemosys_core.db.online_migrations import (
+    BackfillProgress,
+    _index_statement,
+    batched_backfill,
+    concurrent_index_statements,
+    create_index_concurrently,
+    lock_timeout,
+    lock_timeout_connect_args,
+    partition_index_name,
+    read_backfill_checkpoint,
+)
+from mnemosys_core.db.parameters import parameter_index_name
+from mnemosys_core.db.session import create_session_factory
+from mnemosys_core.testing import DataFactory
+
+exercise_instance = table("exercise_instance", column("id"), column("sequence_order"))
+
+
+def _parameter_index(name: str = "tempo") -> Index:
+    return next(index for index in ExerciseInstance.__table__.indexes if index.name == parameter_index_name(name))
+
+
+def _postgresql_connection(index_validity: list[bool | None] | None = None) -> MagicMock:
+    """Build a PostgreSQL connection double; pg_index lookups report the given validities in turn."""
+    validity = iter(index_validity or [])
+    connection = MagicMock()
+    connection.dialect.name = "postgresql"
+
+    def execute(statement: Any, parameters: Any = None) -> MagicMock:
+        result = MagicMock()
+        if "pg_index" in str(statement):
+            result.scalar.return_value = next(validity)
+        else:
+            result.scalar_one.return_value = "0"
+        return result
+
+    connection.execute.side_effect = execute
+    return connection
+
+
+def _executed(connection: MagicMock) -> list[str]:
+    return [str(call.args[0]) for call in connection.execute.call_args_list]
+
+
+def _seed_instances(engine: Engine, days: int) -> int:
+    with create_session_factory(engine)() as db_session:
+        DataFactory(db_session).practice_history(days=days)
+        db_session.commit()
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT count(*) FROM exercise_instance")).scalar_one()
+
+
+def test_concurrent_index_statements_for_plain_table() -> None:
+    statements = concurrent_index_statements(_parameter_index("key"))
+
+    assert statements == [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_exercise_instance_parameter_key "
+        "ON exercise_instance ((parameters ->> 'key'))"
+    ]
+
+
+def test_concurrent_index_statements_for_partitioned_table() -> None:
+    partitions = ["exercise_instance_p2025_02", "exercise_instance_p2025_01"]
+
+    statements = concurrent_index_statements(_parameter_index("key"), partitions)
+
+    assert statements[0] == (
+        "CREATE INDEX IF NOT EXISTS ix_exercise_instance_parameter_key "
+        "ON ONLY exercise_instance ((parameters ->> 'key'))"
+    )
+    assert statements[1] == (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_exercise_instance_parameter_key_p2025_01 "
+        "ON exercise_instance_p2025_01 ((parameters ->> 'key'))"
+    )
+    assert statements[2] == (
+        "ALTER INDEX ix_exercise_instance_parameter_key ATTACH PARTITION ix_exercise_instance_parameter_key_p2025_01"
+    )
+    assert len(statements) == 5
+
+
+def test_partition_index_name() -> None:
+    assert partition_index_name("ix_log_day", "log", "log_p2025_03") == "ix_log_day_p2025_03"
+
+
+def test_create_index_concurrently_is_idempotent_on_sqlite(engine: Engine) -> None:
+    index = _parameter_index()
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP INDEX {index.name}"))
+
+    for _ in range(2):
+        with engine.begin() as connection:
+            create_index_concurrently(connection, index)
+
+    with engine.connect() as connection:
+        names = connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars().all()
+    assert index.name in names
+
+
+def test_lock_timeout_is_noop_outside_postgresql(engine: Engine) -> None:
+    with engine.connect() as connection, lock_timeout(connection, 100):
+        assert connection.execute(text("SELECT 1")).scalar_one() == 1
+
+    assert lock_timeout_connect_args("sqlite:///:memory:", 100) == {}
+    assert lock_timeout_connect_args("postgresql+psycopg://localhost/db", 100) == {"options": "-c lock_timeout=100"}
+    assert lock_timeout_connect_args("postgresql+psycopg://localhost/db", None) == {}
+
+
+def test_batched_backfill_updates_matching_rows_in_batches(engine: Engine) -> None:
+    total = _seed_instances(engine, days=10)
+    pauses: list[float] = []
+    seen: list[BackfillProgress] = []
+
+    progress = batched_backfill(
+        engine,
+        "renumber",
+        exercise_instance,
+        {"sequence_order": exercise_instance.c.sequence_order + 100},
+        where=exercise_instance.c.sequence_order < 100,
+        batch_size=7,
+        pause_seconds=0.5,
+        on_batch=seen.append,
+        sleep=pauses.append,
+    )
+
+    assert progress.finished
+    assert progress.rows_updated == total
+    assert progress.batches == -(-total // 7)
+    assert len(seen) == progress.batches
+    assert pauses == [0.5] * progress.batches
+    with engine.connect() as connection:
+        orders = connection.execute(select(exercise_instance.c.sequence_order)).scalars().all()
+    assert min(orders) > 100
+
+
+def test_batched_backfill_resumes_from_checkpoint(engine: Engine) -> None:
+    total = _seed_instances(engine, days=10)
+    arguments: dict[str, Any] = {
+        "values": {"sequence_order": exercise_instance.c.sequence_order + 100},
+        "where": exercise_instance.c.sequence_order < 100,
+        "batch_size": 5,
+        "pause_seconds": 0,
+    }
+
+    first = batched_backfill(engine, "renumber", exercise_instance, max_batches=2, **arguments)
+
+    assert not first.finished
+    assert first.rows_updated == 10
+    assert read_backfill_checkpoint(engine, "renumber") == first
+
+    second = batched_backfill(engine, "renumber", exercise_instance, **arguments)
+
+    assert second.finished
+    assert second.rows_updated == total
+    with create_session_factory(engine)() as db_session:
+        checkpoint = db_session.scalars(select(BackfillCheckpoint)).one()
+    assert checkpoint.name == "renumber"
+    assert checkpoint.rows_updated == total
+    assert repr(checkpoint) == f"<BackfillCheckpoint(name='renumber', last_key={second.last_key})>"
+    with engine.connect() as connection:
+        orders = connection.execute(select(exercise_instance.c.sequence_order)).scalars().all()
+    assert min(orders) > 100 and max(orders) < 200
+
+
+def test_read_backfill_checkpoint_defaults_to_start(engine: Engine) -> None:
+    assert read_backfill_checkpoint(engine, "new") == BackfillProgress("new", last_key=0, rows_updated=0, batches=0)
+
+
+def test_index_statements_need_a_bound_named_index() -> None:
+    unbound = Index("ix_unbound", "tempo")
+
+    with pytest.raises(ValueError, match="bound to a table"):
+        concurrent_index_statements(unbound)
+    with pytest.raises(ValueError, match="ix_unbound"):
+        _index_statement(unbound, "ix_unbound", "exercise_instance", concurrently=True, only=False)
+    with pytest.raises(ValueError, match="ix_unbound"):
+        create_index_concurrently(_postgresql_connection(), unbound)
+
+
+def test_create_index_concurrently_on_postgresql_rebuilds_invalid_partition_indexes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(online_migrations, "is_partitioned", lambda connection, table_name: True)
+    monkeypatch.setattr(
+        online_migrations,
+        "existing_partitions",
+        lambda connection, table_name: {"exercise_instance_p2025_01", "exercise_instance_p2025_02"},
+    )
+    # The January build was interrupted and left an invalid index, February has none yet
+    connection = _postgresql_connection(index_validity=[False, None])
+
+    create_index_concurrently(connection, _parameter_index("key"), lock_timeout_ms=250)
+
+    executed = _executed(connection)
+    assert executed[:2] == [
+        "SELECT current_setting('lock_timeout')",
+        "SELECT set_config('lock_timeout', :value, false)",
+    ]
+    assert connection.execute.call_args_list[1].args[1] == {"value": "250ms"}
+    drops = [statement for statement in executed if statement.startswith("DROP INDEX")]
+    assert drops == ["DROP INDEX CONCURRENTLY IF EXISTS ix_exercise_instance_parameter_key_p2025_01"]
+    assert sum(statement.startswith("CREATE INDEX CONCURRENTLY") for statement in executed) == 2
+    assert connection.execute.call_args_list[-1].args[1] == {"value": "0"}
+
+
+def test_lock_timeout_restores_previous_setting_on_postgresql() -> None:
+    connection = _postgresql_connection()
+
+    with lock_timeout(connection, 100):
+        connection.execute(text("SELECT 1"))
+
+    assert _executed(connection) == [
+        "SELECT current_setting('lock_timeout')",
+        "SELECT set_config('lock_timeout', :value, false)",
+        "SELECT 1",
+        "SELECT set_config('lock_timeout', :value, false)",
+    ]
+    assert [call.args[1] for call in connection.execute.call_args_list if len(call.args) > 1] == [
+        {"value": "100ms"},
+        {"value": "0"},
+    ]
+
+
+def test_lock_timeout_tolerates_failed_restore() -> None:
+    connection = _postgresql_connection()
+
+    with lock_timeout(connection, 100):
+        connection.execute.side_effect = RuntimeError("current transaction is aborted")
+
+    assert connection.execute.call_count == 3
+
+
+def test_batched_backfill_sets_lock_timeout_per_batch_on_postgresql(
+    engine: Engine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    connection = _postgresql_connection()
+    db_session = MagicMock()
+    db_session.connection.return_value = connection
+
+    def run_in_transaction(session_factory: Any, operation: Callable[[Session], Any], policy: Any) -> Any:
+        return operation(db_session)
+
+    monkeypatch.setattr(online_migrations, "run_in_transaction", run_in_transaction)
+    connection.execute.side_effect = [MagicMock(), MagicMock(**{"scalars.return_value.all.return_value": []})]
+
+    progress = batched_backfill(engine, "noop", exercise_instance, {"sequence_order": 0}, lock_timeout_ms=300)
+
+    assert progress.finished
+    assert connection.execute.call_args_list[0].args[1] == {"value": "300ms"}
+    assert "set_config('lock_timeout', :value, true)" in str(connection.execute.call_args_list[0].args[0])
+
+
+def test_batched_backfill_without_filter_updates_every_row(engine: Engine) -> None:
+    total = _seed_instances(engine, days=3)
+
+    progress = batched_backfill(engine, "reset", exercise_instance, {"sequence_order": 0}, pause_seconds=0)
+
+    assert progress.finished
+    assert progress.rows_updated == total
+    with engine.connect() as connection:
+        assert set(connection.execute(select(exercise_instance.c.sequence_order)).scalars()) == {0}
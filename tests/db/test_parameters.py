@@ -0,0 +1,116 @@
+"""
+Exercise instance parameter query tests.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import Engine, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from mnemosys_core.db.models import (
+    DomainType,
+    Exercise,
+    ExerciseInstance,
+    Practice,
+    SessionType,
+    StringedInstrument,
+)
+from mnemosys_core.db.parameters import INDEXED_PARAMETERS, ParameterFilter, parameter_index_name, parameter_value
+from mnemosys_core.db.session import create_session_factory
+
+
+def seed_instances(engine: Engine, tempos: list[int | str]) -> None:
+    """Create one practice with an exercise instance per tempo."""
+    with create_session_factory(engine)() as db_session:
+        exercise = Exercise(name="Alternate Picking", domains=[DomainType.TECHNIQUE])
+        practice = Practice(
+            instrument=StringedInstrument(name="Strat", string_count=6, scale_length=25.5),
+            session_date=date(2025, 1, 15),
+            session_type=SessionType.NORMAL,
+            total_minutes=30,
+        )
+        for sequence_order, tempo in enumerate(tempos, start=1):
+            practice.exercise_instances.append(
+                ExerciseInstance(exercise=exercise, sequence_order=sequence_order, parameters={"tempo": tempo})
+            )
+        db_session.add(practice)
+        db_session.commit()
+
+
+def test_parse_filters() -> None:
+    """Test the filter expression language."""
+    assert ParameterFilter.parse("tempo>=120") == ParameterFilter("tempo", ">=", 120)
+    assert ParameterFilter.parse(" duration < 7.5 ") == ParameterFilter("duration", "<", 7.5)
+    assert ParameterFilter.parse("key=7") == ParameterFilter("key", "=", "7")
+    assert ParameterFilter.parse("pattern!=alternate") == ParameterFilter("pattern", "!=", "alternate")
+    assert ParameterFilter.parse("strings=3").numeric
+
+
+@pytest.mark.parametrize("expression", ["tempo", "tempo>=", "tempo>=fast", "tempo>=nan", "te-mpo=1", "=1"])
+def test_parse_rejects_invalid_filters(expression: str) -> None:
+    """Test that malformed filters raise ValueError."""
+    with pytest.raises(ValueError):
+        ParameterFilter.parse(expression)
+
+
+def test_postgresql_filters_match_index_expressions() -> None:
+    """Test that filters compile to the exact expression of the PostgreSQL indexes."""
+    dialect = postgresql.dialect()  # type: ignore[no-untyped-call]
+    table = ExerciseInstance.__table__
+    index = next(index for index in table.indexes if index.name == parameter_index_name("tempo"))
+
+    index_sql = str(CreateIndex(index).compile(dialect=dialect))
+    filter_sql = str(ParameterFilter.parse("tempo>=120").clause(table.c.parameters).compile(dialect=dialect))
+
+    assert index_sql == (
+        "CREATE INDEX ix_exercise_instance_parameter_tempo ON exercise_instance "
+        "((CASE WHEN jsonb_typeof(parameters -> 'tempo') = 'number' THEN (parameters ->> 'tempo')::numeric END))"
+    )
+    assert filter_sql == (
+        "(CASE WHEN jsonb_typeof(exercise_instance.parameters -> 'tempo') = 'number' "
+        "THEN (exercise_instance.parameters ->> 'tempo')::numeric END) >= %(param_1)s"
+    )
+    key_sql = str(ParameterFilter.parse("key=C").clause(table.c.parameters).compile(dialect=dialect))
+    assert key_sql == "(exercise_instance.parameters ->> 'key') = %(param_1)s"
+
+
+def test_every_indexed_parameter_has_an_index(engine: Engine) -> None:
+    """Test that create_all builds the expression indexes on SQLite."""
+    with engine.connect() as connection:
+        index_names = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+
+    assert {parameter_index_name(name) for name in INDEXED_PARAMETERS} <= index_names
+
+
+def test_range_filter_uses_expression_index(engine: Engine) -> None:
+    """Test that SQLite plans tempo range queries as index searches."""
+    statement = select(ExerciseInstance.id).where(
+        ParameterFilter.parse("tempo>=120").clause(ExerciseInstance.parameters)
+    )
+
+    with engine.connect() as connection:
+        compiled = statement.compile(connection)
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", tuple(compiled.params.values())).all()
+
+    assert any(parameter_index_name("tempo") in str(row[-1]) for row in plan), plan
+
+
+def test_filters_and_ordering(engine: Engine) -> None:
+    """Test filtering and ordering on extracted parameters."""
+    seed_instances(engine, [140, 90, 120])
+    tempo = parameter_value(ExerciseInstance.parameters, "tempo")
+
+    with engine.connect() as connection:
+        fast_tempos = connection.execute(
+            select(tempo).where(ParameterFilter.parse("tempo>100").clause(ExerciseInstance.parameters)).order_by(tempo)
+        ).scalars()
+
+        assert list(fast_tempos) == [120, 140]
+
+
+def test_invalid_parameter_name_is_rejected() -> None:
+    """Test that names are validated before being rendered into SQL."""
+    with pytest.raises(ValueError, match="Invalid parameter name"):
+        parameter_value(ExerciseInstance.parameters, "tempo') OR 1=1 --")
@@ -0,0 +1,312 @@
+"""
+Date-range partitioning tests.
+"""
+
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import Engine, text
+
+from mnemosys_core.db.models import (
+    BlockType,
+    CompletionStatus,
+    DomainType,
+    Exercise,
+    ExerciseInstance,
+    ExerciseLog,
+    Practice,
+    PracticeBlock,
+    PracticeBlockLog,
+    QualityRating,
+    SessionType,
+    StringedInstrument,
+)
+from mnemosys_core.db.partitioning import (
+    TableLayout,
+    add_months,
+    backfill_partition_keys,
+    conversion_statements,
+    convert_to_partitioned,
+    create_partition_statement,
+    ensure_partitions,
+    is_partitioned,
+    month_range,
+    partition_name,
+    populate_partition_keys,
+    table_layouts,
+)
+from mnemosys_core.db.session import create_session_factory
+
+
+class FakePostgresConnection:
+    """Connection double answering the catalog queries used by partition maintenance."""
+
+    def __init__(self, partitioned_tables: set[str], partitions: set[str], earliest: date | None = None) -> None:
+        self.dialect = MagicMock()
+        self.dialect.name = "postgresql"
+        self.partitioned_tables = partitioned_tables
+        self.partitions = partitions
+        self.earliest = earliest
+        self.statements: list[str] = []
+
+    def execute(self, statement: object, parameters: dict[str, str] | None = None) -> MagicMock:
+        sql = str(statement)
+        result = MagicMock()
+        if "relkind" in sql:
+            assert parameters is not None
+            result.scalar.return_value = "p" if parameters["table_name"] in self.partitioned_tables else "r"
+        elif "pg_inherits" in sql:
+            assert parameters is not None
+            result.__iter__.return_value = iter(
+                [(name,) for name in self.partitions if name.startswith(f"{parameters['table_name']}_p")]
+            )
+        elif "min(" in sql:
+            result.scalar.return_value = self.earliest
+        else:
+            self.statements.append(sql)
+        return result
+
+
+def create_practice_tree(session_date: date) -> Practice:
+    """Build a practice with one block, block log, exercise instance and exercise log."""
+    exercise = Exercise(name="Chromatic Scale", domains=[DomainType.TECHNIQUE])
+    practice = Practice(
+        instrument=StringedInstrument(name="Test Guitar", string_count=6, scale_length=25.5),
+        session_date=session_date,
+        session_type=SessionType.NORMAL,
+        total_minutes=60,
+    )
+    block = PracticeBlock(
+        practice=practice, exercise=exercise, block_order=1, block_type=BlockType.TECHNIQUE, duration_minutes=20
+    )
+    PracticeBlockLog(practice_block=block, completed=CompletionStatus.YES, quality=QualityRating.CLEAN)
+    instance = ExerciseInstance(practice=practice, exercise=exercise, sequence_order=1, parameters={})
+    ExerciseLog(exercise_instance=instance, completion_status=CompletionStatus.YES, quality_rating=QualityRating.CLEAN)
+    return practice
+
+
+def test_month_helpers() -> None:
+    """Test month arithmetic across year boundaries."""
+    assert add_months(date(2025, 11, 20), 2) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 31), -1) == date(2024, 12, 1)
+    assert month_range(date(2025, 11, 15), date(2026, 1, 3)) == [
+        date(2025, 11, 1),
+        date(2025, 12, 1),
+        date(2026, 1, 1),
+    ]
+    assert month_range(date(2025, 2, 1), date(2025, 1, 1)) == []
+
+
+def test_partition_names_and_bounds() -> None:
+    """Test monthly partition naming and range bounds."""
+    assert partition_name("practice_block_log", date(2025, 3, 1)) == "practice_block_log_p2025_03"
+    assert create_partition_statement("practice", date(2025, 12, 1)) == (
+        "CREATE TABLE IF NOT EXISTS practice_p2025_12 PARTITION OF practice "
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')"
+    )
+
+
+def test_conversion_statements_rebuild_tables_with_partition_keys() -> None:
+    """Test that conversion partitions every table and widens keys with session_date."""
+    statements = conversion_statements([date(2025, 1, 1)])
+
+    assert statements[0] == "ALTER TABLE exercise_log DROP CONSTRAINT fk_exercise_log_exercise_instance_id_exercise_instance"
+    assert "CREATE TABLE practice (LIKE practice_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (session_date)" in (
+        statements
+    )
+    assert "ALTER TABLE practice ADD CONSTRAINT pk_practice PRIMARY KEY (id, session_date)" in statements
+    assert (
+        "ALTER TABLE exercise_log ADD CONSTRAINT uq_exercise_log_exercise_instance_id "
+        "UNIQUE (exercise_instance_id, session_date)"
+    ) in statements
+    assert "CREATE TABLE IF NOT EXISTS exercise_log_default PARTITION OF exercise_log DEFAULT" in statements
+    assert (
+        "ALTER TABLE practice_block_log ADD CONSTRAINT fk_practice_block_log_practice_block_id_practice_block "
+        "FOREIGN KEY (practice_block_id, session_date) REFERENCES practice_block (id, session_date) ON UPDATE CASCADE"
+    ) in statements
+    assert (
+        "ALTER TABLE practice ADD CONSTRAINT fk_practice_instrument_id_instrument "
+        "FOREIGN KEY (instrument_id) REFERENCES instrument (id)"
+    ) in statements
+    # Data is copied before the old table goes away, and parents are rebuilt first
+    assert statements.index("INSERT INTO practice SELECT * FROM practice_unpartitioned") < statements.index(
+        "DROP TABLE practice_unpartitioned"
+    )
+    assert statements.index("DROP TABLE exercise_log_unpartitioned") < statements.index(
+        "DROP TABLE practice_unpartitioned"
+    )
+
+
+def test_conversion_statements_follow_the_given_layouts() -> None:
+    """Test that an explicit layout decides which keys and indexes are rebuilt."""
+    layouts = [
+        TableLayout("practice", "pk_practice"),
+        TableLayout(
+            "practice_block",
+            "pk_practice_block",
+            indexes=(("ix_block_date", "CREATE INDEX ix_block_date ON practice_block (session_date)"),),
+            foreign_keys=(("fk_block_practice", ("practice_id",), "practice"),),
+        ),
+    ]
+
+    statements = conversion_statements([date(2025, 1, 1)], layouts)
+
+    assert statements[0] == "ALTER TABLE practice_block DROP CONSTRAINT fk_block_practice"
+    assert "CREATE INDEX ix_block_date ON practice_block (session_date)" in statements
+    assert not any("exercise_instance" in statement for statement in statements)
+    assert statements[-1] == (
+        "ALTER TABLE practice_block ADD CONSTRAINT fk_block_practice "
+        "FOREIGN KEY (practice_id, session_date) REFERENCES practice (id, session_date) ON UPDATE CASCADE"
+    )
+    assert conversion_statements([date(2025, 1, 1)], table_layouts()) == conversion_statements([date(2025, 1, 1)])
+
+
+def test_child_rows_copy_session_date_from_parents(engine: Engine) -> None:
+    """Test that flushing fills partition keys from loaded and unloaded parents."""
+    session_factory = create_session_factory(engine)
+    with session_factory() as db_session:
+        practice = create_practice_tree(date(2025, 5, 17))
+        db_session.add(practice)
+        db_session.commit()
+        practice_id = practice.id
+        exercise_id = practice.blocks[0].exercise_id
+
+    with session_factory() as db_session:
+        # Parent referenced only by ID, not loaded in this session
+        block = PracticeBlock(
+            practice_id=practice_id,
+            exercise_id=exercise_id,
+            block_order=2,
+            block_type=BlockType.HARMONY,
+            duration_minutes=10,
+        )
+        db_session.add(block)
+        db_session.flush()
+        db_session.add(
+            PracticeBlockLog(practice_block_id=block.id, completed=CompletionStatus.NO, quality=QualityRating.SLOPPY)
+        )
+        db_session.commit()
+
+    with engine.connect() as connection:
+        for table_name in ("practice_block", "practice_block_log", "exercise_instance", "exercise_log"):
+            session_dates = connection.execute(text(f"SELECT DISTINCT session_date FROM {table_name}")).scalars()
+            assert list(session_dates) == ["2025-05-17"], table_name
+
+
+def test_reparented_block_takes_new_practice_date(engine: Engine) -> None:
+    """Test that moving a block to another practice updates its partition key."""
+    session_factory = create_session_factory(engine)
+    with session_factory() as db_session:
+        practice = create_practice_tree(date(2025, 5, 17))
+        other_practice = Practice(
+            instrument=practice.instrument,
+            session_date=date(2025, 6, 2),
+            session_type=SessionType.LIGHT,
+            total_minutes=30,
+        )
+        db_session.add_all([practice, other_practice])
+        db_session.commit()
+
+        block = practice.blocks[0]
+        block.practice_id = other_practice.id
+        db_session.commit()
+
+        assert block.session_date == date(2025, 6, 2)
+
+
+def test_orphan_child_rows_keep_missing_partition_key(engine: Engine) -> None:
+    """Test that rows without a resolvable parent are left for the backfill."""
+    session_factory = create_session_factory(engine)
+    with session_factory() as db_session:
+        block = PracticeBlock(exercise_id=1, block_order=1, block_type=BlockType.TECHNIQUE, duration_minutes=20)
+        db_session.add(block)
+
+        populate_partition_keys(db_session, None, None)
+        assert block.session_date is None
+
+        block.practice_id = 999
+        populate_partition_keys(db_session, None, None)
+        assert block.session_date is None
+
+
+def test_rescheduled_practice_propagates_to_children(engine: Engine) -> None:
+    """Test that changing a practice date updates every child table."""
+    session_factory = create_session_factory(engine)
+    with session_factory() as db_session:
+        practice = create_practice_tree(date(2025, 5, 17))
+        db_session.add(practice)
+        db_session.commit()
+
+        practice.session_date = date(2025, 7, 1)
+        db_session.commit()
+
+        assert practice.blocks[0].session_date == date(2025, 7, 1)
+        assert practice.exercise_instances[0].session_date == date(2025, 7, 1)
+
+    with engine.connect() as connection:
+        for table_name in ("practice_block", "practice_block_log", "exercise_instance", "exercise_log"):
+            session_dates = connection.execute(text(f"SELECT DISTINCT session_date FROM {table_name}")).scalars()
+            assert list(session_dates) == ["2025-07-01"], table_name
+
+
+def test_backfill_partition_keys_fills_missing_dates(engine: Engine) -> None:
+    """Test that the backfill copies dates down the parent chain."""
+    session_factory = create_session_factory(engine)
+    with session_factory() as db_session:
+        db_session.add(create_practice_tree(date(2025, 5, 17)))
+        db_session.commit()
+
+    with engine.begin() as connection:
+        for table_name in ("practice_block", "practice_block_log", "exercise_instance", "exercise_log"):
+            connection.execute(text(f"UPDATE {table_name} SET session_date = NULL"))
+        backfill_partition_keys(connection)
+        for table_name in ("practice_block", "practice_block_log", "exercise_instance", "exercise_log"):
+            session_dates = connection.execute(text(f"SELECT DISTINCT session_date FROM {table_name}")).scalars()
+            assert list(session_dates) == ["2025-05-17"], table_name
+
+
+def test_sqlite_keeps_unpartitioned_layout(engine: Engine) -> None:
+    """Test that partition maintenance is a no-op on SQLite and conversion is refused."""
+    with engine.begin() as connection:
+        assert is_partitioned(connection, "practice") is False
+        assert ensure_partitions(connection, months_ahead=2) == []
+        with pytest.raises(ValueError, match="requires PostgreSQL"):
+            convert_to_partitioned(connection)
+
+
+def test_ensure_partitions_creates_missing_months() -> None:
+    """Test that only missing future partitions of partitioned tables are created."""
+    connection = FakePostgresConnection(
+        partitioned_tables={"practice"}, partitions={"practice_default", "practice_p2025_05"}
+    )
+
+    created = ensure_partitions(connection, months_ahead=2, today=date(2025, 5, 20))  # type: ignore[arg-type]
+
+    assert created == ["practice_p2025_06", "practice_p2025_07"]
+    assert connection.statements == [
+        create_partition_statement("practice", date(2025, 6, 1)),
+        create_partition_statement("practice", date(2025, 7, 1)),
+    ]
+
+
+def test_convert_to_partitioned_covers_history_and_future() -> None:
+    """Test that conversion backfills, then partitions from the earliest session onwards."""
+    connection = FakePostgresConnection(partitioned_tables=set(), partitions=set(), earliest=date(2025, 3, 9))
+
+    is_converted = convert_to_partitioned(connection, months_ahead=1, today=date(2025, 5, 20))  # type: ignore[arg-type]
+
+    assert is_converted is True
+    assert connection.statements[0].startswith("UPDATE practice_block SET session_date")
+    created_partitions = [statement for statement in connection.statements if "PARTITION OF practice FOR" in statement]
+    assert created_partitions == [
+        create_partition_statement("practice", month) for month in month_range(date(2025, 3, 1), date(2025, 6, 1))
+    ]
+
+
+def test_convert_to_partitioned_skips_partitioned_database() -> None:
+    """Test that conversion is idempotent."""
+    connection = FakePostgresConnection(partitioned_tables={"practice"}, partitions=set())
+
+    assert convert_to_partitioned(connection) is False  # type: ignore[arg-type]
+    assert connection.statements == []
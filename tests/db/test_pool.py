@@ -0,0 +1,145 @@
+"""
+Observable connection pool tests.
+"""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.pool import StaticPool
+
+from mnemosys_core.db.pool import ObservedQueuePool, PoolMetrics, PoolStatistics, get_pool_metrics
+
+
+def create_observed_pool(pool_size: int = 1, max_overflow: int = 0, timeout: float = 0.01) -> ObservedQueuePool:
+    """Create an observed pool over in-memory SQLite connections."""
+    pool = ObservedQueuePool(
+        lambda: sqlite3.connect(":memory:", check_same_thread=False),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        timeout=timeout,
+    )
+    pool.metrics = PoolMetrics()
+    return pool
+
+
+def test_metrics_record_checkout_into_histogram() -> None:
+    """Test that checkout waits land in the matching histogram bucket."""
+    pool_metrics = PoolMetrics(wait_bucket_bounds_ms=(1.0, 10.0))
+
+    pool_metrics.record_checkout(0.0005, is_overflow=False)
+    pool_metrics.record_checkout(0.005, is_overflow=True)
+    pool_metrics.record_checkout(0.5, is_overflow=False)
+
+    pool_statistics = pool_metrics.snapshot()
+    assert pool_statistics.checkouts == 3
+    assert pool_statistics.overflow_checkouts == 1
+    assert pool_statistics.wait_bucket_counts == (1, 1, 1)
+    assert pool_statistics.wait_total_ms == pytest.approx(505.5)
+
+
+def test_statistics_wait_quantile() -> None:
+    """Test quantile estimation from histogram buckets."""
+    pool_statistics = PoolStatistics(
+        checkouts=100,
+        checkins=100,
+        overflow_checkouts=0,
+        timeouts=0,
+        wait_bucket_bounds_ms=(1.0, 10.0),
+        wait_bucket_counts=(90, 9, 1),
+        wait_total_ms=0.0,
+    )
+
+    assert pool_statistics.wait_quantile_ms(0.50) == 1.0
+    assert pool_statistics.wait_quantile_ms(0.99) == 10.0
+    assert pool_statistics.wait_quantile_ms(1.0) == float("inf")
+
+
+def test_statistics_wait_quantile_empty() -> None:
+    """Test that quantiles are undefined before any checkout."""
+    assert PoolMetrics().snapshot().wait_quantile_ms(0.99) is None
+
+
+def test_observed_pool_counts_checkouts_and_checkins() -> None:
+    """Test that checkout and checkin activity is recorded."""
+    pool = create_observed_pool()
+    assert pool.metrics is not None
+
+    connection = pool.connect()
+    connection.close()
+
+    pool_statistics = pool.metrics.snapshot()
+    assert pool_statistics.checkouts == 1
+    assert pool_statistics.overflow_checkouts == 0
+    assert sum(pool_statistics.wait_bucket_counts) == 1
+
+
+def test_observed_pool_counts_overflow() -> None:
+    """Test that checkouts beyond pool_size count as overflow."""
+    pool = create_observed_pool(pool_size=1, max_overflow=1)
+    assert pool.metrics is not None
+
+    first_connection = pool.connect()
+    second_connection = pool.connect()
+
+    assert pool.metrics.snapshot().overflow_checkouts == 1
+    first_connection.close()
+    second_connection.close()
+
+
+def test_observed_pool_reuse_is_not_overflow() -> None:
+    """Test that reusing a pooled connection while overflow is open is not an overflow checkout."""
+    pool = create_observed_pool(pool_size=1, max_overflow=1)
+    assert pool.metrics is not None
+    first_connection = pool.connect()
+    second_connection = pool.connect()
+    first_connection.close()
+
+    third_connection = pool.connect()
+
+    assert pool.overflow() == 1
+    assert pool.metrics.snapshot().overflow_checkouts == 1
+    second_connection.close()
+    third_connection.close()
+
+
+def test_observed_pool_counts_timeouts() -> None:
+    """Test that exhausted pools record timeouts and re-raise."""
+    pool = create_observed_pool(pool_size=1, max_overflow=0, timeout=0.01)
+    assert pool.metrics is not None
+
+    connection = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+
+    assert pool.metrics.snapshot().timeouts == 1
+    connection.close()
+
+
+def test_observed_pool_without_metrics() -> None:
+    """Test that an observed pool works without a metrics sink."""
+    pool = create_observed_pool(timeout=0.01)
+    pool.metrics = None
+
+    connection = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    connection.close()
+
+
+def test_observed_pool_recreate_keeps_metrics() -> None:
+    """Test that engine.dispose() keeps reporting to the same metrics."""
+    pool = create_observed_pool()
+
+    recreated_pool = pool.recreate()
+
+    assert isinstance(recreated_pool, ObservedQueuePool)
+    assert recreated_pool.metrics is pool.metrics
+
+
+def test_get_pool_metrics() -> None:
+    """Test metrics lookup for observed and plain pools."""
+    pool = create_observed_pool()
+
+    assert get_pool_metrics(pool) is pool.metrics
+    assert get_pool_metrics(StaticPool(lambda: sqlite3.connect(":memory:"))) is None
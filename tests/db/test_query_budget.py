@@ -0,0 +1,135 @@
+"""
+Query budget and N+1 detection tests.
+"""
+
+import logging
+
+import pytest
+from sqlalchemy import Engine, select, text
+
+from mnemosys_core.config.environments import Environment
+from mnemosys_core.config.settings import Settings
+from mnemosys_core.db.models import Exercise
+from mnemosys_core.db.query_budget import (
+    QueryBudget,
+    QueryBudgetExceededError,
+    QueryLog,
+    QueryMonitor,
+    capture_queries,
+    count_queries,
+    query_monitor_from_settings,
+    track_queries,
+)
+
+
+def query_log_of(statements: list[str]) -> QueryLog:
+    """Build a query log from statement texts."""
+    query_log = QueryLog()
+    for statement in statements:
+        query_log.record(statement)
+    return query_log
+
+
+def test_repeated_statements_are_reported_most_frequent_first() -> None:
+    """Test grouping of identical statement texts."""
+    query_log = query_log_of(["SELECT a WHERE id = ?"] * 2 + ["SELECT b WHERE id = ?"] * 3 + ["SELECT c"])
+
+    assert query_log.count == 6
+    assert query_log.repeated_statements() == {"SELECT b WHERE id = ?": 3, "SELECT a WHERE id = ?": 2}
+    assert query_log.repeated_statements(min_executions=3) == {"SELECT b WHERE id = ?": 3}
+
+
+def test_budget_violations() -> None:
+    """Test the total and per-statement limits."""
+    query_log = query_log_of(["SELECT practice"] + ["SELECT block\n WHERE practice_id = ?"] * 4)
+
+    assert QueryBudget(max_queries=5, max_statement_repeats=4).violations(query_log) == []
+    assert QueryBudget(max_queries=3, max_statement_repeats=3).violations(query_log) == [
+        "5 queries exceed the budget of 3",
+        "possible N+1: statement ran 4 times: SELECT block WHERE practice_id = ?",
+    ]
+
+
+def test_capture_queries_records_tracked_engine_statements(engine: Engine) -> None:
+    """Test that statements land in the log of the enclosing capture only."""
+    track_queries(engine)
+    track_queries(engine)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with capture_queries() as query_log:
+            for exercise_id in range(3):
+                connection.execute(select(Exercise.name).where(Exercise.id == exercise_id))
+
+    assert query_log.count == 3
+    assert len(query_log.repeated_statements()) == 1
+
+
+def test_budget_dependency_applies_to_current_capture() -> None:
+    """Test that calling a budget declares it for the captured unit of work."""
+    budget = QueryBudget(max_queries=2)
+
+    budget()
+    with capture_queries() as query_log:
+        budget()
+
+    assert query_log.budget is budget
+
+
+def test_count_queries_listens_to_one_engine(engine: Engine) -> None:
+    """Test the engine-scoped counter used by the pytest helper."""
+    with count_queries(engine) as query_log, engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 2"))
+
+    assert query_log.statements == ["SELECT 1"]
+
+
+def test_monitor_raises_in_strict_mode() -> None:
+    """Test that strict monitors fail the unit of work."""
+    query_log = query_log_of(["SELECT 1", "SELECT 2"])
+    query_log.budget = QueryBudget(max_queries=1)
+
+    with pytest.raises(QueryBudgetExceededError, match="GET /probe: 2 queries exceed the budget of 1"):
+        QueryMonitor(strict=True).check(query_log, "GET /probe")
+
+
+def test_monitor_logs_otherwise(caplog: pytest.LogCaptureFixture) -> None:
+    """Test that non-strict monitors log violations of the default budget."""
+    query_log = query_log_of(["SELECT tuning WHERE id = ?"] * 3)
+    monitor = QueryMonitor(QueryBudget(max_statement_repeats=2))
+
+    with caplog.at_level(logging.WARNING, logger="mnemosys_core.db.query_budget"):
+        violations = monitor.check(query_log, "GET /probe")
+
+    assert violations == ["possible N+1: statement ran 3 times: SELECT tuning WHERE id = ?"]
+    assert "GET /probe" in caplog.text
+
+
+@pytest.mark.parametrize(
+    ("environment", "configured_strict", "expected_strict"),
+    [
+        (Environment.TEST, None, True),
+        (Environment.PRODUCTION, None, False),
+        (Environment.TEST, False, False),
+        (Environment.PRODUCTION, True, True),
+    ],
+)
+def test_query_monitor_from_settings(
+    environment: Environment, configured_strict: bool | None, expected_strict: bool
+) -> None:
+    """Test that strictness defaults to the test environment."""
+    settings = Settings(
+        environment=environment,
+        database_url="sqlite:///:memory:",
+        db_query_budget_max_queries=30,
+        db_query_budget_max_repeats=4,
+        db_query_budget_strict=configured_strict,
+    )
+
+    query_monitor = query_monitor_from_settings(settings)
+
+    assert query_monitor.strict is expected_strict
+    assert query_monitor.default_budget == QueryBudget(max_queries=30, max_statement_repeats=4)
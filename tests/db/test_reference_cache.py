@@ -0,0 +1,203 @@
+"""
+Reference data cache tests.
+"""
+
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import Engine, delete, event, insert
+from sqlalchemy.orm import Session as DBSession
+from sqlalchemy.orm import sessionmaker
+
+from mnemosys_core.db.models import (
+    DomainType,
+    Exercise,
+    ExerciseState,
+    OverloadDimension,
+    StringedInstrumentTuning,
+    Technique,
+)
+from mnemosys_core.db.models.exercise import exercise_technique_association
+from mnemosys_core.db.reference_cache import ReferenceDataCache
+from mnemosys_core.db.session import create_session_factory
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def session_factory(engine: Engine) -> sessionmaker[DBSession]:
+    """Session factory with the application's configuration."""
+    return create_session_factory(engine)
+
+
+@pytest.fixture
+def statements(engine: Engine) -> Generator[list[str]]:
+    """Record every SQL statement sent to the database."""
+    recorded: list[str] = []
+
+    def record(conn: object, cursor: object, statement: str, *arguments: object) -> None:
+        recorded.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def seed_reference_data(session_factory: sessionmaker[DBSession]) -> None:
+    """Create an exercise with associations plus a tuning."""
+    with session_factory() as db_session:
+        technique = Technique(name="alternate picking")
+        overload_dimension = OverloadDimension(name="tempo", description="Beats per minute")
+        exercise = Exercise(
+            name="Chromatic Scale",
+            domains=[DomainType.TECHNIQUE],
+            instrument_compatibility=["guitar"],
+            techniques=[technique],
+            overload_dimensions=[overload_dimension],
+        )
+        tuning = StringedInstrumentTuning(name="Standard", pitch_sequence=["E2", "A2", "D3", "G3", "B3", "E4"])
+        db_session.add_all([exercise, tuning])
+        db_session.commit()
+
+
+def test_snapshot_contains_reference_entities(session_factory: sessionmaker[DBSession]) -> None:
+    """Test that snapshots copy entities and their associations."""
+    seed_reference_data(session_factory)
+    reference_cache = ReferenceDataCache(session_factory)
+
+    snapshot = reference_cache.get()
+
+    exercise = snapshot.exercises[0]
+    assert exercise.name == "Chromatic Scale"
+    assert exercise.domains == (DomainType.TECHNIQUE,)
+    assert exercise.instrument_compatibility == ("guitar",)
+    assert snapshot.technique_by_id[exercise.technique_ids[0]].name == "alternate picking"
+    assert snapshot.overload_dimension_by_id[exercise.overload_dimension_ids[0]].description == "Beats per minute"
+    tuning = next(iter(snapshot.tuning_by_id.values()))
+    assert tuning.tuning_type == "stringed"
+    assert tuning.pitch_sequence == ("E2", "A2", "D3", "G3", "B3", "E4")
+    assert snapshot.exercise_by_id[exercise.id] is exercise
+
+
+def test_snapshot_is_immutable(session_factory: sessionmaker[DBSession]) -> None:
+    """Test that snapshots cannot be modified by callers."""
+    seed_reference_data(session_factory)
+    snapshot = ReferenceDataCache(session_factory).get()
+
+    with pytest.raises(TypeError):
+        snapshot.exercise_by_id[999] = snapshot.exercises[0]  # type: ignore[index]
+    with pytest.raises(AttributeError):
+        snapshot.exercises[0].name = "Renamed"  # type: ignore[misc]
+
+
+def test_cached_reads_skip_database(session_factory: sessionmaker[DBSession], statements: list[str]) -> None:
+    """Test that repeated reads are served without SQL."""
+    seed_reference_data(session_factory)
+    reference_cache = ReferenceDataCache(session_factory)
+
+    first_snapshot = reference_cache.get()
+    statement_count = len(statements)
+    second_snapshot = reference_cache.get()
+
+    assert second_snapshot is first_snapshot
+    assert len(statements) == statement_count
+
+
+def test_committed_reference_write_invalidates(session_factory: sessionmaker[DBSession]) -> None:
+    """Test that committing a reference change bumps the version."""
+    reference_cache = ReferenceDataCache(session_factory)
+    reference_cache.track_writes(session_factory)
+    assert reference_cache.get().exercises == ()
+
+    seed_reference_data(session_factory)
+
+    assert reference_cache.version == 1
+    assert reference_cache.get().exercises[0].name == "Chromatic Scale"
+
+
+def test_association_statement_invalidates(session_factory: sessionmaker[DBSession]) -> None:
+    """Test that Core statements on association tables bump the version."""
+    seed_reference_data(session_factory)
+    reference_cache = ReferenceDataCache(session_factory)
+    reference_cache.track_writes(session_factory)
+    exercise = reference_cache.get().exercises[0]
+
+    with session_factory() as db_session:
+        db_session.execute(delete(exercise_technique_association))
+        db_session.commit()
+    assert reference_cache.get().exercises[0].technique_ids == ()
+
+    with session_factory() as db_session:
+        db_session.execute(
+            insert(exercise_technique_association).values(exercise_id=exercise.id, technique_id=exercise.technique_ids[0])
+        )
+        db_session.commit()
+    assert reference_cache.get().exercises[0].technique_ids == exercise.technique_ids
+
+
+def test_rolled_back_reference_write_keeps_snapshot(session_factory: sessionmaker[DBSession]) -> None:
+    """Test that rolled-back changes do not invalidate the cache."""
+    reference_cache = ReferenceDataCache(session_factory)
+    reference_cache.track_writes(session_factory)
+    snapshot = reference_cache.get()
+
+    with session_factory() as db_session:
+        db_session.add(Technique(name="legato"))
+        db_session.flush()
+        db_session.rollback()
+        db_session.commit()
+
+    assert reference_cache.version == 0
+    assert reference_cache.get() is snapshot
+
+
+def test_unrelated_write_keeps_snapshot(session_factory: sessionmaker[DBSession]) -> None:
+    """Test that non-reference commits do not invalidate the cache."""
+    seed_reference_data(session_factory)
+    reference_cache = ReferenceDataCache(session_factory)
+    reference_cache.track_writes(session_factory)
+    snapshot = reference_cache.get()
+
+    with session_factory() as db_session:
+        db_session.add(ExerciseState(exercise_id=snapshot.exercises[0].id))
+        db_session.commit()
+
+    assert reference_cache.get() is snapshot
+
+
+def test_ttl_expiry_reloads(session_factory: sessionmaker[DBSession]) -> None:
+    """Test that snapshots older than the TTL are reloaded."""
+    clock = FakeClock()
+    reference_cache = ReferenceDataCache(session_factory, ttl_seconds=60.0, clock=clock)
+    snapshot = reference_cache.get()
+
+    seed_reference_data(session_factory)  # Out-of-band write: cache is not tracking this factory
+    clock.now = 59.0
+    assert reference_cache.get() is snapshot
+
+    clock.now = 60.0
+    assert reference_cache.get().exercises[0].name == "Chromatic Scale"
+
+
+def test_invalidation_during_load_is_not_cached(session_factory: sessionmaker[DBSession]) -> None:
+    """Test that a snapshot loaded across an invalidation is not kept."""
+    reference_cache = ReferenceDataCache(session_factory)
+
+    @event.listens_for(session_factory, "after_begin")
+    def invalidate_mid_load(*arguments: object) -> None:
+        reference_cache.invalidate()
+
+    first_snapshot = reference_cache.get()
+    event.remove(session_factory, "after_begin", invalidate_mid_load)
+
+    assert first_snapshot.version == 0
+    assert reference_cache.version == 1
+    assert reference_cache.get() is not first_snapshot
@@ -0,0 +1,204 @@
+"""
+Transient database error retry tests.
+"""
+
+import random
+
+import pytest
+from sqlalchemy import Engine, exc
+from sqlalchemy.orm import Session as DBSession
+
+from mnemosys_core.config.environments import Environment
+from mnemosys_core.config.settings import Settings
+from mnemosys_core.db.models import DomainType, Exercise
+from mnemosys_core.db.retry import (
+    RetryAttempts,
+    RetryMetrics,
+    RetryPolicy,
+    classify_transient_error,
+    retry_policy_from_settings,
+    run_in_transaction,
+)
+from mnemosys_core.db.session import create_session_factory
+
+
+class FakeDriverError(Exception):
+    """Driver exception carrying a SQLSTATE like psycopg does."""
+
+    def __init__(self, message: str, sqlstate: str | None = None, pgcode: str | None = None) -> None:
+        super().__init__(message)
+        self.sqlstate = sqlstate
+        self.pgcode = pgcode
+
+
+def driver_error(message: str, sqlstate: str | None = None, pgcode: str | None = None) -> exc.OperationalError:
+    """Wrap a fake driver error the way SQLAlchemy does."""
+    return exc.OperationalError("SELECT 1", {}, FakeDriverError(message, sqlstate=sqlstate, pgcode=pgcode))
+
+
+@pytest.mark.parametrize(
+    ("error", "dialect_name", "expected_reason"),
+    [
+        (driver_error("could not serialize access", sqlstate="40001"), "postgresql", "serialization_failure"),
+        (driver_error("deadlock detected", pgcode="40P01"), "postgresql", "deadlock"),
+        (driver_error("canceling statement due to lock timeout", pgcode="55P03"), "postgresql", "lock_timeout"),
+        (driver_error("connection failure", sqlstate="08006"), "postgresql", "connection"),
+        (driver_error("terminating connection", sqlstate="57P01"), "postgresql", "connection"),
+        (driver_error("unique violation", sqlstate="23505"), "postgresql", None),
+        (driver_error("no sqlstate"), "postgresql", None),
+        (driver_error("database is locked"), "sqlite", "lock_contention"),
+        (driver_error("no such table: practice"), "sqlite", None),
+        (exc.IntegrityError("INSERT", {}, FakeDriverError("database is locked")), "sqlite", None),
+        (ValueError("not a database error"), "postgresql", None),
+    ],
+)
+def test_classify_transient_error(error: BaseException, dialect_name: str, expected_reason: str | None) -> None:
+    """Test per-dialect recognition of transient errors."""
+    assert classify_transient_error(error, dialect_name) == expected_reason
+
+
+def test_invalidated_connections_are_transient_on_any_dialect() -> None:
+    """Test that disconnects flagged by SQLAlchemy are retried."""
+    error = exc.OperationalError("SELECT 1", {}, FakeDriverError("server closed"), connection_invalidated=True)
+
+    assert classify_transient_error(error, "mysql") == "connection"
+
+
+def test_backoff_uses_capped_exponential_full_jitter() -> None:
+    """Test that backoff stays below the exponential ceiling and the cap."""
+    retry_policy = RetryPolicy(base_delay_seconds=0.1, max_delay_seconds=0.3)
+    randomizer = random.Random(7)
+
+    first_delays = [retry_policy.backoff_seconds(1, randomizer) for _ in range(50)]
+    late_delays = [retry_policy.backoff_seconds(6, randomizer) for _ in range(50)]
+
+    assert all(0.0 <= delay <= 0.1 for delay in first_delays)
+    assert all(0.0 <= delay <= 0.3 for delay in late_delays)
+    assert max(late_delays) > 0.1
+
+
+def test_allows_retry_respects_attempts_and_budget() -> None:
+    """Test the attempt and total-backoff bounds."""
+    retry_policy = RetryPolicy(max_attempts=3, budget_seconds=1.0)
+
+    assert retry_policy.allows_retry(1, 0.5) is True
+    assert retry_policy.allows_retry(3, 0.5) is False
+    assert retry_policy.allows_retry(1, 1.5) is False
+
+
+def test_retry_attempts_track_backoff_and_metrics() -> None:
+    """Test that transient errors get a delay until the policy runs out, then None."""
+    retry_metrics = RetryMetrics()
+    attempts = RetryAttempts(RetryPolicy(max_attempts=3), retry_metrics, random.Random(3))
+    transient = driver_error("deadlock detected", sqlstate="40P01")
+
+    assert attempts.retry_delay(ValueError("bug"), "postgresql") is None
+    assert attempts.retry_delay(transient, "postgresql") is not None
+    assert attempts.retry_delay(transient, "postgresql") is not None
+    assert attempts.retry_delay(transient, "postgresql") is None
+    attempts.record_success()
+
+    statistics = retry_metrics.snapshot()
+    assert (statistics.retries, statistics.exhausted, statistics.recovered) == (2, 1, 1)
+    assert statistics.retries_by_reason == {"deadlock": 2}
+
+
+def test_run_in_transaction_retries_then_commits(engine: Engine) -> None:
+    """Test that transient failures are retried on a fresh session and counted."""
+    session_factory = create_session_factory(engine)
+    retry_metrics = RetryMetrics()
+    sleeps: list[float] = []
+    attempts: list[DBSession] = []
+
+    def add_exercise(db_session: DBSession) -> str:
+        attempts.append(db_session)
+        db_session.add(Exercise(name=f"Attempt {len(attempts)}", domains=[DomainType.TECHNIQUE]))
+        db_session.flush()
+        if len(attempts) < 3:
+            raise driver_error("database is locked")
+        return "done"
+
+    result = run_in_transaction(
+        session_factory,
+        add_exercise,
+        RetryPolicy(max_attempts=3),
+        retry_metrics,
+        sleep=sleeps.append,
+        randomizer=random.Random(1),
+    )
+
+    assert result == "done"
+    assert len(sleeps) == 2
+    assert attempts[0] is not attempts[1]
+    with session_factory() as db_session:
+        assert [exercise.name for exercise in db_session.query(Exercise)] == ["Attempt 3"]
+    assert retry_metrics.snapshot().retries == 2
+    assert retry_metrics.snapshot().recovered == 1
+    assert retry_metrics.snapshot().retries_by_reason == {"lock_contention": 2}
+
+
+def test_run_in_transaction_gives_up_after_max_attempts(engine: Engine) -> None:
+    """Test that the last transient error propagates once the policy is spent."""
+    session_factory = create_session_factory(engine)
+    retry_metrics = RetryMetrics()
+
+    def always_locked(db_session: DBSession) -> None:
+        raise driver_error("database is locked")
+
+    with pytest.raises(exc.OperationalError):
+        run_in_transaction(session_factory, always_locked, RetryPolicy(max_attempts=2), retry_metrics, sleep=lambda _: None)
+
+    statistics = retry_metrics.snapshot()
+    assert statistics.retries == 1
+    assert statistics.exhausted == 1
+    assert statistics.recovered == 0
+
+
+def test_run_in_transaction_retries_without_metrics(engine: Engine) -> None:
+    """Test that retrying does not require a metrics collector."""
+    session_factory = create_session_factory(engine)
+    calls: list[int] = []
+
+    def always_locked(db_session: DBSession) -> None:
+        calls.append(1)
+        raise driver_error("database is locked")
+
+    with pytest.raises(exc.OperationalError):
+        run_in_transaction(session_factory, always_locked, RetryPolicy(max_attempts=3), sleep=lambda _: None)
+
+    assert len(calls) == 3
+
+
+def test_run_in_transaction_does_not_retry_other_errors(engine: Engine) -> None:
+    """Test that non-transient errors propagate immediately after rollback."""
+    session_factory = create_session_factory(engine)
+    calls: list[int] = []
+
+    def failing_work(db_session: DBSession) -> None:
+        calls.append(1)
+        db_session.add(Exercise(name="Rolled back", domains=[DomainType.TECHNIQUE]))
+        db_session.flush()
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError, match="bad input"):
+        run_in_transaction(session_factory, failing_work)
+
+    assert calls == [1]
+    with session_factory() as db_session:
+        assert db_session.query(Exercise).count() == 0
+
+
+def test_retry_policy_from_settings() -> None:
+    """Test building the policy from settings."""
+    settings = Settings(
+        environment=Environment.TEST,
+        database_url="sqlite:///:memory:",
+        db_retry_max_attempts=5,
+        db_retry_base_delay=0.2,
+        db_retry_max_delay=4.0,
+        db_retry_budget=8.0,
+    )
+
+    assert retry_policy_from_settings(settings) == RetryPolicy(
+        max_attempts=5, base_delay_seconds=0.2, max_delay_seconds=4.0, budget_seconds=8.0
+    )
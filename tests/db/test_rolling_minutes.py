@@ -0,0 +1,296 @@
+"""
+Rolling minute window maintenance tests.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from mnemosys_core.db.models import (
+    BlockType,
+    CompletionStatus,
+    Exercise,
+    ExerciseDailyMinutes,
+    ExerciseInstance,
+    ExerciseLog,
+    ExerciseState,
+    Practice,
+    PracticeBlock,
+    PracticeBlockLog,
+    QualityRating,
+    SessionType,
+)
+from mnemosys_core.db.rolling_minutes import (
+    expire_rolling_minutes,
+    instance_minutes,
+    rebuild_rolling_minutes,
+    refresh_rolling_minutes,
+)
+from mnemosys_core.testing import DataFactory
+from mnemosys_core.util.time import today_utc
+
+
+@pytest.fixture
+def today() -> date:
+    return today_utc()
+
+
+def _practice(
+    factory: DataFactory, session_date: date, blocks: list[tuple[Exercise, int]], logged: bool = True
+) -> Practice:
+    practice = Practice(
+        instrument=factory.instrument(),
+        session_date=session_date,
+        session_type=SessionType.NORMAL,
+        total_minutes=sum(minutes for _, minutes in blocks),
+    )
+    for order, (exercise, minutes) in enumerate(blocks, start=1):
+        block = PracticeBlock(exercise=exercise, block_order=order, block_type=BlockType.TECHNIQUE, duration_minutes=minutes)
+        if logged:
+            block.logs.append(_block_log())
+        practice.blocks.append(block)
+    factory.db_session.add(practice)
+    factory.db_session.flush()
+    return practice
+
+
+def _block_log() -> PracticeBlockLog:
+    return PracticeBlockLog(completed=CompletionStatus.YES, quality=QualityRating.CLEAN)
+
+
+def _exercise_log() -> ExerciseLog:
+    return ExerciseLog(completion_status=CompletionStatus.YES, quality_rating=QualityRating.CLEAN)
+
+
+def _windows(db_session: Session, exercise: Exercise) -> tuple[int, int]:
+    state = db_session.scalars(select(ExerciseState).where(ExerciseState.exercise_id == exercise.id)).one()
+    return state.rolling_minutes_7d, state.rolling_minutes_28d
+
+
+def test_instance_minutes_reads_numeric_duration() -> None:
+    assert instance_minutes({"duration": 12, "tempo": 90}) == 12
+    assert instance_minutes({"duration": 7.5}) == 7
+    assert instance_minutes({"duration": "10"}) == 0
+    assert instance_minutes({"duration": True}) == 0
+    assert instance_minutes(None) == 0
+
+
+def test_new_blocks_add_to_windows(mnemosys_factory: DataFactory, mnemosys_session: Session, today: date) -> None:
+    scales, arpeggios = mnemosys_factory.exercise(), mnemosys_factory.exercise()
+
+    _practice(mnemosys_factory, today, [(scales, 10), (arpeggios, 5), (scales, 15)])
+    _practice(mnemosys_factory, today - timedelta(days=10), [(scales, 20)])
+    _practice(mnemosys_factory, today - timedelta(days=40), [(arpeggios, 30)])
+
+    assert _windows(mnemosys_session, scales) == (25, 45)
+    assert _windows(mnemosys_session, arpeggios) == (5, 5)
+    state = mnemosys_session.scalars(select(ExerciseState).where(ExerciseState.exercise_id == scales.id)).one()
+    assert state.rolling_as_of == today
+    assert state.last_practiced_date == today
+    days = mnemosys_session.scalars(select(ExerciseDailyMinutes.day)).all()
+    assert today - timedelta(days=40) not in days
+
+
+def test_blocks_and_instances_of_one_session_count_once(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    exercise = mnemosys_factory.exercise()
+
+    practice = mnemosys_factory.practice(exercises=[exercise], session_date=today)
+
+    minutes = practice.blocks[0].duration_minutes
+    assert _windows(mnemosys_session, exercise) == (minutes, minutes)
+
+    practice.exercise_instances[0].parameters = {**practice.exercise_instances[0].parameters, "duration": minutes + 5}
+    mnemosys_session.flush()
+
+    assert _windows(mnemosys_session, exercise) == (minutes + 5, minutes + 5)
+
+
+def test_updates_apply_deltas(mnemosys_factory: DataFactory, mnemosys_session: Session, today: date) -> None:
+    scales, arpeggios = mnemosys_factory.exercise(), mnemosys_factory.exercise()
+    practice = _practice(mnemosys_factory, today - timedelta(days=2), [(scales, 10), (scales, 20)])
+
+    practice.blocks[0].duration_minutes = 15
+    mnemosys_session.flush()
+    assert _windows(mnemosys_session, scales) == (35, 35)
+
+    practice.blocks[1].exercise_id = arpeggios.id
+    mnemosys_session.flush()
+    assert _windows(mnemosys_session, scales) == (15, 15)
+    assert _windows(mnemosys_session, arpeggios) == (20, 20)
+
+    mnemosys_session.delete(practice.blocks[0])
+    mnemosys_session.flush()
+    assert _windows(mnemosys_session, scales) == (0, 0)
+    assert mnemosys_session.get(ExerciseDailyMinutes, (scales.id, today - timedelta(days=2))) is None
+
+
+def test_rescheduled_and_deleted_practices(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    exercise = mnemosys_factory.exercise()
+    practice = _practice(mnemosys_factory, today - timedelta(days=1), [(exercise, 10), (exercise, 5)])
+    instance = ExerciseInstance(exercise=exercise, sequence_order=1, parameters={"duration": 30}, log=_exercise_log())
+    practice.exercise_instances.append(instance)
+    mnemosys_session.flush()
+    assert _windows(mnemosys_session, exercise) == (30, 30)
+
+    practice.session_date = today - timedelta(days=20)
+    practice.blocks[0].duration_minutes = 20
+    mnemosys_session.flush()
+    assert _windows(mnemosys_session, exercise) == (0, 30)
+    bucket = mnemosys_session.get_one(ExerciseDailyMinutes, (exercise.id, today - timedelta(days=20)))
+    assert (bucket.block_minutes, bucket.instance_minutes) == (25, 30)
+
+    mnemosys_session.delete(practice)
+    mnemosys_session.flush()
+    assert _windows(mnemosys_session, exercise) == (0, 0)
+    assert mnemosys_session.scalars(select(ExerciseDailyMinutes)).all() == []
+
+
+def test_stale_windows_expire(mnemosys_factory: DataFactory, mnemosys_session: Session, today: date) -> None:
+    exercise = mnemosys_factory.exercise()
+    _practice(mnemosys_factory, today - timedelta(days=3), [(exercise, 10)])
+    _practice(mnemosys_factory, today - timedelta(days=20), [(exercise, 20)])
+
+    assert expire_rolling_minutes(mnemosys_session, today + timedelta(days=5)) == 1
+    assert _windows(mnemosys_session, exercise) == (0, 30)
+    assert expire_rolling_minutes(mnemosys_session, today + timedelta(days=5)) == 0
+
+    assert expire_rolling_minutes(mnemosys_session, today + timedelta(days=10)) == 1
+    assert _windows(mnemosys_session, exercise) == (0, 10)
+    assert mnemosys_session.scalars(select(ExerciseDailyMinutes.day)).all() == [today - timedelta(days=3)]
+
+
+def test_rebuild_matches_incremental_maintenance(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    exercises = [mnemosys_factory.exercise() for _ in range(4)]
+    mnemosys_factory.practice_history(days=35, start=today - timedelta(days=34), exercises=exercises)
+    incremental = {exercise.id: _windows(mnemosys_session, exercise) for exercise in exercises}
+    buckets = mnemosys_session.execute(select(ExerciseDailyMinutes.__table__)).all()
+
+    rebuild_rolling_minutes(mnemosys_session, today)
+
+    assert {exercise.id: _windows(mnemosys_session, exercise) for exercise in exercises} == incremental
+    assert sorted(mnemosys_session.execute(select(ExerciseDailyMinutes.__table__)).all()) == sorted(buckets)
+
+
+def test_refresh_fills_windows_of_new_states(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    exercise = mnemosys_factory.exercise()
+    _practice(mnemosys_factory, today, [(exercise, 10)])
+    state = mnemosys_session.scalars(select(ExerciseState)).one()
+    state.rolling_minutes_7d = 0
+    mnemosys_session.flush()
+
+    refresh_rolling_minutes(mnemosys_session, [exercise.id], today)
+
+    assert _windows(mnemosys_session, exercise) == (10, 10)
+
+
+def test_changes_that_keep_minutes_leave_windows_alone(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    exercise = mnemosys_factory.exercise()
+    practice = mnemosys_factory.practice(exercises=[exercise], session_date=today)
+    minutes = _windows(mnemosys_session, exercise)
+    instance = practice.exercise_instances[0]
+
+    instance.parameters = {**instance.parameters, "tempo": 200}
+    practice.blocks[0].block_order = 2
+    mnemosys_session.flush()
+    practice.blocks[0].block_order = 2
+    mnemosys_session.flush()
+
+    assert _windows(mnemosys_session, exercise) == minutes
+
+
+def test_refresh_skips_exercises_without_states(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    exercise = mnemosys_factory.exercise()
+
+    refresh_rolling_minutes(mnemosys_session, [exercise.id], today)
+    refresh_rolling_minutes(mnemosys_session, [], today)
+
+    assert mnemosys_session.scalars(select(ExerciseState)).all() == []
+
+
+def test_rebuild_creates_missing_states(mnemosys_factory: DataFactory, mnemosys_session: Session, today: date) -> None:
+    exercise = mnemosys_factory.exercise()
+    _practice(mnemosys_factory, today, [(exercise, 10)])
+    mnemosys_session.execute(delete(ExerciseState))
+
+    assert rebuild_rolling_minutes(mnemosys_session, today) == 1
+
+    assert _windows(mnemosys_session, exercise) == (10, 10)
+    bucket = mnemosys_session.get(ExerciseDailyMinutes, (exercise.id, today))
+    assert repr(bucket) == f"<ExerciseDailyMinutes(exercise_id={exercise.id}, day={today}, minutes=10)>"
+
+
+def test_rows_without_a_session_date_count_once_it_is_filled_in(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    exercise = mnemosys_factory.exercise()
+    practice = _practice(mnemosys_factory, today, [])
+    # Written behind the ORM's back, without the partition key
+    block_id = mnemosys_session.execute(
+        insert(PracticeBlock)
+        .values(
+            practice_id=practice.id,
+            exercise_id=exercise.id,
+            block_order=1,
+            block_type=BlockType.TECHNIQUE,
+            duration_minutes=10,
+        )
+        .returning(PracticeBlock.id)
+    ).scalar_one()
+    mnemosys_session.execute(
+        insert(PracticeBlockLog).values(
+            practice_block_id=block_id, completed=CompletionStatus.YES, quality=QualityRating.CLEAN
+        )
+    )
+    block = mnemosys_session.get_one(PracticeBlock, block_id)
+    assert block.session_date is None
+
+    block.duration_minutes = 20
+    mnemosys_session.flush()
+
+    assert block.session_date == today
+    assert _windows(mnemosys_session, exercise) == (20, 20)
+
+
+def test_only_logged_rows_count(mnemosys_factory: DataFactory, mnemosys_session: Session, today: date) -> None:
+    scales, arpeggios = mnemosys_factory.exercise(), mnemosys_factory.exercise()
+    practice = _practice(mnemosys_factory, today, [(scales, 10), (arpeggios, 20)], logged=False)
+    instance = ExerciseInstance(exercise=scales, sequence_order=1, parameters={"duration": 30})
+    practice.exercise_instances.append(instance)
+    mnemosys_session.flush()
+    # A saved plan is not practice
+    assert mnemosys_session.scalars(select(ExerciseState)).all() == []
+
+    log = _block_log()
+    practice.blocks[0].logs.append(log)
+    mnemosys_session.flush()
+    assert _windows(mnemosys_session, scales) == (10, 10)
+
+    instance.log = _exercise_log()
+    mnemosys_session.flush()
+    assert _windows(mnemosys_session, scales) == (30, 30)
+
+    # Moving a log moves the minutes it stands for
+    log.practice_block_id = practice.blocks[1].id
+    mnemosys_session.flush()
+    assert _windows(mnemosys_session, arpeggios) == (20, 20)
+
+    mnemosys_session.delete(instance.log)
+    mnemosys_session.delete(log)
+    mnemosys_session.flush()
+    assert _windows(mnemosys_session, scales) == (0, 0)
+    assert _windows(mnemosys_session, arpeggios) == (0, 0)
+    assert rebuild_rolling_minutes(mnemosys_session, today) == 0
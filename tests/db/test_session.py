@@ -0,0 +1,222 @@
+"""
+Session factory and session dependency tests.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import Engine, event, insert, text, update
+from sqlalchemy.orm import Session as DBSession
+
+from mnemosys_core.db.models import DomainType, Exercise
+from mnemosys_core.db.session import (
+    HAS_WRITES_KEY,
+    READ_ONLY_KEY,
+    ReadOnlySessionError,
+    _begin_read_only,
+    create_session_factory,
+    get_session_dependency,
+    has_pending_writes,
+)
+
+
+def count_commits(session_factory: object) -> list[DBSession]:
+    """Attach a commit counter to a session factory."""
+    commits: list[DBSession] = []
+    event.listen(session_factory, "after_commit", commits.append)
+    return commits
+
+
+def test_session_checks_out_no_connection_until_first_statement(engine: Engine) -> None:
+    """Test that acquiring a session does not touch the pool."""
+    checkouts: list[object] = []
+    event.listen(engine, "checkout", lambda *arguments: checkouts.append(arguments))
+    session_factory = create_session_factory(engine)
+    get_session = get_session_dependency(session_factory)
+
+    generator = get_session()
+    db_session = next(generator)
+    assert checkouts == []
+
+    db_session.execute(text("SELECT 1"))
+    assert len(checkouts) == 1
+
+    with pytest.raises(StopIteration):
+        next(generator)
+
+
+def test_session_without_writes_skips_commit(engine: Engine) -> None:
+    """Test that pure reads end without a commit."""
+    session_factory = create_session_factory(engine)
+    commits = count_commits(session_factory)
+    get_session = get_session_dependency(session_factory)
+
+    generator = get_session()
+    db_session = next(generator)
+    db_session.query(Exercise).all()
+    with pytest.raises(StopIteration):
+        next(generator)
+
+    assert commits == []
+
+
+def test_session_with_flushed_writes_commits(engine: Engine) -> None:
+    """Test that flushed writes are committed at the end of the unit of work."""
+    session_factory = create_session_factory(engine)
+    commits = count_commits(session_factory)
+    get_session = get_session_dependency(session_factory)
+
+    generator = get_session()
+    db_session = next(generator)
+    db_session.add(Exercise(name="Chromatic Scale", domains=[DomainType.TECHNIQUE]))
+    db_session.flush()
+    assert db_session.info[HAS_WRITES_KEY] is True
+    with pytest.raises(StopIteration):
+        next(generator)
+
+    assert len(commits) == 1
+    with session_factory() as verify_session:
+        assert verify_session.query(Exercise).count() == 1
+
+
+def test_core_writes_commit(engine: Engine) -> None:
+    """Test that bulk and Core DML count as writes and are committed."""
+    session_factory = create_session_factory(engine)
+    commits = count_commits(session_factory)
+    get_session = get_session_dependency(session_factory)
+
+    generator = get_session()
+    db_session = next(generator)
+    db_session.execute(insert(Exercise), [{"name": "Chromatic Scale", "domains": [DomainType.TECHNIQUE]}])
+    assert db_session.info[HAS_WRITES_KEY] is True
+    with pytest.raises(StopIteration):
+        next(generator)
+
+    assert len(commits) == 1
+    with session_factory() as verify_session:
+        assert verify_session.query(Exercise).count() == 1
+
+
+def test_read_only_session_rejects_flushes(engine: Engine) -> None:
+    """Test that flushing writes in a read-only session raises and rolls back."""
+    session_factory = create_session_factory(engine)
+    commits = count_commits(session_factory)
+    get_session = get_session_dependency(session_factory)
+
+    generator = get_session(read_only=True)
+    db_session = next(generator)
+    assert db_session.info[READ_ONLY_KEY] is True
+    db_session.add(Exercise(name="Chromatic Scale", domains=[DomainType.TECHNIQUE]))
+    with pytest.raises(ReadOnlySessionError):
+        db_session.flush()
+    generator.close()
+
+    assert commits == []
+    with session_factory() as verify_session:
+        assert verify_session.query(Exercise).count() == 0
+
+
+def test_read_only_session_rejects_core_writes(engine: Engine) -> None:
+    """Test that bulk and Core DML in a read-only session raise before running."""
+    session_factory = create_session_factory(engine)
+    get_session = get_session_dependency(session_factory)
+
+    generator = get_session(read_only=True)
+    db_session = next(generator)
+    with pytest.raises(ReadOnlySessionError):
+        db_session.execute(update(Exercise).values(name="Renamed"))
+    generator.close()
+
+
+def test_read_only_session_rejects_unflushed_changes(engine: Engine) -> None:
+    """Test that changes left unflushed in a read-only session raise instead of being dropped."""
+    session_factory = create_session_factory(engine)
+    get_session = get_session_dependency(session_factory)
+
+    generator = get_session(read_only=True)
+    db_session = next(generator)
+    db_session.add(Exercise(name="Chromatic Scale", domains=[DomainType.TECHNIQUE]))
+    with pytest.raises(ReadOnlySessionError, match="unflushed"):
+        next(generator)
+
+
+def test_session_rolls_back_on_exception(engine: Engine) -> None:
+    """Test that errors roll back the unit of work and propagate."""
+    session_factory = create_session_factory(engine)
+    get_session = get_session_dependency(session_factory)
+
+    generator = get_session()
+    db_session = next(generator)
+    db_session.add(Exercise(name="Chromatic Scale", domains=[DomainType.TECHNIQUE]))
+    db_session.flush()
+    with pytest.raises(ValueError, match="boom"):
+        generator.throw(ValueError("boom"))
+
+    with session_factory() as verify_session:
+        assert verify_session.query(Exercise).count() == 0
+
+
+def test_has_pending_writes_detects_unflushed_changes(engine: Engine) -> None:
+    """Test that unflushed objects count as pending writes."""
+    session_factory = create_session_factory(engine)
+    with session_factory() as db_session:
+        assert has_pending_writes(db_session) is False
+        db_session.add(Exercise(name="Chromatic Scale", domains=[DomainType.TECHNIQUE]))
+        assert has_pending_writes(db_session) is True
+
+
+def test_begin_read_only_sets_postgresql_transaction() -> None:
+    """Test that PostgreSQL read-only sessions issue SET TRANSACTION READ ONLY."""
+    db_session = MagicMock()
+    db_session.info = {READ_ONLY_KEY: True}
+    connection = MagicMock()
+    connection.dialect.name = "postgresql"
+
+    _begin_read_only(db_session, MagicMock(), connection)
+
+    connection.execute.assert_called_once()
+    assert str(connection.execute.call_args.args[0]) == "SET TRANSACTION READ ONLY"
+
+
+def test_begin_read_only_ignores_read_write_sessions() -> None:
+    """Test that read-write sessions leave the transaction untouched."""
+    db_session = MagicMock()
+    db_session.info = {READ_ONLY_KEY: False}
+    connection = MagicMock()
+    connection.dialect.name = "postgresql"
+
+    _begin_read_only(db_session, MagicMock(), connection)
+
+    connection.execute.assert_not_called()
+
+
+def test_begin_read_only_ignores_sqlite() -> None:
+    """Test that SQLite read-only sessions do not issue PostgreSQL syntax."""
+    db_session = MagicMock()
+    db_session.info = {READ_ONLY_KEY: True}
+    connection = MagicMock()
+    connection.dialect.name = "sqlite"
+
+    _begin_read_only(db_session, MagicMock(), connection)
+
+    connection.execute.assert_not_called()
+
+
+def test_read_only_sessions_route_to_read_engine(engine: Engine) -> None:
+    """Test that only read-only sessions use the reader engine."""
+    read_engine = MagicMock(spec=Engine)
+    session_factory = create_session_factory(engine, read_engine)
+
+    with session_factory() as db_session:
+        assert db_session.get_bind() is engine
+        db_session.info[READ_ONLY_KEY] = True
+        assert db_session.get_bind() is read_engine
+
+
+def test_sessions_without_read_engine_use_primary(engine: Engine) -> None:
+    """Test that read-only sessions fall back to the primary engine."""
+    session_factory = create_session_factory(engine)
+
+    with session_factory() as db_session:
+        db_session.info[READ_ONLY_KEY] = True
+        assert db_session.get_bind() is engine
@@ -0,0 +1,233 @@
+"""
+Slow query log tests.
+"""
+
+import logging
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import Engine, insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from mnemosys_core.config.environments import Environment
+from mnemosys_core.config.settings import Settings
+from mnemosys_core.db.models import DomainType, Exercise
+from mnemosys_core.db.slow_query import (
+    QUERY_START_KEY,
+    SlowQueryLog,
+    _explain,
+    normalize_statement,
+    query_origin,
+    redact_parameters,
+    slow_query_log_from_settings,
+)
+
+
+def test_normalize_statement() -> None:
+    """Test that literals and whitespace are normalized away."""
+    statement = "SELECT *\n  FROM practice_p2024_01 WHERE id = 42 AND notes = 'it''s' AND score > 1.5"
+
+    assert normalize_statement(statement) == "SELECT * FROM practice_p2024_01 WHERE id = ? AND notes = ? AND score > ?"
+
+
+@pytest.mark.parametrize(
+    ("parameters", "executemany", "expected"),
+    [
+        ((3, "secret"), False, ["<int>", "<str>"]),
+        ({"name_1": "secret"}, False, {"name_1": "<str>"}),
+        ([(1,), (2,)], True, "<2 parameter sets>"),
+        (None, False, None),
+    ],
+)
+def test_redact_parameters(parameters: Any, executemany: bool, expected: Any) -> None:
+    """Test that parameter values never reach the log."""
+    assert redact_parameters(parameters, executemany) == expected
+
+
+def test_slow_statements_are_recorded_with_origin_and_plan(engine: Engine) -> None:
+    """Test recording and SQLite plan capture for SELECT statements."""
+    slow_query_log = SlowQueryLog(threshold_ms=0.0, explain_threshold_ms=0.0)
+    slow_query_log.attach(engine)
+
+    with query_origin(lambda: "GET /api/v1/exercises/"), engine.begin() as connection:
+        connection.execute(insert(Exercise).values(name="Scales", domains=[DomainType.TECHNIQUE]))
+        connection.execute(select(Exercise.id).where(Exercise.name == "Scales"))
+
+    insert_sample, select_sample = slow_query_log.samples()
+    assert insert_sample.statement.startswith("INSERT INTO exercise")
+    assert insert_sample.plan is None
+    assert select_sample.origin == "GET /api/v1/exercises/"
+    assert select_sample.parameters == ["<str>"]
+    assert select_sample.plan is not None
+    assert any("exercise" in line for line in select_sample.plan)
+
+
+def test_fast_statements_are_ignored_and_plans_are_rate_limited(engine: Engine) -> None:
+    """Test the threshold and the per-statement explain interval."""
+    slow_query_log = SlowQueryLog(threshold_ms=0.0, explain_threshold_ms=0.0, capacity=2)
+    slow_query_log.attach(engine)
+
+    with engine.connect() as connection:
+        for exercise_id in range(3):
+            connection.execute(select(Exercise.name).where(Exercise.id == exercise_id))
+
+    samples = slow_query_log.samples()
+    assert len(samples) == 2
+    assert [sample.plan is not None for sample in samples] == [False, False]
+    assert samples[0].origin is None
+
+    slow_query_log.threshold_ms = 60_000.0
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert len(slow_query_log.samples()) == 2
+
+
+def test_slow_statements_are_logged(engine: Engine, caplog: pytest.LogCaptureFixture) -> None:
+    """Test that each recorded statement is also logged."""
+    SlowQueryLog(threshold_ms=0.0).attach(engine)
+
+    with caplog.at_level(logging.WARNING, logger="mnemosys_core.db.slow_query"), engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert "Slow query" in caplog.text
+
+
+def postgresql_connection(cursor: MagicMock) -> MagicMock:
+    """Build a PostgreSQL connection double handing out the given cursor."""
+    connection = MagicMock()
+    connection.dialect.name = "postgresql"
+    connection.connection.cursor.return_value = cursor
+    return connection
+
+
+@pytest.mark.parametrize(
+    ("analyze", "explain_prefix"), [(False, "EXPLAIN"), (True, "EXPLAIN (ANALYZE, BUFFERS)")]
+)
+def test_explain_on_postgresql_runs_inside_a_savepoint(analyze: bool, explain_prefix: str) -> None:
+    """Test the PostgreSQL plan capture statements; only opt-in ANALYZE re-runs the query."""
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [("Seq Scan on practice",), ("Filter: (id = 1)",)]
+
+    plan = _explain(postgresql_connection(cursor), "SELECT * FROM practice WHERE id = %(id)s", {"id": 1}, analyze)
+
+    assert plan == ["Seq Scan on practice", "Filter: (id = 1)"]
+    assert [call.args[0] for call in cursor.execute.call_args_list] == [
+        "SAVEPOINT mnemosys_explain",
+        f"{explain_prefix} SELECT * FROM practice WHERE id = %(id)s",
+        "RELEASE SAVEPOINT mnemosys_explain",
+    ]
+
+
+def test_failed_explain_rolls_back_to_savepoint() -> None:
+    """Test that a failing EXPLAIN leaves the transaction usable."""
+    cursor = MagicMock()
+    cursor.execute.side_effect = [None, RuntimeError("cannot explain"), None]
+
+    assert _explain(postgresql_connection(cursor), "SELECT 1", {}) is None
+    assert cursor.execute.call_args_list[-1].args[0] == "ROLLBACK TO SAVEPOINT mnemosys_explain"
+    cursor.close.assert_called_once()
+
+
+def test_failed_savepoint_skips_the_plan() -> None:
+    """Test that a SAVEPOINT error is contained and nothing is rolled back to it."""
+    cursor = MagicMock()
+    cursor.execute.side_effect = RuntimeError("SAVEPOINT can only be used in transaction blocks")
+
+    assert _explain(postgresql_connection(cursor), "SELECT 1", {}) is None
+    assert [call.args[0] for call in cursor.execute.call_args_list] == ["SAVEPOINT mnemosys_explain"]
+    cursor.close.assert_called_once()
+
+
+def test_explain_on_other_dialects_and_failures_on_sqlite() -> None:
+    """Test that unsupported dialects are skipped and SQLite errors are contained."""
+    connection = MagicMock()
+    connection.dialect.name = "mysql"
+    assert _explain(connection, "SELECT 1", ()) is None
+    connection.connection.cursor.assert_not_called()
+
+    cursor = MagicMock()
+    cursor.execute.side_effect = RuntimeError("no such table")
+    connection.dialect.name = "sqlite"
+    connection.connection.cursor.return_value = cursor
+    assert _explain(connection, "SELECT * FROM missing", ()) is None
+    assert cursor.execute.call_count == 1
+
+
+def test_statements_started_before_attach_are_ignored(engine: Engine) -> None:
+    """Test that a statement without a recorded start time is not timed."""
+    slow_query_log = SlowQueryLog(threshold_ms=0.0)
+
+    with engine.connect() as connection:
+        slow_query_log._after_cursor_execute(connection, None, "SELECT 1", (), None, False)
+
+    assert slow_query_log.samples() == []
+
+
+def test_failed_statements_do_not_leave_start_times(engine: Engine) -> None:
+    """Test that a statement that raises forgets its start time on the pooled connection."""
+    slow_query_log = SlowQueryLog(threshold_ms=0.0)
+    slow_query_log.attach(engine)
+
+    with engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM missing_table"))
+        assert connection.info[QUERY_START_KEY] == {}
+
+    slow_query_log._handle_error(MagicMock(connection=None))
+
+
+def test_explain_slots_are_bounded_and_expire() -> None:
+    """Test that remembered statements are capped at capacity and dropped after the interval."""
+    slow_query_log = SlowQueryLog(explain_threshold_ms=0.0, capacity=2, explain_interval_seconds=60.0)
+
+    def should_explain(statement: str) -> bool:
+        return slow_query_log._should_explain(statement, statement, 1.0, False)
+
+    assert [should_explain(statement) for statement in ("SELECT 1", "SELECT 2", "SELECT 3")] == [True, True, True]
+    assert list(slow_query_log._explained_at) == ["SELECT 2", "SELECT 3"]
+    assert should_explain("SELECT 3") is False
+    assert should_explain("SELECT 1") is True
+
+    slow_query_log.explain_interval_seconds = 0.0
+    assert should_explain("SELECT 4") is True
+    assert list(slow_query_log._explained_at) == ["SELECT 4"]
+
+
+def test_clear_drops_samples_and_explain_slots(engine: Engine) -> None:
+    """Test that cleared statements are recorded and explained again."""
+    slow_query_log = SlowQueryLog(threshold_ms=0.0, explain_threshold_ms=0.0)
+    slow_query_log.attach(engine)
+    statement = select(Exercise.id).where(Exercise.name == "Scales")
+
+    with engine.connect() as connection:
+        connection.execute(statement)
+        slow_query_log.clear()
+        assert slow_query_log.samples() == []
+        connection.execute(statement)
+
+    assert [sample.plan is not None for sample in slow_query_log.samples()] == [True]
+
+
+def test_slow_query_log_from_settings() -> None:
+    """Test that the log is only built when a threshold is configured."""
+    settings = Settings(environment=Environment.TEST, database_url="sqlite:///:memory:")
+    assert slow_query_log_from_settings(settings) is None
+
+    settings = Settings(
+        environment=Environment.TEST,
+        database_url="sqlite:///:memory:",
+        db_slow_query_ms=250.0,
+        db_slow_query_explain_ms=1000.0,
+        db_slow_query_capacity=20,
+        db_slow_query_explain_analyze=True,
+    )
+    slow_query_log = slow_query_log_from_settings(settings)
+
+    assert slow_query_log is not None
+    assert (slow_query_log.threshold_ms, slow_query_log.explain_threshold_ms, slow_query_log.capacity) == (
+        250.0,
+        1000.0,
+        20,
+    )
+    assert slow_query_log.explain_analyze is True
@@ -0,0 +1,202 @@
+"""
+Set-based ExerciseState recompute tests.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from mnemosys_core.db.models import (
+    BlockType,
+    CompletionStatus,
+    ExerciseDailyMinutes,
+    ExerciseInstance,
+    ExerciseLog,
+    ExerciseState,
+    FatigueProfile,
+    Practice,
+    PracticeBlock,
+    PracticeBlockLog,
+    QualityRating,
+    SessionType,
+)
+from mnemosys_core.db.state_recompute import (
+    RECOMPUTED_FIELDS,
+    StateChange,
+    _instance_minutes,
+    recompute_exercise_states,
+)
+from mnemosys_core.testing import DataFactory
+from mnemosys_core.util.time import today_utc
+
+
+@pytest.fixture
+def today() -> date:
+    return today_utc()
+
+
+def _states(db_session: Session) -> dict[int, tuple[object, ...]]:
+    columns = [getattr(ExerciseState, name) for name in RECOMPUTED_FIELDS]
+    return {row[0]: tuple(row[1:]) for row in db_session.execute(select(ExerciseState.exercise_id, *columns))}
+
+
+def _buckets(db_session: Session) -> set[tuple[object, ...]]:
+    columns = (
+        ExerciseDailyMinutes.exercise_id,
+        ExerciseDailyMinutes.day,
+        ExerciseDailyMinutes.block_minutes,
+        ExerciseDailyMinutes.instance_minutes,
+    )
+    return {tuple(row) for row in db_session.execute(select(*columns))}
+
+
+def test_recompute_matches_incremental_maintenance(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    """Test that recomputing restores windows and buckets maintained on write."""
+    mnemosys_factory.practice_history(40, start=today - timedelta(days=39))
+    maintained = _states(mnemosys_session)
+    buckets = _buckets(mnemosys_session)
+    mnemosys_session.execute(update(ExerciseState).values(rolling_minutes_7d=0, rolling_minutes_28d=0))
+    mnemosys_session.execute(delete(ExerciseDailyMinutes))
+
+    result = recompute_exercise_states(mnemosys_session, today)
+
+    recomputed = _states(mnemosys_session)
+    for exercise_id, values in maintained.items():
+        assert recomputed[exercise_id][:3] == values[:3]
+        assert recomputed[exercise_id][3] is not None
+    assert _buckets(mnemosys_session) == buckets
+    assert result.states == len(maintained)
+    assert result.created == 0
+    assert set(result.timings) == {"derive", "diff", "write"}
+
+
+def test_dry_run_reports_diff_without_writing(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    """Test that a dry run lists changed fields and leaves the states alone."""
+    exercise = mnemosys_factory.exercise()
+    mnemosys_factory.practice(exercises=[exercise], session_date=today, session_type=SessionType.HEAVY)
+    mnemosys_session.execute(update(ExerciseState).values(rolling_minutes_7d=999))
+    before = _states(mnemosys_session)
+
+    result = recompute_exercise_states(mnemosys_session, today, dry_run=True)
+
+    assert result.dry_run
+    assert "write" not in result.timings
+    assert StateChange(exercise.id, "rolling_minutes_7d", 999, before[exercise.id][2]) in result.changes
+    assert StateChange(exercise.id, "last_fatigue_profile", None, FatigueProfile.F2) in result.changes
+    assert _states(mnemosys_session) == before
+
+
+def test_recompute_derives_days_from_blocks_and_instances(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    """Test that days count the larger of logged block and instance minutes and future days are ignored."""
+    exercise = mnemosys_factory.exercise()
+    instrument = mnemosys_factory.instrument()
+    practices = []
+    for session_date, session_type in (
+        (today - timedelta(days=10), SessionType.HEAVY),
+        (today - timedelta(days=1), SessionType.LIGHT),
+        (today + timedelta(days=2), SessionType.HEAVY),
+    ):
+        practice = Practice(instrument=instrument, session_date=session_date, session_type=session_type, total_minutes=0)
+        mnemosys_session.add(practice)
+        practices.append(practice)
+    mnemosys_session.flush()
+
+    # Written behind the ORM, so only a recompute sees them
+    rows = [
+        (PracticeBlock, {"block_order": 1, "block_type": BlockType.TECHNIQUE, "duration_minutes": 10}),
+        (ExerciseInstance, {"sequence_order": 1, "parameters": {"duration": 25.9}}),
+        (ExerciseInstance, {"sequence_order": 2, "parameters": {"duration": "30"}}),
+    ]
+    for practice in practices:
+        for model, values in rows:
+            row_id = mnemosys_session.execute(
+                insert(model)
+                .values(practice_id=practice.id, exercise_id=exercise.id, session_date=practice.session_date, **values)
+                .returning(model.id)
+            ).scalar_one()
+            if model is PracticeBlock:
+                mnemosys_session.execute(
+                    insert(PracticeBlockLog).values(
+                        practice_block_id=row_id, completed=CompletionStatus.YES, quality=QualityRating.CLEAN
+                    )
+                )
+            else:
+                mnemosys_session.execute(
+                    insert(ExerciseLog).values(
+                        exercise_instance_id=row_id,
+                        completion_status=CompletionStatus.YES,
+                        quality_rating=QualityRating.CLEAN,
+                    )
+                )
+        # A planned, unlogged instance is not practice
+        mnemosys_session.execute(
+            insert(ExerciseInstance).values(
+                practice_id=practice.id,
+                exercise_id=exercise.id,
+                session_date=practice.session_date,
+                sequence_order=3,
+                parameters={"duration": 100},
+            )
+        )
+
+    result = recompute_exercise_states(mnemosys_session, today)
+
+    assert result.created == 1
+    assert _states(mnemosys_session)[exercise.id] == (today - timedelta(days=1), 25, 50, FatigueProfile.F0)
+    assert (exercise.id, today + timedelta(days=2), 10, 25) in _buckets(mnemosys_session)
+
+
+def test_recompute_keeps_archived_history(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    """Test that states without hot history keep their date and fatigue profile."""
+    exercise = mnemosys_factory.exercise()
+    last_practiced = today - timedelta(days=900)
+    mnemosys_session.add(
+        ExerciseState(
+            exercise=exercise,
+            last_practiced_date=last_practiced,
+            rolling_minutes_7d=5,
+            rolling_minutes_28d=5,
+            last_fatigue_profile=FatigueProfile.F1,
+        )
+    )
+    mnemosys_session.flush()
+
+    result = recompute_exercise_states(mnemosys_session, today)
+
+    assert _states(mnemosys_session)[exercise.id] == (last_practiced, 0, 0, FatigueProfile.F1)
+    assert {change.field for change in result.changes} == {"rolling_minutes_7d", "rolling_minutes_28d"}
+
+
+def test_recompute_keeps_date_of_states_practiced_only_later(
+    mnemosys_factory: DataFactory, mnemosys_session: Session, today: date
+) -> None:
+    """Test that hot history after the day does not clear the last practiced date and fatigue profile."""
+    exercise = mnemosys_factory.exercise()
+    mnemosys_factory.practice(exercises=[exercise], session_date=today + timedelta(days=3))
+    last_practiced = today - timedelta(days=900)
+    mnemosys_session.execute(
+        update(ExerciseState).values(last_practiced_date=last_practiced, last_fatigue_profile=FatigueProfile.F2)
+    )
+
+    recompute_exercise_states(mnemosys_session, today)
+
+    assert _states(mnemosys_session)[exercise.id] == (last_practiced, 0, 0, FatigueProfile.F2)
+
+
+def test_instance_minutes_on_postgresql() -> None:
+    """Test that PostgreSQL floors the numeric duration parameter."""
+    compiled = str(_instance_minutes("postgresql").compile(dialect=postgresql.dialect()))
+
+    assert "floor" in compiled
+    assert "coalesce" in compiled
@@ -2,12 +2,54 @@
 Custom database type tests.
 """
 
+import json
+from collections.abc import Callable
+from typing import Any
 from unittest.mock import MagicMock
 
+import pytest
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Dialect
+
 from mnemosys_core.db.models import DomainType, FatigueProfile
 from mnemosys_core.db.types import DatabaseEnum, DatabaseEnumList, JSONEncodedDict, JSONEncodedList
 
 
+def processor_name(processor: Callable[[Any], Any] | None) -> str | None:
+    """Qualified name of a bind/result processor, to tell wrappers from impl processors."""
+    return processor.__qualname__ if processor is not None else None
+
+
+def enum_bind_processor(dialect: Dialect) -> Callable[[Any], Any]:
+    """DatabaseEnum(FatigueProfile) bind processor for a dialect."""
+    processor = DatabaseEnum(FatigueProfile).dialect_impl(dialect).bind_processor(dialect)
+    assert processor is not None
+    return processor
+
+
+def enum_result_processor(dialect: Dialect) -> Callable[[Any], Any]:
+    """DatabaseEnum(FatigueProfile) result processor for a dialect."""
+    processor = DatabaseEnum(FatigueProfile).dialect_impl(dialect).result_processor(dialect, None)
+    assert processor is not None
+    return processor
+
+
+def enum_list_processors() -> tuple[Callable[[Any], Any], Callable[[Any], Any]]:
+    """
+    DatabaseEnumList(DomainType) bind and result processors.
+
+    Built for a SQLite dialect whose JSON (de)serialization is a no-op, so
+    only the enum conversion shows in the values.
+    """
+    dialect = sqlite.dialect(json_serializer=lambda value: value, json_deserializer=lambda value: value)  # type: ignore[no-untyped-call]
+    column_type = DatabaseEnumList(DomainType).dialect_impl(dialect)
+    bind_processor = column_type.bind_processor(dialect)
+    result_processor = column_type.result_processor(dialect, None)
+    assert bind_processor is not None
+    assert result_processor is not None
+    return bind_processor, result_processor
+
+
 class TestJSONEncodedList:
     """Test JSONEncodedList type converter."""
 
@@ -32,71 +74,40 @@ class TestJSONEncodedList:
         converter.load_dialect_impl(mock_dialect)
         mock_dialect.type_descriptor.assert_called_once()
 
-    def test_process_bind_param_postgresql(self) -> None:
-        """Test binding list values for PostgreSQL."""
-        converter = JSONEncodedList()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
-
-        value = ["item1", "item2", "item3"]
-        result = converter.process_bind_param(value, mock_dialect)
-
-        # PostgreSQL gets the raw list
-        assert result == ["item1", "item2", "item3"]
-
-    def test_process_bind_param_sqlite(self) -> None:
-        """Test binding list values for SQLite."""
-        converter = JSONEncodedList()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "sqlite"
-
-        value = ["item1", "item2", "item3"]
-        result = converter.process_bind_param(value, mock_dialect)
-
-        # SQLite gets the raw list
-        assert result == ["item1", "item2", "item3"]
-
-    def test_process_bind_param_none(self) -> None:
-        """Test binding None value."""
-        converter = JSONEncodedList()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
-
-        result = converter.process_bind_param(None, mock_dialect)
-        assert result is None
-
-    def test_process_result_value_postgresql(self) -> None:
-        """Test reading list values from PostgreSQL."""
-        converter = JSONEncodedList()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
-
-        value = ["item1", "item2"]
-        result = converter.process_result_value(value, mock_dialect)
-
-        # PostgreSQL returns raw list
-        assert result == ["item1", "item2"]
-
-    def test_process_result_value_sqlite(self) -> None:
-        """Test reading list values from SQLite."""
-        converter = JSONEncodedList()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "sqlite"
+    def test_processors_are_the_impl_processors(self) -> None:
+        """Test that no pass-through hook wraps the JSON and ARRAY processors."""
+        for dialect in (sqlite.dialect(), postgresql.dialect()):  # type: ignore[no-untyped-call]
+            converter = JSONEncodedList().dialect_impl(dialect)
+            impl = converter.impl_instance.dialect_impl(dialect)  # type: ignore[attr-defined]
+
+            assert processor_name(converter.bind_processor(dialect)) == processor_name(impl.bind_processor(dialect))
+            assert processor_name(converter.result_processor(dialect, None)) == processor_name(
+                impl.result_processor(dialect, None)
+            )
+
+    def test_round_trip_sqlite(self) -> None:
+        """Test that SQLite stores lists as JSON text through the engine codec."""
+        dialect = sqlite.dialect()  # type: ignore[no-untyped-call]
+        converter = JSONEncodedList().dialect_impl(dialect)
+        bind_processor = converter.bind_processor(dialect)
+        result_processor = converter.result_processor(dialect, None)
+        assert bind_processor is not None
+        assert result_processor is not None
+
+        stored = bind_processor(["item1", "item2", "item3"])
+
+        assert json.loads(stored) == ["item1", "item2", "item3"]
+        assert result_processor(stored) == ["item1", "item2", "item3"]
+        assert result_processor(bind_processor(None)) is None
+
+    def test_postgresql_binds_raw_lists(self) -> None:
+        """Test that PostgreSQL ARRAY values reach the driver as lists."""
+        dialect = postgresql.dialect()  # type: ignore[no-untyped-call]
+        converter = JSONEncodedList().dialect_impl(dialect)
+        bind_processor = converter.bind_processor(dialect)
 
         value = ["item1", "item2"]
-        result = converter.process_result_value(value, mock_dialect)
-
-        # SQLite returns raw list
-        assert result == ["item1", "item2"]
-
-    def test_process_result_value_none(self) -> None:
-        """Test reading None value."""
-        converter = JSONEncodedList()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
-
-        result = converter.process_result_value(None, mock_dialect)
-        assert result is None
+        assert (bind_processor(value) if bind_processor is not None else value) == ["item1", "item2"]
 
 
 class TestDatabaseEnum:
@@ -122,51 +133,32 @@ class TestDatabaseEnum:
         converter.load_dialect_impl(mock_dialect)
         mock_dialect.type_descriptor.assert_called_once()
 
-    def test_process_bind_param_with_enum(self) -> None:
+    def test_bind_processor_with_enum(self) -> None:
         """Test binding enum values."""
-        converter = DatabaseEnum(FatigueProfile)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
-
-        result = converter.process_bind_param(FatigueProfile.F1, mock_dialect)
-        assert result == "F1"
+        for dialect in (sqlite.dialect(), postgresql.dialect()):  # type: ignore[no-untyped-call]
+            assert enum_bind_processor(dialect)(FatigueProfile.F1) == "F1"
 
-    def test_process_bind_param_with_string(self) -> None:
+    def test_bind_processor_with_string(self) -> None:
         """Test binding string values (for compatibility)."""
-        converter = DatabaseEnum(FatigueProfile)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
-
-        result = converter.process_bind_param("F2", mock_dialect)
-        assert result == "F2"
+        for dialect in (sqlite.dialect(), postgresql.dialect()):  # type: ignore[no-untyped-call]
+            assert enum_bind_processor(dialect)("F2") == "F2"
 
-    def test_process_bind_param_none(self) -> None:
+    def test_bind_processor_none(self) -> None:
         """Test binding None value."""
-        converter = DatabaseEnum(FatigueProfile)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
-
-        result = converter.process_bind_param(None, mock_dialect)
-        assert result is None
+        for dialect in (sqlite.dialect(), postgresql.dialect()):  # type: ignore[no-untyped-call]
+            assert enum_bind_processor(dialect)(None) is None
 
-    def test_process_result_value_with_string(self) -> None:
+    def test_result_processor_with_string(self) -> None:
         """Test reading enum values from database."""
-        converter = DatabaseEnum(FatigueProfile)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
+        for dialect in (sqlite.dialect(), postgresql.dialect()):  # type: ignore[no-untyped-call]
+            result = enum_result_processor(dialect)("F0")
+            assert result == FatigueProfile.F0
+            assert isinstance(result, FatigueProfile)
 
-        result = converter.process_result_value("F0", mock_dialect)
-        assert result == FatigueProfile.F0
-        assert isinstance(result, FatigueProfile)
-
-    def test_process_result_value_none(self) -> None:
+    def test_result_processor_none(self) -> None:
         """Test reading None value."""
-        converter = DatabaseEnum(FatigueProfile)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
-
-        result = converter.process_result_value(None, mock_dialect)
-        assert result is None
+        for dialect in (sqlite.dialect(), postgresql.dialect()):  # type: ignore[no-untyped-call]
+            assert enum_result_processor(dialect)(None) is None
 
     def test_enum_class_stored(self) -> None:
         """Test that enum class is stored correctly."""
@@ -195,70 +187,50 @@ class TestDatabaseEnumList:
         converter.load_dialect_impl(mock_dialect)
         mock_dialect.type_descriptor.assert_called_once()
 
-    def test_process_bind_param_with_enums(self) -> None:
-        """Test binding enum values for PostgreSQL."""
-        converter = DatabaseEnumList(DomainType)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
+    def test_bind_processor_with_enums(self) -> None:
+        """Test binding enum values."""
+        bind_processor = enum_list_processors()[0]
 
-        result = converter.process_bind_param(
-            [DomainType.TECHNIQUE, DomainType.HARMONY], mock_dialect
-        )
-        assert result == ["Technique", "Harmony"]
+        assert bind_processor([DomainType.TECHNIQUE, DomainType.HARMONY]) == ["Technique", "Harmony"]
 
-    def test_process_bind_param_with_strings(self) -> None:
-        """Test binding string values for PostgreSQL."""
-        converter = DatabaseEnumList(DomainType)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
+    def test_bind_processor_with_strings(self) -> None:
+        """Test binding string values."""
+        bind_processor = enum_list_processors()[0]
 
-        result = converter.process_bind_param(["Technique", "Harmony"], mock_dialect)
-        assert result == ["Technique", "Harmony"]
+        assert bind_processor(["Technique", "Harmony"]) == ["Technique", "Harmony"]
 
-    def test_process_bind_param_none(self) -> None:
+    def test_bind_processor_none(self) -> None:
         """Test binding None value."""
-        converter = DatabaseEnumList(DomainType)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
+        bind_processor = enum_list_processors()[0]
 
-        result = converter.process_bind_param(None, mock_dialect)
-        assert result is None
+        assert bind_processor(None) is None
 
-    def test_process_result_value_postgresql(self) -> None:
-        """Test reading enum list values from PostgreSQL."""
-        converter = DatabaseEnumList(DomainType)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
+    def test_result_processor_with_strings(self) -> None:
+        """Test reading enum list values."""
+        result_processor = enum_list_processors()[1]
 
-        result = converter.process_result_value(["Technique", "Harmony"], mock_dialect)
-        assert result == [DomainType.TECHNIQUE, DomainType.HARMONY]
+        assert result_processor(["Technique", "Harmony"]) == [DomainType.TECHNIQUE, DomainType.HARMONY]
 
-    def test_process_result_value_postgresql_with_enums(self) -> None:
+    def test_result_processor_with_enums(self) -> None:
         """Test reading enum list values when enums are returned."""
-        converter = DatabaseEnumList(DomainType)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
+        result_processor = enum_list_processors()[1]
 
-        result = converter.process_result_value([DomainType.TECHNIQUE], mock_dialect)
-        assert result == [DomainType.TECHNIQUE]
+        assert result_processor([DomainType.TECHNIQUE, "Harmony"]) == [DomainType.TECHNIQUE, DomainType.HARMONY]
 
-    def test_process_result_value_sqlite(self) -> None:
-        """Test reading enum list values from SQLite."""
-        converter = DatabaseEnumList(DomainType)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "sqlite"
+    def test_result_processor_none(self) -> None:
+        """Test reading None value."""
+        result_processor = enum_list_processors()[1]
 
-        result = converter.process_result_value(["Technique", "Harmony"], mock_dialect)
-        assert result == [DomainType.TECHNIQUE, DomainType.HARMONY]
+        assert result_processor(None) is None
 
-    def test_process_result_value_none(self) -> None:
-        """Test reading None value."""
-        converter = DatabaseEnumList(DomainType)
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
+    def test_unknown_values_raise(self) -> None:
+        """Test that values outside the enum are rejected both ways."""
+        bind_processor, result_processor = enum_list_processors()
 
-        result = converter.process_result_value(None, mock_dialect)
-        assert result is None
+        with pytest.raises(ValueError, match="Juggling"):
+            bind_processor([DomainType.TECHNIQUE, "Juggling"])
+        with pytest.raises(ValueError, match="Juggling"):
+            result_processor(["Technique", "Juggling"])
 
     def test_enum_class_stored(self) -> None:
         """Test that enum class is stored correctly."""
@@ -289,68 +261,28 @@ class TestJSONEncodedDict:
         converter.load_dialect_impl(mock_dialect)
         mock_dialect.type_descriptor.assert_called_once()
 
-    def test_process_bind_param_postgresql(self) -> None:
-        """Test binding dict values for PostgreSQL."""
-        converter = JSONEncodedDict()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
-
-        value = {"key1": "value1", "key2": 42}
-        result = converter.process_bind_param(value, mock_dialect)
-
-        # PostgreSQL gets the raw dict
-        assert result == {"key1": "value1", "key2": 42}
+    def test_processors_are_the_impl_processors(self) -> None:
+        """Test that no pass-through hook wraps the JSON and JSONB processors."""
+        for dialect in (sqlite.dialect(), postgresql.dialect()):  # type: ignore[no-untyped-call]
+            converter = JSONEncodedDict().dialect_impl(dialect)
+            impl = converter.impl_instance.dialect_impl(dialect)  # type: ignore[attr-defined]
 
-    def test_process_bind_param_sqlite(self) -> None:
-        """Test binding dict values for SQLite."""
-        converter = JSONEncodedDict()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "sqlite"
+            assert processor_name(converter.bind_processor(dialect)) == processor_name(impl.bind_processor(dialect))
+            assert processor_name(converter.result_processor(dialect, None)) == processor_name(
+                impl.result_processor(dialect, None)
+            )
 
-        value = {"key1": "value1", "key2": 42}
-        result = converter.process_bind_param(value, mock_dialect)
+    def test_round_trip(self) -> None:
+        """Test that dicts are stored as JSON text through the engine codec."""
+        for dialect in (sqlite.dialect(), postgresql.dialect()):  # type: ignore[no-untyped-call]
+            converter = JSONEncodedDict().dialect_impl(dialect)
+            bind_processor = converter.bind_processor(dialect)
+            result_processor = converter.result_processor(dialect, None)
+            assert bind_processor is not None
 
-        # SQLite gets the raw dict
-        assert result == {"key1": "value1", "key2": 42}
+            stored = bind_processor({"key1": "value1", "key2": 42})
 
-    def test_process_bind_param_none(self) -> None:
-        """Test binding None value."""
-        converter = JSONEncodedDict()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
-
-        result = converter.process_bind_param(None, mock_dialect)
-        assert result is None
-
-    def test_process_result_value_postgresql(self) -> None:
-        """Test reading dict values from PostgreSQL."""
-        converter = JSONEncodedDict()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
-
-        value = {"key1": "value1", "key2": 42}
-        result = converter.process_result_value(value, mock_dialect)
-
-        # PostgreSQL returns raw dict
-        assert result == {"key1": "value1", "key2": 42}
-
-    def test_process_result_value_sqlite(self) -> None:
-        """Test reading dict values from SQLite."""
-        converter = JSONEncodedDict()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "sqlite"
-
-        value = {"key1": "value1", "key2": 42}
-        result = converter.process_result_value(value, mock_dialect)
-
-        # SQLite returns raw dict
-        assert result == {"key1": "value1", "key2": 42}
-
-    def test_process_result_value_none(self) -> None:
-        """Test reading None value."""
-        converter = JSONEncodedDict()
-        mock_dialect = MagicMock()
-        mock_dialect.name = "postgresql"
+            assert json.loads(stored) == {"key1": "value1", "key2": 42}
+            loaded = result_processor(stored) if result_processor is not None else json.loads(stored)
+            assert loaded == {"key1": "value1", "key2": 42}
 
-        result = converter.process_result_value(None, mock_dialect)
-        assert result is None
@@ -0,0 +1,155 @@
+"""
+Microbenchmarks for enum column processors.
+
+Each benchmark converts a batch of cells with the processor SQLAlchemy
+caches for the dialect and with a reference conversion (the Enum
+constructor and `isinstance` checks per cell, as the per-value hooks did
+before), checks that both agree, and that the cached processor is faster.
+Timings use the best of several rounds to keep noise out; rates are printed
+for `pytest -s` runs. The timing tests are marked `benchmark` and only run
+with `pytest --benchmarks`.
+"""
+
+import json
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Dialect
+
+from mnemosys_core.db.models import DomainType, QualityRating
+from mnemosys_core.db.types import DatabaseEnum, DatabaseEnumList
+
+CELL_COUNT = 50_000
+ROUNDS = 5
+
+
+@pytest.fixture
+def dialect() -> Dialect:
+    """SQLite dialect (VARCHAR enums, JSON enum lists)."""
+    return sqlite.dialect()  # type: ignore[no-untyped-call]
+
+
+@pytest.fixture
+def passthrough_json_dialect() -> Dialect:
+    """SQLite dialect whose JSON (de)serialization is a no-op, isolating the enum list conversion."""
+    return sqlite.dialect(json_serializer=lambda value: value, json_deserializer=lambda value: value)  # type: ignore[no-untyped-call]
+
+
+def compare(
+    name: str, fast_processor: Callable[[Any], Any] | None, generic_processor: Callable[[Any], Any], cells: list[Any]
+) -> None:
+    """Check that both processors agree on the cells and that the fast one wins."""
+    assert fast_processor is not None
+    assert [fast_processor(cell) for cell in cells] == [generic_processor(cell) for cell in cells]
+
+    fast_seconds = min(timeit.repeat(lambda: [fast_processor(cell) for cell in cells], number=1, repeat=ROUNDS))
+    generic_seconds = min(timeit.repeat(lambda: [generic_processor(cell) for cell in cells], number=1, repeat=ROUNDS))
+
+    print(
+        f"\n{name}: {len(cells) / fast_seconds:,.0f} cells/s "
+        f"(generic {len(cells) / generic_seconds:,.0f} cells/s, {generic_seconds / fast_seconds:.1f}x)"
+    )
+    assert fast_seconds < generic_seconds
+
+
+def coerce_domain(value: DomainType | str) -> DomainType:
+    """Reference per-item conversion for enum lists."""
+    return value if isinstance(value, DomainType) else DomainType(value)
+
+
+def test_processors_are_cached_per_dialect(dialect: Dialect) -> None:
+    """Test that SQLAlchemy reuses the processors built for a dialect."""
+    column_type = DatabaseEnum(QualityRating)
+
+    result_processor = column_type._cached_result_processor(dialect, None)
+    bind_processor = column_type._cached_bind_processor(dialect)
+
+    assert result_processor is not None
+    assert result_processor is column_type._cached_result_processor(dialect, None)
+    assert bind_processor is column_type._cached_bind_processor(dialect)
+
+
+@pytest.mark.benchmark
+def test_enum_result_processor_benchmark(dialect: Dialect) -> None:
+    """Benchmark DatabaseEnum result processing."""
+    column_type = DatabaseEnum(QualityRating).dialect_impl(dialect)
+    cells = [member.value for member in QualityRating] * (CELL_COUNT // len(QualityRating)) + [None]
+
+    compare(
+        "DatabaseEnum result",
+        column_type.result_processor(dialect, None),
+        lambda value: None if value is None else QualityRating(value),
+        cells,
+    )
+
+
+@pytest.mark.benchmark
+def test_enum_bind_processor_benchmark(dialect: Dialect) -> None:
+    """Benchmark DatabaseEnum bind processing."""
+    column_type = DatabaseEnum(QualityRating).dialect_impl(dialect)
+    cells = [*QualityRating, "clean"] * (CELL_COUNT // (len(QualityRating) + 1)) + [None]
+
+    compare(
+        "DatabaseEnum bind",
+        column_type.bind_processor(dialect),
+        lambda value: value.value if isinstance(value, QualityRating) else value,
+        cells,
+    )
+
+
+@pytest.mark.benchmark
+def test_enum_list_result_processor_benchmark(passthrough_json_dialect: Dialect) -> None:
+    """Benchmark DatabaseEnumList result processing."""
+    column_type = DatabaseEnumList(DomainType).dialect_impl(passthrough_json_dialect)
+    cells = [[member.value for member in DomainType]] * (CELL_COUNT // len(DomainType)) + [None]
+
+    compare(
+        "DatabaseEnumList result",
+        column_type.result_processor(passthrough_json_dialect, None),
+        lambda value: None if value is None else [coerce_domain(item) for item in value],
+        cells,
+    )
+
+
+@pytest.mark.benchmark
+def test_enum_list_bind_processor_benchmark(passthrough_json_dialect: Dialect) -> None:
+    """Benchmark DatabaseEnumList bind processing."""
+    column_type = DatabaseEnumList(DomainType).dialect_impl(passthrough_json_dialect)
+    cells = [list(DomainType), ["Technique", DomainType.RHYTHM]] * (CELL_COUNT // (len(DomainType) + 2)) + [None]
+
+    compare(
+        "DatabaseEnumList bind",
+        column_type.bind_processor(passthrough_json_dialect),
+        lambda value: None if value is None else [coerce_domain(item).value for item in value],
+        cells,
+    )
+
+
+def test_enum_list_processors_round_trip_json(dialect: Dialect) -> None:
+    """Test the list processors together with the SQLite JSON impl."""
+    column_type = DatabaseEnumList(DomainType).dialect_impl(dialect)
+    bind_processor = column_type.bind_processor(dialect)
+    result_processor = column_type.result_processor(dialect, None)
+    assert bind_processor is not None
+    assert result_processor is not None
+
+    stored = bind_processor([DomainType.HARMONY, "Rhythm"])
+
+    assert json.loads(stored) == ["Harmony", "Rhythm"]
+    assert result_processor(stored) == [DomainType.HARMONY, DomainType.RHYTHM]
+
+
+def test_unknown_values_still_raise(dialect: Dialect) -> None:
+    """Test that the lookup tables keep the Enum's validation."""
+    enum_processor = DatabaseEnum(QualityRating).dialect_impl(dialect).result_processor(dialect, None)
+    list_processor = DatabaseEnumList(DomainType).dialect_impl(dialect).bind_processor(dialect)
+    assert enum_processor is not None
+    assert list_processor is not None
+
+    with pytest.raises(ValueError, match="perfect"):
+        enum_processor("perfect")
+    with pytest.raises(ValueError, match="Juggling"):
+        list_processor(["Technique", "Juggling"])
@@ -0,0 +1,240 @@
+"""
+Batch session generation tests.
+"""
+
+import sqlite3
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session as DBSession
+from sqlalchemy.orm import sessionmaker
+
+from mnemosys_core.db.models import (
+    DomainType,
+    ExerciseDailyMinutes,
+    ExerciseInstance,
+    Instrument,
+    Practice,
+    SessionType,
+)
+from mnemosys_core.db.reference_cache import load_reference_snapshot
+from mnemosys_core.db.retry import RetryPolicy
+from mnemosys_core.db.session import create_session_factory
+from mnemosys_core.generator import batch, generate_sessions_batch
+from mnemosys_core.generator.batch import PartitionTask, plan_partition
+from mnemosys_core.generator.candidates import Candidate, build_candidate_index, index_candidates
+from mnemosys_core.generator.engine import ExerciseProgress
+from mnemosys_core.generator.mesocycle import create_mesocycle
+from mnemosys_core.generator.service import load_features_by_instrument, load_progress
+from mnemosys_core.testing import DataFactory
+from mnemosys_core.util.time import today_utc
+
+SESSION_DATE = today_utc() + timedelta(days=1)
+
+
+def _seed(session_factory: sessionmaker[DBSession], instruments: int) -> None:
+    with session_factory() as db_session:
+        factory = DataFactory(db_session)
+        factory.practice_history(10, start=today_utc() - timedelta(days=10))
+        for _ in range(instruments - 1):
+            factory.instrument()
+        db_session.commit()
+
+
+def _sessions(session_factory: sessionmaker[DBSession]) -> list[tuple[int, int, int, dict[str, str | int | float]]]:
+    with session_factory() as db_session:
+        rows = db_session.execute(
+            select(
+                Practice.instrument_id,
+                ExerciseInstance.sequence_order,
+                ExerciseInstance.exercise_id,
+                ExerciseInstance.parameters,
+            )
+            .join(ExerciseInstance, ExerciseInstance.practice_id == Practice.id)
+            .where(Practice.session_date == SESSION_DATE)
+            .order_by(Practice.instrument_id, ExerciseInstance.sequence_order)
+        ).tuples()
+        return list(rows)
+
+
+def test_batch_writes_one_session_per_instrument(engine: Engine) -> None:
+    """Test that every instrument gets a session and that re-runs skip planned instruments."""
+    session_factory = create_session_factory(engine)
+    _seed(session_factory, 7)
+
+    result = generate_sessions_batch(session_factory, SESSION_DATE, available_minutes=30, workers=1, partition_size=3)
+
+    assert (result.sessions, result.skipped, result.unplannable) == (7, 0, ())
+    rows = _sessions(session_factory)
+    assert result.instances == len(rows) == 7 * 4
+    assert len(result.workers) == 1
+    assert (result.workers[0].partitions, result.workers[0].sessions) == (3, 7)
+    assert set(result.timings) == {"load", "generate", "windows"}
+    with session_factory() as db_session:
+        practices = db_session.scalars(select(Practice).where(Practice.session_date == SESSION_DATE)).all()
+        assert {practice.session_type for practice in practices} == {SessionType.NORMAL}
+        assert {practice.total_minutes for practice in practices} == {30}
+        # Planned, not practiced: nothing counts toward the rolling windows
+        assert db_session.scalars(select(ExerciseDailyMinutes).where(ExerciseDailyMinutes.day == SESSION_DATE)).all() == []
+
+    rerun = generate_sessions_batch(session_factory, SESSION_DATE, available_minutes=30, workers=1)
+    assert (rerun.sessions, rerun.skipped) == (0, 7)
+    assert _sessions(session_factory) == rows
+
+
+def test_process_pool_matches_in_process_plans(engine: Engine) -> None:
+    """Test that worker processes produce the same sessions as planning in-process."""
+    session_factory = create_session_factory(engine)
+    _seed(session_factory, 6)
+
+    pooled = generate_sessions_batch(session_factory, SESSION_DATE, workers=2, partition_size=2)
+    pooled_rows = _sessions(session_factory)
+    with session_factory() as db_session:
+        for practice in db_session.scalars(select(Practice).where(Practice.session_date == SESSION_DATE)):
+            db_session.delete(practice)
+        db_session.commit()
+    inline = generate_sessions_batch(session_factory, SESSION_DATE, workers=1, partition_size=2)
+
+    assert _sessions(session_factory) == pooled_rows
+    assert pooled.sessions == inline.sessions == 6
+    assert sum(worker.partitions for worker in pooled.workers) == 3
+    assert all(worker.sessions_per_second > 0 for worker in pooled.workers)
+
+
+def _task(features_by_instrument: dict[int, frozenset[str]]) -> PartitionTask:
+    return PartitionTask(
+        partition=0,
+        session_date=SESSION_DATE,
+        session_type=SessionType.NORMAL,
+        available_minutes=30,
+        features_by_instrument=features_by_instrument,
+    )
+
+
+def test_workers_plan_with_the_state_set_at_start_up(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a worker process plans from the catalog and progress handed to its initializer."""
+    monkeypatch.setattr(batch, "_worker_index", None)
+    monkeypatch.setattr(batch, "_worker_progress", {})
+    candidate_index = index_candidates(
+        1,
+        [
+            Candidate(
+                exercise_id=exercise_id,
+                name=f"Exercise {exercise_id}",
+                domains=frozenset({domain}),
+                required_features=frozenset(),
+                overload_dimensions=("tempo",),
+            )
+            for exercise_id, domain in enumerate(
+                (DomainType.TECHNIQUE, DomainType.HARMONY, DomainType.MUSICIANSHIP), start=1
+            )
+        ],
+    )
+    progress = {1: ExerciseProgress(last_practiced_date=SESSION_DATE - timedelta(days=1), mastery_estimate=0.5)}
+    task = _task({1: frozenset({"stringed"}), 2: frozenset({"stringed"})})
+    with pytest.raises(RuntimeError, match="not initialized"):
+        batch._plan_in_worker(task)
+
+    batch._init_worker(candidate_index.version, candidate_index.catalog, progress)
+
+    assert batch._plan_in_worker(task).practices == plan_partition(task, candidate_index, progress).practices
+
+
+def test_instruments_no_exercise_fits_are_reported(db_session: DBSession) -> None:
+    """Test that instruments without a fitting exercise are listed and nothing is written for them."""
+    plans = plan_partition(_task({1: frozenset(), 2: frozenset()}), index_candidates(1, []), {})
+
+    assert (plans.practices, plans.unplannable) == ((), (1, 2))
+    assert batch._write_partition(db_session, _task({}), plans) == (0, 0)
+
+
+def test_partition_writes_skip_planned_instruments(engine: Engine) -> None:
+    """Test that writing a partition twice, e.g. on a retry, plans each instrument once."""
+    session_factory = create_session_factory(engine)
+    _seed(session_factory, 2)
+    generate_sessions_batch(session_factory, SESSION_DATE, workers=1)
+    with session_factory() as db_session:
+        instrument_ids = db_session.scalars(select(Instrument.id)).all()
+        task = _task(load_features_by_instrument(db_session, instrument_ids))
+        candidate_index = build_candidate_index(load_reference_snapshot(db_session, 0, 0.0))
+        plans = plan_partition(task, candidate_index, load_progress(db_session))
+
+        assert len(plans.practices) == 2
+        assert batch._write_partition(db_session, task, plans) == (0, 0)
+
+
+def test_transient_write_failures_are_retried(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a partition write that hits a locked database is retried in a new transaction."""
+    session_factory = create_session_factory(engine)
+    _seed(session_factory, 4)
+    write_partition = batch._write_partition
+    attempts = []
+
+    def locked_once(db_session: DBSession, task: PartitionTask, plans: Any) -> tuple[int, int]:
+        attempts.append(task.partition)
+        written = write_partition(db_session, task, plans)
+        if attempts.count(task.partition) == 1:
+            raise OperationalError("INSERT", {}, sqlite3.OperationalError("database is locked"))
+        return written
+
+    monkeypatch.setattr(batch, "_write_partition", locked_once)
+
+    result = generate_sessions_batch(
+        session_factory, SESSION_DATE, workers=1, partition_size=2, retry_policy=RetryPolicy(base_delay_seconds=0.0)
+    )
+
+    assert attempts == [0, 0, 1, 1]
+    assert (result.sessions, result.instances) == (4, len(_sessions(session_factory)))
+
+
+def test_interrupted_runs_keep_finished_partitions(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a failed partition keeps the ones before it and still rebuilds the windows."""
+    session_factory = create_session_factory(engine)
+    _seed(session_factory, 4)
+    write_partition = batch._write_partition
+    rebuild_rolling_minutes = batch.rebuild_rolling_minutes
+    rebuilds = []
+
+    def failing_second(db_session: DBSession, task: PartitionTask, plans: Any) -> tuple[int, int]:
+        if task.partition == 1:
+            raise ValueError("disk full")
+        return write_partition(db_session, task, plans)
+
+    def rebuild(db_session: DBSession) -> int:
+        rebuilds.append(db_session)
+        return rebuild_rolling_minutes(db_session)
+
+    monkeypatch.setattr(batch, "_write_partition", failing_second)
+    monkeypatch.setattr(batch, "rebuild_rolling_minutes", rebuild)
+
+    with pytest.raises(ValueError, match="disk full"):
+        generate_sessions_batch(session_factory, SESSION_DATE, workers=1, partition_size=2)
+
+    assert len(rebuilds) == 1
+    assert len({row[0] for row in _sessions(session_factory)}) == 2
+
+    resumed = generate_sessions_batch(session_factory, SESSION_DATE, workers=1, partition_size=2)
+    assert (resumed.sessions, resumed.skipped) == (2, 2)
+
+
+def test_instruments_follow_their_mesocycle(engine: Engine) -> None:
+    """Test that an instrument with a planned day gets its session type and at most its volume target."""
+    session_factory = create_session_factory(engine)
+    _seed(session_factory, 2)
+    with session_factory() as db_session:
+        planned_id, unplanned_id = db_session.scalars(select(Instrument.id).order_by(Instrument.id)).all()
+        # Three weeks of accumulation and one of intensification, so the day opens the deload
+        create_mesocycle(db_session, planned_id, SESSION_DATE - timedelta(days=28), base_minutes=45, accumulation_weeks=3)
+        db_session.commit()
+
+    generate_sessions_batch(session_factory, SESSION_DATE, available_minutes=30, workers=1)
+
+    with session_factory() as db_session:
+        practices = {
+            practice.instrument_id: (practice.session_type, practice.total_minutes)
+            for practice in db_session.scalars(select(Practice).where(Practice.session_date == SESSION_DATE))
+        }
+    assert practices == {planned_id: (SessionType.DELOAD, 27), unplanned_id: (SessionType.NORMAL, 30)}
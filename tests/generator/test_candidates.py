@@ -0,0 +1,68 @@
+"""
+Candidate index tests.
+"""
+
+from sqlalchemy.orm import Session as DBSession
+from sqlalchemy.orm import sessionmaker
+
+from mnemosys_core.db.models import BlockType, DomainType, Exercise, OverloadDimension
+from mnemosys_core.db.reference_cache import ReferenceDataCache
+from mnemosys_core.generator.candidates import CandidateIndexCache, build_candidate_index, instrument_features
+
+
+def test_instrument_features() -> None:
+    assert instrument_features("Stringed", ["Alternate Picking", "Legato"], 7) == {
+        "stringed",
+        "alternate picking",
+        "legato",
+        "7-string",
+    }
+    assert instrument_features("keyboard", []) == {"keyboard"}
+
+
+def _add_catalog(db_session: DBSession) -> None:
+    tempo = OverloadDimension(name="tempo")
+    db_session.add_all(
+        [
+            Exercise(name="Picking", domains=[DomainType.TECHNIQUE], overload_dimensions=[tempo]),
+            Exercise(
+                name="Seven-string sweeps", domains=[DomainType.TECHNIQUE], instrument_compatibility=["7-String"]
+            ),
+            Exercise(name="Triads", domains=[DomainType.HARMONY, DomainType.MUSICIANSHIP]),
+        ]
+    )
+    db_session.commit()
+
+
+def test_index_groups_candidates_by_block(session_factory: sessionmaker[DBSession]) -> None:
+    with session_factory() as db_session:
+        _add_catalog(db_session)
+    index = build_candidate_index(ReferenceDataCache(session_factory).get())
+
+    def names(block_type: BlockType) -> list[str]:
+        return [candidate.name for candidate in index.select(index.block_masks[block_type])]
+
+    assert names(BlockType.WARMUP) == ["Picking", "Seven-string sweeps"]
+    assert names(BlockType.APPLICATION) == ["Triads"]
+    assert names(BlockType.RHYTHM) == []
+    assert index.catalog[0].overload_dimensions == ("tempo",)
+
+    six_string = instrument_features("stringed", [], 6)
+    seven_string = instrument_features("stringed", [], 7)
+    assert [candidate.name for candidate in index.candidates(BlockType.TECHNIQUE, six_string)] == ["Picking"]
+    assert len(index.candidates(BlockType.TECHNIQUE, seven_string)) == 2
+
+
+def test_cache_rebuilds_on_new_snapshot(session_factory: sessionmaker[DBSession]) -> None:
+    reference_cache = ReferenceDataCache(session_factory)
+    candidate_cache = CandidateIndexCache(reference_cache)
+    empty = candidate_cache.get()
+    assert candidate_cache.get() is empty
+
+    with session_factory() as db_session:
+        _add_catalog(db_session)
+    reference_cache.invalidate()
+
+    rebuilt = candidate_cache.get()
+    assert rebuilt.version > empty.version
+    assert rebuilt.block_masks[BlockType.TECHNIQUE].bit_count() == 2
@@ -0,0 +1,60 @@
+"""
+Bitset compatibility index tests.
+"""
+
+import random
+
+from mnemosys_core.db.models import DomainType
+from mnemosys_core.generator.candidates import Candidate
+from mnemosys_core.generator.compatibility import build_compatibility_index, positions
+
+FEATURES = ("stringed", "7-string", "8-string", "legato", "sweep picking")
+
+
+def _catalog(size: int, seed: int = 3) -> list[Candidate]:
+    generator = random.Random(seed)
+    return [
+        Candidate(
+            exercise_id=exercise_id,
+            name=f"Exercise {exercise_id}",
+            domains=frozenset(generator.sample(list(DomainType), generator.randint(1, 2))),
+            required_features=frozenset(generator.sample(FEATURES, generator.choice([0, 0, 1, 2]))),
+            overload_dimensions=(),
+            technique_ids=frozenset(generator.sample(range(1, 9), generator.randint(0, 3))),
+        )
+        for exercise_id in range(10, 10 + 3 * size, 3)
+    ]
+
+
+def test_positions() -> None:
+    assert list(positions(0)) == []
+    assert list(positions(0b1011)) == [0, 1, 3]
+    assert list(positions(1 << 200)) == [200]
+
+
+def test_masks_match_linear_filters() -> None:
+    """Test that bitwise filters select exactly what scanning the catalog does."""
+    catalog = _catalog(500)
+    index = build_compatibility_index(catalog)
+    features = frozenset({"stringed", "legato"})
+    domains = {DomainType.HARMONY, DomainType.RHYTHM}
+
+    mask = index.compatible(features) & index.in_domains(domains) & index.with_techniques({2, 5})
+
+    expected = [
+        candidate.exercise_id
+        for candidate in catalog
+        if (not candidate.required_features or candidate.required_features & features)
+        and candidate.domains & domains
+        and candidate.technique_ids & {2, 5}
+    ]
+    assert list(index.exercise_ids(mask)) == expected
+    assert index.count(mask) == len(expected)
+    assert index.count(index.all_mask) == len(catalog)
+    assert index.count(0) == 0
+
+
+def test_mask_of() -> None:
+    index = build_compatibility_index(_catalog(5))
+    assert index.exercise_ids(index.mask_of([22, 10, 999])) == (10, 22)
+    assert index.in_domains([]) == index.with_techniques([]) == 0
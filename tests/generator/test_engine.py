@@ -0,0 +1,198 @@
+"""
+Session generator engine tests.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from mnemosys_core.db.models import BlockType, DomainType, FatigueProfile, SessionType
+from mnemosys_core.generator.candidates import Candidate, CandidateIndex, index_candidates
+from mnemosys_core.generator.engine import (
+    ExerciseProgress,
+    SessionGenerationError,
+    SessionRequest,
+    plan_session,
+)
+from mnemosys_core.generator.rules import BLOCK_RULES
+
+TODAY = date(2025, 6, 10)
+FEATURES = frozenset({"stringed", "6-string"})
+
+
+def _candidate(exercise_id: int, *domains: DomainType, required: frozenset[str] = frozenset()) -> Candidate:
+    return Candidate(
+        exercise_id=exercise_id,
+        name=f"Exercise {exercise_id}",
+        domains=frozenset(domains),
+        required_features=required,
+        overload_dimensions=("tempo",),
+    )
+
+
+def _index(*candidates: Candidate) -> CandidateIndex:
+    return index_candidates(1, candidates)
+
+
+CATALOG = _index(
+    _candidate(1, DomainType.TECHNIQUE),
+    _candidate(2, DomainType.TECHNIQUE),
+    _candidate(3, DomainType.TECHNIQUE, required=frozenset({"7-string"})),
+    _candidate(4, DomainType.HARMONY),
+    _candidate(5, DomainType.RHYTHM),
+    _candidate(6, DomainType.MUSICIANSHIP),
+)
+
+
+def _request(
+    minutes: int = 60, session_type: SessionType = SessionType.NORMAL, goal_weights: dict[DomainType, float] | None = None
+) -> SessionRequest:
+    return SessionRequest(
+        instrument_id=1,
+        available_minutes=minutes,
+        session_type=session_type,
+        session_date=TODAY,
+        goal_weights=goal_weights or {},
+    )
+
+
+def test_plans_are_deterministic() -> None:
+    progress = {1: ExerciseProgress(last_practiced_date=TODAY - timedelta(days=3), mastery_estimate=0.4)}
+    assert plan_session(_request(), CATALOG, FEATURES, progress) == plan_session(_request(), CATALOG, FEATURES, progress)
+
+
+def test_plan_fills_the_skeleton() -> None:
+    plan = plan_session(_request(60), CATALOG, FEATURES, {})
+
+    assert [block.block_type for block in plan.blocks] == [
+        BlockType.WARMUP,
+        BlockType.TECHNIQUE,
+        BlockType.HARMONY,
+        BlockType.RHYTHM,
+        BlockType.APPLICATION,
+    ]
+    assert plan.total_minutes == 60
+    assert plan.skipped_blocks == ()
+    exercise_ids = [block.exercise_id for block in plan.blocks]
+    assert len(set(exercise_ids)) == len(exercise_ids)
+    assert 3 not in exercise_ids
+    for block in plan.blocks:
+        assert block.parameters["duration"] == block.duration_minutes
+        low, high = BLOCK_RULES[block.block_type].tempo_bounds
+        assert low <= int(block.parameters["tempo"]) <= high
+        assert block.instructions and block.focus_cues and block.stop_conditions and block.reasons
+
+
+def test_neediest_exercise_is_selected() -> None:
+    progress = {
+        1: ExerciseProgress(last_practiced_date=TODAY - timedelta(days=1), rolling_minutes_28d=200),
+        2: ExerciseProgress(last_practiced_date=TODAY - timedelta(days=20), rolling_minutes_28d=10),
+    }
+    catalog = _index(_candidate(1, DomainType.TECHNIQUE), _candidate(2, DomainType.TECHNIQUE))
+    plan = plan_session(_request(20), catalog, FEATURES, progress)
+    assert [block.exercise_id for block in plan.blocks] == [2, 1]
+
+
+def test_goal_weights_shift_selection() -> None:
+    catalog = _index(_candidate(1, DomainType.TECHNIQUE), _candidate(2, DomainType.RHYTHM))
+    warmup = plan_session(_request(20, goal_weights={DomainType.RHYTHM: 2.0}), catalog, FEATURES, {}).blocks[0]
+    assert warmup.exercise_id == 2
+    assert "goal weight 2" in warmup.reasons
+
+
+def test_empty_blocks_are_skipped() -> None:
+    catalog = _index(_candidate(1, DomainType.TECHNIQUE), _candidate(2, DomainType.TECHNIQUE))
+    plan = plan_session(_request(60), catalog, FEATURES, {})
+
+    assert [block.block_type for block in plan.blocks] == [BlockType.WARMUP, BlockType.TECHNIQUE]
+    assert plan.skipped_blocks == (BlockType.HARMONY, BlockType.RHYTHM, BlockType.APPLICATION)
+    assert plan.total_minutes == 60
+
+    with pytest.raises(SessionGenerationError):
+        plan_session(_request(60), _index(), FEATURES, {})
+
+
+def test_fatigue_follows_session_type() -> None:
+    heavy = plan_session(_request(60, SessionType.HEAVY), CATALOG, FEATURES, {})
+    assert [block.fatigue_profile for block in heavy.blocks] == [
+        FatigueProfile.F0,
+        FatigueProfile.F2,
+        FatigueProfile.F1,
+        FatigueProfile.F1,
+        FatigueProfile.F1,
+    ]
+    light = plan_session(_request(60, SessionType.LIGHT), CATALOG, FEATURES, {})
+    assert {block.fatigue_profile for block in light.blocks} == {FatigueProfile.F0}
+
+
+def test_recovering_exercises_stay_out_of_f2_blocks() -> None:
+    catalog = _index(*(_candidate(exercise_id, DomainType.TECHNIQUE) for exercise_id in (1, 2, 3)))
+    yesterday = ExerciseProgress(last_practiced_date=TODAY - timedelta(days=1), last_fatigue_profile=FatigueProfile.F2)
+
+    # The warmup takes exercise 2; exercise 1 is still recovering
+    plan = plan_session(_request(20, SessionType.HEAVY), catalog, FEATURES, {1: yesterday})
+    technique = plan.blocks[1]
+    assert (technique.exercise_id, technique.fatigue_profile) == (3, FatigueProfile.F2)
+
+    everyone_recovering = dict.fromkeys((1, 2, 3), yesterday)
+    plan = plan_session(_request(20, SessionType.HEAVY), catalog, FEATURES, everyone_recovering)
+    assert plan.blocks[1].fatigue_profile is FatigueProfile.F1
+
+
+def test_overload_direction() -> None:
+    catalog = _index(_candidate(1, DomainType.TECHNIQUE))
+    settled = ExerciseProgress(last_practiced_date=TODAY - timedelta(days=2), mastery_estimate=0.5)
+    struggling = ExerciseProgress(
+        last_practiced_date=TODAY - timedelta(days=2), mastery_estimate=0.5, failure_streak=2
+    )
+
+    def tempo(progress: ExerciseProgress, session_type: SessionType) -> int:
+        block = plan_session(_request(20, session_type), catalog, FEATURES, {1: progress}).blocks[0]
+        assert block.primary_overload == "tempo"
+        return int(block.parameters["tempo"])
+
+    assert tempo(settled, SessionType.NORMAL) > tempo(settled, SessionType.LIGHT)
+    assert tempo(struggling, SessionType.NORMAL) < tempo(settled, SessionType.LIGHT)
+    assert tempo(settled, SessionType.DELOAD) < tempo(settled, SessionType.LIGHT)
+
+
+def _multi_dimension_index(*dimensions: str) -> CandidateIndex:
+    return _index(
+        Candidate(
+            exercise_id=1,
+            name="Exercise 1",
+            domains=frozenset({DomainType.TECHNIQUE}),
+            required_features=frozenset(),
+            overload_dimensions=dimensions,
+        )
+    )
+
+
+def test_level_dimensions() -> None:
+    catalog = _multi_dimension_index("complexity")
+    progress = {1: ExerciseProgress(last_practiced_date=TODAY - timedelta(days=2), mastery_estimate=1.0)}
+    rule = BLOCK_RULES[BlockType.WARMUP]
+
+    def level(session_type: SessionType) -> int:
+        block = plan_session(_request(20, session_type), catalog, FEATURES, progress).blocks[0]
+        assert block.primary_overload == "complexity"
+        assert f"complexity level {block.parameters['complexity']}" in block.instructions
+        return int(block.parameters["complexity"])
+
+    assert level(SessionType.NORMAL) == rule.level_bounds[1]
+    assert level(SessionType.DELOAD) < rule.level_bounds[1]
+
+
+def test_requested_overload_picks_the_primary_dimension() -> None:
+    catalog = _multi_dimension_index("tempo", "complexity")
+
+    def primary(overload: str | None, day: date) -> str | None:
+        request = SessionRequest(1, 20, SessionType.NORMAL, day, overload=overload)
+        return plan_session(request, catalog, FEATURES, {}).blocks[0].primary_overload
+
+    for day in (TODAY, TODAY + timedelta(days=1)):
+        assert primary("complexity", day) == "complexity"
+        assert primary("tempo", day) == "tempo"
+    # Dimensions the exercise lacks (duration is carried by the minutes) fall back to the daily rotation
+    assert {primary("duration", TODAY), primary("duration", TODAY + timedelta(days=1))} == {"tempo", "complexity"}
+    assert primary("duration", TODAY) == primary(None, TODAY)
@@ -0,0 +1,274 @@
+"""
+Mesocycle planning tests.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.orm import Session as DBSession
+
+from mnemosys_core.db.models import (
+    CompletionStatus,
+    Exercise,
+    MesocyclePhase,
+    QualityRating,
+    SessionType,
+    StringedInstrument,
+)
+from mnemosys_core.generator.engine import SessionRequest
+from mnemosys_core.generator.mesocycle import (
+    FailureTrend,
+    PlannedDay,
+    create_mesocycle,
+    load_failure_trend,
+    load_planned_days,
+    phase_weeks,
+    plan_mesocycle,
+    replan_days,
+    replan_mesocycle,
+    step_down,
+)
+from mnemosys_core.testing import DataFactory
+
+START = date(2026, 1, 5)
+
+
+def _week(days: tuple[PlannedDay, ...], week: int) -> tuple[PlannedDay, ...]:
+    return days[week * 7 : (week + 1) * 7]
+
+
+def _log_practices(
+    factory: DataFactory,
+    instrument: StringedInstrument,
+    exercises: list[Exercise],
+    first_day: date,
+    days: int,
+    completion: CompletionStatus,
+    quality: QualityRating,
+) -> None:
+    """Log one practice a day, every outcome the same."""
+    for offset in range(days):
+        practice = factory.practice(instrument, exercises, session_date=first_day + timedelta(days=offset))
+        for block in practice.blocks:
+            block.logs[0].completed = completion
+            block.logs[0].quality = quality
+        for instance in practice.exercise_instances:
+            assert instance.log is not None
+            instance.log.completion_status = completion
+            instance.log.quality_rating = quality
+    factory.db_session.flush()
+
+
+def test_phase_weeks() -> None:
+    """Test that phases follow each other and their lengths are bounded."""
+    assert phase_weeks(3, 2) == (
+        MesocyclePhase.ACCUMULATION,
+        MesocyclePhase.ACCUMULATION,
+        MesocyclePhase.ACCUMULATION,
+        MesocyclePhase.INTENSIFICATION,
+        MesocyclePhase.INTENSIFICATION,
+        MesocyclePhase.DELOAD,
+    )
+    with pytest.raises(ValueError, match="Accumulation"):
+        phase_weeks(2, 1)
+    with pytest.raises(ValueError, match="Intensification"):
+        phase_weeks(4, 3)
+
+
+def test_plan_mesocycle_layout() -> None:
+    """Test that every day of the cycle is planned once, in order."""
+    days = plan_mesocycle(START, base_minutes=45, accumulation_weeks=5, intensification_weeks=2)
+
+    assert len(days) == 8 * 7
+    assert [planned_day.day for planned_day in days] == [START + timedelta(days=offset) for offset in range(56)]
+    assert {planned_day.phase for planned_day in days[-7:]} == {MesocyclePhase.DELOAD}
+
+
+def test_accumulation_raises_volume_through_duration() -> None:
+    """Test that accumulation targets grow week over week with one heavy day a week."""
+    days = plan_mesocycle(START, base_minutes=40, accumulation_weeks=4)
+
+    normal_minutes = [_week(days, week)[0].target_minutes for week in range(4)]
+    assert normal_minutes == [40, 44, 48, 52]
+    for week in range(4):
+        session_types = [planned_day.session_type for planned_day in _week(days, week)]
+        assert session_types.count(SessionType.HEAVY) == 1
+        assert {planned_day.overload for planned_day in _week(days, week)} == {"duration"}
+
+
+def test_intensification_holds_volume_and_overloads_tempo_and_complexity() -> None:
+    """Test that intensification stays below the accumulation peak with more heavy days."""
+    days = plan_mesocycle(START, base_minutes=40, accumulation_weeks=3, intensification_weeks=2)
+    peak = _week(days, 2)[0].target_minutes
+
+    for week in (3, 4):
+        intensification = _week(days, week)
+        assert {planned_day.phase for planned_day in intensification} == {MesocyclePhase.INTENSIFICATION}
+        assert max(planned_day.target_minutes for planned_day in intensification) < peak
+        assert [planned_day.session_type for planned_day in intensification].count(SessionType.HEAVY) == 2
+        assert {planned_day.overload for planned_day in intensification} == {"tempo", "complexity"}
+    assert [planned_day.overload for planned_day in _week(days, 3)[:3]] == ["tempo", "complexity", "tempo"]
+
+
+def test_deload_removes_heavy_work() -> None:
+    """Test that the deload week is all deload sessions at reduced volume."""
+    days = plan_mesocycle(START, base_minutes=45)
+    deload = _week(days, 5)
+
+    assert {planned_day.session_type for planned_day in deload} == {SessionType.DELOAD}
+    assert {planned_day.target_minutes for planned_day in deload} == {27}
+    assert {planned_day.overload for planned_day in deload} == {None}
+
+
+def test_plan_mesocycle_rejects_base_minutes_out_of_range() -> None:
+    """Test that the base volume must be a valid session length."""
+    with pytest.raises(ValueError, match="Base minutes"):
+        plan_mesocycle(START, base_minutes=5)
+
+
+def test_session_request() -> None:
+    """Test that a planned day becomes the generator's request."""
+    planned_day = plan_mesocycle(START, base_minutes=45)[4]
+
+    request = planned_day.session_request(instrument_id=7)
+
+    assert (request.instrument_id, request.session_date) == (7, START + timedelta(days=4))
+    assert (request.session_type, request.available_minutes) == (SessionType.HEAVY, 45)
+    assert request.overload == "duration"
+
+
+def test_fit_request() -> None:
+    """Test that a request follows the planned day's type and overload within its volume target."""
+    planned_day = PlannedDay(START, MesocyclePhase.INTENSIFICATION, SessionType.HEAVY, 40, "complexity")
+    request = SessionRequest(7, 60, SessionType.NORMAL, START)
+
+    fitted = planned_day.fit_request(request)
+
+    assert (fitted.session_type, fitted.available_minutes, fitted.overload) == (SessionType.HEAVY, 40, "complexity")
+    assert planned_day.fit_request(SessionRequest(7, 30, SessionType.NORMAL, START)).available_minutes == 30
+
+
+def test_step_down() -> None:
+    """Test that heavy steps to normal and normal to light, with less volume."""
+    heavy = PlannedDay(START, MesocyclePhase.INTENSIFICATION, SessionType.HEAVY, 50, "tempo")
+    deload = PlannedDay(START, MesocyclePhase.DELOAD, SessionType.DELOAD, 27, None)
+
+    assert step_down(heavy) == PlannedDay(START, MesocyclePhase.INTENSIFICATION, SessionType.NORMAL, 40, "tempo")
+    assert step_down(step_down(heavy)).session_type is SessionType.LIGHT
+    assert step_down(deload) == deload
+
+
+def test_replan_days_only_touches_the_next_week() -> None:
+    """Test that past days, today, days past the horizon and deload days are kept."""
+    days = plan_mesocycle(START, base_minutes=45, accumulation_weeks=3)
+    as_of = START + timedelta(days=24)
+
+    replanned = replan_days(days, as_of)
+
+    assert [planned_day.day for planned_day in replanned] == [as_of + timedelta(days=offset) for offset in range(1, 4)]
+    assert all(planned_day.phase is MesocyclePhase.INTENSIFICATION for planned_day in replanned)
+
+
+def test_failure_trend_rising() -> None:
+    """Test the thresholds of a rising failure rate."""
+    assert FailureTrend(10, 4, 20, 2).rising
+    assert not FailureTrend(10, 4, 20, 8).rising
+    assert not FailureTrend(10, 2, 20, 0).rising
+    assert not FailureTrend(4, 4, 0, 0).rising
+    assert FailureTrend(0, 0, 0, 0).recent_rate == 0.0
+
+
+def test_load_failure_trend(db_session: DBSession) -> None:
+    """Test that outcomes are split into the recent and baseline windows."""
+    factory = DataFactory(db_session)
+    instrument = factory.instrument()
+    exercises = [factory.exercise(), factory.exercise()]
+    as_of = date(2025, 3, 31)
+    _log_practices(
+        factory, instrument, exercises, as_of - timedelta(days=20), 14, CompletionStatus.YES, QualityRating.CLEAN
+    )
+    _log_practices(factory, instrument, exercises, as_of - timedelta(days=2), 3, CompletionStatus.NO, QualityRating.SLOPPY)
+    factory.practice(exercises=exercises, session_date=as_of)
+
+    trend = load_failure_trend(db_session, instrument.id, as_of)
+
+    # Two exercises, each with a block log and an exercise log, per practice
+    assert trend == FailureTrend(recent_outcomes=12, recent_failures=12, baseline_outcomes=56, baseline_failures=0)
+    assert trend.rising
+
+
+def test_create_mesocycle(db_session: DBSession) -> None:
+    """Test that a mesocycle is saved with one row per planned day."""
+    instrument = DataFactory(db_session).instrument()
+
+    mesocycle = create_mesocycle(db_session, instrument.id, START, base_minutes=45, accumulation_weeks=3)
+
+    assert mesocycle.deload_weeks == 1
+    assert len(mesocycle.days) == 35
+    assert [(row.day, row.session_type, row.target_minutes) for row in mesocycle.days] == [
+        (planned_day.day, planned_day.session_type, planned_day.target_minutes)
+        for planned_day in plan_mesocycle(START, base_minutes=45, accumulation_weeks=3)
+    ]
+
+
+def test_replan_mesocycle_on_rising_failures(db_session: DBSession) -> None:
+    """Test that rising failures step down the next week once and leave other days alone."""
+    factory = DataFactory(db_session)
+    instrument = factory.instrument()
+    exercises = [factory.exercise(), factory.exercise()]
+    mesocycle = create_mesocycle(db_session, instrument.id, START, base_minutes=45)
+    as_of = START + timedelta(days=13)
+    _log_practices(factory, instrument, exercises, START, 10, CompletionStatus.YES, QualityRating.CLEAN)
+    _log_practices(
+        factory, instrument, exercises, as_of - timedelta(days=3), 4, CompletionStatus.PARTIAL, QualityRating.SLOPPY
+    )
+    before = {row.day: (row.session_type, row.target_minutes) for row in mesocycle.days}
+
+    trend, changed = replan_mesocycle(db_session, mesocycle, as_of)
+
+    assert trend.rising
+    assert [row.day for row in changed] == [as_of + timedelta(days=offset) for offset in range(1, 8)]
+    assert all(row.replanned_on == as_of for row in changed)
+    for row in mesocycle.days:
+        if row in changed:
+            assert row.target_minutes < before[row.day][1]
+        else:
+            assert (row.session_type, row.target_minutes) == before[row.day]
+    heavy_day = START + timedelta(days=18)
+    assert before[heavy_day][0] is SessionType.HEAVY
+    assert next(row for row in changed if row.day == heavy_day).session_type is SessionType.NORMAL
+
+    assert replan_mesocycle(db_session, mesocycle, as_of)[1] == []
+
+
+def test_replan_mesocycle_without_rising_failures(db_session: DBSession) -> None:
+    """Test that a steady failure rate changes nothing."""
+    factory = DataFactory(db_session)
+    instrument = factory.instrument()
+    exercises = [factory.exercise()]
+    mesocycle = create_mesocycle(db_session, instrument.id, START, base_minutes=45)
+    _log_practices(factory, instrument, exercises, START, 14, CompletionStatus.YES, QualityRating.ACCEPTABLE)
+
+    trend, changed = replan_mesocycle(db_session, mesocycle, START + timedelta(days=13))
+
+    assert not trend.rising
+    assert changed == []
+    assert all(row.replanned_on is None for row in mesocycle.days)
+
+
+def test_load_planned_days(db_session: DBSession) -> None:
+    """Test that the latest mesocycle covering a day wins, per instrument."""
+    factory = DataFactory(db_session)
+    first, second, unplanned = factory.instrument(), factory.instrument(), factory.instrument()
+    earlier = create_mesocycle(db_session, first.id, START, base_minutes=45)
+    later = create_mesocycle(db_session, first.id, START + timedelta(days=7), base_minutes=60)
+    create_mesocycle(db_session, second.id, START, base_minutes=30)
+    day = START + timedelta(days=7)
+
+    planned_days = load_planned_days(db_session, day)
+
+    assert set(planned_days) == {first.id, second.id}
+    assert planned_days[first.id] == plan_mesocycle(START + timedelta(days=7), base_minutes=60)[0]
+    assert load_planned_days(db_session, day, [second.id, unplanned.id]).keys() == {second.id}
+    assert repr(later) == f"<Mesocycle(id={later.id}, instrument_id={first.id}, start={START + timedelta(days=7)})>"
+    assert repr(earlier.days[0]) == f"<MesocycleDay(day={START}, phase=accumulation, type=normal)>"
@@ -0,0 +1,155 @@
+"""
+Session plan cache tests.
+"""
+
+from dataclasses import replace
+from datetime import date
+
+from sqlalchemy import Engine, select, update
+from sqlalchemy.orm import Session as DBSession
+from sqlalchemy.orm import sessionmaker
+
+from mnemosys_core.db.models import (
+    DomainType,
+    Exercise,
+    ExerciseState,
+    Instrument,
+    SessionType,
+    StringedInstrument,
+    Technique,
+)
+from mnemosys_core.db.query_budget import count_queries
+from mnemosys_core.db.reference_cache import ReferenceDataCache
+from mnemosys_core.db.session import create_session_factory
+from mnemosys_core.generator import CandidateIndexCache, SessionPlan, SessionPlanCache, SessionRequest, generate_session
+from mnemosys_core.generator.mesocycle import create_mesocycle
+from mnemosys_core.testing import DataFactory
+
+TODAY = date(2025, 6, 10)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _request(minutes: int = 30, **goal_weights: float) -> SessionRequest:
+    return SessionRequest(
+        instrument_id=1,
+        available_minutes=minutes,
+        session_type=SessionType.NORMAL,
+        session_date=TODAY,
+        goal_weights={DomainType[domain.upper()]: weight for domain, weight in goal_weights.items()},
+    )
+
+
+def _plan(request: SessionRequest) -> SessionPlan:
+    return SessionPlan(request=request, blocks=(), skipped_blocks=(), catalog_version=0)
+
+
+def test_keys_ignore_goal_weight_order() -> None:
+    plan_cache = SessionPlanCache()
+    first = plan_cache.key(_request(technique=2.0, rhythm=0.5), 0)
+    assert first == plan_cache.key(_request(rhythm=0.5, technique=2.0), 0)
+    assert first != plan_cache.key(_request(rhythm=0.5, technique=2.0), 1)
+    assert first != plan_cache.key(_request(technique=2.0), 0)
+    assert first != plan_cache.key(replace(_request(rhythm=0.5, technique=2.0), overload="tempo"), 0)
+
+
+def test_lru_eviction_and_ttl() -> None:
+    clock = FakeClock()
+    plan_cache = SessionPlanCache(max_entries=2, ttl_seconds=60.0, clock=clock)
+    keys = [plan_cache.key(_request(minutes), 0) for minutes in (20, 30, 40)]
+    plan_cache.put(keys[0], _plan(_request(20)))
+    plan_cache.put(keys[1], _plan(_request(30)))
+    assert plan_cache.get(keys[0]) is not None
+
+    plan_cache.put(keys[2], _plan(_request(40)))
+
+    assert plan_cache.get(keys[1]) is None
+    assert plan_cache.get(keys[0]) is not None
+    clock.now = 60.0
+    assert plan_cache.get(keys[2]) is None
+    assert (plan_cache.hits, plan_cache.misses) == (2, 2)
+
+
+def test_stale_plans_are_not_stored() -> None:
+    plan_cache = SessionPlanCache()
+    key = plan_cache.key(_request(), 0)
+    plan_cache.invalidate()
+    plan_cache.put(key, _plan(_request()))
+    assert len(plan_cache) == 0
+
+
+def test_state_writes_invalidate(engine: Engine) -> None:
+    """Test that practice, log and state commits invalidate, other commits do not."""
+    session_factory = create_session_factory(engine)
+    plan_cache = SessionPlanCache()
+    plan_cache.track_writes(session_factory)
+
+    with session_factory() as db_session:
+        db_session.add(Technique(name="legato"))
+        db_session.commit()
+        db_session.execute(update(Technique).values(description="Slurred notes"))
+        db_session.commit()
+    assert plan_cache.version == 0
+
+    with session_factory() as db_session:
+        DataFactory(db_session).practice_history(2)
+        db_session.rollback()
+    assert plan_cache.version == 0
+
+    with session_factory() as db_session:
+        DataFactory(db_session).practice_history(2)
+        db_session.commit()
+    assert plan_cache.version == 1
+
+    with session_factory() as db_session:
+        db_session.execute(update(ExerciseState).values(failure_streak=0))
+        db_session.commit()
+    assert plan_cache.version == 2
+
+    with session_factory() as db_session:
+        create_mesocycle(db_session, db_session.scalars(select(Instrument.id).limit(1)).one(), TODAY, base_minutes=45)
+        db_session.commit()
+    assert plan_cache.version == 3
+
+
+def test_cached_plans_skip_database(engine: Engine, session_factory: sessionmaker[DBSession]) -> None:
+    """Test that a repeated request is served without SQL until states change."""
+    app_session_factory = create_session_factory(engine)
+    plan_cache = SessionPlanCache()
+    plan_cache.track_writes(app_session_factory)
+    with app_session_factory() as db_session:
+        factory = DataFactory(db_session)
+        instrument = factory.instrument()
+        factory.practice_history(5, start=date(2025, 6, 1))
+        db_session.commit()
+        instrument_id = instrument.id
+        request = SessionRequest(instrument_id, 30, SessionType.NORMAL, TODAY)
+    candidate_index = CandidateIndexCache(ReferenceDataCache(session_factory)).get()
+
+    with app_session_factory() as db_session:
+        plan = generate_session(db_session, candidate_index, request, plan_cache)
+        with count_queries(engine) as query_log:
+            assert generate_session(db_session, candidate_index, request, plan_cache) is plan
+        assert query_log.statements == []
+
+    with app_session_factory() as db_session:
+        warmup = db_session.get_one(Exercise, plan.blocks[0].exercise_id)
+        DataFactory(db_session).practice(db_session.get_one(StringedInstrument, instrument_id), [warmup], TODAY)
+        db_session.commit()
+        replanned = generate_session(db_session, candidate_index, request, plan_cache)
+    assert replanned is not plan
+    assert replanned.blocks[0].exercise_id != plan.blocks[0].exercise_id
+
+    # Without a cache every request is planned afresh
+    with app_session_factory() as db_session:
+        uncached = generate_session(db_session, candidate_index, request)
+    assert uncached == replanned
+    assert uncached is not replanned
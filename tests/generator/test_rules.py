@@ -0,0 +1,55 @@
+"""
+Session structure rule tests.
+"""
+
+import pytest
+
+from mnemosys_core.db.models import BlockType, FatigueProfile
+from mnemosys_core.generator.rules import (
+    BLOCK_RULES,
+    MAX_SESSION_MINUTES,
+    MIN_SESSION_MINUTES,
+    allocate_minutes,
+    lower_fatigue,
+    session_skeleton,
+)
+
+
+@pytest.mark.parametrize(
+    ("minutes", "blocks"),
+    [
+        (MIN_SESSION_MINUTES, 3),
+        (25, 3),
+        (26, 4),
+        (45, 4),
+        (46, 5),
+        (MAX_SESSION_MINUTES, 5),
+        (MAX_SESSION_MINUTES + 60, 5),
+    ],
+)
+def test_skeleton_grows_with_time(minutes: int, blocks: int) -> None:
+    skeleton = session_skeleton(minutes)
+    assert len(skeleton) == blocks
+    assert skeleton[0] is BlockType.WARMUP
+    assert skeleton[-1] is BlockType.APPLICATION
+
+
+def test_allocation_uses_every_minute() -> None:
+    for minutes in range(MIN_SESSION_MINUTES, MAX_SESSION_MINUTES + 1):
+        allocation = allocate_minutes(session_skeleton(minutes), minutes)
+        assert sum(allocation) == minutes
+        assert min(allocation) >= minutes * 2 // 13
+
+
+def test_allocation_follows_shares() -> None:
+    assert allocate_minutes([BlockType.WARMUP, BlockType.TECHNIQUE, BlockType.APPLICATION], 21) == [6, 9, 6]
+    assert allocate_minutes([BlockType.WARMUP, BlockType.TECHNIQUE, BlockType.APPLICATION], 22) == [6, 10, 6]
+    assert allocate_minutes([], 30) == []
+
+
+def test_only_technique_blocks_allow_f2() -> None:
+    assert [rule.block_type for rule in BLOCK_RULES.values() if rule.max_fatigue is FatigueProfile.F2] == [
+        BlockType.TECHNIQUE
+    ]
+    assert lower_fatigue(FatigueProfile.F2, FatigueProfile.F1) is FatigueProfile.F1
+    assert lower_fatigue(FatigueProfile.F0, FatigueProfile.F2) is FatigueProfile.F0
@@ -0,0 +1,224 @@
+"""
+Alembic environment tests.
+"""
+
+import io
+import warnings
+from datetime import date
+from pathlib import Path
+from types import ModuleType
+from unittest.mock import MagicMock
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from alembic.util import CommandError
+from sqlalchemy import Engine, inspect, select, text
+
+from mnemosys_core.db.base import Base
+from mnemosys_core.db.engine import create_db_engine
+from mnemosys_core.db.models import ExerciseInstance
+from mnemosys_core.db.parameters import INDEXED_PARAMETERS, parameter_index_name, parameter_value
+from mnemosys_core.db.partitioning import conversion_statements
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "src" / "mnemosys_core" / "migrations"
+RECENT_TABLES = {
+    "backfill_checkpoint",
+    "exercise_daily_minutes",
+    "mesocycle",
+    "mesocycle_day",
+    "practice_archive",
+    "practice_summary",
+}
+CHILD_TABLES = ("practice_block", "practice_block_log", "exercise_instance", "exercise_log")
+
+
+@pytest.fixture
+def migration_engine(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Engine:
+    database_url = f"sqlite:///{tmp_path / 'mnemosys.db'}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    return create_db_engine(database_url)
+
+
+@pytest.fixture
+def config() -> Config:
+    alembic_config = Config()
+    alembic_config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return alembic_config
+
+
+def _revision_module(config: Config, revision: str) -> ModuleType:
+    script = ScriptDirectory.from_config(config).get_revision(revision)
+    assert script is not None
+    return script.module
+
+
+def _index_names(engine: Engine, table_name: str) -> set[str]:
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table_name"),
+            {"table_name": table_name},
+        )
+        return {str(name) for name in rows.scalars()}
+
+
+def test_downgrade_and_upgrade_recent_revisions(migration_engine: Engine, config: Config) -> None:
+    Base.metadata.create_all(migration_engine)
+
+    command.stamp(config, "head")
+    command.downgrade(config, "0004_parameter_indexes")
+    assert not RECENT_TABLES & set(inspect(migration_engine).get_table_names())
+    columns = inspect(migration_engine).get_columns("exercise_state")
+    assert "failure_streak" not in {column["name"] for column in columns}
+
+    command.upgrade(config, "head")
+    assert set(inspect(migration_engine).get_table_names()) >= RECENT_TABLES
+    columns = inspect(migration_engine).get_columns("exercise_state")
+    assert "failure_streak" in {column["name"] for column in columns}
+    migration_engine.dispose()
+
+
+def test_upgrade_empty_database_matches_models(migration_engine: Engine, config: Config) -> None:
+    command.upgrade(config, "head")
+
+    with migration_engine.connect() as connection, warnings.catch_warnings():
+        # SQLite cannot reflect the expression indexes; they are checked by name below
+        warnings.simplefilter("ignore")
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+    parameter_indexes = {parameter_index_name(name) for name in INDEXED_PARAMETERS}
+    assert _index_names(migration_engine, "exercise_instance") >= parameter_indexes
+
+    command.downgrade(config, "0003_import_checkpoint")
+    assert not parameter_indexes & _index_names(migration_engine, "exercise_instance")
+
+    command.downgrade(config, "base")
+    assert inspect(migration_engine).get_table_names() == ["alembic_version"]
+    migration_engine.dispose()
+
+
+def test_partition_keys_backfill_existing_rows(migration_engine: Engine, config: Config) -> None:
+    command.upgrade(config, "0000_baseline")
+    with migration_engine.begin() as connection:
+        for statement in (
+            "INSERT INTO instrument (id, name, instrument_type) VALUES (1, 'Guitar', 'stringed')",
+            "INSERT INTO exercise (id, name, domains) VALUES (1, 'Scales', '[\"Technique\"]')",
+            "INSERT INTO practice VALUES (1, 1, '2025-05-17', 'normal', 30)",
+            "INSERT INTO practice_block VALUES (1, 1, 1, 1, 'Technique', 30)",
+            "INSERT INTO practice_block_log VALUES (1, 1, 'yes', 'clean', NULL)",
+            "INSERT INTO exercise_instance VALUES (1, 1, 1, 1, '{}')",
+            "INSERT INTO exercise_log VALUES (1, 1, 'yes', 'clean', NULL)",
+        ):
+            connection.execute(text(statement))
+
+    command.upgrade(config, "0001_partition_keys")
+    with migration_engine.connect() as connection:
+        for table_name in CHILD_TABLES:
+            session_dates = connection.execute(text(f"SELECT session_date FROM {table_name}")).scalars()
+            assert list(session_dates) == ["2025-05-17"], table_name
+    for table_name in ("practice", *CHILD_TABLES):
+        assert f"ix_{table_name}_session_date" in _index_names(migration_engine, table_name)
+
+    # Rerunning over columns that already exist only backfills
+    command.stamp(config, "0000_baseline")
+    command.upgrade(config, "0001_partition_keys")
+
+    command.downgrade(config, "0000_baseline")
+    for table_name in CHILD_TABLES:
+        assert "session_date" not in {column["name"] for column in inspect(migration_engine).get_columns(table_name)}
+    assert "ix_practice_session_date" not in _index_names(migration_engine, "practice")
+    migration_engine.dispose()
+
+
+@pytest.mark.parametrize(
+    ("dialect_name", "partitioning", "is_converted"),
+    [("postgresql", "true", True), ("postgresql", "false", False), ("sqlite", "true", False)],
+)
+def test_partition_by_month_converts_only_opted_in_postgresql(
+    config: Config, monkeypatch: pytest.MonkeyPatch, dialect_name: str, partitioning: str, is_converted: bool
+) -> None:
+    module = _revision_module(config, "0002_partition_by_month")
+    connection = MagicMock()
+    connection.dialect.name = dialect_name
+    convert_to_partitioned = MagicMock()
+    monkeypatch.setattr(module, "op", MagicMock(get_bind=MagicMock(return_value=connection)))
+    monkeypatch.setattr(module, "convert_to_partitioned", convert_to_partitioned)
+    monkeypatch.setenv("DB_PARTITIONING", partitioning)
+    monkeypatch.setenv("DB_PARTITION_MONTHS_AHEAD", "2")
+
+    module.upgrade()
+
+    if is_converted:
+        convert_to_partitioned.assert_called_once_with(connection, months_ahead=2, layouts=module.LAYOUTS)
+    else:
+        convert_to_partitioned.assert_not_called()
+
+
+def test_partition_by_month_refuses_to_downgrade_partitioned_tables(
+    config: Config, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    module = _revision_module(config, "0002_partition_by_month")
+    monkeypatch.setattr(module, "op", MagicMock())
+    monkeypatch.setattr(module, "is_partitioned", MagicMock(return_value=True))
+
+    with pytest.raises(CommandError, match="irreversible"):
+        module.downgrade()
+
+
+def test_partition_by_month_uses_the_layout_frozen_at_its_revision(config: Config) -> None:
+    """Test that 0002 rebuilds the 0001 keys and indexes, not ones added to the models later."""
+    module = _revision_module(config, "0002_partition_by_month")
+
+    statements = conversion_statements([date(2025, 1, 1)], module.LAYOUTS)
+
+    created_indexes = [statement for statement in statements if statement.startswith("CREATE INDEX")]
+    assert created_indexes == [
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_session_date ON {table_name} (session_date)"
+        for table_name in ("practice", "practice_block", "exercise_instance", "practice_block_log", "exercise_log")
+    ]
+
+
+def test_parameter_indexes_serve_the_parameter_filters(migration_engine: Engine, config: Config) -> None:
+    command.upgrade(config, "0004_parameter_indexes")
+
+    query = select(ExerciseInstance.id).where(parameter_value(ExerciseInstance.parameters, "tempo") >= 120)
+    with migration_engine.connect() as connection:
+        compiled = query.compile(migration_engine, compile_kwargs={"literal_binds": True})
+        plan = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    assert "ix_exercise_instance_parameter_tempo" in str(plan)
+    migration_engine.dispose()
+
+
+def test_parameter_indexes_use_jsonb_expressions_on_postgresql(config: Config, monkeypatch: pytest.MonkeyPatch) -> None:
+    module = _revision_module(config, "0004_parameter_indexes")
+    operations = MagicMock()
+    operations.get_bind.return_value.dialect.name = "postgresql"
+    monkeypatch.setattr(module, "op", operations)
+
+    module.upgrade()
+
+    statements = [call.args[0] for call in operations.execute.call_args_list]
+    assert statements == [
+        "CREATE INDEX IF NOT EXISTS ix_exercise_instance_parameter_duration ON exercise_instance "
+        "((CASE WHEN jsonb_typeof(parameters -> 'duration') = 'number' THEN (parameters ->> 'duration')::numeric END))",
+        "CREATE INDEX IF NOT EXISTS ix_exercise_instance_parameter_key ON exercise_instance ((parameters ->> 'key'))",
+        "CREATE INDEX IF NOT EXISTS ix_exercise_instance_parameter_tempo ON exercise_instance "
+        "((CASE WHEN jsonb_typeof(parameters -> 'tempo') = 'number' THEN (parameters ->> 'tempo')::numeric END))",
+    ]
+
+
+def test_mesocycles_create_and_drop_the_phase_enum_type_on_postgresql(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DATABASE_URL", "postgresql://mnemosys@localhost/mnemosys")
+    output = io.StringIO()
+    offline_config = Config(output_buffer=output)
+    offline_config.set_main_option("script_location", str(MIGRATIONS_DIR))
+
+    command.upgrade(offline_config, "0008_mastery_failure_streak:0009_mesocycles", sql=True)
+    command.downgrade(offline_config, "0009_mesocycles:0008_mastery_failure_streak", sql=True)
+
+    sql = output.getvalue()
+    create_type = """CREATE TYPE "MesocyclePhase" AS ENUM ('ACCUMULATION', 'INTENSIFICATION', 'DELOAD')"""
+    assert sql.index(create_type) < sql.index("CREATE TABLE mesocycle_day")
+    assert sql.index("DROP TABLE mesocycle_day") < sql.index('DROP TYPE "MesocyclePhase"')
@@ -0,0 +1,63 @@
+"""
+Test-database toolkit tests.
+"""
+
+from sqlalchemy import Engine, func, select
+
+from mnemosys_core.db.models import Exercise, StringedInstrument
+from mnemosys_core.db.query_budget import count_queries
+from mnemosys_core.db.session import create_session_factory
+from mnemosys_core.testing import TemplateDatabase, transactional_session
+
+
+def seed_instrument(engine: Engine) -> None:
+    """Template seed with one instrument."""
+    with create_session_factory(engine)() as db_session:
+        db_session.add(StringedInstrument(name="Strat", string_count=6, scale_length=25.5))
+        db_session.commit()
+
+
+def count_rows(engine: Engine, model: type[Exercise] | type[StringedInstrument]) -> int:
+    """Count the rows of a model."""
+    with engine.connect() as connection:
+        return int(connection.execute(select(func.count()).select_from(model)).scalar_one())
+
+
+def test_snapshots_start_from_seeded_template_and_stay_isolated() -> None:
+    """Test that each snapshot copies the template and keeps its own writes."""
+    template = TemplateDatabase(seed=seed_instrument)
+    first, second = template.snapshot(), template.snapshot()
+    try:
+        with create_session_factory(first)() as db_session:
+            db_session.add(Exercise(name="Chromatic Scale", domains=[]))
+            db_session.commit()
+
+        assert count_rows(first, StringedInstrument) == count_rows(second, StringedInstrument) == 1
+        assert count_rows(first, Exercise) == 1
+        assert count_rows(second, Exercise) == 0
+        assert count_rows(template.engine, Exercise) == 0
+    finally:
+        first.dispose()
+        second.dispose()
+        template.dispose()
+
+
+def test_transactional_session_discards_commits(engine: Engine) -> None:
+    """Test that commits inside a transactional session are rolled back on exit."""
+    with transactional_session(engine) as db_session:
+        db_session.add(Exercise(name="Chromatic Scale", domains=[]))
+        db_session.commit()
+        db_session.add(Exercise(name="Spider Walk", domains=[]))
+        db_session.rollback()
+
+        assert db_session.scalars(select(Exercise.name)).all() == ["Chromatic Scale"]
+
+    assert count_rows(engine, Exercise) == 0
+
+
+def test_snapshot_begin_is_invisible_to_statement_listeners(engine: Engine) -> None:
+    """Test that the explicit BEGIN does not count against query budgets."""
+    with count_queries(engine) as query_log, engine.connect() as connection:
+        connection.execute(select(Exercise.id)).all()
+
+    assert query_log.count == 1
@@ -0,0 +1,65 @@
+"""
+Seed data factory tests.
+"""
+
+from datetime import date
+
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+
+from mnemosys_core.db.models import ExerciseInstance, ExerciseLog, PracticeBlockLog
+from mnemosys_core.testing import DataFactory, transactional_session
+
+
+def test_practice_history(mnemosys_factory: DataFactory, mnemosys_session: Session) -> None:
+    """Test that a history has one logged practice per day with partition keys filled in."""
+    practices = mnemosys_factory.practice_history(days=5, start=date(2025, 3, 1), exercises_per_practice=2)
+
+    assert [practice.session_date for practice in practices] == [date(2025, 3, day) for day in range(1, 6)]
+    for practice in practices:
+        assert len(practice.blocks) == len(practice.exercise_instances) == 2
+        assert practice.total_minutes == sum(block.duration_minutes for block in practice.blocks)
+        assert {instance.session_date for instance in practice.exercise_instances} == {practice.session_date}
+        assert 60 <= practice.exercise_instances[0].parameters["tempo"] <= 180
+    assert len(mnemosys_session.scalars(select(ExerciseLog)).all()) == 10
+    assert len(mnemosys_session.scalars(select(PracticeBlockLog)).all()) == 10
+
+
+def test_equal_seeds_produce_equal_data(engine: Engine) -> None:
+    """Test that factories are reproducible."""
+    parameter_sets = []
+    for _ in range(2):
+        with transactional_session(engine) as db_session:
+            DataFactory(db_session, seed=7).practice_history(days=3)
+            parameter_sets.append(db_session.scalars(select(ExerciseInstance.parameters)).all())
+
+    assert parameter_sets[0] == parameter_sets[1]
+
+
+def test_exercise_names_stay_unique(mnemosys_factory: DataFactory) -> None:
+    """Test that names are unique past the built-in list."""
+    names = [mnemosys_factory.exercise().name for _ in range(10)]
+
+    assert len(set(names)) == 10
+
+
+def test_practice_defaults(mnemosys_factory: DataFactory) -> None:
+    """Test that a practice without arguments gets a new instrument and three new exercises."""
+    practice = mnemosys_factory.practice()
+
+    assert practice.session_date == date(2025, 1, 1)
+    assert practice.instrument.id is not None
+    assert len({block.exercise_id for block in practice.blocks}) == 3
+
+
+def test_practice_history_uses_given_instrument_and_exercises(mnemosys_factory: DataFactory) -> None:
+    """Test that a history practices the instrument and exercise pool it is given."""
+    instrument = mnemosys_factory.instrument()
+    pool = [mnemosys_factory.exercise(), mnemosys_factory.exercise()]
+
+    practices = mnemosys_factory.practice_history(days=3, instrument=instrument, exercises=pool)
+
+    assert {practice.instrument_id for practice in practices} == {instrument.id}
+    assert {block.exercise_id for practice in practices for block in practice.blocks} == {
+        exercise.id for exercise in pool
+    }
@@ -0,0 +1,28 @@
+"""
+Timing utility tests.
+"""
+
+import pytest
+
+from mnemosys_core.util.timing import timed
+
+
+def test_timed_records_duration() -> None:
+    """Test timed records the block's duration under its phase."""
+    timings: dict[str, float] = {"load": 1.0}
+
+    with timed(timings, "write"):
+        pass
+
+    assert timings["load"] == 1.0
+    assert 0 <= timings["write"] < 1
+
+
+def test_timed_records_duration_of_failed_block() -> None:
+    """Test timed still records the duration when the block raises."""
+    timings: dict[str, float] = {}
+
+    with pytest.raises(ValueError), timed(timings, "write"):
+        raise ValueError("boom")
+
+    assert set(timings) == {"write"}